@@ -0,0 +1,98 @@
+"""
+Benchmark of speculative fallback to unstructured reasoning.
+
+Structured attempts fail (after their full latency) with a given
+probability. Queries are run through process_query_with_fallback with
+speculation off, parallel and delayed, and latency percentiles and the
+number of unstructured generations started are reported.
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.api.fake import FakeBackend
+from src.cot.reasoning import ChainOfThoughtReasoner
+
+
+class FailingStructuredBackend(FakeBackend):
+    """FakeBackend whose structured attempts sometimes fail."""
+
+    def __init__(self, structured: float, unstructured: float, failure_rate: float, seed: int):
+        super().__init__()
+        self.structured = structured
+        self.unstructured = unstructured
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.unstructured_calls = 0
+
+    def generate_completion(self, messages, **kwargs):
+        if "Show your work" in messages[-1]["content"]:
+            with self._lock:
+                self.unstructured_calls += 1
+            time.sleep(self.unstructured)
+        else:
+            with self._lock:
+                fail = self._random.random() < self.failure_rate
+            time.sleep(self.structured)
+            if fail:
+                raise RuntimeError("structured attempt failed")
+        return super().generate_completion(messages, **kwargs)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Speculative fallback benchmark")
+    parser.add_argument("--requests", type=int, default=200, help="Queries per mode")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--structured-ms", type=float, default=80.0, help="Latency of a structured attempt")
+    parser.add_argument("--unstructured-ms", type=float, default=60.0, help="Latency of an unstructured generation")
+    parser.add_argument("--failure-rate", type=float, default=0.1, help="Fraction of structured attempts that fail")
+    parser.add_argument("--delay-ms", type=float, default=40.0, help="Delay before a delayed fallback starts")
+    return parser.parse_args()
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def main():
+    args = parse_args()
+
+    print(f"\n{'=' * 72}")
+    print("process_query_with_fallback latency (milliseconds)")
+    print(f"{'=' * 72}")
+    print(f"{'':>10} {'p50':>8} {'p95':>8} {'max':>8} {'fallbacks started':>18} {'payoff rate':>12}")
+    for mode in ("off", "parallel", "delayed"):
+        backend = FailingStructuredBackend(args.structured_ms / 1000, args.unstructured_ms / 1000, args.failure_rate, seed=1)
+        reasoner = ChainOfThoughtReasoner(use_tools=False, client=backend)
+
+        def one(_):
+            start = time.perf_counter()
+            reasoner.process_query_with_fallback(
+                "Why is the sky blue?",
+                speculation=mode,
+                speculation_delay=args.delay_ms / 1000
+            )
+            return (time.perf_counter() - start) * 1000
+
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            latencies = list(pool.map(one, range(args.requests)))
+        stats = reasoner.speculation_stats()
+        payoff = f"{stats['payoff_rate']:.1%}" if mode != "off" else "-"
+        print(
+            f"{mode:>10} {percentile(latencies, 50):>8.1f} {percentile(latencies, 95):>8.1f} "
+            f"{max(latencies):>8.1f} {backend.unstructured_calls:>18} {payoff:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark of request hedging against a backend with a heavy latency tail.
+
+The fake backend's first-token latency is usually short but occasionally
+very long, as seen with a shared upstream API. Requests are sent from
+concurrent clients with and without hedging, and latency percentiles and
+the extra upstream requests caused by hedging are reported.
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.api.fake import FakeBackend
+from src.api.hedging import HedgedBackend
+
+MESSAGES = [{"role": "user", "content": "Why is the sky blue? Answer in JSON."}]
+
+
+class TailLatencyBackend(FakeBackend):
+    """FakeBackend whose first-token latency has a heavy tail."""
+
+    def __init__(self, median: float, slow: float, slow_fraction: float, seed: int):
+        super().__init__()
+        self.median = median
+        self.slow = slow
+        self.slow_fraction = slow_fraction
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.started = 0
+
+    def _wait(self):
+        with self._lock:
+            self.started += 1
+            slow = self._random.random() < self.slow_fraction
+            jitter = self._random.lognormvariate(0, 0.3)
+        time.sleep(self.slow if slow else self.median * jitter)
+
+    def generate_completion(self, messages, **kwargs):
+        self._wait()
+        return super().generate_completion(messages, **kwargs)
+
+    def stream_completion(self, messages, **kwargs):
+        self._wait()
+        yield from super().stream_completion(messages, **kwargs)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Hedged request benchmark")
+    parser.add_argument("--requests", type=int, default=400, help="Requests per run")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--median-ms", type=float, default=30.0, help="Typical first-token latency")
+    parser.add_argument("--slow-ms", type=float, default=600.0, help="First-token latency of slow requests")
+    parser.add_argument("--slow-fraction", type=float, default=0.03, help="Fraction of slow requests")
+    parser.add_argument("--max-hedge-rate", type=float, default=0.1, help="Hedge rate cap")
+    return parser.parse_args()
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def run(backend, requests, concurrency):
+    def one(_):
+        start = time.perf_counter()
+        backend.generate_completion(MESSAGES)
+        return (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(one, range(requests)))
+
+
+def main():
+    args = parse_args()
+
+    def make_backend():
+        return TailLatencyBackend(args.median_ms / 1000, args.slow_ms / 1000, args.slow_fraction, seed=1)
+
+    plain = make_backend()
+    hedged_primary = make_backend()
+    hedged = HedgedBackend(
+        hedged_primary,
+        percentile=95,
+        initial_delay=args.median_ms * 3 / 1000,
+        max_hedge_rate=args.max_hedge_rate
+    )
+
+    print(f"\n{'=' * 64}")
+    print("Completion latency (milliseconds)")
+    print(f"{'=' * 64}")
+    print(f"{'':>10} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'upstream calls':>16}")
+    for name, backend, counted in (("plain", plain, plain), ("hedged", hedged, hedged_primary)):
+        latencies = run(backend, args.requests, args.concurrency)
+        print(
+            f"{name:>10} {percentile(latencies, 50):>8.1f} {percentile(latencies, 95):>8.1f} "
+            f"{percentile(latencies, 99):>8.1f} {max(latencies):>8.1f} {counted.started:>16}"
+        )
+    stats = hedged.stats()
+    print(f"\nHedged {stats['hedges']} of {stats['requests']} requests ({stats['hedge_rate']:.1%}), "
+          f"hedge won {stats['hedge_wins']} times")
+
+
+if __name__ == "__main__":
+    main()
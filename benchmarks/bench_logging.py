@@ -0,0 +1,114 @@
+"""
+Micro-benchmark of per-request logging overhead.
+
+Simulates the log calls made while serving one /api/reason request and
+reports the time spent in the calling thread (i.e. what the event loop or
+worker pays) for the legacy synchronous handler with eager f-strings versus
+the queue-based pipeline with lazy formatting.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.logger import configure_logging, flush_logging, get_logger, set_request_id
+
+QUERY = "Calculate the compound interest on $1000 invested for 5 years at an annual rate of 8% compounded quarterly."
+CONTENT = '{"reasoning_steps": [' + ", ".join(['{"title": "Step", "content": "' + "x" * 200 + '"}'] * 10) + "]}"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Per-request logging overhead benchmark")
+    parser.add_argument("--requests", type=int, default=20000, help="Number of simulated requests")
+    parser.add_argument(
+        "--write-latency-us",
+        type=float,
+        default=20.0,
+        help="Simulated latency of each write to the log sink (a pipe or collector that is not instantaneous)"
+    )
+    return parser.parse_args()
+
+
+class SlowSink:
+    """Log sink whose writes take a fixed time, like a busy stdout pipe."""
+
+    def __init__(self, latency_us):
+        self.latency = latency_us / 1e6
+
+    def write(self, data):
+        if self.latency:
+            time.sleep(self.latency)
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+def legacy_request(logger):
+    logger.info(f"Received query: {QUERY}")
+    logger.info(f"Processing query: {QUERY}")
+    logger.debug(f"Sending request to Groq API with {2} messages")
+    logger.debug(f"Received response from Groq API: {CONTENT[:100]}...")
+    logger.debug(f"Calculating expression: {'1000 * (1 + 0.08/4) ** 20'}")
+    logger.debug(f"Calculation result: {1485.9473959063}")
+    logger.info(f"Successfully processed query with {10} reasoning steps")
+
+
+def pipeline_request(logger):
+    logger.info("Received query (%d chars)", len(QUERY))
+    logger.debug("Query text: %.200s", QUERY)
+    logger.info("Processing query (%d chars)", len(QUERY))
+    logger.debug("Sending request to Groq API with %d messages", 2)
+    logger.debug("Received response from Groq API: %.100s...", CONTENT)
+    logger.debug("Calculating expression: %s", '1000 * (1 + 0.08/4) ** 20')
+    logger.debug("Calculation result: %s", 1485.9473959063)
+    logger.info("Successfully processed query with %s reasoning steps", 10)
+
+
+def measure(fn, logger, requests):
+    start = time.perf_counter()
+    for _ in range(requests):
+        fn(logger)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    args = parse_args()
+    sink = SlowSink(args.write_latency_us)
+    set_request_id("bench")
+
+    legacy = logging.getLogger("bench.legacy")
+    legacy.propagate = False
+    handler = logging.StreamHandler(sink)
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    legacy.addHandler(handler)
+
+    results = []
+    for level in ("INFO", "DEBUG"):
+        legacy.setLevel(level)
+        results.append((f"legacy sync handler, f-strings ({level})", measure(legacy_request, legacy, args.requests)))
+
+        for fmt, rate in (("text", 1.0), ("json", 1.0), ("json", 0.1)):
+            configure_logging(stream=sink, fmt=fmt, debug_sample_rate=rate)
+            logger = get_logger(f"bench.pipeline.{level}.{fmt}.{rate}", level=level)
+            label = f"queue pipeline, lazy {fmt}" + (f", debug sampled {rate:.0%}" if rate < 1.0 else "")
+            results.append((f"{label} ({level})", measure(pipeline_request, logger, args.requests)))
+            logger.handlers.clear()
+
+    flush_logging()
+
+    print(f"\n{'=' * 70}")
+    print(f"Per-request logging overhead in the calling thread ({args.requests} requests, "
+          f"{args.write_latency_us:g} us per sink write)")
+    print(f"{'=' * 70}")
+    for label, us in results:
+        print(f"{label:<58} {us:8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark of the generation budget profiles.
+
+Runs an evaluation dataset once per profile and prints accuracy, latency
+and token use side by side, so the quality a cheaper profile gives up can
+be weighed against what it saves. Uses the deterministic fake backend by
+default; pass --backend groq (or openai) to measure the real model.
+"""
+
+import argparse
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.api.backends import create_backend
+from src.cot.profiles import get_profile, profile_names
+from src.cot.reasoning import ChainOfThoughtReasoner
+from src.eval.datasets import load_dataset
+from src.eval.runner import EvalRunner
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Budget profile benchmark")
+    parser.add_argument("--dataset", default="examples", help="Dataset file, or the name of a dataset in data/eval")
+    parser.add_argument("--limit", type=int, default=None, help="Evaluate only the first N items")
+    parser.add_argument("--backend", default="fake", help="Completion backend: groq, openai or fake")
+    parser.add_argument("--profiles", nargs="+", default=profile_names(), choices=profile_names(), help="Profiles to compare")
+    parser.add_argument("--concurrency", type=int, default=4, help="Items evaluated in parallel")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    items = load_dataset(args.dataset, limit=args.limit)
+
+    print(f"\n{'=' * 72}")
+    print(f"Budget profiles on {args.dataset} ({len(items)} items, {args.backend} backend)")
+    print(f"{'=' * 72}")
+    print(f"{'profile':>10} {'accuracy':>9} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'tokens/item':>12}")
+    for name in args.profiles:
+        profile = get_profile(name)
+        reasoner = ChainOfThoughtReasoner(client=create_backend(args.backend, model=profile.model), profile=name)
+        # Each profile runs at its own temperature
+        runner = EvalRunner(reasoner, concurrency=args.concurrency, temperature=None)
+        summary = runner.run(items, name=name, dataset=args.dataset)["summary"]
+        print(
+            f"{name:>10} {summary['accuracy']:>9.1%} {summary['errors']:>7} "
+            f"{summary['latency_ms']['p50']:>9.0f} {summary['latency_ms']['p95']:>9.0f} "
+            f"{summary['tokens'] / max(1, summary['items']):>12.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark of sandboxed tool calls.
+
+Measures the per-call latency of the calculator run in-process and in the
+warm worker pool, then the cost of a call that times out, which includes
+killing and replacing its worker.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tools.calculator import _calculate
+from src.tools.sandbox import ToolSandbox, ToolTimeout
+
+EXPRESSION = "round(1000 * (1 + 0.05 / 12) ** 120, 2)"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sandboxed tool call benchmark")
+    parser.add_argument("--calls", type=int, default=2000, help="Calls per run")
+    parser.add_argument("--workers", type=int, default=2, help="Worker processes")
+    return parser.parse_args()
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def run(call, calls):
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - start) * 1_000_000)
+    return latencies
+
+
+def main():
+    args = parse_args()
+    sandbox = ToolSandbox(workers=args.workers)
+    start = time.perf_counter()
+    sandbox.start()
+    startup = time.perf_counter() - start
+
+    print(f"\n{'=' * 56}")
+    print("Calculator call latency (microseconds)")
+    print(f"{'=' * 56}")
+    print(f"{'':>12} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    runs = (
+        ("in-process", lambda: _calculate(EXPRESSION, "exact", None)),
+        ("sandboxed", lambda: sandbox.run(_calculate, EXPRESSION, "exact", None)),
+    )
+    for name, call in runs:
+        latencies = run(call, args.calls)
+        print(
+            f"{name:>12} {percentile(latencies, 50):>8.0f} {percentile(latencies, 95):>8.0f} "
+            f"{percentile(latencies, 99):>8.0f} {max(latencies):>8.0f}"
+        )
+
+    start = time.perf_counter()
+    try:
+        sandbox.run(time.sleep, 10, timeout=0.1)
+    except ToolTimeout:
+        pass
+    recycle = time.perf_counter() - start
+    print(f"\nStarting {args.workers} workers took {startup * 1000:.0f} ms; "
+          f"a 100 ms timeout including the worker's replacement took {recycle * 1000:.0f} ms")
+    sandbox.close()
+
+
+if __name__ == "__main__":
+    main()
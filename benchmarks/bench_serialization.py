@@ -0,0 +1,107 @@
+"""
+Benchmark of /api/reason response serialization on multi-kilobyte reasoning outputs.
+
+Compares the previous path (untyped Dict[str, Any] response model, dumped
+to Python objects and then encoded with json) against the typed models
+serialized directly to bytes, and reports compressed sizes and costs.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from typing import Any, Dict
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pydantic import BaseModel
+
+from src.cot.models import QueryResponse, ReasoningResult
+from src.web.responses import brotli, compress
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class LegacyQueryResponse(BaseModel):
+    result: Dict[str, Any]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Response serialization benchmark")
+    parser.add_argument("--steps", type=int, nargs="+", default=[5, 20, 60], help="Reasoning step counts to test")
+    parser.add_argument("--iterations", type=int, default=2000, help="Iterations per measurement")
+    return parser.parse_args()
+
+
+def make_result(steps: int) -> Dict[str, Any]:
+    paragraph = (
+        "To find the compound interest we use A = P(1 + r/n)^(nt) with P = 1000, r = 0.08, "
+        "n = 4 and t = 5. Each quarter the balance grows by 2%, so after 20 quarters the "
+        "balance is 1000 * 1.02^20. "
+    )
+    return {
+        "reasoning_steps": [
+            {
+                "title": f"Step {i + 1}: Apply the compound interest formula",
+                "content": paragraph * 3,
+                "next_action": "final_answer" if i == steps - 1 else "continue",
+            }
+            for i in range(steps)
+        ],
+        "final_answer": "The compound interest is approximately $485.95.",
+    }
+
+
+def timeit(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    args = parse_args()
+
+    print(f"\n{'=' * 78}")
+    print("Response serialization (microseconds per response)")
+    print(f"{'=' * 78}")
+    header = f"{'steps':>5} {'size':>8} {'legacy':>9} {'typed':>9}"
+    if orjson is not None:
+        header += f" {'orjson':>9}"
+    header += f" {'gzip':>16}"
+    if brotli is not None:
+        header += f" {'brotli':>16}"
+    print(header)
+
+    for steps in args.steps:
+        result = make_result(steps)
+
+        def legacy():
+            response = LegacyQueryResponse.model_validate({"result": result})
+            return json.dumps(response.model_dump(mode="json")).encode("utf-8")
+
+        def typed():
+            response = QueryResponse(result=ReasoningResult.from_result(result))
+            return response.model_dump_json(exclude_none=True).encode("utf-8")
+
+        body = typed()
+        row = f"{steps:>5} {len(body):>7}B {timeit(legacy, args.iterations):>8.1f} {timeit(typed, args.iterations):>8.1f}"
+        if orjson is not None:
+            row += f" {timeit(lambda: orjson.dumps({'result': result}), args.iterations):>8.1f}"
+
+        gzipped = gzip.compress(body, compresslevel=5)
+        row += f" {len(gzipped):>6}B {timeit(lambda: compress(body, 'gzip'), args.iterations // 4):>7.1f}us"
+        if brotli is not None:
+            brotlied = compress(body, "br")
+            row += f" {len(brotlied):>6}B {timeit(lambda: compress(body, 'br'), args.iterations // 4):>7.1f}us"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark of time-to-first-step for streamed versus blocking reasoning.
+
+A fake client emits the JSON response in small chunks at a fixed rate, as a
+model generating tokens would. The blocking path (process_query, used by
+/api/reason) can show nothing until the whole response has been generated;
+the streaming path (stream_query, used by /api/reason/stream) yields each
+step as soon as its closing brace arrives.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# The fake client below never talks to the API
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+
+from src.cot.reasoning import ChainOfThoughtReasoner
+
+
+class FakeStreamingClient:
+    """Emits a fixed response in chunks, sleeping between chunks."""
+
+    def __init__(self, response: str, chunk_size: int, chunk_delay: float):
+        self.response = response
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+
+    def stream_completion(self, **kwargs) -> Iterator[Dict[str, Any]]:
+        for start in range(0, len(self.response), self.chunk_size):
+            time.sleep(self.chunk_delay)
+            yield {"content": self.response[start:start + self.chunk_size]}
+
+    def generate_completion(self, **kwargs) -> Dict[str, Any]:
+        return {"content": "".join(chunk["content"] for chunk in self.stream_completion(**kwargs))}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Streaming time-to-first-step benchmark")
+    parser.add_argument("--steps", type=int, nargs="+", default=[3, 8, 20], help="Reasoning step counts to test")
+    parser.add_argument("--chunk-size", type=int, default=16, help="Characters per streamed chunk")
+    parser.add_argument("--chunk-delay-ms", type=float, default=2.0, help="Delay between chunks in milliseconds")
+    return parser.parse_args()
+
+
+def make_response(steps: int) -> str:
+    paragraph = "We apply the formula, substitute the known values and simplify the result. "
+    return json.dumps({
+        "reasoning_steps": [
+            {
+                "title": f"Step {i + 1}",
+                "content": paragraph * 4,
+                "next_action": "final_answer" if i == steps - 1 else "continue",
+            }
+            for i in range(steps)
+        ],
+        "final_answer": "42",
+    })
+
+
+def main():
+    args = parse_args()
+    reasoner = ChainOfThoughtReasoner(use_tools=False)
+
+    print(f"\n{'=' * 70}")
+    print("Time to first step (milliseconds)")
+    print(f"{'=' * 70}")
+    print(f"{'steps':>5} {'size':>8} {'blocking':>10} {'streamed':>10} {'stream total':>13}")
+
+    for steps in args.steps:
+        response = make_response(steps)
+        reasoner.client = FakeStreamingClient(response, args.chunk_size, args.chunk_delay_ms / 1000)
+
+        start = time.perf_counter()
+        reasoner.process_query("benchmark")
+        blocking = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        first_step = None
+        for event in reasoner.stream_query("benchmark"):
+            if event["type"] == "step" and first_step is None:
+                first_step = (time.perf_counter() - start) * 1000
+        total = (time.perf_counter() - start) * 1000
+
+        print(f"{steps:>5} {len(response):>7}B {blocking:>10.1f} {first_step:>10.1f} {total:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark of trace storage: size and speed of the trace codec against plain JSON.
+
+Trains the codec on one half of a set of reasoning results and encodes the
+other half one record at a time, as the trace log and caches do. Reports
+the bytes per record, the compression ratio against plain JSON and the
+encode and decode throughput in MB/s of JSON. Without --traces, synthetic
+results with the repetitive titles and phrasing of real ones are used.
+
+Examples:
+    python benchmarks/bench_trace_codec.py
+    python benchmarks/bench_trace_codec.py --traces data/answer_index/index.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import zlib
+from typing import Any, Callable, Dict, List
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.cot.trace_store import RAW, ZLIB, ZSTD, TraceCodec, read_results, zstandard
+
+TITLES = [
+    "Understand the problem", "Identify the key information", "Set up the equation",
+    "Calculate the result", "Verify the answer", "Consider alternative approaches",
+    "Re-examine the calculation", "Check the units", "Break the problem into parts",
+    "Apply the formula", "Compare the methods", "Summarize the findings",
+]
+PHRASES = [
+    "Let's start by carefully reading the question to understand what is being asked.",
+    "We are given that the value of {a} is multiplied by {b}.",
+    "To solve this, we can use the formula and substitute the known values.",
+    "Substituting the values gives {a} * {b} = {c}.",
+    "Let me re-examine this using another approach to make sure the answer is correct.",
+    "As an alternative method, we can estimate: {a} is close to {d}, so the result should be near {e}.",
+    "Both methods agree, so we can be confident in the answer.",
+    "I should consider that I may be wrong, so let's double-check each step.",
+    "The question asks for the total, so we add the parts: {a} + {b} = {f}.",
+    "Counting the letters one at a time, we find {g} occurrences.",
+    "This is consistent with the result from the previous step.",
+]
+
+
+def make_traces(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Synthetic reasoning results with recurring titles and boilerplate phrasing."""
+    rng = random.Random(seed)
+    traces = []
+    for _ in range(count):
+        a, b = rng.randint(2, 999), rng.randint(2, 99)
+        values = {"a": a, "b": b, "c": a * b, "d": round(a, -1), "e": round(a, -1) * b, "f": a + b, "g": rng.randint(1, 5)}
+        steps = rng.randint(3, 8)
+        reasoning_steps = []
+        for i in range(steps):
+            title = rng.choice(TITLES)
+            if rng.random() < 0.3:
+                title = f"Step {i + 1}: {title}"
+            content = " ".join(rng.choice(PHRASES).format(**values) for _ in range(rng.randint(2, 5)))
+            reasoning_steps.append({
+                "title": title,
+                "content": content,
+                "next_action": "final_answer" if i == steps - 1 else "continue",
+            })
+        traces.append({
+            "query": f"What is {a} * {b}?",
+            "result": {"reasoning_steps": reasoning_steps, "final_answer": f"The answer is {a * b}."},
+        })
+    return traces
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Trace storage benchmark")
+    parser.add_argument("--traces", help="Answer index, JSON lines file or trace log with results (synthetic if unset)")
+    parser.add_argument("--count", type=int, default=2000, help="Number of synthetic results")
+    parser.add_argument("--dict-size", type=int, default=16 * 1024, help="Dictionary size in bytes")
+    return parser.parse_args()
+
+
+def measure(records: List[Dict[str, Any]], encode: Callable, decode: Callable) -> Dict[str, float]:
+    start = time.perf_counter()
+    encoded = [encode(record) for record in records]
+    encode_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for data in encoded:
+        decode(data)
+    decode_seconds = time.perf_counter() - start
+    return {"bytes": sum(len(data) for data in encoded), "encode": encode_seconds, "decode": decode_seconds}
+
+
+def main():
+    args = parse_args()
+    records = read_results(args.traces) if args.traces else make_traces(args.count)
+    training, test = records[::2], records[1::2]
+
+    def plain(record):
+        return json.dumps(record, ensure_ascii=False).encode("utf-8")
+
+    methods = {"json": (plain, json.loads)}
+    methods["json + zlib"] = (lambda record: zlib.compress(plain(record), 6), lambda data: json.loads(zlib.decompress(data)))
+    if zstandard is not None:
+        compressor, decompressor = zstandard.ZstdCompressor(level=3), zstandard.ZstdDecompressor()
+        methods["json + zstd"] = (lambda record: compressor.compress(plain(record)), lambda data: json.loads(decompressor.decompress(data)))
+
+    start = time.perf_counter()
+    codecs = {
+        "codec raw (titles only)": TraceCodec.train(training, dict_size=args.dict_size, method=RAW),
+        "codec zlib, untrained": TraceCodec(method=ZLIB),
+        "codec zlib, trained": TraceCodec.train(training, dict_size=args.dict_size, method=ZLIB),
+    }
+    if zstandard is not None:
+        codecs["codec zstd, untrained"] = TraceCodec(method=ZSTD)
+        codecs["codec zstd, trained"] = TraceCodec.train(training, dict_size=args.dict_size, method=ZSTD)
+    train_seconds = time.perf_counter() - start
+    for name, codec in codecs.items():
+        methods[name] = (codec.encode, codec.decode)
+
+    json_bytes = sum(len(plain(record)) for record in test)
+    megabytes = json_bytes / 1e6
+    print(f"\n{'=' * 78}")
+    print(f"Trace storage: {len(test)} records, {json_bytes / len(test):.0f} bytes of JSON each"
+          f" (trained on {len(training)} in {train_seconds:.2f}s)")
+    print(f"{'=' * 78}")
+    print(f"{'method':<26} {'bytes/rec':>10} {'ratio':>7} {'encode MB/s':>12} {'decode MB/s':>12}")
+    for name, (encode, decode) in methods.items():
+        result = measure(test, encode, decode)
+        print(f"{name:<26} {result['bytes'] / len(test):>10.0f} {json_bytes / result['bytes']:>6.1f}x"
+              f" {megabytes / result['encode']:>12.1f} {megabytes / result['decode']:>12.1f}")
+    if zstandard is None:
+        print("\nzstandard is not installed; install it to compare zstd")
+
+
+if __name__ == "__main__":
+    main()
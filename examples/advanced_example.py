@@ -10,6 +10,7 @@ import argparse
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from src.cot.profiles import profile_names
 from src.cot.reasoning import ChainOfThoughtReasoner
 from src.utils.logger import get_logger
 
@@ -26,8 +27,20 @@ def parse_args():
     parser.add_argument(
         "--temperature", 
         type=float, 
-        default=0.7, 
-        help="Temperature for generation (0.0 to 1.0)"
+        default=None, 
+        help="Temperature for generation (0.0 to 1.0, defaults to the profile's)"
+    )
+    parser.add_argument(
+        "--profile",
+        choices=profile_names(),
+        default=None,
+        help="Budget profile: fast, balanced or thorough (defaults to BUDGET_PROFILE)"
+    )
+    parser.add_argument(
+        "--max-tokens",
+        type=int,
+        default=None,
+        help="Completion token limit (defaults to the profile's)"
     )
     parser.add_argument(
         "--structured", 
@@ -45,11 +58,12 @@ def main():
     args = parse_args()
     
     # Initialize the reasoner
-    reasoner = ChainOfThoughtReasoner(use_tools=not args.no_tools)
+    reasoner = ChainOfThoughtReasoner(use_tools=not args.no_tools, profile=args.profile)
     
     print(f"\n{'=' * 50}")
     print(f"QUERY: {args.query}")
-    print(f"Temperature: {args.temperature}")
+    print(f"Profile: {reasoner.profile.name}")
+    print(f"Temperature: {reasoner.profile.temperature if args.temperature is None else args.temperature}")
     print(f"Structured output: {args.structured}")
     print(f"Tools enabled: {not args.no_tools}")
     print(f"{'=' * 50}\n")
@@ -58,7 +72,8 @@ def main():
     result = reasoner.process_query(
         query=args.query,
         temperature=args.temperature,
-        structured_output=args.structured
+        structured_output=args.structured,
+        max_tokens=args.max_tokens
     )
     
     # Print the result
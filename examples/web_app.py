@@ -2,80 +2,688 @@
 Web application example using FastAPI.
 """
 
+import asyncio
+import hmac
+import json
 import sys
 import os
-from typing import Optional, Dict, Any
+import signal
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache, partial
+from typing import Any, Dict, Optional
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-# Apply the Groq patch before importing any Groq-related modules
-from src.utils.groq_patch import patch_groq_client
-patch_groq_client()
-
-import uvicorn
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+from starlette.concurrency import iterate_in_threadpool
 
+from src.api.backends import configured_model
+from src.config import ADMIN_API_KEY, JOB_CALLBACK_ALLOWED_HOSTS, JOB_CALLBACK_SECRET, REQUIRE_API_KEY, TENANTS
+from src.cot.answer_index import get_answer_index
+from src.cot.profiles import get_profile
+from src.cot.models import QueryResponse, ReasoningResult, Usage
 from src.cot.reasoning import ChainOfThoughtReasoner
-from src.utils.logger import get_logger
+from src.cot.session import ReasoningSession
+from src.cot.trace_store import get_trace_log
+from src.settings import Settings, SettingsError, get_settings, on_reload, reload_settings, settings_info
+from src.tools.sandbox import get_sandbox
+from src.utils.deadline import Deadline, DeadlineExceeded
+from src.utils.logger import get_logger, new_request_id, reset_request_id, set_request_id
+from src.utils.tracing import start_trace
+from src.utils.usage import UsageMeter, ledger, metered, metering
+from src.web.admission import AdmissionController, Priority, QueueFullError, run_with_deadline
+from src.web.jobs import Job, JobManager, JobQueueFullError
+from src.web.metrics import PROMETHEUS_CONTENT_TYPE, MetricFamily, format_metrics, profiling_metrics, tenant_metrics, usage_metrics
+from src.web.profiling import (
+    MAX_PROFILE_SECONDS, LoopLagMonitor, ProfilerBusyError, RouteCPU, SamplingProfiler, collapsed, cpu_timed, cpu_timed_iter
+)
+from src.web.responses import json_response, ndjson_stream
+from src.web.static_files import PrecompressedStaticFiles
+from src.web.tenants import QuotaExceededError, Tenant, TenantRegistry, UnknownAPIKeyError
 
 logger = get_logger(__name__)
 
+# CPU time per route, event loop lag and the on-demand profiler behind /admin/profile
+route_cpu = RouteCPU()
+loop_monitor = LoopLagMonitor()
+profiler = SamplingProfiler()
+
+def _reload_on_signal():
+    try:
+        reload_settings()
+    except SettingsError as e:
+        logger.error("Keeping the current settings: %s", e)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Load the answer index and start the tool workers before serving, so the
+    first requests do not wait for them, reload the settings on SIGHUP,
+    watch the event loop for blocking code, and on shutdown stop running
+    jobs and write out the trace log.
+    """
+    await asyncio.to_thread(get_answer_index)
+    sandbox = get_sandbox()
+    if sandbox is not None:
+        await asyncio.to_thread(sandbox.start)
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGHUP, _reload_on_signal)
+        reload_signal = True
+    except (AttributeError, NotImplementedError, RuntimeError, ValueError):
+        # No SIGHUP (Windows), or the loop is not running in the main thread
+        reload_signal = False
+    loop_monitor.start()
+    yield
+    await loop_monitor.stop()
+    if reload_signal:
+        loop.remove_signal_handler(signal.SIGHUP)
+    await jobs.close()
+    trace_log = get_trace_log()
+    if trace_log is not None:
+        await asyncio.to_thread(trace_log.flush)
+
 # Initialize the FastAPI app
 app = FastAPI(
     title="Chain of Thought API",
     description="API for chain of thought reasoning with Llama 3.3 70B using Groq",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
-# Mount static files
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# Mount static files (serves precompressed, fingerprinted assets from static/dist
+# once scripts/build_static.py has been run)
+static_files = PrecompressedStaticFiles(directory="static")
+app.mount("/static", static_files, name="static")
 
-# Initialize reasoners (with and without tools)
-reasoner_with_tools = ChainOfThoughtReasoner(use_tools=True)
-reasoner_without_tools = ChainOfThoughtReasoner(use_tools=False)
+@app.middleware("http")
+async def request_context(request: Request, call_next):
+    """
+    Tag everything done for a request (including log records) with a request id.
+    
+    The id is taken from the X-Request-ID header if the client sent one and
+    is echoed back in the response. When tracing is enabled the request is
+    traced, with the trace id derived from the request id; for streamed
+    responses the trace covers the work done until the response starts.
+    CPU and wall time are added to the route's totals once the response
+    has been sent.
+    """
+    request_id = request.headers.get("x-request-id") or new_request_id()
+    token = set_request_id(request_id)
+    usage, cpu_token = route_cpu.start()
+    started = time.perf_counter()
+    try:
+        with start_trace(
+            f"{request.method} {request.url.path}",
+            request_id,
+            **{"http.method": request.method, "http.target": request.url.path}
+        ) as root:
+            response = await call_next(request)
+            root.set_attribute("http.status_code", response.status_code)
+    finally:
+        reset_request_id(token)
+        route_cpu.detach(cpu_token)
+    response.headers["X-Request-ID"] = request_id
+    response.body_iterator = _record_route(response.body_iterator, request, usage, started)
+    return response
+
+async def _record_route(body, request: Request, usage, started: float):
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        # Label by route template, not path, to keep the number of series bounded
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        route_cpu.record(f"{request.method} {route}", usage, time.perf_counter() - started)
+
+def _log_result(request: "QueryRequest", reasoner: ChainOfThoughtReasoner, result: Dict[str, Any]):
+    """Append a served result to the trace log (TRACE_LOG_PATH), if there is one."""
+    trace_log = get_trace_log()
+    if trace_log is not None:
+        trace_log.append({
+            "time": time.time(),
+            "query": request.query,
+            "model": reasoner.client.model,
+            "profile": request.profile,
+            "result": result,
+        })
+
+@lru_cache(maxsize=None)
+def get_reasoner(use_tools: bool, profile: Optional[str] = None) -> ChainOfThoughtReasoner:
+    """
+    Get the shared reasoner for the given tools setting and budget profile, creating it on first use.
+    
+    Reasoners are built lazily so that importing the app (e.g. when a worker
+    starts) does not construct API clients or require credentials.
+    """
+    return ChainOfThoughtReasoner(use_tools=use_tools, profile=profile)
+
+# Bound concurrent upstream work and shed load beyond the queue
+admission = AdmissionController(
+    max_concurrency=get_settings().max_concurrent_requests,
+    max_queue=get_settings().max_queued_requests
+)
+
+# API callers, their shares of the admission slots and their token quotas
+tenants = TenantRegistry.from_config(TENANTS, require_key=REQUIRE_API_KEY, quota_window=get_settings().tenant_quota_window)
+ledger.add_listener(tenants.on_usage)
 
 class QueryRequest(BaseModel):
     query: str
-    temperature: Optional[float] = 0.7
+    temperature: Optional[float] = None  # Defaults to the profile's
     structured_output: Optional[bool] = True
     use_tools: Optional[bool] = True
+    priority: Optional[str] = "interactive"
+    timeout: Optional[float] = None
+    profile: Optional[str] = None  # Budget profile: "fast", "balanced" or "thorough"
+    max_tokens: Optional[int] = Field(default=None, gt=0)
+
+def _parse_priority(request: QueryRequest) -> Priority:
+    try:
+        return Priority.parse(request.priority)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+def _request_reasoner(request: QueryRequest) -> ChainOfThoughtReasoner:
+    """Get the reasoner for a request's tools setting and budget profile."""
+    try:
+        get_profile(request.profile)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return get_reasoner(bool(request.use_tools), request.profile)
 
-class QueryResponse(BaseModel):
-    result: Dict[str, Any]
+def _precomputed(request: QueryRequest, use_tools: bool, profile: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Look up the precomputed answer to a request (see src.cot.answer_index).
+    
+    The lookup needs no reasoner or client, so an indexed answer costs no backend setup.
+    """
+    # Precomputed answers are built with the default budget profile
+    if profile is not None or request.max_tokens is not None:
+        return None
+    return get_answer_index().lookup(request.query, configured_model(), use_tools, bool(request.structured_output))
+
+def _precomputed_events(result: Dict[str, Any]):
+    """The stream events of a precomputed answer: its steps, the result and (empty) usage."""
+    for index, step in enumerate(result.get("reasoning_steps") or []):
+        yield {"type": "step", "index": index, "step": step}
+    yield {"type": "result", "result": result}
+    yield {"type": "usage", "usage": UsageMeter().summary()}
+
+def _request_deadline(request: QueryRequest) -> Deadline:
+    limit = get_settings().request_timeout
+    return Deadline(min(request.timeout, limit) if request.timeout else limit)
+
+def _tenant(headers) -> Tenant:
+    """Identify the caller from its X-API-Key header; usage is attributed to the tenant's name."""
+    try:
+        return tenants.identify(headers.get("x-api-key"))
+    except UnknownAPIKeyError as e:
+        raise HTTPException(status_code=401, detail=str(e))
+
+def _quota_response(error: QuotaExceededError) -> JSONResponse:
+    logger.warning("Rejecting request: %s", error)
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(error)},
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+def _with_usage(events, meter: UsageMeter):
+    """Meter a stream of reasoning events and end it with a "usage" event."""
+    yield from metered(events, meter)
+    yield {"type": "usage", "usage": meter.summary()}
+
+def _overloaded_response(priority: Priority, error: QueueFullError) -> JSONResponse:
+    logger.warning("Shedding %s request, queue is full", priority.name.lower())
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry later"},
+        headers={"Retry-After": str(error.retry_after)}
+    )
 
 @app.post("/api/reason", response_model=QueryResponse)
-async def reason(request: QueryRequest):
+async def reason(request: QueryRequest, http_request: Request):
     """
     Process a query using chain of thought reasoning.
+    
+    Requests are admitted through a bounded priority queue, shared fairly
+    between callers (tenants, identified by X-API-Key). When the queue is
+    full the request is rejected with 503 and a Retry-After header, and
+    when the caller's token quota is used up with 429; when the deadline
+    expires or the client disconnects, upstream work is cancelled.
+    The response includes the request's token usage and estimated cost.
+    Queries with a precomputed answer (see src.cot.answer_index) are
+    answered without calling the model or waiting for admission.
     """
+    priority = _parse_priority(request)
+    deadline = _request_deadline(request)
+    tenant = _tenant(http_request.headers)
+    logger.info("Received query (%d chars)", len(request.query))
+    logger.debug("Query text: %.200s", request.query)
+    
+    precomputed = _precomputed(request, bool(request.use_tools), request.profile)
+    if precomputed is not None:
+        logger.info("Answered from the answer index")
+        return json_response(
+            http_request,
+            QueryResponse(result=ReasoningResult.from_result(precomputed), usage=Usage.model_validate(UsageMeter().summary())),
+            headers={"X-Answer-Source": "index"}
+        )
+    
+    # Choose the appropriate reasoner based on tools setting and profile
+    reasoner = _request_reasoner(request)
     try:
-        logger.info(f"Received query: {request.query}")
+        tenants.check_quota(tenant)
+        with metering(tenant.name) as meter:
+            async with admission.slot(priority, deadline, tenant):
+                result = await run_with_deadline(
+                    http_request,
+                    deadline,
+                    reasoner.process_query,
+                    query=request.query,
+                    temperature=request.temperature,
+                    structured_output=request.structured_output,
+                    deadline=deadline,
+                    max_tokens=request.max_tokens
+                )
+        _log_result(request, reasoner, result)
         
-        # Choose the appropriate reasoner based on tools setting
-        reasoner = reasoner_with_tools if request.use_tools else reasoner_without_tools
-        
-        result = reasoner.process_query(
-            query=request.query,
-            temperature=request.temperature,
-            structured_output=request.structured_output
+        return json_response(
+            http_request,
+            QueryResponse(result=ReasoningResult.from_result(result), usage=Usage.model_validate(meter.summary()))
         )
-        
-        return {"result": result}
+    
+    except QueueFullError as e:
+        return _overloaded_response(priority, e)
+    
+    except QuotaExceededError as e:
+        return _quota_response(e)
+    
+    except DeadlineExceeded as e:
+        logger.warning("Request did not complete: %s", e)
+        raise HTTPException(status_code=504, detail=str(e))
     
     except Exception as e:
-        logger.error(f"Error processing query: {str(e)}")
+        logger.error("Error processing query: %s", e)
         raise HTTPException(status_code=500, detail=f"Error processing query: {str(e)}")
 
+@app.post("/api/reason/stream")
+async def reason_stream(request: QueryRequest, http_request: Request):
+    """
+    Process a query, streaming reasoning events as newline-delimited JSON.
+    
+    Each line is one event: "step" for every reasoning step as soon as the
+    model has produced it, "delta" for unstructured text, "tool_call" and
+    "tool_result" around tool use, a "result" and finally the request's
+    "usage" (or an "error" instead). Precomputed answers are streamed
+    as their steps, result and usage without waiting for admission.
+    """
+    priority = _parse_priority(request)
+    deadline = _request_deadline(request)
+    tenant = _tenant(http_request.headers)
+    
+    precomputed = _precomputed(request, bool(request.use_tools), request.profile)
+    if precomputed is not None:
+        logger.info("Streaming an answer from the answer index")
+        return StreamingResponse(
+            ndjson_stream(_precomputed_events(precomputed), deadline),
+            media_type="application/x-ndjson",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Answer-Source": "index"}
+        )
+    
+    reasoner = _request_reasoner(request)
+    arrived = time.monotonic()
+    try:
+        tenants.check_quota(tenant)
+        await admission.acquire(priority, deadline, tenant)
+    except QueueFullError as e:
+        return _overloaded_response(priority, e)
+    except QuotaExceededError as e:
+        return _quota_response(e)
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    
+    logger.info("Received streaming query (%d chars)", len(request.query))
+    events = reasoner.stream_query(
+        query=request.query,
+        temperature=request.temperature,
+        structured_output=request.structured_output,
+        deadline=deadline,
+        max_tokens=request.max_tokens
+    )
+    events = _with_usage(events, UsageMeter(tenant.name))
+    # The admission slot is held until the stream ends or the client goes away
+    return StreamingResponse(
+        ndjson_stream(events, deadline, on_close=partial(admission.release, tenant, arrived)),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def _session_turn(
+    websocket: WebSocket,
+    session: ReasoningSession,
+    request: QueryRequest,
+    deadline: Deadline,
+    tenant: Tenant,
+    precomputed: Optional[Dict[str, Any]] = None
+):
+    """Answer one message of a WebSocket session, sending events as they are produced."""
+    try:
+        priority = Priority.parse(request.priority)
+    except ValueError as e:
+        await websocket.send_json({"type": "error", "detail": str(e)})
+        return
+    
+    if precomputed is not None:
+        logger.info("Answered session message from the answer index")
+        session.record(request.query, precomputed)
+        for event in _precomputed_events(precomputed):
+            await websocket.send_json(event)
+        return
+    
+    try:
+        tenants.check_quota(tenant)
+        async with admission.slot(priority, deadline, tenant):
+            with route_cpu.track("WS /ws/reason"):
+                events = session.stream(
+                    request.query,
+                    temperature=request.temperature,
+                    structured_output=request.structured_output,
+                    deadline=deadline,
+                    max_tokens=request.max_tokens
+                )
+                events = _with_usage(events, UsageMeter(tenant.name))
+                async for event in iterate_in_threadpool(cpu_timed_iter(events)):
+                    await websocket.send_json(event)
+    except QueueFullError as e:
+        logger.warning("Shedding %s session message, queue is full", priority.name.lower())
+        await websocket.send_json({"type": "error", "detail": "Server is busy, please retry later", "retry_after": e.retry_after})
+    except QuotaExceededError as e:
+        logger.warning("Rejecting session message: %s", e)
+        await websocket.send_json({"type": "error", "detail": str(e), "retry_after": e.retry_after})
+    except DeadlineExceeded as e:
+        logger.warning("Session message did not complete: %s", e)
+        await websocket.send_json({"type": "error", "detail": str(e)})
+    except WebSocketDisconnect:
+        raise
+    except Exception as e:
+        logger.error("Error processing session message: %s", e)
+        await websocket.send_json({"type": "error", "detail": f"Error processing query: {e}"})
+
+# Messages a session may queue while an earlier one is being answered
+SESSION_QUEUE_SIZE = 4
+
+class JobRequest(QueryRequest):
+    callback_url: Optional[str] = None
+
+async def _run_job(job: Job) -> Dict[str, Any]:
+    """Run a job like /api/reason, at batch priority, and return the response body."""
+    request = JobRequest.model_validate(job.payload)
+    reasoner = get_reasoner(bool(request.use_tools), request.profile)
+    tenant = tenants.get(job.caller)
+    tenants.check_quota(tenant)
+    with metering(job.caller) as meter, route_cpu.track("JOB /api/jobs"):
+        while True:
+            try:
+                async with admission.slot(Priority.BATCH, job.deadline, tenant):
+                    result = await asyncio.to_thread(
+                        cpu_timed(reasoner.process_query),
+                        query=request.query,
+                        temperature=request.temperature,
+                        structured_output=request.structured_output,
+                        deadline=job.deadline,
+                        max_tokens=request.max_tokens
+                    )
+                break
+            except QueueFullError as e:
+                # Jobs wait for capacity instead of being shed
+                await asyncio.sleep(e.retry_after)
+    _log_result(request, reasoner, result)
+    response = QueryResponse(result=ReasoningResult.from_result(result), usage=Usage.model_validate(meter.summary()))
+    return response.model_dump(exclude_none=True)
+
+jobs = JobManager(
+    _run_job,
+    workers=get_settings().job_workers,
+    max_pending=get_settings().job_max_pending,
+    result_ttl=get_settings().job_result_ttl,
+    callback_secret=JOB_CALLBACK_SECRET,
+    callback_allowed_hosts=JOB_CALLBACK_ALLOWED_HOSTS
+)
+
+def _apply_settings(settings: Settings):
+    """Retune the long-lived components after a settings reload; running requests are not affected."""
+    admission.configure(settings.max_concurrent_requests, settings.max_queued_requests)
+    jobs.max_pending = settings.job_max_pending
+    jobs.result_ttl = settings.job_result_ttl
+    tenants.quota_window = settings.tenant_quota_window
+
+on_reload(_apply_settings)
+
+def _job_response(job: Job, status_code: int = 200) -> JSONResponse:
+    return JSONResponse(status_code=status_code, content=job.to_dict(), headers={"Location": f"/api/jobs/{job.id}"})
+
+@app.post("/api/jobs", status_code=202)
+async def submit_job(request: JobRequest, http_request: Request):
+    """
+    Submit a query to be answered in the background.
+    
+    Returns the job (with its id) immediately. The job runs like
+    /api/reason at batch priority, for up to JOB_TIMEOUT seconds; poll
+    GET /api/jobs/{id} for the result, or pass callback_url to have the
+    finished job POSTed to it.
+    """
+    limit = get_settings().job_timeout
+    timeout = min(request.timeout, limit) if request.timeout else limit
+    _request_reasoner(request)
+    tenant = _tenant(http_request.headers)
+    try:
+        tenants.check_quota(tenant)
+        job = jobs.submit(
+            request.model_dump(),
+            timeout=timeout,
+            callback_url=request.callback_url,
+            caller=tenant.name
+        )
+    except QuotaExceededError as e:
+        return _quota_response(e)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except JobQueueFullError:
+        logger.warning("Rejecting job, %d jobs are pending", jobs.pending)
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Too many pending jobs, please retry later"},
+            headers={"Retry-After": "30"}
+        )
+    return _job_response(job, status_code=202)
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = 0):
+    """
+    Get a job's status and, once it has finished, its result or error.
+    
+    With ``wait`` (seconds, at most 60) the response is held until the job
+    finishes or the time is up (long polling).
+    """
+    job = await jobs.wait(job_id, min(max(wait, 0), 60))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    return _job_response(job)
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job."""
+    job = jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    return _job_response(job)
+
+@app.websocket("/ws/reason")
+async def reason_session(websocket: WebSocket, use_tools: bool = True, profile: Optional[str] = None):
+    """
+    Multi-turn reasoning over a WebSocket.
+    
+    Each message is a JSON object with the fields of QueryRequest (use_tools
+    and the budget profile are fixed per connection by the query parameters). Messages are answered in
+    order, in the context of the conversation, and the same events as
+    /api/reason/stream are sent back as individual messages. Sending
+    {"type": "cancel"} cancels the message being answered.
+    """
+    await websocket.accept()
+    # The HTTP middleware does not see WebSocket traffic, so tag the session here
+    token = set_request_id(websocket.headers.get("x-request-id") or new_request_id())
+    try:
+        get_profile(profile)
+        tenant = tenants.identify(websocket.headers.get("x-api-key"))
+    except (ValueError, UnknownAPIKeyError) as e:
+        await websocket.close(code=1008, reason=str(e))
+        reset_request_id(token)
+        return
+    settings = get_settings()
+    # The reasoner (and its client) is only created once a message is not in the answer index
+    session = ReasoningSession(
+        partial(get_reasoner, use_tools, profile),
+        max_turns=settings.session_max_turns,
+        max_summary_chars=settings.session_summary_chars
+    )
+    pending: asyncio.Queue = asyncio.Queue(maxsize=SESSION_QUEUE_SIZE)
+    current: Optional[Deadline] = None
+    
+    async def answer_messages():
+        nonlocal current
+        while True:
+            request, deadline = await pending.get()
+            current = deadline
+            await _session_turn(websocket, session, request, deadline, tenant, _precomputed(request, use_tools, profile))
+            current = None
+    
+    worker = asyncio.create_task(answer_messages())
+    logger.info("Session opened")
+    
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except json.JSONDecodeError:
+                await websocket.send_json({"type": "error", "detail": "Messages must be JSON objects"})
+                continue
+            
+            if isinstance(message, dict) and message.get("type") == "cancel":
+                if current is not None:
+                    current.cancel()
+                continue
+            
+            try:
+                request = QueryRequest.model_validate(message)
+            except ValidationError as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+                continue
+            
+            logger.info("Received session query (%d chars)", len(request.query))
+            try:
+                pending.put_nowait((request, _request_deadline(request)))
+            except asyncio.QueueFull:
+                await websocket.send_json({"type": "error", "detail": "Too many queued messages"})
+    except WebSocketDisconnect:
+        logger.info("Session closed after %d turns", session.turn_count)
+    finally:
+        # Stop upstream work for a message still being answered
+        if current is not None:
+            current.cancel()
+        worker.cancel()
+        reset_request_id(token)
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Metrics in the Prometheus text format: token usage and cost per caller,
+    feature and model, admission queue and job gauges, per-tenant latency,
+    throttling and quota use, CPU time per route, event loop lag and answer
+    index hits.
+    """
+    families = usage_metrics(ledger.totals())
+    families.append(MetricFamily("cot_requests_active", "gauge", "Requests holding an admission slot", [({}, admission.active)]))
+    families.append(MetricFamily("cot_requests_queued", "gauge", "Requests waiting for an admission slot", [({}, admission.queued)]))
+    families.append(MetricFamily("cot_requests_shed_total", "counter", "Requests rejected because the queue was full", [({}, admission.shed_count)]))
+    families.append(MetricFamily("cot_jobs_pending", "gauge", "Jobs queued or running", [({}, jobs.pending)]))
+    families.extend(tenant_metrics(admission.tenant_stats(), dict(tenants.quota_rejections), tenants.quota_usage()))
+    families.extend(profiling_metrics(route_cpu.stats(), loop_monitor.stats()))
+    answer_index = get_answer_index()
+    families.append(MetricFamily("cot_answer_index_hits_total", "counter", "Requests answered from the answer index", [({}, answer_index.hits)]))
+    families.append(MetricFamily("cot_answer_index_misses_total", "counter", "Requests not in the answer index", [({}, answer_index.misses)]))
+    return PlainTextResponse(format_metrics(families), media_type=PROMETHEUS_CONTENT_TYPE)
+
+def _require_admin(request: Request):
+    """Allow only requests with the ADMIN_API_KEY (X-Admin-Key header); without one the endpoints do not exist."""
+    if not ADMIN_API_KEY:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(request.headers.get("x-admin-key", ""), ADMIN_API_KEY):
+        raise HTTPException(status_code=403, detail="A valid X-Admin-Key header is required")
+
+@app.get("/admin/settings")
+async def admin_settings(request: Request):
+    """The current runtime settings, the file they were read from and when."""
+    _require_admin(request)
+    return settings_info()
+
+@app.post("/admin/settings/reload")
+async def admin_reload_settings(request: Request):
+    """
+    Re-read the settings file (like SIGHUP) and apply it without a restart.
+    
+    Returns the changed settings and which of them only take effect on
+    restart; invalid settings are rejected with 422 and the current ones kept.
+    """
+    _require_admin(request)
+    try:
+        return reload_settings()
+    except SettingsError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@app.get("/admin/profile")
+async def admin_profile(
+    request: Request,
+    seconds: float = Query(default=10.0, gt=0, le=MAX_PROFILE_SECONDS),
+    interval: float = Query(default=0.005, ge=0.001, le=1.0),
+    format: str = Query(default="collapsed", pattern="^(collapsed|json)$"),
+    idle: bool = False
+):
+    """
+    Sample the stacks of all server threads for the given number of seconds.
+    
+    Returns collapsed stacks ("thread;frame;frame count" per line), ready
+    for flamegraph.pl or speedscope, or with format=json the stacks with the
+    number of samples taken. Threads waiting for work are left out unless
+    idle=true. Only one profile runs at a time (409 otherwise).
+    """
+    _require_admin(request)
+    try:
+        profile = await asyncio.to_thread(profiler.profile, seconds, interval, idle)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if format == "json":
+        return profile
+    return PlainTextResponse(collapsed(profile["stacks"]), headers={"X-Profile-Samples": str(profile["samples"])})
+
+@app.get("/admin/cpu")
+async def admin_cpu(request: Request):
+    """CPU and wall time per route, and event loop lag with the stacks of recent stalls."""
+    _require_admin(request)
+    return {"routes": route_cpu.stats(), "event_loop": loop_monitor.stats()}
+
 @app.get("/")
-async def root():
+async def root(request: Request):
     """
     Root endpoint that serves the HTML interface.
     """
-    return FileResponse("static/index.html")
+    index = "dist/index.html" if os.path.exists("static/dist/index.html") else "index.html"
+    return await static_files.get_response(index, request.scope)
 
 @app.get("/health")
 async def health():
@@ -88,7 +696,10 @@ def main():
     """
     Run the FastAPI application.
     """
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    import uvicorn
+    
+    settings = get_settings()
+    uvicorn.run(app, host=settings.host, port=settings.port)
 
 if __name__ == "__main__":
     main()
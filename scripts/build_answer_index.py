@@ -0,0 +1,112 @@
+"""
+Build the precomputed answer index served by /api/reason.
+
+Answers the example queries of static/index.html and the queries listed in
+data/answer_index/queries.txt, and writes them to the answer index. Run it
+again whenever the prompts, the tools or the model change; the server
+ignores an index built with other prompts or for another model.
+
+Examples:
+    # Build the index with the configured backend
+    python scripts/build_answer_index.py
+
+    # Also answer with tools disabled and without structured output
+    python scripts/build_answer_index.py --variants tools,structured no-tools,structured tools,unstructured
+"""
+
+import argparse
+import html
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.api.backends import create_backend
+from src.config import ANSWER_INDEX_PATH
+from src.cot.answer_index import DEFAULT_PATH, AnswerIndex, normalize_query, read_queries
+from src.cot.models import ReasoningResult
+from src.cot.reasoning import ChainOfThoughtReasoner
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the precomputed answer index")
+    parser.add_argument("--queries", default=os.path.join(ROOT, "data", "answer_index", "queries.txt"),
+                        help="File with one query per line")
+    parser.add_argument("--html", default=os.path.join(ROOT, "static", "index.html"),
+                        help="Page whose example queries are included")
+    parser.add_argument("--out", default=ANSWER_INDEX_PATH or DEFAULT_PATH, help="Index file to write")
+    parser.add_argument("--backend", help="Backend to use (defaults to LLM_BACKEND)")
+    parser.add_argument("--model", help="Model to use")
+    parser.add_argument("--temperature", type=float, default=0.0, help="Sampling temperature")
+    parser.add_argument("--concurrency", type=int, default=4, help="Queries answered in parallel")
+    parser.add_argument("--variants", nargs="+", default=["tools,structured"],
+                        help="Settings to answer with: [no-]tools,[un]structured")
+    parser.add_argument("--rebuild", action="store_true", help="Discard the answers already in the index")
+    return parser.parse_args()
+
+
+def collect_queries(queries_path, html_path):
+    queries = []
+    if html_path and os.path.exists(html_path):
+        with open(html_path, encoding="utf-8") as f:
+            queries.extend(html.unescape(query) for query in re.findall(r'data-query="([^"]*)"', f.read()))
+    if queries_path and os.path.exists(queries_path):
+        with open(queries_path, encoding="utf-8") as f:
+            queries.extend(read_queries(f))
+    unique = {}
+    for query in queries:
+        unique.setdefault(normalize_query(query), query)
+    return list(unique.values())
+
+
+def parse_variant(variant):
+    tools, structure = variant.split(",")
+    if tools not in ("tools", "no-tools") or structure not in ("structured", "unstructured"):
+        raise SystemExit(f"Invalid variant {variant!r}")
+    return tools == "tools", structure == "structured"
+
+
+def main():
+    args = parse_args()
+    variants = [parse_variant(variant) for variant in args.variants]
+    queries = collect_queries(args.queries, args.html)
+    client = create_backend(args.backend, model=args.model) if args.backend or args.model else None
+
+    index = AnswerIndex()
+    failed = []
+    for use_tools, structured_output in variants:
+        reasoner = ChainOfThoughtReasoner(use_tools=use_tools, client=client)
+        if not index.model:
+            index.model = reasoner.client.model
+            if not args.rebuild:
+                existing = AnswerIndex.load(args.out)
+                if existing.model == index.model:
+                    index.entries.update(existing.entries)
+
+        def answer(query):
+            result = reasoner.process_query(query, temperature=args.temperature, structured_output=structured_output)
+            return query, ReasoningResult.from_result(result)
+
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            for query, result in pool.map(answer, queries):
+                usable = not result.error and (result.final_answer if structured_output else result.content)
+                if usable:
+                    index.add(query, result.model_dump(exclude_none=True), use_tools, structured_output)
+                    print(f"  ✓ {query}")
+                else:
+                    failed.append(query)
+                    print(f"  ✗ {query} (no usable answer, not indexed)")
+
+    index.save(args.out)
+    print(f"\nWrote {len(index)} answers for {index.model} to {args.out}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
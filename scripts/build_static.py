@@ -0,0 +1,42 @@
+"""
+Build the web UI's static assets into static/dist.
+
+Vendors and subsets Font Awesome and Google Fonts, minifies and fingerprints
+app.js and style.css, rewrites index.html and writes precompressed siblings.
+The web app serves static/dist automatically once it exists.
+"""
+
+import argparse
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.web.assets import AssetBuilder
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build static assets for the web UI")
+    parser.add_argument(
+        "--static-dir",
+        type=str,
+        default=os.path.join(os.path.dirname(__file__), '..', 'static'),
+        help="Directory containing index.html, css/ and js/"
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Do not download third-party assets (CDN links are kept)"
+    )
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    
+    manifest = AssetBuilder(os.path.abspath(args.static_dir), offline=args.offline).build()
+    
+    for source, built in sorted(manifest.items()):
+        print(f"{source:<32} -> dist/{built}")
+
+if __name__ == "__main__":
+    main()
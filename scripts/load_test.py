@@ -0,0 +1,183 @@
+"""
+Load-test the web app against the fake backend and check its SLOs.
+
+Starts examples/web_app.py under uvicorn with the deterministic fake
+backend (pinned to --cpus on Linux, so results are per core), runs the
+scenarios of data/load/scenarios.json open-loop from this process and
+prints latency histograms and a pass/fail line per SLO. Exits with status
+1 if any SLO fails, so it can gate a deployment.
+
+Examples:
+    # Run the default scenarios on one core
+    python scripts/load_test.py run smoke steady --cpus 0
+
+    # Find the highest rate at which "steady" still meets its SLOs
+    python scripts/load_test.py find-max steady --cpus 0 --duration 20
+
+    # Test a server that is already running, with simulated model latency
+    python scripts/load_test.py run steady --url http://localhost:8000
+    python scripts/load_test.py run steady --server-env FAKE_LATENCY_MS=200 --server-env MAX_CONCURRENT_REQUESTS=64
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+
+from src.eval.load import format_summary, load_scenarios, run_scenario
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def parse_cpus(text):
+    """Parse a CPU list such as "0", "0-3" or "0,2"."""
+    cpus = set()
+    for part in text.split(","):
+        first, _, last = part.partition("-")
+        cpus.update(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Open-loop load test with SLO checks")
+    parser.add_argument("command", choices=["run", "find-max"], help="Run scenarios, or search for the highest passing rate")
+    parser.add_argument("scenarios", nargs="*", help="Scenarios to run (default: all; find-max takes one)")
+    parser.add_argument("--scenario-file", help="Scenario file (defaults to data/load/scenarios.json)")
+    parser.add_argument("--url", help="Test a running server instead of starting one")
+    parser.add_argument("--cpus", type=parse_cpus, help="CPUs to pin the server to, e.g. 0 or 0-1 (Linux)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--port", type=int, help="Port for the server (default: a free one)")
+    parser.add_argument("--server-env", action="append", default=[], metavar="NAME=VALUE",
+                        help="Environment of the server, e.g. FAKE_LATENCY_MS=200 (repeatable)")
+    parser.add_argument("--rate", type=float, help="Arrival rate overriding the scenarios'")
+    parser.add_argument("--duration", type=float, help="Duration in seconds overriding the scenarios'")
+    parser.add_argument("--search-steps", type=int, default=4, help="find-max: bisection steps after the first failure")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for arrivals and queries")
+    parser.add_argument("--out", help="Write the summaries to this JSON file")
+    return parser.parse_args()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, cpus, workers, server_env):
+    """Start the web app with the fake backend and wait until it answers."""
+    env = dict(os.environ, LLM_BACKEND="fake", LOG_LEVEL="WARNING", TRACE_FILE="", TRACE_OTLP_ENDPOINT="")
+    env.setdefault("GROQ_API_KEY", "load-test")
+    for setting in server_env:
+        name, _, value = setting.partition("=")
+        env[name] = value
+    command = [
+        sys.executable, "-m", "uvicorn", "web_app:app", "--app-dir", os.path.join(ROOT, "examples"),
+        "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+    ]
+    pin = (lambda: os.sched_setaffinity(0, cpus)) if cpus and hasattr(os, "sched_setaffinity") else None
+    server = subprocess.Popen(command, cwd=ROOT, env=env, preexec_fn=pin)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            sys.exit(f"The server exited with status {server.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return server
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    sys.exit("The server did not start within 60 seconds")
+
+
+async def run(args, scenarios, url):
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=1000)
+    summaries = []
+    async with httpx.AsyncClient(base_url=url, limits=limits) as client:
+        if args.command == "run":
+            for scenario in scenarios:
+                summary = await run_scenario(client, scenario, seed=args.seed, rate=args.rate)
+                print(format_summary(summary) + "\n")
+                summaries.append(summary)
+            return summaries, all(summary["passed"] for summary in summaries)
+
+        # find-max: double the rate until an SLO fails (or halve it until they pass), then bisect
+        scenario = scenarios[0]
+        passing, failing = None, None
+        rate = args.rate or scenario.rate
+        while passing is None or failing is None:
+            summary = await run_scenario(client, scenario, seed=args.seed, rate=rate)
+            summaries.append(summary)
+            print(f"{rate:g} req/s: {'pass' if summary['passed'] else 'fail'} "
+                  f"(p99 {summary['latency_ms']['p99']:g} ms, error rate {summary['error_rate']:.2%})")
+            if summary["passed"]:
+                passing = rate
+                rate = rate * 2 if failing is None else rate
+            else:
+                failing = rate
+                rate = rate / 2 if passing is None else rate
+            if rate < 0.1:
+                break
+        for _ in range(args.search_steps if passing is not None and failing is not None else 0):
+            rate = round((passing + failing) / 2, 2)
+            summary = await run_scenario(client, scenario, seed=args.seed, rate=rate)
+            summaries.append(summary)
+            print(f"{rate:g} req/s: {'pass' if summary['passed'] else 'fail'} "
+                  f"(p99 {summary['latency_ms']['p99']:g} ms, error rate {summary['error_rate']:.2%})")
+            if summary["passed"]:
+                passing = rate
+            else:
+                failing = rate
+        cores = len(args.cpus) if args.cpus else os.cpu_count()
+        if passing is None:
+            print(f"\n{scenario.name}: no rate met the SLOs")
+        else:
+            print(f"\nMax sustainable rate for {scenario.name}: {passing:g} req/s on {cores} core(s), "
+                  f"{passing / cores:.1f} req/s per core")
+        return summaries, passing is not None
+
+
+def main():
+    args = parse_args()
+    available = load_scenarios(args.scenario_file)
+    names = args.scenarios or list(available)
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        sys.exit(f"Unknown scenarios: {', '.join(unknown)} (available: {', '.join(available)})")
+    if args.command == "find-max" and len(names) != 1:
+        sys.exit("find-max takes one scenario")
+    scenarios = [available[name] for name in names]
+    if args.duration:
+        scenarios = [scenario._replace(duration=args.duration) for scenario in scenarios]
+
+    server = None
+    url = args.url
+    if url is None:
+        port = args.port or free_port()
+        server = start_server(port, args.cpus, args.workers, args.server_env)
+        url = f"http://127.0.0.1:{port}"
+    try:
+        summaries, passed = asyncio.run(run(args, scenarios, url))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(summaries, f, indent=2)
+        print(f"Wrote {args.out}")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
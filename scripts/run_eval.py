@@ -0,0 +1,122 @@
+"""
+Run answer-quality evaluations and compare runs.
+
+Examples:
+    # Evaluate a bundled dataset against the configured backend
+    python scripts/run_eval.py run math_sample --out runs/baseline.json
+
+    # Evaluate offline with the deterministic fake backend
+    python scripts/run_eval.py run examples --backend fake --out runs/fake.json
+
+    # Record model responses once, then re-run offline from the recording
+    python scripts/run_eval.py run math_sample --cassette runs/math.jsonl --cassette-mode record
+    python scripts/run_eval.py run math_sample --cassette runs/math.jsonl --cassette-mode replay
+
+    # Compare two runs
+    python scripts/run_eval.py diff runs/baseline.json runs/candidate.json --report report.md
+
+    # Score a run's stored predictions again after changing the scoring
+    python scripts/run_eval.py rescore runs/baseline.json math_sample
+"""
+
+import argparse
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.api.backends import create_backend
+from src.api.cassette import MODES, CassetteBackend
+from src.cot.profiles import get_profile, profile_names
+from src.cot.reasoning import ChainOfThoughtReasoner
+from src.eval.datasets import load_dataset
+from src.eval.runner import EvalRunner, diff_runs, format_report, load_run, rescore, save_run
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Answer-quality evaluation")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="Evaluate a dataset")
+    run.add_argument("dataset", help="Dataset file, or the name of a dataset in data/eval")
+    run.add_argument("--backend", help="Backend to use (defaults to LLM_BACKEND)")
+    run.add_argument("--model", help="Model to use")
+    run.add_argument("--name", help="Name of the run")
+    run.add_argument("--limit", type=int, help="Only evaluate the first N items")
+    run.add_argument("--concurrency", type=int, default=4, help="Items evaluated in parallel")
+    run.add_argument("--temperature", type=float, default=0.0, help="Sampling temperature")
+    run.add_argument("--profile", choices=profile_names(), help="Budget profile (defaults to BUDGET_PROFILE)")
+    run.add_argument("--no-tools", action="store_true", help="Disable tool usage")
+    run.add_argument("--cassette", help="Record/replay model responses with this cassette file")
+    run.add_argument("--cassette-mode", choices=MODES, default="auto", help="Cassette mode")
+    run.add_argument("--out", help="Write the run to this JSON file")
+
+    diff = subparsers.add_parser("diff", help="Compare two runs")
+    diff.add_argument("base", help="Reference run")
+    diff.add_argument("new", help="Run to compare")
+    diff.add_argument("--report", help="Also write the Markdown report to this file")
+    diff.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 if any item regressed")
+
+    rescore_parser = subparsers.add_parser("rescore", help="Score a run's predictions again")
+    rescore_parser.add_argument("run", help="Run to rescore")
+    rescore_parser.add_argument("dataset", help="Dataset the run was made with")
+    rescore_parser.add_argument("--out", help="Write the rescored run to this file (default: in place)")
+    return parser.parse_args()
+
+
+def print_summary(run):
+    summary = run["summary"]
+    print(f"\n{'=' * 50}")
+    print(f"Run {run['name']} ({run.get('model')})")
+    print(f"{'=' * 50}")
+    print(f"Accuracy: {summary['correct']}/{summary['items']} ({summary['accuracy']:.1%})")
+    print(f"Errors:   {summary['errors']}")
+    print(f"Latency:  p50 {summary['latency_ms']['p50']:.0f} ms, p95 {summary['latency_ms']['p95']:.0f} ms")
+    print(f"Tokens:   {summary['tokens']}")
+    for item in run["items"]:
+        if not item["correct"]:
+            print(f"  ✗ {item['id']}: expected {item['expected']!r}, got {item['prediction'][:80]!r}")
+
+
+def main():
+    args = parse_args()
+
+    if args.command == "run":
+        items = load_dataset(args.dataset, limit=args.limit)
+        client = None
+        model = args.model or get_profile(args.profile).model
+        if args.cassette:
+            client = CassetteBackend(
+                args.cassette,
+                inner=lambda: create_backend(args.backend, model=model),
+                mode=args.cassette_mode
+            )
+        elif args.backend or args.model:
+            client = create_backend(args.backend, model=model)
+        reasoner = ChainOfThoughtReasoner(use_tools=not args.no_tools, client=client, profile=args.profile)
+        runner = EvalRunner(reasoner, concurrency=args.concurrency, temperature=args.temperature)
+        run = runner.run(items, name=args.name, dataset=args.dataset)
+        print_summary(run)
+        if args.out:
+            os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+            save_run(run, args.out)
+
+    elif args.command == "diff":
+        diff = diff_runs(load_run(args.base), load_run(args.new))
+        report = format_report(diff)
+        print(report)
+        if args.report:
+            with open(args.report, "w", encoding="utf-8") as f:
+                f.write(report)
+        if args.fail_on_regression and diff["regressed"]:
+            sys.exit(1)
+
+    elif args.command == "rescore":
+        run = rescore(load_run(args.run), load_dataset(args.dataset))
+        print_summary(run)
+        save_run(run, args.out or args.run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Summarize a trace file written with TRACE_FILE.
+
+Prints where time went per span name (self time excludes child spans) and
+optionally writes collapsed stacks for flamegraph.pl or speedscope:
+
+    python scripts/trace_summary.py traces.jsonl --collapsed stacks.txt
+    flamegraph.pl stacks.txt > flame.svg
+"""
+
+import argparse
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.trace_analysis import collapsed_stacks, load_traces, root_span, span_statistics
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Trace file summary")
+    parser.add_argument("trace_file", help="JSONL trace file")
+    parser.add_argument("--request-id", help="Only include the trace of this request")
+    parser.add_argument("--min-duration-ms", type=float, default=0.0, help="Only include traces at least this slow")
+    parser.add_argument("--slowest", type=int, default=5, help="Number of slowest traces to list")
+    parser.add_argument("--collapsed", help="Write collapsed stacks to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    traces = load_traces(args.trace_file)
+
+    selected = {}
+    for trace_id, spans in traces.items():
+        root = root_span(spans)
+        if root is None:
+            continue
+        if args.request_id and root["attributes"].get("request.id") != args.request_id:
+            continue
+        if root["duration_ns"] / 1e6 < args.min_duration_ms:
+            continue
+        selected[trace_id] = spans
+
+    print(f"\n{len(selected)} of {len(traces)} traces")
+    print(f"\n{'span':<40} {'count':>6} {'self ms':>10} {'total ms':>10} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7}")
+    for row in span_statistics(selected.values()):
+        print(
+            f"{row['name']:<40} {row['count']:>6} {row['self_ms']:>10.1f} {row['total_ms']:>10.1f} "
+            f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['errors']:>7}"
+        )
+
+    slowest = sorted(selected.values(), key=lambda spans: root_span(spans)["duration_ns"], reverse=True)
+    if slowest and args.slowest:
+        print("\nSlowest requests:")
+        for spans in slowest[:args.slowest]:
+            root = root_span(spans)
+            print(f"  {root['duration_ns'] / 1e6:>9.1f} ms  {root['attributes'].get('request.id', '-'):<18} {root['name']}")
+
+    if args.collapsed:
+        with open(args.collapsed, "w", encoding="utf-8") as f:
+            for stack, micros in sorted(collapsed_stacks(selected.values()).items()):
+                if micros > 0:
+                    f.write(f"{stack} {micros}\n")
+
+
+if __name__ == "__main__":
+    main()
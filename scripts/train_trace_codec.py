@@ -0,0 +1,65 @@
+"""
+Train the trace storage codec on past reasoning results.
+
+Reads results from answer indexes (.json), JSON lines files (.jsonl) or
+trace logs, builds the step title table and compression dictionaries and
+writes them to a codec file. Point TRACE_CODEC_PATH at the file to use it;
+logs written with another codec can only be read with that codec.
+
+Examples:
+    # Train on the answer index and last week's trace log
+    python scripts/train_trace_codec.py data/answer_index/index.json logs/traces.bin --out data/trace_codec.json
+"""
+
+import argparse
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.cot.trace_store import RAW, TraceCodec, read_results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the trace storage codec")
+    parser.add_argument("inputs", nargs="+", help="Answer indexes, JSON lines files or trace logs with past results")
+    parser.add_argument("--out", default="data/trace_codec.json", help="Codec file to write")
+    parser.add_argument("--read-codec", help="Codec the input trace logs were written with (defaults to TRACE_CODEC_PATH)")
+    parser.add_argument("--dict-size", type=int, default=16 * 1024, help="Dictionary size in bytes")
+    parser.add_argument("--max-titles", type=int, default=4096, help="Largest number of interned step titles")
+    parser.add_argument("--limit", type=int, help="Train on the last N results only")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    read_codec = TraceCodec.load(args.read_codec) if args.read_codec else None
+    samples = []
+    for path in args.inputs:
+        samples.extend(read_results(path, read_codec))
+    if args.limit:
+        samples = samples[-args.limit:]
+    if not samples:
+        sys.exit("No results to train on")
+
+    # Hold out every tenth result to report how well the codec does on unseen ones
+    held_out = samples[::10] if len(samples) >= 20 else samples
+    training = [sample for i, sample in enumerate(samples) if i % 10] if len(samples) >= 20 else samples
+    codec = TraceCodec.train(training, dict_size=args.dict_size, max_titles=args.max_titles)
+    untrained = TraceCodec(method=codec.method)
+
+    size = sum(len(TraceCodec(method=RAW).encode(sample)) for sample in held_out)
+    trained_size = sum(len(codec.encode(sample)) for sample in held_out)
+    untrained_size = sum(len(untrained.encode(sample)) for sample in held_out)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    codec.save(args.out)
+    print(f"Trained on {len(training)} results: {len(codec.titles)} titles, "
+          f"{len(codec.dictionary)} byte dictionary{', zstd dictionary' if codec.zstd_dictionary else ''}")
+    print(f"Held-out compression ratio: {size / trained_size:.1f}x (untrained: {size / untrained_size:.1f}x)")
+    print(f"Wrote {args.out} (dictionary {codec.dictionary_id:08x})")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,12 +6,18 @@ setup(
     packages=find_packages(),
     install_requires=[
         "groq>=0.4.0",
+        "httpx>=0.23.0",
         "python-dotenv>=1.0.0",
         "pydantic>=2.4.2",
+        "tomli>=1.1.0; python_version < '3.11'",
     ],
+    extras_require={
+        # Smaller trace logs (TRACE_LOG_PATH); zlib is used without it
+        "zstd": ["zstandard>=0.15"],
+    },
     author="Your Name",
     author_email="your.email@example.com",
     description="Chain of Thought implementation with Llama 3.3 70B using Groq API",
     keywords="llama, groq, chain-of-thought, reasoning, llm",
-    python_requires=">=3.8",
+    python_requires=">=3.9",
 )
@@ -0,0 +1,180 @@
+"""
+Completion backends the reasoner can run against.
+
+Every backend implements CompletionBackend. ``create_backend`` picks one by
+name (``LLM_BACKEND`` by default): "groq" for the Groq API, "openai" for any
+OpenAI-compatible server (llama.cpp, vLLM, ...) and "fake" for a
+deterministic in-process backend that needs no network.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from src.config import (
+    CASSETTE_MODE,
+    CASSETTE_PATH,
+    CASSETTE_SPEED,
+    FAKE_LATENCY_MS,
+    FAKE_STEPS,
+    HEDGE_BACKEND,
+    HEDGE_MODEL,
+    LLM_API_KEY,
+    LLM_BACKEND,
+    LLM_BASE_URL,
+    LLM_MODEL,
+)
+from src.settings import get_settings
+
+
+class CompletionBackend(ABC):
+    """
+    Interface for chat completion backends.
+
+    ``generate_completion`` returns {"content": str, "tool_calls": list or None,
+    "usage": dict or None}; tool call objects expose ``id``, ``function.name``
+    and ``function.arguments`` (see src.api.types.ToolCall) and usage has
+    prompt_tokens, completion_tokens and total_tokens. ``stream_completion``
+    yields {"content": delta} chunks followed by at most one
+    {"tool_calls": [...]} and, if the backend reports it, one {"usage": {...}}.
+    A temperature or max_tokens of None means the default_temperature or
+    default_max_tokens setting (src.settings).
+    """
+
+    model: str
+
+    @abstractmethod
+    def generate_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Generate a complete response."""
+
+    def stream_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        timeout: Optional[float] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a response.
+
+        The default implementation yields the complete response as one chunk,
+        for backends that cannot stream.
+        """
+        response = self.generate_completion(
+            messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            response_format=response_format,
+            tools=tools,
+            timeout=timeout
+        )
+        if response.get("content"):
+            yield {"content": response["content"]}
+        if response.get("tool_calls"):
+            yield {"tool_calls": response["tool_calls"]}
+        if response.get("usage"):
+            yield {"usage": response["usage"]}
+
+    def close(self) -> None:
+        """Release any connections held by the backend."""
+
+
+def create_backend(name: Optional[str] = None, model: Optional[str] = None) -> CompletionBackend:
+    """
+    Create a completion backend.
+
+    Args:
+        name: "groq", "openai" or "fake" (defaults to LLM_BACKEND)
+        model: Model name (defaults to LLM_MODEL, then the backend's default)
+
+    Returns:
+        The backend
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    name = (name or LLM_BACKEND).lower()
+    model = model or LLM_MODEL
+
+    # Implementations are imported on demand so only the chosen one is loaded
+    if name == "groq":
+        from src.api.groq_client import GroqClient
+        client = GroqClient()
+        if model:
+            client.model = model
+        return client
+    if name == "openai":
+        from src.api.openai_compat import OpenAICompatibleBackend
+        return OpenAICompatibleBackend(base_url=LLM_BASE_URL, api_key=LLM_API_KEY, model=model)
+    if name == "fake":
+        from src.api.fake import FakeBackend
+        return FakeBackend(latency=FAKE_LATENCY_MS / 1000, steps=FAKE_STEPS)
+    raise ValueError(f"Unknown LLM backend {name!r} (expected 'groq', 'openai' or 'fake')")
+
+
+def configured_model(name: Optional[str] = None) -> Optional[str]:
+    """
+    Return the model create_backend would use, without creating the backend.
+
+    Args:
+        name: Backend name (defaults to LLM_BACKEND)
+
+    Returns:
+        The model name, or None if the backend name is unknown
+    """
+    name = (name or LLM_BACKEND).lower()
+    if name == "groq":
+        # Like GroqClient.model, which follows the model_name setting
+        return LLM_MODEL or get_settings().model_name
+    if name == "openai":
+        return LLM_MODEL or "local-model"
+    if name == "fake":
+        return "fake"
+    return None
+
+
+def with_hedging(primary: CompletionBackend) -> CompletionBackend:
+    """
+    Wrap a backend with request hedging configured by the hedge_* settings.
+
+    Hedge requests go to HEDGE_BACKEND/HEDGE_MODEL if set, else to the
+    primary. The delay and rate follow settings reloads.
+
+    Args:
+        primary: Backend every request is sent to first
+
+    Returns:
+        The hedged backend
+    """
+    from src.api.hedging import from_settings
+
+    alternate = None
+    if HEDGE_BACKEND or HEDGE_MODEL:
+        alternate = create_backend(HEDGE_BACKEND, model=HEDGE_MODEL)
+    return from_settings(primary, alternate=alternate)
+
+
+def with_cassette(factory: Callable[[], CompletionBackend], path: Optional[str] = None) -> CompletionBackend:
+    """
+    Wrap a backend in a record/replay cassette configured by the CASSETTE_* settings.
+
+    Args:
+        factory: Creates the backend to record from; only called when a
+            request has to go upstream
+        path: Cassette file (defaults to CASSETTE_PATH)
+
+    Returns:
+        The cassette backend
+    """
+    from src.api.cassette import CassetteBackend
+
+    return CassetteBackend(path or CASSETTE_PATH, inner=factory, mode=CASSETTE_MODE, speed=CASSETTE_SPEED)
@@ -0,0 +1,263 @@
+"""
+Record/replay of completion requests.
+
+A cassette is a JSONL file of recorded interactions. In record mode every
+request is forwarded to the wrapped backend and the request, the response
+(including streamed chunks and tool calls) and its timing are appended to
+the cassette. In replay mode responses come from the cassette only, so
+benchmarks and regression tests run offline, deterministically and for
+free; timing is reproduced scaled by ``speed`` (0 replays instantly).
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from src.api.backends import CompletionBackend
+from src.api.types import FunctionCall, ToolCall, tool_call_to_dict
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+MODES = ("record", "replay", "auto")
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode when a request was not recorded."""
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    """Return a stable key for a request (timeouts are ignored)."""
+    canonical = {name: value for name, value in request.items() if name != "timeout" and value is not None}
+    encoded = json.dumps(canonical, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _encode_tool_calls(tool_calls: Optional[List[Any]]) -> Optional[List[Dict[str, Any]]]:
+    return [tool_call_to_dict(call) for call in tool_calls] if tool_calls else None
+
+
+def _decode_tool_calls(tool_calls: Optional[List[Dict[str, Any]]]) -> Optional[List[ToolCall]]:
+    if not tool_calls:
+        return None
+    return [
+        ToolCall(id=call["id"], function=FunctionCall(name=call["function"]["name"], arguments=call["function"]["arguments"]))
+        for call in tool_calls
+    ]
+
+
+class CassetteBackend(CompletionBackend):
+    """
+    Backend that records or replays the requests of another backend.
+
+    Identical requests recorded several times are replayed in recording
+    order (the last recording is repeated once exhausted). A streamed
+    recording can answer a blocking request and vice versa.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        inner: Union[CompletionBackend, Callable[[], CompletionBackend], None] = None,
+        mode: str = "auto",
+        speed: float = 0.0
+    ):
+        """
+        Initialize the cassette.
+
+        Args:
+            path: Cassette file
+            inner: Backend to record from, or a function creating it on the
+                first request that is not replayed (so replays need no credentials)
+            mode: "record" (always call the backend), "replay" (never call it)
+                or "auto" (replay if recorded, else record)
+            speed: Replay speed factor: 1.0 reproduces recorded timing,
+                10.0 is ten times faster, 0 replays without delay
+
+        Raises:
+            ValueError: If the mode is unknown
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode {mode!r} (expected one of {', '.join(MODES)})")
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+        self._inner = inner
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._replayed: Dict[str, int] = {}
+        self.model = getattr(inner, "model", None) or "cassette"
+        self.hits = 0
+        self.misses = 0
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries.setdefault(entry["key"], []).append(entry)
+            logger.info("Loaded %d recordings from %s", sum(len(e) for e in self._entries.values()), path)
+
+    @property
+    def inner(self) -> CompletionBackend:
+        """The recorded backend, created on first use."""
+        if self._inner is None:
+            raise CassetteMiss("No backend to record from")
+        if not isinstance(self._inner, CompletionBackend):
+            self._inner = self._inner()
+            self.model = self._inner.model
+        return self._inner
+
+    def _lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.mode == "record":
+            return None
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self.misses += 1
+                return None
+            index = self._replayed.get(key, 0)
+            self._replayed[key] = index + 1
+            self.hits += 1
+            return entries[min(index, len(entries) - 1)]
+
+    def _miss(self, key: str) -> None:
+        if self.mode == "replay":
+            raise CassetteMiss(f"Request {key[:12]} is not in cassette {self.path}")
+
+    def _save(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries.setdefault(entry["key"], []).append(entry)
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def _sleep(self, seconds: float) -> None:
+        if self.speed > 0 and seconds > 0:
+            time.sleep(seconds / self.speed)
+
+    def generate_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Replay a recorded response, or call the backend and record it."""
+        request = {
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "response_format": response_format,
+            "tools": tools,
+        }
+        key = request_key(request)
+        entry = self._lookup(key)
+        if entry is not None:
+            self._sleep(entry["latency"])
+            return {
+                "content": entry["content"],
+                "tool_calls": _decode_tool_calls(entry["tool_calls"]),
+                "usage": entry.get("usage"),
+            }
+        self._miss(key)
+
+        start = time.monotonic()
+        response = self.inner.generate_completion(timeout=timeout, **request)
+        self._save({
+            "key": key,
+            "request": request,
+            "content": response.get("content"),
+            "tool_calls": _encode_tool_calls(response.get("tool_calls")),
+            "usage": response.get("usage"),
+            "latency": time.monotonic() - start,
+            "chunks": None,
+        })
+        return response
+
+    def stream_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        timeout: Optional[float] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Replay recorded chunks with their timing, or stream from the backend and record them."""
+        request = {
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "response_format": response_format,
+            "tools": tools,
+        }
+        key = request_key(request)
+        entry = self._lookup(key)
+        if entry is not None:
+            yield from self._replay_stream(entry)
+            return
+        self._miss(key)
+
+        start = time.monotonic()
+        chunks = []
+        parts = []
+        tool_calls = None
+        usage = None
+        for chunk in self.inner.stream_completion(timeout=timeout, **request):
+            offset = time.monotonic() - start
+            if "tool_calls" in chunk:
+                tool_calls = chunk["tool_calls"]
+                chunks.append({"t": offset, "tool_calls": _encode_tool_calls(tool_calls)})
+            elif "usage" in chunk:
+                usage = chunk["usage"]
+                chunks.append({"t": offset, "usage": usage})
+            else:
+                parts.append(chunk["content"])
+                chunks.append({"t": offset, "content": chunk["content"]})
+            yield chunk
+
+        # Only complete streams are recorded
+        self._save({
+            "key": key,
+            "request": request,
+            "content": "".join(parts) if parts else None,
+            "tool_calls": _encode_tool_calls(tool_calls),
+            "usage": usage,
+            "latency": time.monotonic() - start,
+            "chunks": chunks,
+        })
+
+    def _replay_stream(self, entry: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        chunks = entry["chunks"]
+        if chunks is None:
+            # Recorded as a blocking call: one chunk after the full latency
+            chunks = []
+            if entry["content"]:
+                chunks.append({"t": entry["latency"], "content": entry["content"]})
+            if entry["tool_calls"]:
+                chunks.append({"t": entry["latency"], "tool_calls": entry["tool_calls"]})
+            if entry.get("usage"):
+                chunks.append({"t": entry["latency"], "usage": entry["usage"]})
+
+        previous = 0.0
+        for chunk in chunks:
+            self._sleep(chunk["t"] - previous)
+            previous = chunk["t"]
+            if "tool_calls" in chunk:
+                yield {"tool_calls": _decode_tool_calls(chunk["tool_calls"])}
+            elif "usage" in chunk:
+                yield {"usage": chunk["usage"]}
+            else:
+                yield {"content": chunk["content"]}
+
+    def close(self) -> None:
+        """Close the recorded backend, if it was created."""
+        if isinstance(self._inner, CompletionBackend):
+            self._inner.close()
@@ -0,0 +1,171 @@
+"""
+Deterministic in-process completion backend.
+
+Lets the whole pipeline (reasoner, tools, web app, benchmarks) run without
+network access or credentials. Responses depend only on the request, so
+runs are reproducible; latency can be simulated.
+"""
+
+import hashlib
+import json
+import re
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.api.backends import CompletionBackend
+from src.api.types import FunctionCall, ToolCall
+from src.utils.usage import estimate_tokens
+
+# Arithmetic such as "12 * (3 + 4)" or "1.5 ** 2" inside a question
+_EXPRESSION = re.compile(r"[\d(][\d\s.+\-*/%()]*[\d)]")
+_OPERATOR = re.compile(r"\d\s*(?:\*\*|[-+*/%])\s*[\d(]")
+
+
+def _query_text(content: str) -> str:
+    """Return the user's question from a reasoning prompt (or the content itself)."""
+    if content.startswith("Please solve the following problem"):
+        parts = content.split("\n\n")
+        if len(parts) > 1:
+            return parts[1].strip()
+    return content.strip()
+
+
+def find_expression(text: str) -> Optional[str]:
+    """Return the longest arithmetic expression in text, if any."""
+    candidates = [match.strip() for match in _EXPRESSION.findall(text) if _OPERATOR.search(match)]
+    return max(candidates, key=len) if candidates else None
+
+
+def _usage(prompt_tokens: int, completion_tokens: int) -> Dict[str, int]:
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+class FakeBackend(CompletionBackend):
+    """
+    Deterministic stand-in for a model.
+
+    - If tools are offered, the question contains arithmetic and no tool has
+      been called yet, it requests the calculate tool.
+    - If JSON is requested (response_format, or "json" in the prompt), it
+      answers with a schema-conforming reasoning result, using the latest
+      tool result as the answer when there is one.
+    - Otherwise it answers in plain text.
+
+    Token usage is reported as an estimate from the message lengths.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        chunk_delay: float = 0.0,
+        chunk_size: int = 16,
+        steps: int = 3,
+        use_tools: bool = True
+    ):
+        """
+        Initialize the backend.
+
+        Args:
+            latency: Seconds before the first token of every response
+            chunk_delay: Seconds between streamed chunks
+            chunk_size: Characters per streamed chunk
+            steps: Number of reasoning steps in structured answers
+            use_tools: Whether to request tools when they are offered
+        """
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.chunk_size = chunk_size
+        self.steps = steps
+        self.use_tools = use_tools
+        self.model = "fake"
+        self.calls = 0
+
+    def _respond(
+        self,
+        messages: List[Dict[str, Any]],
+        response_format: Optional[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        self.calls += 1
+        prompt_tokens = sum(estimate_tokens(str(m.get("content") or "")) for m in messages)
+        prompts = [m["content"] for m in messages if m["role"] == "user" and m.get("content")]
+        # Follow-up messages (tool reminders, repair requests) are not the question
+        question = next((p for p in reversed(prompts) if p.startswith("Please solve")), prompts[-1] if prompts else "")
+        query = _query_text(question)
+        tool_results = [m["content"] for m in messages if m["role"] == "tool"]
+
+        expression = find_expression(query)
+        tool_names = {tool["function"]["name"] for tool in tools or []}
+        if self.use_tools and "calculate" in tool_names and expression and not tool_results:
+            call_id = "call_" + hashlib.sha256(query.encode("utf-8")).hexdigest()[:12]
+            arguments = json.dumps({"expression": expression})
+            return {
+                "content": None,
+                "tool_calls": [ToolCall(id=call_id, function=FunctionCall(name="calculate", arguments=arguments))],
+                "usage": _usage(prompt_tokens, estimate_tokens(arguments))
+            }
+
+        answer = f"The answer to '{query[:80]}' is unknown to the fake backend."
+        if tool_results:
+            result = json.loads(tool_results[-1])
+            if "result" in result:
+                answer = f"{expression} = {result['result']}" if expression else str(result["result"])
+
+        prompt_text = " ".join(str(m.get("content") or "") for m in messages if m["role"] in ("system", "user"))
+        if response_format or "json" in prompt_text.lower():
+            steps = [
+                {
+                    "title": f"Step {i + 1}",
+                    "content": f"Considering '{query[:60]}' (approach {i + 1} of {self.steps}).",
+                    "next_action": "final_answer" if i == self.steps - 1 else "continue",
+                }
+                for i in range(self.steps)
+            ]
+            content = json.dumps({"reasoning_steps": steps, "final_answer": answer})
+        else:
+            content = f"Let me think about '{query[:60]}' step by step.\n\n{answer}"
+        return {"content": content, "tool_calls": None, "usage": _usage(prompt_tokens, estimate_tokens(content))}
+
+    def generate_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Return the deterministic response after the configured latency."""
+        response = self._respond(messages, response_format, tools)
+        if self.latency:
+            time.sleep(self.latency)
+        if self.chunk_delay and response["content"]:
+            # Match the total generation time of the streamed response
+            time.sleep(self.chunk_delay * -(-len(response["content"]) // self.chunk_size))
+        return response
+
+    def stream_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        timeout: Optional[float] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream the deterministic response in fixed-size chunks."""
+        response = self._respond(messages, response_format, tools)
+        if self.latency:
+            time.sleep(self.latency)
+        content = response["content"] or ""
+        for start in range(0, len(content), self.chunk_size):
+            if self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            yield {"content": content[start:start + self.chunk_size]}
+        if response["tool_calls"]:
+            yield {"tool_calls": response["tool_calls"]}
+        yield {"usage": response["usage"]}
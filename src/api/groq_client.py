@@ -2,78 +2,127 @@
 Client for interacting with the Groq API.
 """
 
-import os
-from groq import Groq
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 import json
 
+from src.api.backends import CompletionBackend
+from src.api.types import FunctionCall, ToolCall, usage_to_dict
+from src.config import LLM_MODEL, get_groq_api_key
+from src.settings import get_settings
 from src.utils.logger import get_logger
-from src.utils.groq_patch import patch_groq_client
 
 logger = get_logger(__name__)
 
-# Apply the patch before initializing the client
-patch_groq_client()
+# The groq SDK is imported (and patched) on first use rather than at import
+# time, so importing this module stays cheap for tools that never call the API.
+Groq = None
 
-class GroqClient:
+def _load_groq():
+    """
+    Import the Groq SDK class, applying the compatibility patch first.
+    
+    Returns:
+        The groq.Groq class
+    """
+    global Groq
+    if Groq is None:
+        from src.utils.groq_patch import patch_groq_client
+        patch_groq_client()
+        
+        from groq import Groq as _Groq
+        Groq = _Groq
+    return Groq
+
+class GroqClient(CompletionBackend):
     """Client for interacting with the Groq API."""
     
     def __init__(self):
         # Get API key from environment
-        api_key = os.getenv("GROQ_API_KEY")
-        if not api_key:
-            raise ValueError("GROQ_API_KEY environment variable is not set")
+        self._api_key = get_groq_api_key()
+        self._client = None
+        self._model = LLM_MODEL
+        logger.info("Initialized Groq client with model: %s", self.model)
+    
+    @property
+    def model(self) -> str:
+        """The model requested, following the model_name setting unless set explicitly."""
+        return self._model or get_settings().model_name
+    
+    @model.setter
+    def model(self, value: Optional[str]) -> None:
+        self._model = value
+        
+    @property
+    def client(self):
+        """The underlying Groq SDK client, constructed on first use."""
+        if self._client is None:
+            self._client = _load_groq()(api_key=self._api_key)
+        return self._client
+        
+    def _request_kwargs(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        response_format: Optional[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]],
+        timeout: Optional[float]
+    ) -> Dict[str, Any]:
+        settings = get_settings()
+        # Build kwargs dictionary
+        kwargs = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": settings.default_temperature if temperature is None else temperature,
+            "max_tokens": max_tokens or settings.default_max_tokens,
+        }
+        
+        # Only add optional parameters if they're provided
+        if response_format:
+            kwargs["response_format"] = response_format
+            
+        if tools:
+            kwargs["tools"] = tools
+            
+        if timeout is not None:
+            kwargs["timeout"] = timeout
             
-        # Initialize client
-        self.client = Groq(api_key=api_key)
-        self.model = "llama-3.3-70b-versatile"
-        logger.info(f"Initialized Groq client with model: {self.model}")
+        return kwargs
         
     def generate_completion(
         self,
         messages: List[Dict[str, str]],
-        temperature: float = 0.7,
-        max_tokens: int = 4000,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
         response_format: Optional[Dict[str, Any]] = None,
-        tools: Optional[List[Dict[str, Any]]] = None
+        tools: Optional[List[Dict[str, Any]]] = None,
+        timeout: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Generate a completion using the Groq API.
         
         Args:
             messages: List of message dictionaries with 'role' and 'content'
-            temperature: Sampling temperature (0.0 to 1.0)
-            max_tokens: Maximum number of tokens to generate
+            temperature: Sampling temperature (0.0 to 1.0; defaults to the default_temperature setting)
+            max_tokens: Maximum number of tokens to generate (defaults to the default_max_tokens setting)
             response_format: Format specification for the response
             tools: List of tools available to the model
+            timeout: Upper bound in seconds for the HTTP request
             
         Returns:
             Dictionary containing the model's response
         """
         try:
-            logger.debug(f"Sending request to Groq API with {len(messages)} messages")
+            logger.debug("Sending request to Groq API with %d messages", len(messages))
             
-            # Build kwargs dictionary
-            kwargs = {
-                "model": self.model,
-                "messages": messages,
-                "temperature": temperature,
-                "max_tokens": max_tokens,
-            }
-            
-            # Only add optional parameters if they're provided
-            if response_format:
-                kwargs["response_format"] = response_format
-                
-            if tools:
-                kwargs["tools"] = tools
+            kwargs = self._request_kwargs(messages, temperature, max_tokens, response_format, tools, timeout)
             
             # Make the API call
             completion = self.client.chat.completions.create(**kwargs)
             
             # Extract content
             content = completion.choices[0].message.content
-            logger.debug(f"Received response from Groq API: {content[:100]}...")
+            logger.debug("Received response from Groq API: %.100s...", content)
             
             # Try to get tool calls if they exist
             tool_calls = None
@@ -85,9 +134,84 @@ class GroqClient:
             # Return result
             return {
                 "content": content,
-                "tool_calls": tool_calls
+                "tool_calls": tool_calls,
+                "usage": usage_to_dict(getattr(completion, "usage", None))
             }
             
         except Exception as e:
-            logger.error(f"Error in Groq API call: {str(e)}")
+            logger.error("Error in Groq API call: %s", e)
             raise
+            
+    def stream_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        timeout: Optional[float] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a completion from the Groq API.
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            temperature: Sampling temperature (0.0 to 1.0; defaults to the default_temperature setting)
+            max_tokens: Maximum number of tokens to generate (defaults to the default_max_tokens setting)
+            response_format: Format specification for the response
+            tools: List of tools available to the model
+            timeout: Upper bound in seconds for the HTTP request
+            
+        Yields:
+            {"content": text} for each content delta, then a single
+            {"tool_calls": [...]} if the model requested tools and a single
+            {"usage": {...}} if the API reported token usage
+        """
+        logger.debug("Streaming request to Groq API with %d messages", len(messages))
+        
+        kwargs = self._request_kwargs(messages, temperature, max_tokens, response_format, tools, timeout)
+        
+        # Tool calls arrive as fragments keyed by index
+        partial_calls: Dict[int, Dict[str, str]] = {}
+        usage = None
+        
+        stream = self.client.chat.completions.create(stream=True, **kwargs)
+        try:
+            for chunk in stream:
+                # Groq reports usage on the last chunk under x_groq
+                x_groq = getattr(chunk, "x_groq", None)
+                chunk_usage = getattr(chunk, "usage", None) or getattr(x_groq, "usage", None)
+                if chunk_usage is not None:
+                    usage = usage_to_dict(chunk_usage)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                
+                if delta.content:
+                    yield {"content": delta.content}
+                    
+                for fragment in getattr(delta, "tool_calls", None) or []:
+                    call = partial_calls.setdefault(fragment.index, {"id": "", "name": "", "arguments": ""})
+                    if fragment.id:
+                        call["id"] = fragment.id
+                    if fragment.function is not None:
+                        call["name"] += fragment.function.name or ""
+                        call["arguments"] += fragment.function.arguments or ""
+        except Exception as e:
+            logger.error("Error in Groq API stream: %s", e)
+            raise
+        finally:
+            # Closing the stream releases the connection if the caller stops early
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+                
+        if partial_calls:
+            yield {
+                "tool_calls": [
+                    ToolCall(id=call["id"], function=FunctionCall(name=call["name"], arguments=call["arguments"]))
+                    for _, call in sorted(partial_calls.items())
+                ]
+            }
+        if usage is not None:
+            yield {"usage": usage}
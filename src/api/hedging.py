@@ -0,0 +1,336 @@
+"""
+Hedged requests for completion backends.
+
+If a completion has not produced its first token after a delay derived from
+recent first-token latencies, a duplicate request is sent (optionally to an
+alternate backend or model) and whichever produces a token first is used.
+The other request is cancelled: its stream is closed as soon as its thread
+regains control, which releases the upstream connection, and the tokens it
+used are recorded as "hedge" usage (estimated if it never reported usage).
+"""
+
+import contextvars
+import math
+import queue
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from src.api.backends import CompletionBackend
+from src.settings import Settings, get_settings, on_reload
+from src.utils.logger import get_logger
+from src.utils.usage import estimate_tokens, record_usage
+
+logger = get_logger(__name__)
+
+# Events placed on the shared queue by attempts
+_CHUNK, _DONE, _ERROR = "chunk", "done", "error"
+
+
+class _Attempt:
+    """One upstream request, streamed by a background thread."""
+
+    def __init__(self, index: int, backend: CompletionBackend, kwargs: Dict[str, Any], events: queue.Queue):
+        self.index = index
+        self.started_at = time.monotonic()
+        self.cancelled = threading.Event()
+        self.lost = False
+        self._finished = False
+        self._lock = threading.Lock()
+        self._backend = backend
+        self._kwargs = kwargs
+        self._events = events
+        self._usage: Optional[Dict[str, int]] = None
+        self._completion_chars = 0
+        # Run in a copy of the caller's context so usage and spans go to its meter and trace
+        context = contextvars.copy_context()
+        self._thread = threading.Thread(target=context.run, args=(self._run,), name=f"hedge-attempt-{index}", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        stream = None
+        try:
+            stream = self._backend.stream_completion(**self._kwargs)
+            for chunk in stream:
+                if "usage" in chunk:
+                    self._usage = chunk["usage"]
+                elif chunk.get("content"):
+                    self._completion_chars += len(chunk["content"])
+                if self.cancelled.is_set():
+                    return
+                self._events.put((self.index, _CHUNK, chunk))
+            self._events.put((self.index, _DONE, None))
+        except Exception as e:
+            self._events.put((self.index, _ERROR, e))
+        finally:
+            if stream is not None and hasattr(stream, "close"):
+                stream.close()
+            with self._lock:
+                self._finished = True
+                record = self.lost
+            if record:
+                self._record_loss()
+
+    def _record_loss(self) -> None:
+        # The caller only records the winner's usage; the losing request was billed too
+        usage = self._usage
+        if usage is None:
+            messages = self._kwargs["messages"]
+            usage = {
+                "prompt_tokens": sum(estimate_tokens(str(m.get("content") or "")) for m in messages),
+                "completion_tokens": math.ceil(self._completion_chars / 4),
+            }
+        record_usage("hedge", str(getattr(self._backend, "model", "")), usage)
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+
+    def lose(self) -> None:
+        """
+        Cancel the attempt because another one won and record its usage.
+
+        The usage is recorded here if the attempt has already stopped, else
+        by its thread when it stops, so it is recorded exactly once.
+        """
+        with self._lock:
+            if self.lost:
+                return
+            self.lost = True
+            record = self._finished
+        self.cancel()
+        if record:
+            self._record_loss()
+
+
+class HedgedBackend(CompletionBackend):
+    """
+    Wraps a backend with request hedging.
+
+    The hedge delay is the given percentile of recent first-token latencies
+    (initial_delay until min_samples latencies have been seen). At most
+    max_hedge_rate of recent requests are hedged, bounding the extra spend.
+    """
+
+    def __init__(
+        self,
+        primary: CompletionBackend,
+        alternate: Optional[CompletionBackend] = None,
+        percentile: float = 95.0,
+        initial_delay: float = 2.0,
+        min_delay: float = 0.05,
+        max_hedge_rate: float = 0.05,
+        window: int = 500,
+        min_samples: int = 20
+    ):
+        """
+        Initialize the hedged backend.
+
+        Args:
+            primary: Backend every request is sent to first
+            alternate: Backend for hedge requests (defaults to primary)
+            percentile: Percentile of first-token latency after which to hedge
+            initial_delay: Hedge delay in seconds until enough latencies are known
+            min_delay: Lower bound on the hedge delay in seconds
+            max_hedge_rate: Maximum fraction of recent requests that are hedged
+            window: Number of recent requests used for latencies and the hedge rate
+            min_samples: Latencies needed before the percentile is used
+        """
+        self.primary = primary
+        self.alternate = alternate or primary
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_hedge_rate = max_hedge_rate
+        self.min_samples = min_samples
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._hedged: Deque[bool] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    @property
+    def model(self) -> str:
+        """The primary backend's model, which may follow the model_name setting."""
+        return self.primary.model
+
+    def configure(self, percentile: float, initial_delay: float, max_hedge_rate: float) -> None:
+        """Change the hedging parameters; requests already running keep their hedge delay."""
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.max_hedge_rate = max_hedge_rate
+
+    def hedge_delay(self) -> float:
+        """Return the current hedge delay in seconds."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return self.initial_delay
+            latencies = sorted(self._latencies)
+        index = min(len(latencies) - 1, int(len(latencies) * self.percentile / 100))
+        return max(self.min_delay, latencies[index])
+
+    def _allow_hedge(self) -> bool:
+        with self._lock:
+            # Count this request as hedged and check the rate would stay under the cap
+            hedged = sum(self._hedged) + 1
+            return hedged / (len(self._hedged) + 1) <= self.max_hedge_rate
+
+    def _record(self, first_token_latency: Optional[float], hedged: bool, hedge_won: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            self._hedged.append(hedged)
+            if hedged:
+                self.hedges += 1
+            if hedge_won:
+                self.hedge_wins += 1
+            if first_token_latency is not None:
+                self._latencies.append(first_token_latency)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hedging counters."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "hedge_rate": self.hedges / self.requests if self.requests else 0.0,
+            }
+
+    def stream_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        timeout: Optional[float] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a completion, hedging if the first token is slow.
+
+        Yields:
+            The chunks of whichever request produced a token first
+        """
+        kwargs = {
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "response_format": response_format,
+            "tools": tools,
+            "timeout": timeout,
+        }
+        events: queue.Queue = queue.Queue()
+        start = time.monotonic()
+        hedge_at = start + self.hedge_delay()
+        attempts = [_Attempt(0, self.primary, kwargs, events)]
+        may_hedge = True
+        winner: Optional[int] = None
+        failed = set()
+
+        try:
+            while True:
+                wait = max(0.0, hedge_at - time.monotonic()) if may_hedge and winner is None else None
+                try:
+                    index, kind, payload = events.get(timeout=wait)
+                except queue.Empty:
+                    may_hedge = False
+                    if self._allow_hedge():
+                        logger.info("No first token after %.2fs, sending hedge request", time.monotonic() - start)
+                        attempts.append(_Attempt(1, self.alternate, kwargs, events))
+                    continue
+
+                if winner is not None and index != winner:
+                    continue
+
+                if kind == _ERROR:
+                    failed.add(index)
+                    # Errors are not retried: fail unless another attempt is still running
+                    if winner is not None or len(failed) == len(attempts):
+                        raise payload
+                    continue
+
+                if winner is None:
+                    winner = index
+                    for attempt in attempts:
+                        if attempt.index != winner:
+                            attempt.lose()
+                    if winner == 1:
+                        logger.info("Hedge request won")
+                    self._record(time.monotonic() - start, len(attempts) > 1, winner == 1)
+
+                if kind == _DONE:
+                    return
+                yield payload
+        finally:
+            if winner is None:
+                self._record(None, len(attempts) > 1, False)
+            for attempt in attempts:
+                attempt.cancel()
+
+    def generate_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate a completion, hedging if the first token is slow.
+
+        Requests are streamed so that first-token latency can be observed and
+        the losing request can be closed early.
+        """
+        parts = []
+        tool_calls = None
+        usage = None
+        for chunk in self.stream_completion(
+            messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            response_format=response_format,
+            tools=tools,
+            timeout=timeout
+        ):
+            if "tool_calls" in chunk:
+                tool_calls = chunk["tool_calls"]
+            elif "usage" in chunk:
+                usage = chunk["usage"]
+            else:
+                parts.append(chunk["content"])
+        return {"content": "".join(parts) if parts else None, "tool_calls": tool_calls, "usage": usage}
+
+    def close(self) -> None:
+        """Close both backends."""
+        self.primary.close()
+        if self.alternate is not self.primary:
+            self.alternate.close()
+
+
+# Backends created by from_settings, retuned when the settings are reloaded
+_configured: "weakref.WeakSet[HedgedBackend]" = weakref.WeakSet()
+
+
+def from_settings(primary: CompletionBackend, alternate: Optional[CompletionBackend] = None) -> HedgedBackend:
+    """Create a hedged backend that follows the hedge_* settings, including after a reload."""
+    settings = get_settings()
+    backend = HedgedBackend(
+        primary,
+        alternate=alternate,
+        percentile=settings.hedge_percentile,
+        initial_delay=settings.hedge_initial_delay,
+        max_hedge_rate=settings.hedge_max_rate
+    )
+    _configured.add(backend)
+    return backend
+
+
+def _apply_settings(settings: Settings) -> None:
+    for backend in list(_configured):
+        backend.configure(settings.hedge_percentile, settings.hedge_initial_delay, settings.hedge_max_rate)
+
+
+on_reload(_apply_settings)
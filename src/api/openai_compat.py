@@ -0,0 +1,191 @@
+"""
+Backend for OpenAI-compatible chat completion servers.
+
+Works with local inference servers that implement ``/v1/chat/completions``,
+such as llama.cpp's server, vLLM and Ollama, so the reasoner can run against
+a local model for latency-insensitive batch jobs.
+"""
+
+import json
+from typing import Any, Dict, Iterator, List, Optional
+
+import httpx
+
+from src.api.backends import CompletionBackend
+from src.api.types import FunctionCall, ToolCall, usage_to_dict
+from src.settings import get_settings
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _tool_calls(raw_calls: Optional[List[Dict[str, Any]]]) -> Optional[List[ToolCall]]:
+    if not raw_calls:
+        return None
+    return [
+        ToolCall(
+            id=call.get("id", ""),
+            function=FunctionCall(name=call["function"]["name"], arguments=call["function"].get("arguments") or "")
+        )
+        for call in raw_calls
+    ]
+
+
+class OpenAICompatibleBackend(CompletionBackend):
+    """Client for an OpenAI-compatible chat completions endpoint."""
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+        timeout: float = 600.0
+    ):
+        """
+        Initialize the backend.
+
+        Args:
+            base_url: Server URL including the API prefix, e.g. http://localhost:8080/v1
+            api_key: Bearer token, if the server requires one
+            model: Model name sent with each request
+            timeout: Default request timeout in seconds (local CPU inference is slow)
+        """
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        # One pooled client so consecutive requests reuse the connection
+        self._http = httpx.Client(base_url=base_url.rstrip("/"), headers=headers, timeout=timeout)
+        self.model = model or "local-model"
+        logger.info("Initialized OpenAI-compatible backend at %s with model: %s", base_url, self.model)
+
+    def _payload(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        response_format: Optional[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        settings = get_settings()
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": settings.default_temperature if temperature is None else temperature,
+            "max_tokens": max_tokens or settings.default_max_tokens,
+        }
+        if response_format:
+            # Servers differ in json_schema support; json_object is widely implemented
+            payload["response_format"] = {"type": "json_object"}
+        if tools:
+            payload["tools"] = tools
+        return payload
+
+    def generate_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate a completion.
+
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            temperature: Sampling temperature (0.0 to 1.0)
+            max_tokens: Maximum number of tokens to generate
+            response_format: Format specification for the response
+            tools: List of tools available to the model
+            timeout: Upper bound in seconds for the HTTP request
+
+        Returns:
+            Dictionary containing the model's response
+        """
+        payload = self._payload(messages, temperature, max_tokens, response_format, tools)
+        logger.debug("Sending request to %s with %d messages", self._http.base_url, len(messages))
+        try:
+            response = self._http.post(
+                "/chat/completions",
+                json=payload,
+                timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.error("Error in completion request: %s", e)
+            raise
+
+        body = response.json()
+        message = body["choices"][0]["message"]
+        return {
+            "content": message.get("content"),
+            "tool_calls": _tool_calls(message.get("tool_calls")),
+            "usage": usage_to_dict(body.get("usage"))
+        }
+
+    def stream_completion(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        timeout: Optional[float] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a completion using server-sent events.
+
+        Yields:
+            {"content": text} for each content delta, then a single
+            {"tool_calls": [...]} if the model requested tools and a single
+            {"usage": {...}} if the server reported token usage
+        """
+        payload = self._payload(messages, temperature, max_tokens, response_format, tools)
+        payload["stream"] = True
+        # Servers that support it send usage in a final chunk without choices
+        payload["stream_options"] = {"include_usage": True}
+
+        partial_calls: Dict[int, Dict[str, str]] = {}
+        usage = None
+        with self._http.stream(
+            "POST",
+            "/chat/completions",
+            json=payload,
+            timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                if chunk.get("usage"):
+                    usage = usage_to_dict(chunk["usage"])
+                if not chunk.get("choices"):
+                    continue
+                delta = chunk["choices"][0].get("delta") or {}
+
+                if delta.get("content"):
+                    yield {"content": delta["content"]}
+
+                for fragment in delta.get("tool_calls") or []:
+                    call = partial_calls.setdefault(fragment.get("index", 0), {"id": "", "name": "", "arguments": ""})
+                    call["id"] = fragment.get("id") or call["id"]
+                    function = fragment.get("function") or {}
+                    call["name"] += function.get("name") or ""
+                    call["arguments"] += function.get("arguments") or ""
+
+        if partial_calls:
+            yield {
+                "tool_calls": [
+                    ToolCall(id=call["id"], function=FunctionCall(name=call["name"], arguments=call["arguments"]))
+                    for _, call in sorted(partial_calls.items())
+                ]
+            }
+        if usage is not None:
+            yield {"usage": usage}
+
+    def close(self) -> None:
+        """Close the pooled HTTP connections."""
+        self._http.close()
@@ -0,0 +1,71 @@
+"""
+Provider-neutral types for model responses.
+"""
+
+from typing import Any, Dict, NamedTuple, Optional
+
+
+class FunctionCall(NamedTuple):
+    """The function a tool call invokes."""
+
+    name: str
+    arguments: str
+
+
+class ToolCall(NamedTuple):
+    """
+    A tool call requested by the model.
+
+    Mirrors the attribute layout of the SDK's tool call objects
+    (``call.id``, ``call.function.name``, ``call.function.arguments``).
+    """
+
+    id: str
+    function: FunctionCall
+    type: str = "function"
+
+
+def tool_call_to_dict(tool_call: Any) -> Dict[str, Any]:
+    """
+    Convert a tool call object into the message format expected by the API.
+
+    Works for ToolCall as well as SDK tool call objects.
+
+    Args:
+        tool_call: Object with id and function.name/function.arguments
+
+    Returns:
+        Dictionary suitable for an assistant message's tool_calls list
+    """
+    return {
+        "id": tool_call.id,
+        "type": "function",
+        "function": {
+            "name": tool_call.function.name,
+            "arguments": tool_call.function.arguments,
+        },
+    }
+
+
+def usage_to_dict(usage: Any) -> Optional[Dict[str, int]]:
+    """
+    Convert token usage reported by a provider into a plain dictionary.
+
+    Works for dictionaries as well as SDK usage objects.
+
+    Args:
+        usage: Object or dictionary with prompt_tokens and completion_tokens, or None
+
+    Returns:
+        {"prompt_tokens", "completion_tokens", "total_tokens"}, or None if no usage was reported
+    """
+    if usage is None:
+        return None
+    get = usage.get if isinstance(usage, dict) else lambda name: getattr(usage, name, None)
+    prompt_tokens = int(get("prompt_tokens") or 0)
+    completion_tokens = int(get("completion_tokens") or 0)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": int(get("total_tokens") or prompt_tokens + completion_tokens),
+    }
@@ -5,14 +5,164 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # API Configuration
+# The key is validated when a client is constructed, not at import time, so
+# offline tools and tests can import the package without credentials.
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-if not GROQ_API_KEY:
-    raise ValueError("GROQ_API_KEY environment variable is not set")
+
+
+def get_groq_api_key() -> str:
+    """
+    Return the Groq API key from the environment.
+
+    Raises:
+        ValueError: If GROQ_API_KEY is not set
+    """
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        raise ValueError("GROQ_API_KEY environment variable is not set")
+    return api_key
 
 # Model Configuration
-MODEL_NAME = "llama-3.3-70b-versatile"
-DEFAULT_TEMPERATURE = 0.7
-DEFAULT_MAX_TOKENS = 4000
+MODEL_NAME = os.getenv("MODEL_NAME", "llama-3.3-70b-versatile")
+DEFAULT_TEMPERATURE = float(os.getenv("DEFAULT_TEMPERATURE", "0.7"))
+DEFAULT_MAX_TOKENS = int(os.getenv("DEFAULT_MAX_TOKENS", "4000"))
+
+# Server Configuration (examples/web_app.py)
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+
+# Runtime Settings
+# JSON or TOML file whose values override the settings below (see src/settings.py);
+# it is re-read on SIGHUP and POST /admin/settings/reload
+SETTINGS_FILE = os.getenv("SETTINGS_FILE")
+# Key required (X-Admin-Key header) by the /admin endpoints, which are disabled without it
+ADMIN_API_KEY = os.getenv("ADMIN_API_KEY")
+
+# Budget Profiles
+# Named bundles of generation settings, chosen per request ("profile") and by
+# default with BUDGET_PROFILE. "prompt" names a system prompt in
+# src/cot/prompts.py, "min_steps"/"max_steps" are the step counts the prompt
+# asks for, "max_tool_rounds" bounds tool use and "model" overrides the
+# backend's model (None keeps it).
+BUDGET_PROFILES = {
+    "fast": {
+        "prompt": "concise", "max_tokens": 1024, "temperature": 0.3,
+        "min_steps": 1, "max_steps": 3, "max_tool_rounds": 1, "model": None,
+    },
+    "balanced": {
+        "prompt": "balanced", "max_tokens": 2048, "temperature": 0.5,
+        "min_steps": 2, "max_steps": 6, "max_tool_rounds": 1, "model": None,
+    },
+    "thorough": {
+        "prompt": "thorough", "max_tokens": DEFAULT_MAX_TOKENS, "temperature": DEFAULT_TEMPERATURE,
+        "min_steps": 3, "max_steps": None, "max_tool_rounds": 1, "model": None,
+    },
+}
+BUDGET_PROFILE = os.getenv("BUDGET_PROFILE", "thorough")
+# JSON object overriding or adding profiles, e.g. {"fast": {"model": "llama-3.1-8b-instant"}}
+BUDGET_PROFILE_OVERRIDES = os.getenv("BUDGET_PROFILES")
+
+# Backend Configuration
+LLM_BACKEND = os.getenv("LLM_BACKEND", "groq")  # "groq", "openai" or "fake"
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "http://localhost:8080/v1")  # OpenAI-compatible server
+LLM_API_KEY = os.getenv("LLM_API_KEY")
+LLM_MODEL = os.getenv("LLM_MODEL")  # Overrides the backend's default model
+FAKE_LATENCY_MS = float(os.getenv("FAKE_LATENCY_MS", "0"))
+FAKE_STEPS = int(os.getenv("FAKE_STEPS", "3"))  # Reasoning steps in the fake backend's structured answers
 
 # Logging Configuration
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # "text" or "json"
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))
+
+# Event Loop Lag Monitoring (examples/web_app.py)
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.25"))  # Seconds between checks
+LOOP_LAG_THRESHOLD = float(os.getenv("LOOP_LAG_THRESHOLD", "0.1"))  # Lag in seconds logged as a stall, with the blocking stack
+
+# Admission Control Configuration
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "8"))
+MAX_QUEUED_REQUESTS = int(os.getenv("MAX_QUEUED_REQUESTS", "32"))
+REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", "120"))
+
+# Tenant Configuration (API callers identified by X-API-Key)
+# JSON object of tenant name -> {"api_keys": [...], "weight": 1, "max_concurrency": null, "token_quota": null};
+# keys may be given as "sha256:<hex digest>", and the "default" entry applies to unlisted callers
+TENANTS = os.getenv("TENANTS")
+TENANT_QUOTA_WINDOW = float(os.getenv("TENANT_QUOTA_WINDOW", "3600"))  # Seconds token quotas are counted over
+REQUIRE_API_KEY = os.getenv("REQUIRE_API_KEY", "false").lower() == "true"  # Reject callers without a listed key
+
+# Response Configuration
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+# Structured Output Configuration
+# Ask the model to fix its JSON when local repair fails (otherwise return unstructured)
+JSON_REPAIR_REASK = os.getenv("JSON_REPAIR_REASK", "true").lower() == "true"
+
+# Session Configuration (WebSocket /ws/reason)
+SESSION_MAX_TURNS = int(os.getenv("SESSION_MAX_TURNS", "4"))
+SESSION_SUMMARY_CHARS = int(os.getenv("SESSION_SUMMARY_CHARS", "1500"))
+
+# Hedging Configuration
+# Send a duplicate request when the first token is slower than HEDGE_PERCENTILE
+# of recent requests, for at most HEDGE_MAX_RATE of requests
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+HEDGE_INITIAL_DELAY = float(os.getenv("HEDGE_INITIAL_DELAY", "2.0"))
+HEDGE_MAX_RATE = float(os.getenv("HEDGE_MAX_RATE", "0.05"))
+HEDGE_BACKEND = os.getenv("HEDGE_BACKEND")  # Backend for hedge requests (defaults to the primary)
+HEDGE_MODEL = os.getenv("HEDGE_MODEL")  # Model for hedge requests
+
+# Cassette Configuration (record/replay of completion requests)
+CASSETTE_PATH = os.getenv("CASSETTE_PATH")
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "auto")  # "record", "replay" or "auto"
+CASSETTE_SPEED = float(os.getenv("CASSETTE_SPEED", "0"))  # 1.0 replays with recorded timing
+
+# Tracing Configuration
+# Traces are recorded only when exported to a file and/or an OTLP/HTTP collector
+TRACE_FILE = os.getenv("TRACE_FILE")
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT")  # e.g. http://localhost:4318/v1/traces
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "chain-of-thought")
+
+# Usage Accounting
+# Per-caller, per-feature token usage is flushed to this file (SQLite, or CSV if it ends in .csv)
+USAGE_LEDGER_PATH = os.getenv("USAGE_LEDGER_PATH")
+USAGE_FLUSH_INTERVAL = float(os.getenv("USAGE_FLUSH_INTERVAL", "30"))
+# JSON object of model -> [input, output] price in USD per million tokens
+USAGE_PRICES = os.getenv("USAGE_PRICES")
+
+# Fallback Speculation
+# "off" starts the unstructured fallback only after the structured attempt fails,
+# "parallel" starts both at once and "delayed" starts the fallback once the
+# structured attempt has run for FALLBACK_SPECULATION_DELAY seconds
+FALLBACK_SPECULATION = os.getenv("FALLBACK_SPECULATION", "off")
+FALLBACK_SPECULATION_DELAY = float(os.getenv("FALLBACK_SPECULATION_DELAY", "5.0"))
+
+# Calculator Configuration
+# Default arithmetic of the calculate tool: "float", "exact" (fractions) or "decimal"
+CALCULATOR_MODE = os.getenv("CALCULATOR_MODE", "float")
+
+# Tool Sandbox
+# "process" runs tool calls in a pool of worker processes with resource limits, "off" in-process
+TOOL_SANDBOX = os.getenv("TOOL_SANDBOX", "process")
+TOOL_SANDBOX_WORKERS = int(os.getenv("TOOL_SANDBOX_WORKERS", "2"))  # 0 for one per CPU
+TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT", "2.0"))  # Wall-clock seconds before a worker is killed
+TOOL_CPU_SECONDS = float(os.getenv("TOOL_CPU_SECONDS", "1"))  # CPU seconds per call (enforced in whole seconds)
+TOOL_MEMORY_MB = int(os.getenv("TOOL_MEMORY_MB", "512"))  # Address space limit per worker
+TOOL_MAX_CALLS_PER_WORKER = int(os.getenv("TOOL_MAX_CALLS_PER_WORKER", "1000"))
+
+# Answer Index
+# Precomputed answers served by /api/reason (defaults to data/answer_index/index.json)
+ANSWER_INDEX_PATH = os.getenv("ANSWER_INDEX_PATH")
+
+# Trace Storage (see src/cot/trace_store.py)
+TRACE_LOG_PATH = os.getenv("TRACE_LOG_PATH")  # Compressed log of the results served by the API; off if unset
+TRACE_CODEC_PATH = os.getenv("TRACE_CODEC_PATH")  # Codec trained by scripts/train_trace_codec.py
+
+# Job Configuration (asynchronous /api/jobs requests)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))  # Jobs run at once
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", "100"))  # Queued or running jobs before submissions are rejected
+JOB_TIMEOUT = float(os.getenv("JOB_TIMEOUT", "600"))  # Seconds a job may run
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "3600"))  # Seconds finished jobs are kept
+JOB_CALLBACK_SECRET = os.getenv("JOB_CALLBACK_SECRET")  # Signs callbacks (X-Signature: sha256=<HMAC>)
+# Comma-separated callback hosts allowed even though they are private, loopback or link-local
+JOB_CALLBACK_ALLOWED_HOSTS = [host.strip().lower() for host in os.getenv("JOB_CALLBACK_ALLOWED_HOSTS", "").split(",") if host.strip()]
@@ -0,0 +1,185 @@
+"""
+Precomputed answers for frequently asked queries.
+
+The example queries of the web interface are asked over and over with the
+same settings, so their answers are generated ahead of time (with
+scripts/build_answer_index.py) and served without calling the model. The
+index is a JSON file keyed by normalized query:
+
+    {"version": 1, "fingerprint": "...", "model": "...", "generated_at": "...",
+     "entries": {"<normalized query>|tools|structured": {"query": "...", "result": {...}}}}
+
+The fingerprint covers the default budget profile, the prompts, the
+response schema and the tool definitions; an index built with different
+ones is stale and is not served, and neither is an index built for a
+different model than the reasoner uses.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.config import ANSWER_INDEX_PATH
+from src.cot.profiles import get_profile
+from src.cot.prompts import JSON_REPAIR_PROMPT, REASONING_PROMPT_TEMPLATE
+from src.cot.schemas import AVAILABLE_TOOLS, REASONING_SCHEMA
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+INDEX_VERSION = 1
+
+DEFAULT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data", "answer_index", "index.json"))
+
+_QUOTES = str.maketrans({"‘": "'", "’": "'", "“": '"', "”": '"'})
+
+
+def normalize_query(query: str) -> str:
+    """
+    Return the index key of a query.
+
+    Case, Unicode forms, curly quotes, runs of whitespace and trailing
+    punctuation are normalized away, so trivially different spellings of a
+    query share an entry.
+    """
+    query = unicodedata.normalize("NFKC", query).translate(_QUOTES).casefold()
+    query = re.sub(r"\s+", " ", query).strip()
+    return query.rstrip(" ?!.")
+
+
+def prompt_fingerprint() -> str:
+    """Return a hash of everything besides the model that determines an answer."""
+    profile = get_profile()
+    material = json.dumps(
+        [profile._asdict(), profile.system_prompt(), REASONING_PROMPT_TEMPLATE, JSON_REPAIR_PROMPT,
+         REASONING_SCHEMA, AVAILABLE_TOOLS],
+        sort_keys=True
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()[:16]
+
+
+def _key(query: str, use_tools: bool, structured_output: bool) -> str:
+    return "|".join((
+        normalize_query(query),
+        "tools" if use_tools else "no-tools",
+        "structured" if structured_output else "unstructured"
+    ))
+
+
+class AnswerIndex:
+    """Precomputed results, keyed by normalized query and reasoner settings."""
+
+    def __init__(self, model: Optional[str] = None, entries: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Initialize the index.
+
+        Args:
+            model: Model the answers were generated with
+            entries: Entries as stored in the index file
+        """
+        self.model = model
+        self.entries = entries or {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def lookup(self, query: str, model: str, use_tools: bool = True, structured_output: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Return the precomputed result for a query, if there is one.
+
+        Args:
+            query: The query
+            model: Model the caller would use; other models' answers are not served
+            use_tools: Whether tools are enabled
+            structured_output: Whether structured output was requested
+
+        Returns:
+            A copy of the result, or None
+        """
+        entry = self.entries.get(_key(query, use_tools, structured_output)) if model == self.model else None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return copy.deepcopy(entry["result"]) if entry is not None else None
+
+    def add(self, query: str, result: Dict[str, Any], use_tools: bool = True, structured_output: bool = True) -> None:
+        """Add or replace the result of a query."""
+        self.entries[_key(query, use_tools, structured_output)] = {"query": query, "result": result}
+
+    def save(self, path: str) -> None:
+        """Write the index, replacing the file atomically."""
+        data = {
+            "version": INDEX_VERSION,
+            "fingerprint": prompt_fingerprint(),
+            "model": self.model,
+            "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "entries": dict(sorted(self.entries.items())),
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str) -> "AnswerIndex":
+        """
+        Read an index file.
+
+        A missing, unreadable or stale file gives an empty index, so the
+        server always starts.
+
+        Args:
+            path: Index file
+
+        Returns:
+            The index
+        """
+        if not os.path.exists(path):
+            logger.debug("No answer index at %s", path)
+            return cls()
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Could not read answer index %s: %s", path, e)
+            return cls()
+        if data.get("version") != INDEX_VERSION:
+            logger.warning("Ignoring answer index %s with unsupported version %s", path, data.get("version"))
+            return cls()
+        if data.get("fingerprint") != prompt_fingerprint():
+            logger.warning("Ignoring stale answer index %s: prompts have changed since it was built", path)
+            return cls(model=data.get("model"))
+        index = cls(model=data.get("model"), entries=data.get("entries", {}))
+        logger.info("Loaded %d precomputed answers for %s from %s", len(index), index.model, path)
+        return index
+
+
+def read_queries(lines: Iterable[str]) -> List[str]:
+    """Return the queries of a query list, skipping blank lines and # comments."""
+    return [line.strip() for line in lines if line.strip() and not line.lstrip().startswith("#")]
+
+
+_index: Optional[AnswerIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_answer_index() -> AnswerIndex:
+    """Return the shared index, loading ANSWER_INDEX_PATH on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = AnswerIndex.load(ANSWER_INDEX_PATH or DEFAULT_PATH)
+        return _index
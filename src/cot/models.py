@@ -0,0 +1,85 @@
+"""
+Typed models for reasoning results, mirroring REASONING_SCHEMA.
+
+These are used by the web API to validate and serialize results. Typed
+fields let pydantic-core validate and serialize in a single compiled pass
+instead of walking an arbitrary Dict[str, Any] in Python.
+"""
+
+import json
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, ValidationError
+
+
+class ReasoningStep(BaseModel):
+    """A single reasoning step."""
+
+    model_config = ConfigDict(extra="ignore")
+
+    title: str
+    content: str
+    next_action: Literal["continue", "final_answer"]
+
+
+class ReasoningResult(BaseModel):
+    """
+    Result of processing a query.
+
+    Structured results fill reasoning_steps and final_answer; unstructured
+    results (and fallbacks) fill content with structured set to False.
+    """
+
+    model_config = ConfigDict(extra="ignore")
+
+    reasoning_steps: Optional[List[ReasoningStep]] = None
+    final_answer: Optional[str] = None
+    content: Optional[str] = None
+    structured: Optional[bool] = None
+    error: Optional[str] = None
+
+    @classmethod
+    def from_result(cls, result: Dict[str, Any]) -> "ReasoningResult":
+        """
+        Build a model from a reasoner result dictionary.
+
+        Results that do not match the schema are returned as unstructured
+        content rather than failing the request.
+
+        Args:
+            result: Dictionary returned by ChainOfThoughtReasoner
+
+        Returns:
+            The validated result
+        """
+        try:
+            return cls.model_validate(result)
+        except ValidationError:
+            return cls(content=json.dumps(result, ensure_ascii=False), structured=False)
+
+
+class FeatureUsage(BaseModel):
+    """Token usage of the completions made for one feature."""
+
+    calls: int
+    prompt_tokens: int
+    completion_tokens: int
+    cost_usd: float
+
+
+class Usage(BaseModel):
+    """Token usage and cost of a request (see src.utils.usage.UsageMeter)."""
+
+    calls: int
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    cost_usd: float
+    by_feature: Dict[str, FeatureUsage]
+
+
+class QueryResponse(BaseModel):
+    """Response body of /api/reason."""
+
+    result: ReasoningResult
+    usage: Optional[Usage] = None
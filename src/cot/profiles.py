@@ -0,0 +1,111 @@
+"""
+Generation budget profiles.
+
+A profile bundles the settings that trade answer quality against latency
+and cost: the system prompt variant, the number of reasoning steps asked
+for, max_tokens, temperature, how many tool rounds are allowed and
+optionally a different model. Profiles are defined in
+src.config.BUDGET_PROFILES and can be overridden or extended with the
+BUDGET_PROFILES environment variable.
+"""
+
+import json
+from typing import Dict, List, NamedTuple, Optional
+
+from src.config import BUDGET_PROFILE, BUDGET_PROFILE_OVERRIDES, BUDGET_PROFILES
+from src.cot.prompts import SYSTEM_PROMPTS
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class BudgetProfile(NamedTuple):
+    """Generation settings used by a reasoner."""
+
+    name: str
+    prompt: str
+    max_tokens: int
+    temperature: float
+    min_steps: int
+    max_steps: Optional[int]
+    max_tool_rounds: int
+    model: Optional[str] = None
+
+    def system_prompt(self) -> str:
+        """Return the profile's system prompt with its step limits filled in."""
+        return SYSTEM_PROMPTS[self.prompt].format(min_steps=self.min_steps, max_steps=self.max_steps)
+
+
+def _step_limit_error(profile: BudgetProfile) -> Optional[str]:
+    """
+    Return why a profile's step or tool round limits are invalid, or None.
+
+    min_steps and max_steps only reach the model through the prompt's
+    {min_steps} and {max_steps} placeholders; max_steps is only required by
+    prompts that use it. At least one tool round is needed so that tool
+    calls the model makes are always run.
+    """
+    if not isinstance(profile.max_tool_rounds, int) or profile.max_tool_rounds < 1:
+        return f"max_tool_rounds must be a positive integer, got {profile.max_tool_rounds!r}"
+    if not isinstance(profile.min_steps, int) or profile.min_steps < 1:
+        return f"min_steps must be a positive integer, got {profile.min_steps!r}"
+    if "{max_steps}" not in SYSTEM_PROMPTS[profile.prompt]:
+        return None
+    if not isinstance(profile.max_steps, int) or profile.max_steps < profile.min_steps:
+        return f"the {profile.prompt!r} prompt needs max_steps of at least min_steps, got {profile.max_steps!r}"
+    return None
+
+
+def _load_profiles() -> Dict[str, BudgetProfile]:
+    definitions = {name: dict(settings) for name, settings in BUDGET_PROFILES.items()}
+    if BUDGET_PROFILE_OVERRIDES:
+        try:
+            for name, settings in json.loads(BUDGET_PROFILE_OVERRIDES).items():
+                definitions.setdefault(name, dict(BUDGET_PROFILES["balanced"])).update(settings)
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.warning("Ignoring invalid BUDGET_PROFILES: %s", e)
+
+    profiles = {}
+    for name, settings in definitions.items():
+        try:
+            profile = BudgetProfile(name=name, **settings)
+        except TypeError as e:
+            logger.warning("Ignoring budget profile %s: %s", name, e)
+            continue
+        if profile.prompt not in SYSTEM_PROMPTS:
+            logger.warning("Ignoring budget profile %s: unknown prompt %r", name, profile.prompt)
+            continue
+        error = _step_limit_error(profile)
+        if error:
+            logger.warning("Ignoring budget profile %s: %s", name, error)
+            continue
+        profiles[name] = profile
+    return profiles
+
+
+PROFILES = _load_profiles()
+
+
+def profile_names() -> List[str]:
+    """Return the names of the available profiles."""
+    return list(PROFILES)
+
+
+def get_profile(name: Optional[str] = None) -> BudgetProfile:
+    """
+    Look up a profile.
+
+    Args:
+        name: Profile name (defaults to BUDGET_PROFILE)
+
+    Returns:
+        The profile
+
+    Raises:
+        ValueError: If there is no profile with that name
+    """
+    name = (name or BUDGET_PROFILE).strip().lower()
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown profile '{name}', expected one of: {', '.join(PROFILES)}")
@@ -2,61 +2,210 @@
 This module implements chain of thought reasoning with the Llama model.
 """
 
+import contextvars
 import json
 import re
-from typing import Dict, Any, List, Optional, Union
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
 
+from src.api.backends import CompletionBackend, create_backend, with_cassette, with_hedging
 from src.api.groq_client import GroqClient
-from src.cot.prompts import SYSTEM_PROMPT, REASONING_PROMPT_TEMPLATE
+from src.api.types import tool_call_to_dict
+from src.config import CASSETTE_PATH, LLM_BACKEND
+from src.cot.profiles import BudgetProfile, get_profile
+from src.cot.prompts import REASONING_PROMPT_TEMPLATE, JSON_REPAIR_PROMPT
 from src.cot.schemas import REASONING_SCHEMA, AVAILABLE_TOOLS
+from src.cot.streaming import StepStreamParser
+from src.cot.validation import ReasoningValidationError, repair_reasoning
+from src.settings import get_settings
 from src.tools.calculator import calculate
+from src.utils.deadline import Deadline, DeadlineExceeded
 from src.utils.logger import get_logger
+from src.utils.tracing import add_span, span, traced
+from src.utils.usage import record_usage
 
 logger = get_logger(__name__)
 
+SPECULATION_MODES = ("off", "parallel", "delayed")
+
 class ChainOfThoughtReasoner:
     """
     Implements chain of thought reasoning using the Llama model via Groq API.
     """
     
-    def __init__(self, use_tools: bool = True):
+    def __init__(
+        self,
+        use_tools: bool = True,
+        client: Optional[CompletionBackend] = None,
+        profile: Optional[str] = None
+    ):
         """
         Initialize the reasoner.
         
         Args:
             use_tools: Whether to enable tool usage
+            client: Completion backend to use (defaults to the one configured
+                by LLM_BACKEND, with the profile's model if it sets one)
+            profile: Budget profile (defaults to BUDGET_PROFILE, see src.cot.profiles)
+            
+        Raises:
+            ValueError: If the profile is unknown
         """
-        self.client = GroqClient()
+        self.profile: BudgetProfile = get_profile(profile)
+        # Clients the reasoner creates are hedged while hedge_enabled is on (see _backend)
+        self._hedge = client is None and not CASSETTE_PATH
+        if client is None:
+            model = self.profile.model
+            client = with_cassette(lambda: self._default_client(model)) if CASSETTE_PATH else self._default_client(model)
+        self.client = client
         self.use_tools = use_tools
-        logger.info(f"Initialized ChainOfThoughtReasoner with tools {'enabled' if use_tools else 'disabled'}")
+        self._hedged: Optional[CompletionBackend] = None
+        self._hedge_lock = threading.Lock()
+        self._speculation_lock = threading.Lock()
+        self._speculation = {
+            "requests": 0, "speculated": 0, "structured_used": 0, "fallback_used": 0, "paid_off": 0, "wasted": 0
+        }
+        logger.info("Initialized ChainOfThoughtReasoner with tools %s and the %s profile",
+                    'enabled' if use_tools else 'disabled', self.profile.name)
+        
+    @staticmethod
+    def _default_client(model: Optional[str] = None) -> CompletionBackend:
+        if LLM_BACKEND == "groq":
+            client = GroqClient()
+            if model:
+                client.model = model
+        else:
+            client = create_backend(LLM_BACKEND, model=model)
+        return client
+    
+    def _backend(self) -> CompletionBackend:
+        """Return the backend for the next call: the client, hedged while hedge_enabled is on."""
+        if not (self._hedge and get_settings().hedge_enabled):
+            return self.client
+        with self._hedge_lock:
+            if self._hedged is None:
+                self._hedged = with_hedging(self.client)
+            return self._hedged
+        
+    def _complete(self, deadline: Optional[Deadline] = None, feature: str = "structured", **kwargs) -> Dict[str, Any]:
+        """
+        Call the model, honouring the request deadline if one is given.
+        
+        Args:
+            deadline: Deadline bounding this call
+            feature: What the call is for, recorded with its token usage
+            **kwargs: Arguments for generate_completion
+            
+        Returns:
+            Dictionary containing the model's response
+        """
+        if deadline is not None:
+            deadline.check()
+            remaining = deadline.remaining()
+            if remaining is not None:
+                kwargs["timeout"] = remaining
+        client = self._backend()
+        model = str(getattr(client, "model", ""))
+        with span("llm.completion", backend=type(client).__name__, model=model, feature=feature,
+                  messages=len(kwargs["messages"]), tools=bool(kwargs.get("tools"))) as completion:
+            response = client.generate_completion(**kwargs)
+            completion.set_attribute("tool_calls", len(response.get("tool_calls") or []))
+            usage = response.get("usage")
+            if usage:
+                completion.set_attribute("tokens", usage["total_tokens"])
+        record_usage(feature, model, usage)
+        return response
         
+    @traced("reasoner.process_query")
     def process_query(
         self, 
         query: str,
-        temperature: float = 0.7,
-        structured_output: bool = True
+        temperature: Optional[float] = None,
+        structured_output: bool = True,
+        deadline: Optional[Deadline] = None,
+        history: Optional[List[Dict[str, Any]]] = None,
+        max_tokens: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Process a query using chain of thought reasoning.
         
         Args:
             query: The user's question or problem
-            temperature: Temperature for generation (0.0 to 1.0)
+            temperature: Temperature for generation (0.0 to 1.0; defaults to the profile's)
             structured_output: Whether to return structured JSON output
+            deadline: Deadline after which no further upstream calls are made
+            history: Earlier conversation messages (see ReasoningSession)
+            max_tokens: Completion token limit (defaults to the profile's)
             
         Returns:
             Dictionary containing reasoning steps and final answer
         """
+        messages, kwargs = self._build_request(query, temperature, structured_output, history, max_tokens)
+        
+        # Generate completion
+        logger.info("Processing query (%d chars)", len(query))
+        logger.debug("Query text: %.200s", query)
+        response = self._complete(deadline, "structured" if structured_output else "unstructured", **kwargs)
+        
+        # Handle tool calls if present
+        if response.get("tool_calls"):
+            messages, result = self._handle_tool_calls(response, messages, structured_output, deadline, kwargs["max_tokens"])
+            return result
+        
+        # Parse the response
+        try:
+            if structured_output:
+                # Try to extract JSON from the response
+                content = response["content"]
+                result = self._parse_structured(content, deadline)
+            else:
+                result = {"content": response["content"]}
+                
+            logger.info("Successfully processed query with %s reasoning steps", len(result.get('reasoning_steps', [])) if structured_output and 'reasoning_steps' in result else 'unstructured')
+            return result
+            
+        except (json.JSONDecodeError, ReasoningValidationError):
+            logger.error("Failed to parse JSON response")
+            # Return the raw content so it's still usable
+            return {"content": response["content"], "structured": False}
+    
+    @traced("reasoner.build_prompt")
+    def _build_request(
+        self,
+        query: str,
+        temperature: Optional[float],
+        structured_output: bool,
+        history: Optional[List[Dict[str, Any]]] = None,
+        max_tokens: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Build the messages and completion parameters for a query.
+        
+        Args:
+            query: The user's question or problem
+            temperature: Temperature for generation (None for the profile's)
+            structured_output: Whether to request structured JSON output
+            history: Earlier conversation messages placed between the system
+                prompt and the query
+            max_tokens: Completion token limit (None for the profile's)
+            
+        Returns:
+            Tuple of (messages, keyword arguments for the completion call)
+        """
         # Prepare messages
         messages = [
-            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "system", "content": self.profile.system_prompt()},
+            *(history or []),
             {"role": "user", "content": REASONING_PROMPT_TEMPLATE.format(query=query)}
         ]
         
         # Prepare request parameters
         kwargs = {
             "messages": messages,
-            "temperature": temperature,
+            "temperature": self.profile.temperature if temperature is None else temperature,
+            "max_tokens": max_tokens or self.profile.max_tokens,
         }
         
         # Note: Groq API doesn't support both response_format and tools at the same time
@@ -66,9 +215,9 @@ class ChainOfThoughtReasoner:
             kwargs["response_format"] = REASONING_SCHEMA
             
             # Make sure we have the word "json" in the messages
-            if "json" not in messages[0]["content"].lower() and "json" not in messages[1]["content"].lower():
+            if "json" not in messages[0]["content"].lower() and "json" not in messages[-1]["content"].lower():
                 # Add JSON instruction to user message if not already present
-                messages[1]["content"] += " Please format your response as JSON."
+                messages[-1]["content"] += " Please format your response as JSON."
         elif self.use_tools:
             # If we need tools, we can't use response_format
             # Instead, add explicit instructions for JSON formatting
@@ -78,31 +227,7 @@ class ChainOfThoughtReasoner:
             
             kwargs["tools"] = AVAILABLE_TOOLS
         
-        # Generate completion
-        logger.info(f"Processing query: {query}")
-        response = self.client.generate_completion(**kwargs)
-        
-        # Handle tool calls if present
-        if response.get("tool_calls"):
-            messages, result = self._handle_tool_calls(response, messages, structured_output)
-            return result
-        
-        # Parse the response
-        try:
-            if structured_output:
-                # Try to extract JSON from the response
-                content = response["content"]
-                result = self._extract_json_from_content(content)
-            else:
-                result = {"content": response["content"]}
-                
-            logger.info(f"Successfully processed query with {len(result.get('reasoning_steps', [])) if structured_output and 'reasoning_steps' in result else 'unstructured'} reasoning steps")
-            return result
-            
-        except json.JSONDecodeError:
-            logger.error("Failed to parse JSON response")
-            # Return the raw content so it's still usable
-            return {"content": response["content"], "structured": False}
+        return messages, kwargs
     
     def _extract_json_from_content(self, content: str) -> Dict[str, Any]:
         """
@@ -115,7 +240,7 @@ class ChainOfThoughtReasoner:
             Parsed JSON as a dictionary
         """
         # Try to extract JSON from markdown code blocks first
-        json_block_pattern = r"``````"
+        json_block_pattern = r"```(?:json)?\s*([\s\S]*?)```"
         json_blocks = re.findall(json_block_pattern, content)
         
         if json_blocks:
@@ -126,22 +251,103 @@ class ChainOfThoughtReasoner:
                 except json.JSONDecodeError:
                     continue
         
-        # If no valid JSON blocks found, try the entire content
-        return json.loads(content)
+        try:
+            # If no valid JSON blocks found, try the entire content
+            return json.loads(content)
+        except json.JSONDecodeError:
+            # Fall back to the outermost braces, dropping any prose around them
+            start, end = content.find("{"), content.rfind("}")
+            if start == -1 or end <= start:
+                raise
+            return json.loads(content[start:end + 1])
     
+    @traced("reasoner.parse_json")
+    def _parse_structured(self, content: str, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """
+        Parse and validate a structured response, repairing it locally if possible.
+        
+        Only when local extraction or repair fails is the model asked, with a
+        short targeted prompt, to fix its JSON.
+        
+        Args:
+            content: The model's response text
+            deadline: Deadline bounding the re-ask, if one is needed
+            
+        Returns:
+            A result that satisfies REASONING_SCHEMA
+            
+        Raises:
+            json.JSONDecodeError: If the JSON could not be recovered
+            ReasoningValidationError: If the result could not be repaired
+        """
+        try:
+            result, repairs = repair_reasoning(self._extract_json_from_content(content))
+            if repairs:
+                logger.info("Repaired structured output locally: %s", ", ".join(repairs))
+            return result
+        except (json.JSONDecodeError, ReasoningValidationError) as e:
+            if not get_settings().json_repair_reask:
+                raise
+            logger.warning("Local repair failed (%s), asking the model to fix its JSON", e)
+            try:
+                return self._reask_for_json(content, str(e), deadline)
+            except DeadlineExceeded:
+                raise
+            except Exception as reask_error:
+                logger.warning("JSON re-ask failed: %s", reask_error)
+                raise e
+    
+    @traced("reasoner.reask_json")
+    def _reask_for_json(self, content: str, error: str, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """
+        Ask the model to correct malformed JSON without redoing the reasoning.
+        
+        Args:
+            content: The malformed response
+            error: Description of what was wrong with it
+            deadline: Deadline bounding the call
+            
+        Returns:
+            A result that satisfies REASONING_SCHEMA
+        """
+        messages = [
+            {"role": "system", "content": JSON_REPAIR_PROMPT},
+            {"role": "user", "content": f"Error: {error}\n\n{content}"}
+        ]
+        response = self._complete(
+            deadline,
+            "json_reask",
+            messages=messages,
+            temperature=0.0,
+            # The fixed JSON is about as long as the original
+            max_tokens=min(4000, len(content) // 3 + 256),
+            response_format={"type": "json_object"}
+        )
+        result, _ = repair_reasoning(self._extract_json_from_content(response["content"]))
+        return result
+    
+    @traced("reasoner.tool_round")
     def _handle_tool_calls(
         self, 
         response: Dict[str, Any], 
         messages: List[Dict[str, str]],
-        structured_output: bool = True
+        structured_output: bool = True,
+        deadline: Optional[Deadline] = None,
+        max_tokens: Optional[int] = None
     ) -> tuple:
         """
         Handle tool calls in the response.
         
+        The model may keep calling tools for up to the profile's
+        max_tool_rounds rounds; the last follow-up is made without tools so
+        that it has to answer.
+        
         Args:
             response: The response from the model
             messages: The current message history
             structured_output: Whether to request structured output
+            deadline: Deadline after which no further upstream calls are made
+            max_tokens: Completion token limit of the follow-up calls
             
         Returns:
             Tuple of (updated messages, result)
@@ -150,22 +356,66 @@ class ChainOfThoughtReasoner:
         if not tool_calls:
             return messages, {"content": response["content"]}
         
-        # Add the assistant's message with tool calls
-        messages.append({
-            "role": "assistant",
-            "content": response["content"],
-            "tool_calls": tool_calls
-        })
+        rounds = 0
+        while tool_calls:
+            self._append_tool_round(messages, response["content"], tool_calls, structured_output)
+            rounds += 1
+            
+            # Get the response after tool use (we can't use response_format with tools)
+            follow_up = self._follow_up_kwargs(messages, rounds, max_tokens)
+            response = self._complete(deadline, "tool_round", **follow_up)
+            tool_calls = response.get("tool_calls") if "tools" in follow_up else None
+        final_response = response
+        
+        try:
+            if structured_output:
+                # Try to extract JSON from the response
+                content = final_response["content"]
+                result = self._parse_structured(content, deadline)
+            else:
+                result = {"content": final_response["content"]}
+                
+            return messages, result
+            
+        except (json.JSONDecodeError, ReasoningValidationError):
+            logger.warning("Failed to parse JSON response after tool use")
+            return messages, {"content": final_response["content"], "structured": False}
+            
+    def _follow_up_kwargs(
+        self,
+        messages: List[Dict[str, Any]],
+        rounds: int,
+        max_tokens: Optional[int],
+        temperature: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Return the completion parameters of the call following a tool round."""
+        kwargs: Dict[str, Any] = {"messages": messages, "max_tokens": max_tokens or self.profile.max_tokens}
+        if temperature is not None:
+            kwargs["temperature"] = temperature
+        if rounds < self.profile.max_tool_rounds:
+            kwargs["tools"] = AVAILABLE_TOOLS
+        return kwargs
+    
+    def _run_tool_calls(self, tool_calls: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Execute the tools requested by the model.
         
-        # Process each tool call
+        Args:
+            tool_calls: Tool call objects from the model response
+            
+        Returns:
+            Tool result messages
+        """
         tool_results = []
         for tool_call in tool_calls:
             function_name = tool_call.function.name
             function_args = json.loads(tool_call.function.arguments)
             
             tool_result = None
-            if function_name == "calculate":
-                tool_result = calculate(function_args["expression"])
+            with span(f"tool.{function_name}"):
+                if function_name == "calculate":
+                    options = {key: function_args[key] for key in ("mode", "precision") if key in function_args}
+                    tool_result = calculate(function_args["expression"], **options)
             
             if tool_result:
                 tool_results.append({
@@ -174,8 +424,36 @@ class ChainOfThoughtReasoner:
                     "name": function_name,
                     "content": json.dumps(tool_result)
                 })
+        return tool_results
+    
+    def _append_tool_round(
+        self,
+        messages: List[Dict[str, Any]],
+        content: Optional[str],
+        tool_calls: List[Any],
+        structured_output: bool
+    ) -> List[Dict[str, Any]]:
+        """
+        Run the requested tools and append the round to the message history.
+        
+        Args:
+            messages: The current message history (modified in place)
+            content: Content of the assistant message that requested the tools
+            tool_calls: Tool call objects from the model response
+            structured_output: Whether to remind the model to answer in JSON
+            
+        Returns:
+            The tool result messages
+        """
+        # Add the assistant's message with tool calls
+        messages.append({
+            "role": "assistant",
+            "content": content,
+            "tool_calls": [tool_call_to_dict(tool_call) for tool_call in tool_calls]
+        })
         
-        # Add tool results to messages
+        # Process each tool call and add the results to messages
+        tool_results = self._run_tool_calls(tool_calls)
         messages.extend(tool_results)
         
         # If we want structured output, add a reminder to format as JSON
@@ -184,32 +462,116 @@ class ChainOfThoughtReasoner:
                 "role": "user",
                 "content": "Now that you have the calculation result, please provide your final answer. Remember to format your response as JSON with reasoning_steps and final_answer."
             })
+        return tool_results
+    
+    def stream_query(
+        self,
+        query: str,
+        temperature: Optional[float] = None,
+        structured_output: bool = True,
+        deadline: Optional[Deadline] = None,
+        history: Optional[List[Dict[str, Any]]] = None,
+        max_tokens: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Process a query, yielding reasoning steps as soon as they are generated.
         
-        # Get final response after tool use
-        final_response = self.client.generate_completion(
-            messages=messages,
-            # We can't use response_format with tools
-            # response_format=REASONING_SCHEMA if structured_output else None
-        )
+        Args:
+            query: The user's question or problem
+            temperature: Temperature for generation (0.0 to 1.0; defaults to the profile's)
+            structured_output: Whether to return structured JSON output
+            deadline: Deadline after which no further upstream calls are made
+            history: Earlier conversation messages (see ReasoningSession)
+            max_tokens: Completion token limit (defaults to the profile's)
+            
+        Yields:
+            Events: {"type": "step", "index", "step"} for each completed step,
+            {"type": "delta", "content"} for unstructured text,
+            {"type": "tool_call", "name", "arguments"} and
+            {"type": "tool_result", "name", "result"} around tool use, and
+            finally {"type": "result", "result"} with the validated result
+        """
+        messages, kwargs = self._build_request(query, temperature, structured_output, history, max_tokens)
+        logger.info("Streaming query (%d chars)", len(query))
         
-        try:
-            if structured_output:
-                # Try to extract JSON from the response
-                content = final_response["content"]
-                result = self._extract_json_from_content(content)
-            else:
-                result = {"content": final_response["content"]}
-                
-            return messages, result
+        step_count = 0
+        rounds = 0
+        feature = "stream"
+        while True:
+            if deadline is not None:
+                deadline.check()
+                remaining = deadline.remaining()
+                if remaining is not None:
+                    kwargs["timeout"] = remaining
             
-        except json.JSONDecodeError:
-            logger.warning("Failed to parse JSON response after tool use")
-            return messages, {"content": final_response["content"], "structured": False}
+            parser = StepStreamParser()
+            parts = []
+            tool_calls = None
+            usage = None
+            # Spans cannot be held open across yields, so the stream is recorded when it ends
+            stream_start = time.time_ns()
+            first_token_ns = None
+            client = self._backend()
+            for chunk in client.stream_completion(**kwargs):
+                if first_token_ns is None:
+                    first_token_ns = time.time_ns()
+                if deadline is not None and deadline.expired:
+                    # Stop reading; closing the generator closes the upstream stream
+                    deadline.check()
+                if "tool_calls" in chunk:
+                    tool_calls = chunk["tool_calls"]
+                    continue
+                if "usage" in chunk:
+                    usage = chunk["usage"]
+                    continue
+                parts.append(chunk["content"])
+                if not structured_output:
+                    yield {"type": "delta", "content": chunk["content"]}
+                    continue
+                for step in parser.feed(chunk["content"]):
+                    yield {"type": "step", "index": step_count, "step": step}
+                    step_count += 1
+            content = "".join(parts)
+            add_span(
+                "llm.stream",
+                stream_start,
+                backend=type(client).__name__,
+                feature=feature,
+                messages=len(messages),
+                first_token_ms=((first_token_ns or time.time_ns()) - stream_start) / 1e6
+            )
+            record_usage(feature, str(getattr(client, "model", "")), usage)
+            
+            if not tool_calls or rounds >= self.profile.max_tool_rounds:
+                break
+            
+            for tool_call in tool_calls:
+                yield {"type": "tool_call", "name": tool_call.function.name, "arguments": tool_call.function.arguments}
+            for tool_result in self._append_tool_round(messages, content or None, tool_calls, structured_output):
+                yield {"type": "tool_result", "name": tool_result["name"], "result": json.loads(tool_result["content"])}
             
+            rounds += 1
+            # As in _handle_tool_calls, the last follow-up completion gets no tools
+            kwargs = self._follow_up_kwargs(messages, rounds, kwargs["max_tokens"], kwargs.get("temperature"))
+            feature = "tool_round"
+        
+        if not structured_output:
+            yield {"type": "result", "result": {"content": content}}
+            return
+        
+        try:
+            result = self._parse_structured(content, deadline)
+        except (json.JSONDecodeError, ReasoningValidationError):
+            logger.error("Failed to parse streamed JSON response")
+            result = {"content": content, "structured": False}
+        yield {"type": "result", "result": result}
+    
+    @traced("reasoner.unstructured")
     def generate_unstructured_reasoning(
         self,
         query: str,
-        temperature: float = 0.7
+        temperature: Optional[float] = None,
+        deadline: Optional[Deadline] = None
     ) -> str:
         """
         Generate unstructured chain of thought reasoning.
@@ -217,7 +579,8 @@ class ChainOfThoughtReasoner:
         
         Args:
             query: The user's question or problem
-            temperature: Temperature for generation (0.0 to 1.0)
+            temperature: Temperature for generation (0.0 to 1.0; defaults to the profile's)
+            deadline: Deadline after which no further upstream calls are made
             
         Returns:
             String containing the reasoning and answer
@@ -237,44 +600,73 @@ class ChainOfThoughtReasoner:
         ]
         
         # Generate completion without structured format
-        response = self.client.generate_completion(
+        response = self._complete(
+            deadline,
+            "fallback",
             messages=messages,
-            temperature=temperature
+            temperature=self.profile.temperature if temperature is None else temperature,
+            max_tokens=self.profile.max_tokens
         )
         
         return response["content"]
     
+    @traced("reasoner.process_query_with_fallback")
     def process_query_with_fallback(
         self,
         query: str,
-        temperature: float = 0.7
+        temperature: Optional[float] = None,
+        deadline: Optional[Deadline] = None,
+        speculation: Optional[str] = None,
+        speculation_delay: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Process a query with fallback to unstructured output if structured fails.
         
         Args:
             query: The user's question or problem
-            temperature: Temperature for generation (0.0 to 1.0)
+            temperature: Temperature for generation (0.0 to 1.0; defaults to the profile's)
+            deadline: Deadline after which no further upstream calls are made
+            speculation: When to start the fallback: "off" (after the
+                structured attempt fails), "parallel" (at once) or "delayed"
+                (after speculation_delay); defaults to the fallback_speculation setting
+            speculation_delay: Seconds before a "delayed" fallback starts
+                (defaults to the fallback_speculation_delay setting)
             
         Returns:
             Dictionary containing the response
+            
+        Raises:
+            ValueError: If the speculation mode is unknown
         """
+        settings = get_settings()
+        mode = speculation or settings.fallback_speculation
+        if mode not in SPECULATION_MODES:
+            raise ValueError(f"Unknown speculation mode {mode!r} (expected one of {', '.join(SPECULATION_MODES)})")
+        if mode != "off":
+            if mode == "parallel":
+                delay = 0.0
+            else:
+                delay = settings.fallback_speculation_delay if speculation_delay is None else speculation_delay
+            return self._speculative_fallback(query, temperature, deadline, delay)
+        
         try:
             # First try with structured output
             result = self.process_query(
                 query=query,
                 temperature=temperature,
-                structured_output=True
+                structured_output=True,
+                deadline=deadline
             )
             
             # Check if we got an error
             if "error" in result:
-                logger.warning(f"Structured output failed: {result['error']}. Falling back to unstructured output.")
+                logger.warning("Structured output failed: %s. Falling back to unstructured output.", result['error'])
                 
                 # Fall back to unstructured output
                 content = self.generate_unstructured_reasoning(
                     query=query,
-                    temperature=temperature
+                    temperature=temperature,
+                    deadline=deadline
                 )
                 
                 return {"content": content, "structured": False}
@@ -286,18 +678,128 @@ class ChainOfThoughtReasoner:
                 
             return {**result, "structured": True}
             
+        except DeadlineExceeded:
+            # No point in falling back once the request has run out of time
+            raise
+            
         except Exception as e:
-            logger.error(f"Error in structured processing: {str(e)}. Falling back to unstructured output.")
+            logger.error("Error in structured processing: %s. Falling back to unstructured output.", e)
             
             try:
                 # Fall back to unstructured output
                 content = self.generate_unstructured_reasoning(
                     query=query,
-                    temperature=temperature
+                    temperature=temperature,
+                    deadline=deadline
                 )
                 
                 return {"content": content, "structured": False}
                 
+            except DeadlineExceeded:
+                raise
+                
             except Exception as fallback_error:
-                logger.error(f"Fallback also failed: {str(fallback_error)}")
+                logger.error("Fallback also failed: %s", fallback_error)
                 return {"error": f"Both structured and unstructured processing failed: {str(fallback_error)}"}
+    
+    def _speculative_fallback(
+        self,
+        query: str,
+        temperature: Optional[float],
+        deadline: Optional[Deadline],
+        delay: float
+    ) -> Dict[str, Any]:
+        """
+        Run the structured attempt with the unstructured fallback started speculatively.
+        
+        The fallback starts after delay seconds unless the structured attempt
+        has finished by then. A usable structured result is always preferred.
+        The attempt not used is cancelled, which stops it before its next
+        upstream call; a completion already in flight runs to its end in the
+        background. Failure latency is bounded by max(structured, delay +
+        unstructured) instead of their sum.
+        
+        Args:
+            query: The user's question or problem
+            temperature: Temperature for generation (0.0 to 1.0; defaults to the profile's)
+            deadline: Deadline after which no further upstream calls are made
+            delay: Seconds before the fallback starts
+            
+        Returns:
+            Dictionary containing the response
+        """
+        parent = deadline or Deadline()
+        fallback_deadline = parent.child()
+        pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="speculation")
+        
+        def submit(func, **kwargs):
+            # Each attempt runs in a copy of this context so tracing and usage metering follow it
+            return pool.submit(contextvars.copy_context().run, func, **kwargs)
+        
+        def start_fallback():
+            return submit(self.generate_unstructured_reasoning, query=query, temperature=temperature, deadline=fallback_deadline)
+        
+        try:
+            structured = submit(
+                self.process_query,
+                query=query,
+                temperature=temperature,
+                structured_output=True,
+                deadline=parent.child()
+            )
+            wait([structured], timeout=delay)
+            speculated = not structured.done()
+            fallback = start_fallback() if speculated else None
+            
+            try:
+                result = structured.result()
+                error = result.get("error")
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                result, error = None, str(e)
+            
+            if error is None:
+                fallback_deadline.cancel()
+                self._record_speculation(speculated, used_fallback=False)
+                if result.get("structured") is False:
+                    logger.warning("Failed to get structured output. Using the unstructured response.")
+                    return result
+                return {**result, "structured": True}
+            
+            logger.warning("Structured output failed: %s. Falling back to unstructured output.", error)
+            if fallback is None:
+                fallback = start_fallback()
+            self._record_speculation(speculated, used_fallback=True)
+            try:
+                return {"content": fallback.result(), "structured": False}
+            except DeadlineExceeded:
+                raise
+            except Exception as fallback_error:
+                logger.error("Fallback also failed: %s", fallback_error)
+                return {"error": f"Both structured and unstructured processing failed: {str(fallback_error)}"}
+        finally:
+            pool.shutdown(wait=False)
+    
+    def _record_speculation(self, speculated: bool, used_fallback: bool) -> None:
+        with self._speculation_lock:
+            stats = self._speculation
+            stats["requests"] += 1
+            stats["speculated"] += speculated
+            stats["fallback_used" if used_fallback else "structured_used"] += 1
+            if speculated:
+                stats["paid_off" if used_fallback else "wasted"] += 1
+    
+    def speculation_stats(self) -> Dict[str, Any]:
+        """
+        Return counters of speculative fallback.
+        
+        Returns:
+            Requests, how many started the fallback early ("speculated"), how
+            many of those needed it ("paid_off") or not ("wasted"), and the
+            payoff rate
+        """
+        with self._speculation_lock:
+            stats = dict(self._speculation)
+        stats["payoff_rate"] = stats["paid_off"] / stats["speculated"] if stats["speculated"] else 0.0
+        return stats
@@ -38,6 +38,18 @@ CALCULATOR_TOOL = {
                 "expression": {
                     "type": "string",
                     "description": "The mathematical expression to evaluate"
+                },
+                "mode": {
+                    "type": "string",
+                    "enum": ["float", "exact", "decimal"],
+                    "description": (
+                        "Arithmetic to use: 'exact' (rational numbers) or 'decimal' for money, "
+                        "interest and anything that must not suffer float rounding"
+                    )
+                },
+                "precision": {
+                    "type": "integer",
+                    "description": "Significant digits for decimal mode and for irrational results"
                 }
             },
             "required": ["expression"]
@@ -0,0 +1,147 @@
+"""
+This module keeps the conversation state of a multi-turn reasoning session.
+"""
+
+import re
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+from src.cot.reasoning import ChainOfThoughtReasoner
+from src.utils.deadline import Deadline
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def _first_sentence(text: str, limit: int) -> str:
+    """Return the first sentence of text, cut to at most limit characters."""
+    text = " ".join(text.split())
+    match = _SENTENCE_END.search(text)
+    if match:
+        text = text[:match.start()]
+    if len(text) > limit:
+        text = text[:limit - 3].rstrip() + "..."
+    return text
+
+
+def answer_text(result: Dict[str, Any]) -> str:
+    """
+    Return the text of a result that is worth keeping in the conversation.
+
+    Only the final answer of a structured result is kept; its reasoning steps
+    are not needed to answer follow-up questions and would dominate the prompt.
+    """
+    return result.get("final_answer") or result.get("content") or ""
+
+
+class ReasoningSession:
+    """
+    Conversation state for a multi-turn reasoning session.
+
+    The most recent turns are sent back verbatim (question and final answer
+    only). Older turns are folded into a short extractive summary whose size
+    is bounded, so the prompt for a follow-up question stays small however
+    long the session runs.
+    """
+
+    def __init__(
+        self,
+        reasoner: Union[ChainOfThoughtReasoner, Callable[[], ChainOfThoughtReasoner]],
+        max_turns: int = 4,
+        max_answer_chars: int = 1500,
+        max_summary_chars: int = 1500
+    ):
+        """
+        Initialize the session.
+
+        Args:
+            reasoner: Reasoner used for every turn (and its client connection),
+                or a function returning it, called when a turn first needs it
+            max_turns: Number of recent turns kept verbatim
+            max_answer_chars: Answers longer than this are truncated in the history
+            max_summary_chars: Upper bound on the size of the summary of older turns
+        """
+        self._reasoner = reasoner
+        self.max_turns = max_turns
+        self.max_answer_chars = max_answer_chars
+        self.max_summary_chars = max_summary_chars
+        self.turns: Deque[Tuple[str, str]] = deque()
+        self.summary: Deque[str] = deque()
+        self.turn_count = 0
+
+    @property
+    def reasoner(self) -> ChainOfThoughtReasoner:
+        """The session's reasoner, created on first use if a factory was given."""
+        if not isinstance(self._reasoner, ChainOfThoughtReasoner):
+            self._reasoner = self._reasoner()
+        return self._reasoner
+
+    def history(self) -> List[Dict[str, str]]:
+        """
+        Build the history messages for the next query.
+
+        Returns:
+            Messages to place between the system prompt and the next query
+        """
+        messages = []
+        if self.summary:
+            messages.append({
+                "role": "system",
+                "content": "Summary of the earlier conversation:\n" + "\n".join(self.summary)
+            })
+        for query, answer in self.turns:
+            messages.append({"role": "user", "content": query})
+            messages.append({"role": "assistant", "content": answer})
+        return messages
+
+    def record(self, query: str, result: Dict[str, Any]) -> None:
+        """
+        Add a completed turn to the conversation.
+
+        Args:
+            query: The user's question
+            result: The reasoning result for the question
+        """
+        answer = answer_text(result)
+        if len(answer) > self.max_answer_chars:
+            answer = answer[:self.max_answer_chars] + "..."
+        self.turns.append((query, answer))
+        self.turn_count += 1
+
+        while len(self.turns) > self.max_turns:
+            old_query, old_answer = self.turns.popleft()
+            self.summary.append(f"- Q: {_first_sentence(old_query, 200)} A: {_first_sentence(old_answer, 300)}")
+
+        # Drop the oldest summary lines once the summary is over budget
+        while len(self.summary) > 1 and sum(len(line) + 1 for line in self.summary) > self.max_summary_chars:
+            self.summary.popleft()
+
+    def stream(
+        self,
+        query: str,
+        temperature: Optional[float] = None,
+        structured_output: bool = True,
+        deadline: Optional[Deadline] = None,
+        max_tokens: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Answer a question in the context of the conversation.
+
+        Yields the same events as ChainOfThoughtReasoner.stream_query. The turn
+        is recorded once its result has been produced; failed or cancelled
+        turns leave the conversation unchanged.
+        """
+        for event in self.reasoner.stream_query(
+            query,
+            temperature=temperature,
+            structured_output=structured_output,
+            deadline=deadline,
+            history=self.history(),
+            max_tokens=max_tokens
+        ):
+            if event["type"] == "result" and not event["result"].get("error"):
+                self.record(query, event["result"])
+            yield event
+        logger.debug("Session has %d turns, %d kept verbatim", self.turn_count, len(self.turns))
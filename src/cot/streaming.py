@@ -0,0 +1,89 @@
+"""
+This module extracts reasoning steps from a partially streamed JSON response.
+"""
+
+import json
+from typing import Any, Dict, List
+
+
+class StepStreamParser:
+    """
+    Incrementally extracts complete step objects from a streamed response.
+
+    Text is fed as it arrives. Once the ``"reasoning_steps"`` array has been
+    seen, each step object is returned as soon as its closing brace arrives,
+    long before the whole JSON document is complete. Every character is
+    scanned once, so feeding is linear in the size of the response.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self._pos = 0
+        self._in_array = False
+        self._done = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._start = -1
+        self.steps: List[Dict[str, Any]] = []
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Add streamed text.
+
+        Args:
+            text: The next chunk of the model's response
+
+        Returns:
+            Step objects completed by this chunk
+        """
+        self.buffer += text
+        if self._done:
+            return []
+
+        if not self._in_array:
+            key = self.buffer.find('"reasoning_steps"', max(0, self._pos - len('"reasoning_steps"')))
+            if key == -1:
+                self._pos = len(self.buffer)
+                return []
+            bracket = self.buffer.find("[", key)
+            if bracket == -1:
+                self._pos = key
+                return []
+            self._in_array = True
+            self._pos = bracket + 1
+
+        completed = []
+        buffer = self.buffer
+        for index in range(self._pos, len(buffer)):
+            char = buffer[index]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if self._depth == 0:
+                    self._start = index
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == 0:
+                    # End of the reasoning_steps array
+                    self._done = True
+                    break
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        step = json.loads(buffer[self._start:index + 1])
+                    except json.JSONDecodeError:
+                        step = None
+                    if isinstance(step, dict):
+                        completed.append(step)
+        self._pos = len(buffer)
+
+        self.steps.extend(completed)
+        return completed
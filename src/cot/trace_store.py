@@ -0,0 +1,423 @@
+"""
+Compact storage of reasoning results for caches and result logs.
+
+Reasoning results repeat themselves: the same step titles ("Understand the
+problem", "Verify the answer"), the same phrasing taken from the system
+prompts and the same JSON keys. ``TraceCodec`` stores a result as compact
+JSON in which step titles found in its title table are replaced by their
+index, compressed with a preset dictionary of phrases common in past
+results. It uses zstd when the optional ``zstandard`` package is installed
+and zlib otherwise; both use the dictionary, so small records compress
+well on their own.
+
+An untrained codec uses the system prompts as its dictionary. Train one on
+past results (``TraceCodec.train``, or scripts/train_trace_codec.py) and
+set TRACE_CODEC_PATH to use it. Every encoded record names the method and
+the dictionary it was written with, so a record is never decoded with the
+wrong dictionary.
+
+``TraceLog`` appends encoded records to a file (TRACE_LOG_PATH) from a
+background thread.
+"""
+
+import base64
+import json
+import queue
+import re
+import struct
+import threading
+import zlib
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from src.config import TRACE_CODEC_PATH, TRACE_LOG_PATH
+from src.cot.prompts import JSON_REPAIR_PROMPT, SYSTEM_PROMPTS
+from src.utils.logger import get_logger
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional; records are compressed with zlib without it
+    zstandard = None
+
+logger = get_logger(__name__)
+
+MAGIC = b"CT"
+FORMAT_VERSION = 1
+# Compression methods, as stored in the record header
+RAW, ZLIB, ZSTD = b"j", b"z", b"s"
+_HEADER = struct.Struct(">2sBcI")  # magic, version, method, dictionary id
+_LENGTH = struct.Struct(">I")
+
+# zlib can only refer back 32 KiB, so larger dictionaries do not help it
+ZLIB_DICT_SIZE = 32 * 1024
+# Dictionary candidates when training: the sentences of past results
+_PHRASE = re.compile(r"[^.!?\n]+[.!?]?")
+
+
+class TraceCodecError(Exception):
+    """Raised when a record cannot be decoded."""
+
+
+def _seed_dictionary() -> bytes:
+    """Dictionary of an untrained codec: the system prompts and the shape of a result."""
+    skeleton = '{"reasoning_steps":[{"title":"","content":"","next_action":"continue"},'\
+        '{"title":"","content":"","next_action":"final_answer"}],"final_answer":"'
+    text = "\n".join(list(SYSTEM_PROMPTS.values()) + [JSON_REPAIR_PROMPT, skeleton])
+    return text.encode("utf-8")
+
+
+class TraceCodec:
+    """Encodes reasoning results (and records holding them) to compressed bytes."""
+
+    def __init__(
+        self,
+        titles: Optional[List[str]] = None,
+        dictionary: Optional[bytes] = None,
+        zstd_dictionary: Optional[bytes] = None,
+        method: Optional[bytes] = None,
+        level: Optional[int] = None
+    ):
+        """
+        Initialize the codec.
+
+        Args:
+            titles: Step titles stored as indexes into this list
+            dictionary: Raw dictionary of common phrases (defaults to the system prompts)
+            zstd_dictionary: Trained zstd dictionary used instead of the raw one with zstd
+            method: ZSTD, ZLIB or RAW (defaults to zstd if zstandard is installed, else zlib)
+            level: Compression level (defaults to 3 for zstd and 6 for zlib)
+        """
+        self.titles = list(titles or [])
+        self._title_index = {title: i for i, title in enumerate(self.titles)}
+        self.dictionary = (dictionary if dictionary is not None else _seed_dictionary())[-ZLIB_DICT_SIZE:]
+        self.zstd_dictionary = zstd_dictionary
+        if method is None:
+            method = ZSTD if zstandard is not None else ZLIB
+        if method == ZSTD and zstandard is None:
+            raise ValueError("zstd compression needs the zstandard package")
+        if method not in (RAW, ZLIB, ZSTD):
+            raise ValueError(f"Unknown compression method {method!r}")
+        self.method = method
+        self.level = level if level is not None else (3 if method == ZSTD else 6)
+        material = json.dumps(self.titles).encode("utf-8") + self.dictionary + (zstd_dictionary or b"")
+        self.dictionary_id = zlib.crc32(material)
+        self._zstd = None
+
+    def _zstd_codecs(self):
+        # Compressors are not thread-safe, so each thread gets its own
+        if self._zstd is None:
+            self._zstd = threading.local()
+        local = self._zstd
+        if not hasattr(local, "compressor"):
+            if self.zstd_dictionary:
+                data = zstandard.ZstdCompressionDict(self.zstd_dictionary)
+            else:
+                data = zstandard.ZstdCompressionDict(self.dictionary, dict_type=zstandard.DICT_TYPE_RAWCONTENT)
+            local.compressor = zstandard.ZstdCompressor(level=self.level, dict_data=data, write_content_size=True)
+            local.decompressor = zstandard.ZstdDecompressor(dict_data=data)
+        return local.compressor, local.decompressor
+
+    def _intern(self, value: Any) -> Any:
+        if not isinstance(value, dict):
+            return value
+        interned = {key: self._intern(item) for key, item in value.items()}
+        steps = value.get("reasoning_steps")
+        if isinstance(steps, list):
+            interned["reasoning_steps"] = [
+                dict(step, title=self._title_index.get(step["title"], step["title"]))
+                if isinstance(step, dict) and isinstance(step.get("title"), str) else step
+                for step in steps
+            ]
+        return interned
+
+    def _restore(self, value: Any) -> Any:
+        if not isinstance(value, dict):
+            return value
+        restored = {key: self._restore(item) for key, item in value.items()}
+        steps = value.get("reasoning_steps")
+        if isinstance(steps, list):
+            try:
+                restored["reasoning_steps"] = [
+                    dict(step, title=self.titles[step["title"]])
+                    if isinstance(step, dict) and isinstance(step.get("title"), int) else step
+                    for step in steps
+                ]
+            except IndexError:
+                raise TraceCodecError("Record refers to a step title the codec does not have")
+        return restored
+
+    def encode(self, value: Dict[str, Any]) -> bytes:
+        """
+        Encode a result, or a record holding results.
+
+        Args:
+            value: JSON-serializable dictionary; the step titles of every
+                "reasoning_steps" list in it (or in dictionaries it holds) are interned
+
+        Returns:
+            The encoded record
+        """
+        body = json.dumps(self._intern(value), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        if self.method == ZSTD:
+            body = self._zstd_codecs()[0].compress(body)
+        elif self.method == ZLIB:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15, zdict=self.dictionary)
+            body = compressor.compress(body) + compressor.flush()
+        return _HEADER.pack(MAGIC, FORMAT_VERSION, self.method, self.dictionary_id) + body
+
+    def decode(self, data: bytes) -> Dict[str, Any]:
+        """
+        Decode a record written by this codec (or one with the same dictionary and titles).
+
+        Raises:
+            TraceCodecError: If the record is corrupt or was written with another dictionary
+        """
+        if len(data) < _HEADER.size:
+            raise TraceCodecError("Record is truncated")
+        magic, version, method, dictionary_id = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise TraceCodecError("Not a trace record")
+        if dictionary_id != self.dictionary_id:
+            raise TraceCodecError(f"Record was written with dictionary {dictionary_id:08x}, not {self.dictionary_id:08x}")
+        body = data[_HEADER.size:]
+        try:
+            if method == ZSTD:
+                if zstandard is None:
+                    raise TraceCodecError("Record is compressed with zstd; install zstandard to read it")
+                body = self._zstd_codecs()[1].decompress(body)
+            elif method == ZLIB:
+                decompressor = zlib.decompressobj(-15, zdict=self.dictionary)
+                body = decompressor.decompress(body) + decompressor.flush()
+            elif method != RAW:
+                raise TraceCodecError(f"Unknown compression method {method!r}")
+            return self._restore(json.loads(body))
+        except TraceCodecError:
+            raise
+        except Exception as e:
+            raise TraceCodecError(f"Corrupt trace record: {e}")
+
+    @classmethod
+    def train(
+        cls,
+        samples: Iterable[Dict[str, Any]],
+        dict_size: int = 16 * 1024,
+        max_titles: int = 4096,
+        method: Optional[bytes] = None,
+        level: Optional[int] = None
+    ) -> "TraceCodec":
+        """
+        Build a codec from past results.
+
+        Step titles seen more than once become the title table. The raw
+        dictionary holds the phrases that recur across samples, the most
+        frequent last (where zlib reaches them most cheaply); with zstandard
+        installed a zstd dictionary is trained as well when there are enough
+        samples.
+
+        Args:
+            samples: Past results, or records holding them
+            dict_size: Size of the dictionaries in bytes
+            max_titles: Largest number of interned titles
+            method: Compression method (see __init__)
+            level: Compression level (see __init__)
+
+        Returns:
+            The trained codec
+        """
+        samples = list(samples)
+        titles: Counter = Counter()
+        for sample in samples:
+            _count_titles(sample, titles)
+        table = [title for title, count in titles.most_common(max_titles) if count > 1]
+
+        untrained = cls(titles=table, method=RAW)
+        encoded = [untrained.encode(sample)[_HEADER.size:] for sample in samples]
+
+        phrases: Counter = Counter()
+        for body in encoded:
+            phrases.update(set(match.group() for match in _PHRASE.finditer(body.decode("utf-8"))))
+        ranked = sorted(
+            (phrase for phrase, count in phrases.items() if count > 1 and len(phrase) > 8),
+            key=lambda phrase: (phrases[phrase] - 1) * len(phrase),
+            reverse=True
+        )
+        chosen: List[bytes] = []
+        size = 0
+        for phrase in ranked:
+            data = phrase.encode("utf-8")
+            if size + len(data) > min(dict_size, ZLIB_DICT_SIZE):
+                continue
+            chosen.append(data)
+            size += len(data)
+        # Fill the rest with the seed dictionary, ahead of the phrases
+        seed = _seed_dictionary()
+        remaining = min(dict_size, ZLIB_DICT_SIZE) - size
+        dictionary = (seed[len(seed) - remaining:] if remaining > 0 else b"") + b"".join(reversed(chosen))
+
+        zstd_dictionary = None
+        if zstandard is not None and len(encoded) >= 8:
+            try:
+                zstd_dictionary = zstandard.train_dictionary(dict_size, encoded).as_bytes()
+            except zstandard.ZstdError as e:
+                logger.info("Not training a zstd dictionary (%s); using the raw dictionary", e)
+        return cls(titles=table, dictionary=dictionary, zstd_dictionary=zstd_dictionary, method=method, level=level)
+
+    def save(self, path: str) -> None:
+        """Write the codec's titles and dictionaries to a JSON file."""
+        data = {
+            "version": FORMAT_VERSION,
+            "dictionary_id": f"{self.dictionary_id:08x}",
+            "titles": self.titles,
+            "dictionary": base64.b64encode(self.dictionary).decode("ascii"),
+            "zstd_dictionary": base64.b64encode(self.zstd_dictionary).decode("ascii") if self.zstd_dictionary else None,
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str, method: Optional[bytes] = None, level: Optional[int] = None) -> "TraceCodec":
+        """Read a codec written by ``save``."""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        zstd_dictionary = data.get("zstd_dictionary")
+        return cls(
+            titles=data["titles"],
+            dictionary=base64.b64decode(data["dictionary"]),
+            zstd_dictionary=base64.b64decode(zstd_dictionary) if zstd_dictionary else None,
+            method=method,
+            level=level
+        )
+
+
+def _count_titles(value: Any, titles: Counter) -> None:
+    if not isinstance(value, dict):
+        return
+    steps = value.get("reasoning_steps")
+    if isinstance(steps, list):
+        titles.update(step["title"] for step in steps if isinstance(step, dict) and isinstance(step.get("title"), str))
+    for key, item in value.items():
+        if key != "reasoning_steps":
+            _count_titles(item, titles)
+
+
+@lru_cache(maxsize=None)
+def get_codec() -> TraceCodec:
+    """Return the codec loaded from TRACE_CODEC_PATH, or an untrained one."""
+    if TRACE_CODEC_PATH:
+        try:
+            return TraceCodec.load(TRACE_CODEC_PATH)
+        except (OSError, ValueError, KeyError) as e:
+            logger.error("Could not load trace codec %s: %s; using the untrained codec", TRACE_CODEC_PATH, e)
+    return TraceCodec()
+
+
+def read_records(path: str, codec: Optional[TraceCodec] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Read the records of a trace log.
+
+    Raises:
+        TraceCodecError: If a record cannot be decoded with the codec
+    """
+    codec = codec or get_codec()
+    with open(path, "rb") as f:
+        while True:
+            prefix = f.read(_LENGTH.size)
+            if len(prefix) < _LENGTH.size:
+                return
+            (length,) = _LENGTH.unpack(prefix)
+            data = f.read(length)
+            if len(data) < length:
+                logger.warning("Ignoring a truncated record at the end of %s", path)
+                return
+            yield codec.decode(data)
+
+
+def read_results(path: str, codec: Optional[TraceCodec] = None) -> List[Dict[str, Any]]:
+    """
+    Read past results from an answer index (.json), a JSON lines file (.jsonl) or a trace log.
+
+    Returns:
+        The records (answer index entries and trace log records hold the result under "result")
+    """
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return list(data.get("entries", {}).values()) if isinstance(data, dict) else list(data)
+    if path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    return list(read_records(path, codec))
+
+
+class TraceLog:
+    """Appends encoded records to a file from a background thread."""
+
+    def __init__(self, path: str, codec: Optional[TraceCodec] = None, max_pending: int = 10000):
+        """
+        Initialize the log.
+
+        Args:
+            path: File to append to; each record is a 4-byte length and the encoded record
+            codec: Codec to encode records with (defaults to get_codec())
+            max_pending: Records waiting to be written before new ones are dropped
+        """
+        self.path = path
+        self.codec = codec or get_codec()
+        self.dropped = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Queue a record to be written; never blocks."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-log", daemon=True)
+                self._thread.start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Wait until the records appended so far have been written."""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            while not self._queue.empty() and len(batch) < 256:
+                batch.append(self._queue.get_nowait())
+            data = []
+            events = []
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    events.append(item)
+                    continue
+                # A bad record is dropped; nothing may stop the writer thread
+                try:
+                    encoded = self.codec.encode(item)
+                except Exception as e:
+                    logger.warning("Could not encode trace record: %s", e)
+                    continue
+                data.append(_LENGTH.pack(len(encoded)) + encoded)
+            try:
+                if data:
+                    with open(self.path, "ab") as f:
+                        f.write(b"".join(data))
+            except Exception as e:
+                logger.warning("Could not write to trace log %s: %s", self.path, e)
+            for event in events:
+                event.set()
+
+
+@lru_cache(maxsize=None)
+def get_trace_log() -> Optional[TraceLog]:
+    """Return the log at TRACE_LOG_PATH, or None if no path is set."""
+    return TraceLog(TRACE_LOG_PATH) if TRACE_LOG_PATH else None
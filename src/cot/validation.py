@@ -0,0 +1,180 @@
+"""
+This module validates reasoning results against REASONING_SCHEMA and repairs them locally.
+
+The validator is derived once from the schema at import time and only does
+dictionary lookups and type checks, so it costs microseconds per result.
+Deterministic repairs fix the common ways model output deviates from the
+schema without another round trip to the model.
+"""
+
+import json
+from typing import Any, Dict, List, Tuple
+
+from src.cot.schemas import REASONING_SCHEMA
+
+
+class ReasoningValidationError(ValueError):
+    """Raised when a result cannot be repaired into a valid reasoning result."""
+
+    def __init__(self, errors: List[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+def _compile_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    root = schema["schema"]
+    step_schema = root["properties"]["reasoning_steps"]["items"]
+    return {
+        "required": tuple(root["required"]),
+        "step_required": tuple(step_schema["required"]),
+        "step_strings": tuple(
+            name for name, prop in step_schema["properties"].items()
+            if prop.get("type") == "string" and "enum" not in prop
+        ),
+        "next_actions": frozenset(step_schema["properties"]["next_action"]["enum"]),
+    }
+
+
+_COMPILED = _compile_schema(REASONING_SCHEMA)
+
+# Keys models commonly use instead of the schema's names
+_KEY_ALIASES = {
+    "steps": "reasoning_steps",
+    "reasoning": "reasoning_steps",
+    "reasoningSteps": "reasoning_steps",
+    "answer": "final_answer",
+    "finalAnswer": "final_answer",
+    "final": "final_answer",
+}
+
+_FINAL_ACTIONS = {"final_answer", "final", "finalanswer", "answer", "done", "finish", "finished", "stop", "end", "conclude"}
+
+
+def validate_reasoning(data: Any) -> List[str]:
+    """
+    Validate a parsed result against the reasoning schema.
+
+    Args:
+        data: Parsed JSON from the model
+
+    Returns:
+        List of validation errors (empty if the result is valid)
+    """
+    if not isinstance(data, dict):
+        return ["result is not a JSON object"]
+
+    errors = [f"missing '{key}'" for key in _COMPILED["required"] if key not in data]
+
+    steps = data.get("reasoning_steps")
+    if steps is not None and not isinstance(steps, list):
+        errors.append("'reasoning_steps' is not an array")
+    elif steps:
+        for index, step in enumerate(steps):
+            if not isinstance(step, dict):
+                errors.append(f"step {index} is not an object")
+                continue
+            for key in _COMPILED["step_required"]:
+                if key not in step:
+                    errors.append(f"step {index} is missing '{key}'")
+            for key in _COMPILED["step_strings"]:
+                if key in step and not isinstance(step[key], str):
+                    errors.append(f"step {index} '{key}' is not a string")
+            if "next_action" in step and step["next_action"] not in _COMPILED["next_actions"]:
+                errors.append(f"step {index} has invalid next_action {step['next_action']!r}")
+
+    if "final_answer" in data and not isinstance(data["final_answer"], str):
+        errors.append("'final_answer' is not a string")
+
+    return errors
+
+
+def _as_text(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _coerce_next_action(value: Any) -> str:
+    if isinstance(value, str):
+        normalized = value.strip().lower().replace(" ", "_").replace("-", "_")
+        if normalized in _COMPILED["next_actions"]:
+            return normalized
+        if normalized.replace("_", "") in _FINAL_ACTIONS or normalized in _FINAL_ACTIONS:
+            return "final_answer"
+    return "continue"
+
+
+def repair_reasoning(data: Any) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Repair a parsed result so that it satisfies the reasoning schema.
+
+    Repairs are deterministic: aliased keys are renamed, malformed steps are
+    dropped, non-string fields are stringified, next_action values are
+    coerced onto the enum (the last step always ends with final_answer) and
+    a missing final_answer is synthesized from the last step.
+
+    Args:
+        data: Parsed JSON from the model
+
+    Returns:
+        Tuple of (repaired result, list of repairs applied)
+
+    Raises:
+        ReasoningValidationError: If nothing usable can be recovered
+    """
+    if not validate_reasoning(data):
+        return data, []
+
+    repairs = []
+    if isinstance(data, list):
+        data = {"reasoning_steps": data}
+        repairs.append("wrapped bare step list")
+    if not isinstance(data, dict):
+        raise ReasoningValidationError(["result is not a JSON object"])
+
+    result = dict(data)
+    for alias, key in _KEY_ALIASES.items():
+        if alias in result and key not in result:
+            result[key] = result.pop(alias)
+            repairs.append(f"renamed '{alias}' to '{key}'")
+
+    raw_steps = result.get("reasoning_steps")
+    if raw_steps is None:
+        raw_steps = []
+    elif not isinstance(raw_steps, list):
+        raw_steps = [raw_steps]
+        repairs.append("wrapped 'reasoning_steps' in an array")
+
+    steps = []
+    for index, step in enumerate(raw_steps):
+        if not isinstance(step, dict) or step.get("content") in (None, ""):
+            repairs.append(f"dropped malformed step {index}")
+            continue
+        title = step.get("title")
+        repaired = {
+            **step,
+            "title": _as_text(title) if title not in (None, "") else f"Step {len(steps) + 1}",
+            "content": _as_text(step["content"]),
+            "next_action": _coerce_next_action(step.get("next_action")),
+        }
+        if repaired["next_action"] != step.get("next_action") or repaired["title"] != title:
+            repairs.append(f"normalized step {index}")
+        steps.append(repaired)
+
+    final_answer = result.get("final_answer")
+    if final_answer in (None, ""):
+        if not steps:
+            raise ReasoningValidationError(["no reasoning steps and no final answer"])
+        final_answer = steps[-1]["content"]
+        repairs.append("synthesized final_answer from last step")
+    elif not isinstance(final_answer, str):
+        final_answer = _as_text(final_answer)
+        repairs.append("stringified final_answer")
+
+    if steps and steps[-1]["next_action"] != "final_answer":
+        steps[-1]["next_action"] = "final_answer"
+        repairs.append("marked last step as final_answer")
+
+    result["reasoning_steps"] = steps
+    result["final_answer"] = final_answer
+    return result, repairs
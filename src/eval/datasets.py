@@ -0,0 +1,94 @@
+"""
+Evaluation datasets.
+
+Datasets are JSONL files with one item per line:
+
+    {"id": "apples", "question": "...", "answer": "6"}
+
+GSM8K-style answers, where the worked solution ends with ``#### <answer>``,
+are accepted as is. Items whose answer is a number are scored numerically
+unless ``"kind": "exact"`` is given; ``"tolerance"`` sets the absolute
+tolerance for numeric items.
+"""
+
+import json
+import os
+import re
+from typing import List, NamedTuple, Optional
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data", "eval"))
+
+_NUMBER = re.compile(r"^-?\d+(?:\.\d+)?$")
+
+
+class EvalItem(NamedTuple):
+    """One question with its reference answer."""
+
+    id: str
+    question: str
+    answer: str
+    kind: str = "exact"  # "exact" or "numeric"
+    tolerance: float = 1e-6
+
+
+def reference_answer(answer: str) -> str:
+    """Return the final answer from a reference, stripping a GSM8K-style solution."""
+    if "####" in answer:
+        answer = answer.rsplit("####", 1)[1]
+    return answer.strip()
+
+
+def parse_item(data: dict, default_id: str) -> EvalItem:
+    """
+    Build an item from a dataset record.
+
+    Args:
+        data: Record with "question" and "answer" (and optional "id", "kind", "tolerance")
+        default_id: Id used when the record has none
+
+    Returns:
+        The item
+    """
+    answer = reference_answer(str(data["answer"]))
+    normalized = answer.replace(",", "").lstrip("$")
+    kind = data.get("kind") or ("numeric" if _NUMBER.match(normalized) else "exact")
+    return EvalItem(
+        id=str(data.get("id", default_id)),
+        question=data["question"],
+        answer=normalized if kind == "numeric" else answer,
+        kind=kind,
+        tolerance=float(data.get("tolerance", 1e-6)),
+    )
+
+
+def load_dataset(path: str, limit: Optional[int] = None) -> List[EvalItem]:
+    """
+    Load a JSONL dataset.
+
+    Args:
+        path: Path to the file, or the name of a bundled dataset in data/eval
+        limit: Only load the first limit items
+
+    Returns:
+        The items
+
+    Raises:
+        ValueError: If a line is not a valid record
+    """
+    if not os.path.isfile(path):
+        bundled = os.path.join(DATA_DIR, path if path.endswith(".jsonl") else path + ".jsonl")
+        if os.path.isfile(bundled):
+            path = bundled
+
+    items = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                items.append(parse_item(json.loads(line), default_id=str(line_number)))
+            except (json.JSONDecodeError, KeyError) as e:
+                raise ValueError(f"{path}:{line_number}: invalid dataset record: {e}")
+            if limit is not None and len(items) >= limit:
+                break
+    return items
@@ -0,0 +1,330 @@
+"""
+Open-loop load tests of the web API with SLO checks.
+
+A scenario sends requests at a fixed average rate with Poisson arrivals
+(exponentially distributed gaps), whether or not earlier requests have
+finished, so a slow server faces a growing backlog as it would in
+production. Latency is measured from the moment a request was due to be
+sent, so delays in the load generator count against the server rather
+than hiding its slowness (coordinated omission).
+
+Scenarios are read from data/load/scenarios.json or any file of the same
+form:
+
+    {"steady": {
+        "rate": 20, "duration": 30,
+        "mix": {"structured": 0.6, "unstructured": 0.1, "tools": 0.2, "stream": 0.1},
+        "query_chars": {"median": 120, "sigma": 0.8, "max": 2000},
+        "slo": {"p50_ms": 50, "p99_ms": 500, "max_error_rate": 0.01, "min_throughput_ratio": 0.95}}}
+
+The traffic kinds are "structured" (/api/reason), "unstructured"
+(/api/reason without structured output), "tools" (/api/reason with the
+calculator) and "stream" (/api/reason/stream, read to the end). Query
+lengths in characters follow a log-normal distribution.
+"""
+
+import asyncio
+import json
+import math
+import os
+import random
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import httpx
+
+from src.eval.datasets import DATA_DIR, load_dataset
+
+SCENARIOS_PATH = os.path.abspath(os.path.join(DATA_DIR, "..", "load", "scenarios.json"))
+KINDS = ("structured", "unstructured", "tools", "stream")
+
+# Upper bounds of the latency histogram buckets in milliseconds
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, math.inf)
+
+_FILLER = [
+    "I am working through a homework set and want to understand the method, not just the answer.",
+    "Please explain each step so I can check my own work against it.",
+    "My teacher said there is a trick to this kind of problem, but I do not remember it.",
+    "The numbers come from a worksheet, so assume they are exact.",
+    "I tried this twice and got different answers, so I am not sure where I went wrong.",
+    "If there is more than one way to solve it, show the simplest one first.",
+    "Round the final answer to two decimal places if it is not a whole number.",
+    "This is for a quick sanity check before I submit a report.",
+]
+
+
+class Scenario(NamedTuple):
+    """A load test: arrival rate, duration, traffic mix, query lengths and SLOs."""
+
+    name: str
+    rate: float
+    duration: float
+    mix: Dict[str, float]
+    query_chars: Dict[str, float]
+    slo: Dict[str, float]
+    timeout: float = 30.0
+
+
+def load_scenarios(path: Optional[str] = None) -> Dict[str, Scenario]:
+    """
+    Read scenarios from a JSON file.
+
+    Raises:
+        ValueError: If a scenario has an unknown traffic kind or setting
+    """
+    with open(path or SCENARIOS_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+    scenarios = {}
+    for name, settings in data.items():
+        scenario = Scenario(name=name, **settings)
+        unknown = set(scenario.mix) - set(KINDS)
+        if unknown:
+            raise ValueError(f"Scenario {name}: unknown traffic kinds {', '.join(sorted(unknown))}")
+        scenarios[name] = scenario
+    return scenarios
+
+
+def arrival_times(rate: float, duration: float, rng: random.Random) -> List[float]:
+    """Return Poisson arrival times (seconds from the start) over the duration."""
+    times = []
+    t = rng.expovariate(rate)
+    while t < duration:
+        times.append(t)
+        t += rng.expovariate(rate)
+    return times
+
+
+def make_query(kind: str, chars: int, questions: List[str], rng: random.Random) -> str:
+    """Build a query of about the given length; tool traffic asks for arithmetic."""
+    if kind == "tools":
+        a, b, c = rng.randint(2, 9999), rng.randint(2, 999), rng.randint(1, 99)
+        question = f"What is {a} * {b} + {c}?"
+    else:
+        question = rng.choice(questions)
+    context = []
+    length = len(question)
+    while length < chars:
+        sentence = rng.choice(_FILLER)
+        context.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(context + [question])
+
+
+def plan_requests(scenario: Scenario, seed: int = 0, rate: Optional[float] = None) -> List[Tuple[float, str, str]]:
+    """
+    Draw the requests of a scenario.
+
+    Args:
+        scenario: The scenario
+        seed: Random seed, so runs can be repeated
+        rate: Arrival rate overriding the scenario's
+
+    Returns:
+        (arrival time, traffic kind, query) per request, in arrival order
+    """
+    rng = random.Random(seed)
+    questions = [item.question for name in ("examples", "math_sample") for item in load_dataset(name)]
+    kinds = [kind for kind in KINDS if scenario.mix.get(kind)]
+    weights = [scenario.mix[kind] for kind in kinds]
+    median = scenario.query_chars.get("median", 120)
+    sigma = scenario.query_chars.get("sigma", 0.8)
+    longest = scenario.query_chars.get("max", 4000)
+    plan = []
+    for at in arrival_times(rate or scenario.rate, scenario.duration, rng):
+        kind = rng.choices(kinds, weights)[0]
+        chars = min(int(rng.lognormvariate(math.log(median), sigma)), longest)
+        plan.append((at, kind, make_query(kind, chars, questions, rng)))
+    return plan
+
+
+async def _send(client: httpx.AsyncClient, kind: str, query: str, due: float, timeout: float) -> Dict[str, Any]:
+    body = {
+        "query": query,
+        "use_tools": kind == "tools",
+        "structured_output": kind != "unstructured",
+    }
+    record: Dict[str, Any] = {"kind": kind, "chars": len(query), "status": None, "ttfb": None}
+    try:
+        if kind == "stream":
+            async with client.stream("POST", "/api/reason/stream", json=body, timeout=timeout) as response:
+                record["status"] = response.status_code
+                async for _ in response.aiter_bytes():
+                    if record["ttfb"] is None:
+                        record["ttfb"] = time.perf_counter() - due
+        else:
+            response = await client.post("/api/reason", json=body, timeout=timeout)
+            record["status"] = response.status_code
+    except httpx.TimeoutException:
+        record["error"] = "timeout"
+    except httpx.HTTPError as e:
+        record["error"] = type(e).__name__
+    record["latency"] = time.perf_counter() - due
+    return record
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    seed: int = 0,
+    rate: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Send a scenario's requests open-loop and summarize the responses.
+
+    Args:
+        client: Client for the API (its base_url, or an ASGI transport, picks the server)
+        scenario: The scenario
+        seed: Random seed for arrivals, traffic kinds and queries
+        rate: Arrival rate overriding the scenario's
+
+    Returns:
+        The summary (see ``summarize``) with the SLO checks under "slo"
+    """
+    plan = plan_requests(scenario, seed, rate)
+    start = time.perf_counter()
+    tasks = []
+    send_lag = 0.0
+    for at, kind, query in plan:
+        due = start + at
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        send_lag = max(send_lag, time.perf_counter() - due)
+        tasks.append(asyncio.ensure_future(_send(client, kind, query, due, scenario.timeout)))
+    records = await asyncio.gather(*tasks)
+    # A server that keeps up finishes shortly after the last arrival; one that falls behind takes longer
+    elapsed = max(time.perf_counter() - start, scenario.duration)
+
+    summary = summarize(records, elapsed)
+    summary.update(
+        scenario=scenario.name,
+        offered_rate=rate or scenario.rate,
+        sent_rate=round(len(plan) / scenario.duration, 2),
+        send_lag_ms=round(send_lag * 1000, 1)
+    )
+    summary["slo"] = check_slos(summary, scenario.slo)
+    summary["passed"] = all(check["passed"] for check in summary["slo"])
+    return summary
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Return the p-th percentile (0-100) by the nearest-rank method."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def histogram(latencies_ms: List[float]) -> List[Tuple[Any, int]]:
+    """Count latencies into BUCKETS_MS; returns (upper bound, count) pairs, the last bound being "+Inf"."""
+    counts = [0] * len(BUCKETS_MS)
+    for value in latencies_ms:
+        for i, bound in enumerate(BUCKETS_MS):
+            if value <= bound:
+                counts[i] += 1
+                break
+    return [(bound if bound != math.inf else "+Inf", count) for bound, count in zip(BUCKETS_MS, counts)]
+
+
+def _latency_stats(values_ms: List[float]) -> Dict[str, float]:
+    return {
+        "p50": round(percentile(values_ms, 50), 2),
+        "p90": round(percentile(values_ms, 90), 2),
+        "p95": round(percentile(values_ms, 95), 2),
+        "p99": round(percentile(values_ms, 99), 2),
+        "max": round(max(values_ms, default=0.0), 2),
+    }
+
+
+def summarize(records: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+    """
+    Summarize the responses of a run.
+
+    Latency percentiles and the histogram cover successful requests; failed
+    ones (non-2xx statuses, timeouts, connection errors) count as errors.
+    """
+    ok = [record for record in records if record["status"] is not None and 200 <= record["status"] < 300]
+    latencies = [record["latency"] * 1000 for record in ok]
+    statuses: Dict[str, int] = {}
+    for record in records:
+        key = str(record["status"]) if record["status"] is not None else record.get("error", "error")
+        statuses[key] = statuses.get(key, 0) + 1
+    by_kind = {}
+    for kind in KINDS:
+        values = [record["latency"] * 1000 for record in ok if record["kind"] == kind]
+        if values:
+            by_kind[kind] = dict(_latency_stats(values), requests=len(values))
+    ttfb = [record["ttfb"] * 1000 for record in ok if record["ttfb"] is not None]
+    return {
+        "requests": len(records),
+        "succeeded": len(ok),
+        "error_rate": round(1 - len(ok) / len(records), 4) if records else 0.0,
+        "statuses": statuses,
+        "seconds": round(elapsed, 3),
+        "throughput": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": _latency_stats(latencies),
+        "latency_by_kind_ms": by_kind,
+        "stream_ttfb_ms": _latency_stats(ttfb) if ttfb else None,
+        "histogram_ms": histogram(latencies),
+    }
+
+
+def check_slos(summary: Dict[str, Any], slo: Dict[str, float]) -> List[Dict[str, Any]]:
+    """
+    Compare a run's summary with its SLOs.
+
+    SLOs: "p50_ms", "p90_ms", "p95_ms", "p99_ms" and "max_ms" (latency of
+    successful requests), "stream_ttfb_p95_ms", "max_error_rate" and
+    "min_throughput_ratio" (successful requests per second over the rate at
+    which requests were sent).
+
+    Returns:
+        One {"name", "limit", "value", "passed"} check per SLO
+
+    Raises:
+        ValueError: If an SLO is unknown
+    """
+    checks = []
+    for name, limit in slo.items():
+        if name == "min_throughput_ratio":
+            value = round(summary["throughput"] / summary["sent_rate"], 3) if summary.get("sent_rate") else 1.0
+            checks.append({"name": name, "limit": limit, "value": value, "passed": value >= limit})
+            continue
+        if name == "max_error_rate":
+            value = summary["error_rate"]
+        elif name == "stream_ttfb_p95_ms":
+            value = (summary["stream_ttfb_ms"] or {}).get("p95", 0.0)
+        elif name.endswith("_ms") and name[:-3] in summary["latency_ms"]:
+            value = summary["latency_ms"][name[:-3]]
+        else:
+            raise ValueError(f"Unknown SLO {name!r}")
+        checks.append({"name": name, "limit": limit, "value": value, "passed": value <= limit})
+    return checks
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    """Render a run summary with its latency histogram and SLO checks as text."""
+    latency = summary["latency_ms"]
+    lines = [
+        f"Scenario {summary['scenario']}: {summary['offered_rate']:g} req/s offered ({summary['sent_rate']:g} sent), "
+        f"{summary['throughput']:g} req/s served over {summary['seconds']:g}s",
+        f"  requests {summary['requests']}, succeeded {summary['succeeded']}, error rate {summary['error_rate']:.2%}, "
+        f"statuses {json.dumps(summary['statuses'])}, generator lag {summary['send_lag_ms']:g} ms",
+        f"  latency ms: p50 {latency['p50']:g}  p90 {latency['p90']:g}  p95 {latency['p95']:g}  "
+        f"p99 {latency['p99']:g}  max {latency['max']:g}",
+    ]
+    for kind, stats in summary["latency_by_kind_ms"].items():
+        lines.append(f"    {kind:<13} n={stats['requests']:<6} p50 {stats['p50']:g}  p95 {stats['p95']:g}  p99 {stats['p99']:g}")
+    if summary["stream_ttfb_ms"]:
+        lines.append(f"    stream first byte  p50 {summary['stream_ttfb_ms']['p50']:g}  p95 {summary['stream_ttfb_ms']['p95']:g}")
+
+    peak = max((count for _, count in summary["histogram_ms"]), default=0)
+    lines.append("  histogram:")
+    for bound, count in summary["histogram_ms"]:
+        if count:
+            label = f"<= {bound:g} ms" if bound != "+Inf" else f"> {BUCKETS_MS[-2]:g} ms"
+            lines.append(f"    {label:>12} {count:>7} {'#' * max(1, round(40 * count / peak))}")
+
+    for check in summary["slo"]:
+        lines.append(f"  [{'PASS' if check['passed'] else 'FAIL'}] {check['name']}: {check['value']:g} (limit {check['limit']:g})")
+    return "\n".join(lines)
@@ -0,0 +1,255 @@
+"""
+Runs evaluation datasets through the reasoner and compares runs.
+
+A run is a JSON-serializable dictionary:
+
+    {
+        "name": ..., "dataset": ..., "model": ..., "created_at": ...,
+        "summary": {"items", "correct", "accuracy", "errors", "latency_ms": {...}, "tokens"},
+        "items": [{"id", "question", "expected", "prediction", "correct",
+                   "latency_ms", "tokens", "tokens_estimated", "error"}, ...]
+    }
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from src.cot.reasoning import ChainOfThoughtReasoner
+from src.eval.datasets import EvalItem
+from src.eval.scoring import is_correct
+from src.utils.logger import get_logger
+from src.utils.usage import estimate_tokens, metering
+
+logger = get_logger(__name__)
+
+
+def _percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def summarize(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Summarize per-item records.
+
+    Args:
+        items: Item records of a run
+
+    Returns:
+        Accuracy, error count, latency percentiles and total tokens
+    """
+    latencies = [item["latency_ms"] for item in items if item.get("error") is None]
+    correct = sum(1 for item in items if item["correct"])
+    return {
+        "items": len(items),
+        "correct": correct,
+        "accuracy": correct / len(items) if items else 0.0,
+        "errors": sum(1 for item in items if item.get("error") is not None),
+        "latency_ms": {
+            "mean": sum(latencies) / len(latencies) if latencies else 0.0,
+            "p50": _percentile(latencies, 50),
+            "p95": _percentile(latencies, 95),
+        },
+        "tokens": sum(item.get("tokens") or 0 for item in items),
+    }
+
+
+class EvalRunner:
+    """Runs items through a reasoner in parallel and scores the answers."""
+
+    def __init__(
+        self,
+        reasoner: ChainOfThoughtReasoner,
+        concurrency: int = 4,
+        temperature: Optional[float] = 0.0,
+        structured_output: bool = True
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            reasoner: Reasoner to evaluate
+            concurrency: Number of items evaluated at the same time
+            temperature: Sampling temperature (0 for reproducible runs, None for the profile's)
+            structured_output: Whether to request structured output
+        """
+        self.reasoner = reasoner
+        self.concurrency = concurrency
+        self.temperature = temperature
+        self.structured_output = structured_output
+
+    def evaluate_item(self, item: EvalItem) -> Dict[str, Any]:
+        """
+        Evaluate a single item.
+
+        Errors are recorded on the item instead of being raised, so one
+        failing item does not abort the run.
+        """
+        record = {"id": item.id, "question": item.question, "expected": item.answer}
+        start = time.perf_counter()
+        try:
+            with metering("eval") as meter:
+                result = self.reasoner.process_query(
+                    item.question,
+                    temperature=self.temperature,
+                    structured_output=self.structured_output
+                )
+        except Exception as e:
+            logger.warning("Item %s failed: %s", item.id, e)
+            record.update(prediction="", correct=False, error=str(e),
+                          latency_ms=(time.perf_counter() - start) * 1000, tokens=0, tokens_estimated=True)
+            return record
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        prediction = result.get("final_answer") or result.get("content") or ""
+        usage = meter.summary()
+        if usage["total_tokens"]:
+            tokens, estimated = usage["total_tokens"], False
+        else:
+            tokens, estimated = estimate_tokens(item.question) + estimate_tokens(json.dumps(result)), True
+
+        record.update(
+            prediction=prediction,
+            correct=is_correct(prediction, item),
+            error=result.get("error"),
+            latency_ms=latency_ms,
+            tokens=tokens,
+            tokens_estimated=estimated,
+        )
+        return record
+
+    def run(self, items: List[EvalItem], name: Optional[str] = None, dataset: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Evaluate all items.
+
+        Args:
+            items: Items to evaluate
+            name: Name of the run
+            dataset: Name of the dataset, recorded in the run
+
+        Returns:
+            The run (see module docstring)
+        """
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            records = list(pool.map(self.evaluate_item, items))
+
+        run = {
+            "name": name or datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S"),
+            "dataset": dataset,
+            "model": getattr(self.reasoner.client, "model", None),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "summary": summarize(records),
+            "items": records,
+        }
+        logger.info("Run %s: %d/%d correct", run["name"], run["summary"]["correct"], len(records))
+        return run
+
+
+def rescore(run: Dict[str, Any], items: List[EvalItem]) -> Dict[str, Any]:
+    """
+    Score the stored predictions of a run again, without calling the model.
+
+    Useful after changing the scoring or the reference answers.
+
+    Args:
+        run: A previous run
+        items: The dataset items (matched by id)
+
+    Returns:
+        A new run with updated scores
+    """
+    by_id = {item.id: item for item in items}
+    records = []
+    for record in run["items"]:
+        record = dict(record)
+        item = by_id.get(record["id"])
+        if item is not None:
+            record["expected"] = item.answer
+            record["correct"] = record.get("error") is None and is_correct(record["prediction"], item)
+        records.append(record)
+    return {**run, "summary": summarize(records), "items": records}
+
+
+def diff_runs(base: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compare two runs of the same dataset.
+
+    Args:
+        base: The reference run
+        new: The run to compare
+
+    Returns:
+        Deltas of the summary metrics and the ids of items that were fixed or regressed
+    """
+    base_items = {item["id"]: item for item in base["items"]}
+    new_items = {item["id"]: item for item in new["items"]}
+    common = [item_id for item_id in base_items if item_id in new_items]
+
+    base_summary, new_summary = base["summary"], new["summary"]
+    return {
+        "base": base["name"],
+        "new": new["name"],
+        "accuracy": (base_summary["accuracy"], new_summary["accuracy"]),
+        "latency_p50_ms": (base_summary["latency_ms"]["p50"], new_summary["latency_ms"]["p50"]),
+        "latency_p95_ms": (base_summary["latency_ms"]["p95"], new_summary["latency_ms"]["p95"]),
+        "tokens": (base_summary["tokens"], new_summary["tokens"]),
+        "errors": (base_summary["errors"], new_summary["errors"]),
+        "fixed": [i for i in common if not base_items[i]["correct"] and new_items[i]["correct"]],
+        "regressed": [i for i in common if base_items[i]["correct"] and not new_items[i]["correct"]],
+        "only_in_base": [i for i in base_items if i not in new_items],
+        "only_in_new": [i for i in new_items if i not in base_items],
+    }
+
+
+def format_report(diff: Dict[str, Any]) -> str:
+    """
+    Format a diff as a Markdown report.
+
+    Args:
+        diff: Result of diff_runs
+
+    Returns:
+        Markdown text with a metrics table and the changed items
+    """
+    def change(base: float, new: float) -> str:
+        if not base:
+            return "n/a"
+        return f"{(new - base) / base:+.1%}"
+
+    lines = [
+        f"## {diff['base']} → {diff['new']}",
+        "",
+        "| metric | base | new | change |",
+        "|---|---:|---:|---:|",
+    ]
+    base, new = diff["accuracy"]
+    lines.append(f"| accuracy | {base:.1%} | {new:.1%} | {(new - base) * 100:+.1f} pts |")
+    for key, label in (("latency_p50_ms", "latency p50 (ms)"), ("latency_p95_ms", "latency p95 (ms)")):
+        base, new = diff[key]
+        lines.append(f"| {label} | {base:.0f} | {new:.0f} | {change(base, new)} |")
+    base, new = diff["tokens"]
+    lines.append(f"| tokens | {base} | {new} | {change(base, new)} |")
+    base, new = diff["errors"]
+    lines.append(f"| errors | {base} | {new} | {new - base:+d} |")
+
+    for key, label in (("regressed", "Regressed"), ("fixed", "Fixed")):
+        if diff[key]:
+            lines += ["", f"**{label}:** " + ", ".join(diff[key])]
+    return "\n".join(lines) + "\n"
+
+
+def save_run(run: Dict[str, Any], path: str) -> None:
+    """Write a run to a JSON file."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(run, f, indent=2, ensure_ascii=False)
+
+
+def load_run(path: str) -> Dict[str, Any]:
+    """Read a run from a JSON file."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
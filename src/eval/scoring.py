@@ -0,0 +1,60 @@
+"""
+Scoring of predicted answers against reference answers.
+"""
+
+import math
+import re
+import string
+from typing import Optional
+
+from src.eval.datasets import EvalItem
+
+_NUMBER = re.compile(r"-?\d[\d,]*(?:\.\d+)?|-?\.\d+")
+_ARTICLES = re.compile(r"\b(a|an|the)\b")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, and remove punctuation, articles and extra whitespace."""
+    text = text.lower()
+    text = "".join(char for char in text if char not in string.punctuation)
+    text = _ARTICLES.sub(" ", text)
+    return " ".join(text.split())
+
+
+def extract_number(text: str) -> Optional[float]:
+    """
+    Return the last number in a text.
+
+    Final answers usually end with the result ("6 * 7 = 42", "about $485.95"),
+    so the last number is taken. Thousands separators are ignored.
+    """
+    matches = _NUMBER.findall(text)
+    if not matches:
+        return None
+    try:
+        return float(matches[-1].replace(",", ""))
+    except ValueError:
+        return None
+
+
+def is_correct(prediction: str, item: EvalItem) -> bool:
+    """
+    Score a prediction.
+
+    Numeric items are correct if the last number in the prediction is within
+    the item's tolerance of the reference; other items need an exact match
+    after normalization.
+
+    Args:
+        prediction: The model's final answer
+        item: The evaluated item
+
+    Returns:
+        Whether the prediction is correct
+    """
+    if item.kind == "numeric":
+        predicted = extract_number(prediction)
+        if predicted is None:
+            return False
+        return math.isclose(predicted, float(item.answer), rel_tol=1e-9, abs_tol=item.tolerance)
+    return normalize_text(prediction) == normalize_text(item.answer)
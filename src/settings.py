@@ -0,0 +1,270 @@
+"""
+Typed runtime settings with hot reload.
+
+The performance knobs of src/config.py (concurrency, queue and pool sizes,
+timeouts, rate limits) are collected in a validated, immutable Settings
+object. Values come from the environment (through src.config) and are
+overridden by SETTINGS_FILE, a JSON or TOML file with the same field names
+in lower case:
+
+    {"max_concurrent_requests": 16, "request_timeout": 60, "tool_timeout": 1.5}
+
+``reload_settings()`` re-reads the file and swaps in the new settings
+atomically if they are valid; an invalid file leaves the current settings
+in place. Code reads knobs with ``get_settings()`` when it uses them, and
+long-lived objects (the admission controller, the job manager, the tool
+sandbox, ...) apply changes from an ``on_reload`` callback, so in-flight
+requests finish with the settings they started with. Fields listed in
+RESTART_REQUIRED only take effect on restart.
+"""
+
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from src import config
+from src.utils.logger import get_logger, set_log_level
+
+logger = get_logger(__name__)
+
+# Settings read once at startup
+RESTART_REQUIRED = frozenset({"host", "port", "job_workers", "tool_sandbox_workers"})
+
+
+class SettingsError(Exception):
+    """Raised when the settings file cannot be read or holds invalid settings."""
+
+
+class Settings(NamedTuple):
+    """Runtime settings; defaults come from the environment (src.config)."""
+
+    # Model defaults
+    model_name: str = config.MODEL_NAME
+    default_temperature: float = config.DEFAULT_TEMPERATURE
+    default_max_tokens: int = config.DEFAULT_MAX_TOKENS
+
+    # Server
+    host: str = config.HOST
+    port: int = config.PORT
+
+    # Admission control and request limits
+    max_concurrent_requests: int = config.MAX_CONCURRENT_REQUESTS
+    max_queued_requests: int = config.MAX_QUEUED_REQUESTS
+    request_timeout: float = config.REQUEST_TIMEOUT
+    compression_min_size: int = config.COMPRESSION_MIN_SIZE
+
+    # Sessions
+    session_max_turns: int = config.SESSION_MAX_TURNS
+    session_summary_chars: int = config.SESSION_SUMMARY_CHARS
+
+    # Jobs
+    job_workers: int = config.JOB_WORKERS
+    job_max_pending: int = config.JOB_MAX_PENDING
+    job_timeout: float = config.JOB_TIMEOUT
+    job_result_ttl: float = config.JOB_RESULT_TTL
+
+    # Tenants
+    tenant_quota_window: float = config.TENANT_QUOTA_WINDOW
+
+    # Tool sandbox
+    tool_sandbox_workers: int = config.TOOL_SANDBOX_WORKERS
+    tool_timeout: float = config.TOOL_TIMEOUT
+    tool_cpu_seconds: float = config.TOOL_CPU_SECONDS
+    tool_memory_mb: int = config.TOOL_MEMORY_MB
+    tool_max_calls_per_worker: int = config.TOOL_MAX_CALLS_PER_WORKER
+
+    # Upstream resilience
+    fallback_speculation: str = config.FALLBACK_SPECULATION
+    fallback_speculation_delay: float = config.FALLBACK_SPECULATION_DELAY
+    json_repair_reask: bool = config.JSON_REPAIR_REASK
+    hedge_enabled: bool = config.HEDGE_ENABLED
+    hedge_percentile: float = config.HEDGE_PERCENTILE
+    hedge_initial_delay: float = config.HEDGE_INITIAL_DELAY
+    hedge_max_rate: float = config.HEDGE_MAX_RATE
+
+    # Logging and accounting
+    log_level: str = config.LOG_LEVEL.upper()
+    log_debug_sample_rate: float = config.LOG_DEBUG_SAMPLE_RATE
+    usage_flush_interval: float = config.USAGE_FLUSH_INTERVAL
+    loop_lag_interval: float = config.LOOP_LAG_INTERVAL
+    loop_lag_threshold: float = config.LOOP_LAG_THRESHOLD
+
+
+def _positive(value: Any) -> bool:
+    return value > 0
+
+
+def _non_negative(value: Any) -> bool:
+    return value >= 0
+
+
+# Constraints beyond the field types, with the message shown when one fails
+_CHECKS: Dict[str, Tuple[Callable[[Any], bool], str]] = {
+    "default_temperature": (lambda value: 0 <= value <= 2, "must be between 0 and 2"),
+    "default_max_tokens": (_positive, "must be positive"),
+    "port": (lambda value: 0 < value < 65536, "must be a TCP port"),
+    "max_concurrent_requests": (_positive, "must be positive"),
+    "max_queued_requests": (_non_negative, "must not be negative"),
+    "request_timeout": (_positive, "must be positive"),
+    "compression_min_size": (_non_negative, "must not be negative"),
+    "session_max_turns": (_non_negative, "must not be negative"),
+    "session_summary_chars": (_non_negative, "must not be negative"),
+    "job_workers": (_positive, "must be positive"),
+    "job_max_pending": (_positive, "must be positive"),
+    "job_timeout": (_positive, "must be positive"),
+    "job_result_ttl": (_non_negative, "must not be negative"),
+    "tenant_quota_window": (_positive, "must be positive"),
+    "tool_sandbox_workers": (_non_negative, "must not be negative"),
+    "tool_timeout": (_positive, "must be positive"),
+    "tool_cpu_seconds": (_non_negative, "must not be negative"),
+    "tool_memory_mb": (_non_negative, "must not be negative"),
+    "tool_max_calls_per_worker": (_positive, "must be positive"),
+    "fallback_speculation": (lambda value: value in ("off", "parallel", "delayed"), "must be off, parallel or delayed"),
+    "fallback_speculation_delay": (_non_negative, "must not be negative"),
+    "hedge_percentile": (lambda value: 0 < value <= 100, "must be between 0 and 100"),
+    "hedge_initial_delay": (_non_negative, "must not be negative"),
+    "hedge_max_rate": (lambda value: 0 <= value <= 1, "must be between 0 and 1"),
+    "log_level": (lambda value: value in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"), "must be a logging level"),
+    "log_debug_sample_rate": (lambda value: 0 <= value <= 1, "must be between 0 and 1"),
+    "usage_flush_interval": (_positive, "must be positive"),
+    "loop_lag_interval": (_positive, "must be positive"),
+    "loop_lag_threshold": (_positive, "must be positive"),
+}
+
+
+def _coerce(name: str, value: Any) -> Any:
+    kind = Settings.__annotations__[name]
+    if kind is float and isinstance(value, int) and not isinstance(value, bool):
+        value = float(value)
+    if kind is str and name == "log_level" and isinstance(value, str):
+        value = value.upper()
+    if type(value) is not kind:
+        raise SettingsError(f"Invalid setting {name}: expected {kind.__name__}, got {value!r}")
+    return value
+
+
+def validate_settings(values: Dict[str, Any]) -> Settings:
+    """
+    Build settings from defaults overridden by the given values.
+
+    Raises:
+        SettingsError: If a name is unknown, or a value has the wrong type or is out of range
+    """
+    unknown = sorted(set(values) - set(Settings._fields))
+    if unknown:
+        raise SettingsError(f"Unknown settings: {', '.join(unknown)}")
+    settings = Settings(**{name: _coerce(name, value) for name, value in values.items()})
+    for name, (check, message) in _CHECKS.items():
+        if not check(getattr(settings, name)):
+            raise SettingsError(f"Invalid setting {name}: {message}")
+    return settings
+
+
+def _toml_parser() -> Any:
+    try:
+        import tomllib
+    except ImportError:  # Python < 3.11
+        try:
+            import tomli as tomllib
+        except ImportError:
+            raise SettingsError("TOML settings files need Python 3.11+ or the tomli package")
+    return tomllib
+
+
+def _read_file(path: str) -> Dict[str, Any]:
+    try:
+        if path.endswith(".toml"):
+            tomllib = _toml_parser()
+            with open(path, "rb") as f:
+                data = tomllib.load(f)
+        else:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise SettingsError(f"Could not read settings file {path}: {e}")
+    if not isinstance(data, dict):
+        raise SettingsError(f"Settings file {path} must hold an object")
+    return data
+
+
+def load_settings(path: Optional[str] = None) -> Settings:
+    """
+    Build settings from the environment and a settings file.
+
+    Args:
+        path: JSON or TOML file overriding the environment (None for none)
+
+    Returns:
+        The settings
+
+    Raises:
+        SettingsError: If the file cannot be read or holds invalid settings
+    """
+    return validate_settings(_read_file(path) if path else {})
+
+
+_listeners: List[Callable[[Settings], None]] = []
+_lock = threading.Lock()
+_path = config.SETTINGS_FILE
+_loaded_at = time.time()
+try:
+    _settings = load_settings(_path)
+except SettingsError as e:
+    logger.error("%s; using the environment only", e)
+    _settings = Settings()
+
+
+def get_settings() -> Settings:
+    """Return the current settings."""
+    return _settings
+
+
+def settings_info() -> Dict[str, Any]:
+    """Return the current settings with where and when they were loaded."""
+    return {"settings": _settings._asdict(), "file": _path, "loaded_at": _loaded_at}
+
+
+def on_reload(listener: Callable[[Settings], None]) -> None:
+    """Call a function with the new settings after every successful reload."""
+    _listeners.append(listener)
+
+
+def reload_settings(path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Re-read the settings file and apply the result.
+
+    Args:
+        path: Settings file to read from now on (defaults to the current one)
+
+    Returns:
+        The changed fields as {name: [old, new]}, and those of them that
+        need a restart under "restart_required"
+
+    Raises:
+        SettingsError: If the new settings are invalid; the current ones stay in place
+    """
+    global _settings, _path, _loaded_at
+    with _lock:
+        new = load_settings(path or _path)
+        old, _settings = _settings, new
+        _path = path or _path
+        _loaded_at = time.time()
+        changed = {
+            name: [value, getattr(new, name)]
+            for name, value in old._asdict().items()
+            if getattr(new, name) != value
+        }
+        for listener in _listeners:
+            try:
+                listener(new)
+            except Exception as e:
+                logger.error("Could not apply reloaded settings in %s: %s", getattr(listener, "__qualname__", listener), e)
+    restart = sorted(set(changed) & RESTART_REQUIRED)
+    logger.info("Reloaded settings from %s: %s changed", _path or "the environment", ", ".join(changed) or "nothing")
+    if restart:
+        logger.warning("Changes to %s take effect on restart", ", ".join(restart))
+    return {"changed": changed, "restart_required": restart}
+
+
+on_reload(lambda settings: set_log_level(settings.log_level, settings.log_debug_sample_rate))
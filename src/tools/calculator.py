@@ -1,12 +1,31 @@
 """
 This module implements a calculator tool for mathematical expressions.
+
+Expressions are parsed into an AST and evaluated node by node, in one of
+three modes:
+
+- "float": binary floating point, like Python itself
+- "exact": integers and fractions, so money and interest calculations have
+  no binary rounding artifacts (integers stay Python ints, so big-integer
+  arithmetic is exact and fast)
+- "decimal": decimal floating point with a configurable precision
+
+Exact and decimal results are returned both rounded (as a number) and in
+full (as a string). Exponents and intermediate results are bounded so that
+expressions such as ``9 ** 9 ** 9`` fail fast instead of exhausting memory.
 """
 
+import ast
 import math
 import operator
-from typing import Dict, Any, Union
 import re
+import sys
+from decimal import Context, Decimal, DecimalException, Inexact, localcontext
+from fractions import Fraction
+from typing import Any, Dict, List, Optional, Union
 
+from src.config import CALCULATOR_MODE
+from src.tools.sandbox import ToolError, get_sandbox
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -37,42 +56,366 @@ SAFE_FUNCTIONS = {
     'exp': math.exp,
 }
 
-def calculate(expression: str) -> Dict[str, Any]:
+MODES = ("float", "exact", "decimal")
+
+# Limits that keep evaluation fast whatever the expression
+MAX_EXPRESSION_LENGTH = 1000
+# Results must be printable: CPython refuses to convert ints of more than
+# sys.get_int_max_str_digits() digits (4300 by default) to strings
+MAX_RESULT_DIGITS = min(getattr(sys, "get_int_max_str_digits", lambda: 0)() or 30_000, 30_000)
+MAX_RESULT_BITS = int((MAX_RESULT_DIGITS - 1) * math.log2(10))
+MAX_PRECISION = 1000
+DEFAULT_PRECISION = 28
+# Significant digits of the rounded result
+ROUNDED_DIGITS = 15
+
+_AST_OPERATORS = {
+    ast.Add: '+',
+    ast.Sub: '-',
+    ast.Mult: '*',
+    ast.Div: '/',
+    ast.FloorDiv: '//',
+    ast.Mod: '%',
+    ast.Pow: '**',
+}
+
+# pi by precision, computed on first use
+_PI_DIGITS_CACHE: Dict[int, Decimal] = {}
+
+
+class CalculationError(ValueError):
+    """Raised for expressions that cannot be evaluated."""
+
+
+def _decimal_pi(precision: int) -> Decimal:
+    """Compute pi to the given precision (Machin's formula)."""
+    if precision not in _PI_DIGITS_CACHE:
+        with localcontext(Context(prec=precision + 5)):
+            def arctan_inverse(x: int) -> Decimal:
+                total = term = Decimal(1) / x
+                x_squared, n, sign = x * x, 1, 1
+                while term:
+                    term /= x_squared
+                    n += 2
+                    sign = -sign
+                    total += sign * term / n
+                return total
+            pi = 16 * arctan_inverse(5) - 4 * arctan_inverse(239)
+        _PI_DIGITS_CACHE[precision] = +pi
+    return _PI_DIGITS_CACHE[precision]
+
+
+def _check_size(value: Any) -> Any:
+    if isinstance(value, int) and value.bit_length() > MAX_RESULT_BITS:
+        raise CalculationError("Result is too large")
+    if isinstance(value, Fraction) and max(value.numerator.bit_length(), value.denominator.bit_length()) > MAX_RESULT_BITS:
+        raise CalculationError("Result is too large")
+    return value
+
+
+class _Evaluator:
+    """Evaluates a parsed expression with the arithmetic of one mode."""
+
+    def __init__(self, mode: str, precision: int):
+        self.mode = mode
+        self.precision = precision
+        self.context = Context(prec=precision, Emax=999_999, Emin=-999_999)
+        # Set when a value had to be approximated (irrational functions, roots, constants)
+        self.inexact = False
+
+    def evaluate(self, node: ast.AST) -> Any:
+        if isinstance(node, ast.Expression):
+            return self.evaluate(node.body)
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            return self.number(node.value)
+        if isinstance(node, ast.Name):
+            return self.constant(node.id)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+            value = self.evaluate(node.operand)
+            value = -value if isinstance(node.op, ast.USub) else +value
+            return self.exact(value) if self.mode == "exact" else value
+        if isinstance(node, ast.BinOp) and type(node.op) in _AST_OPERATORS:
+            return self.binary(_AST_OPERATORS[type(node.op)], self.evaluate(node.left), self.evaluate(node.right))
+        if isinstance(node, (ast.List, ast.Tuple)):
+            return [self.evaluate(element) for element in node.elts]
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+            return self.call(node.func.id, [self.evaluate(arg) for arg in node.args])
+        raise CalculationError(f"Unsupported syntax: {type(node).__name__}")
+
+    # Numbers
+
+    def number(self, value: Union[int, float]) -> Any:
+        if isinstance(value, float) and not math.isfinite(value):
+            raise CalculationError("Number is too large")
+        if self.mode == "float" or isinstance(value, int):
+            return Decimal(value) if self.mode == "decimal" else value
+        # Use the literal's shortest representation, so 0.1 means one tenth
+        return Decimal(repr(value)) if self.mode == "decimal" else self.exact(Fraction(repr(value)))
+
+    def approximate(self, value: Union[float, Decimal]) -> Any:
+        """Convert an approximation into the mode's number type."""
+        self.inexact = True
+        if self.mode == "float":
+            return float(value)
+        if self.mode == "decimal":
+            return self.context.plus(Decimal(repr(value)) if isinstance(value, float) else value)
+        return self.exact(Fraction(repr(value)) if isinstance(value, float) else Fraction(value))
+
+    def to_decimal(self, value: Any) -> Decimal:
+        if isinstance(value, Fraction):
+            return self.context.divide(Decimal(value.numerator), Decimal(value.denominator))
+        if isinstance(value, float):
+            return Decimal(repr(value))
+        return self.context.plus(Decimal(value))
+
+    def constant(self, name: str) -> Any:
+        if name not in ("pi", "e"):
+            raise CalculationError(f"Unknown name: {name}")
+        if self.mode == "float":
+            return math.pi if name == "pi" else math.e
+        value = _decimal_pi(self.precision) if name == "pi" else self.context.exp(Decimal(1))
+        return self.approximate(value)
+
+    # Operators
+
+    def binary(self, symbol: str, left: Any, right: Any) -> Any:
+        if isinstance(left, list) or isinstance(right, list):
+            raise CalculationError("Lists can only be passed to functions")
+        if symbol == '**':
+            return self.power(left, right)
+        if self.mode == "decimal":
+            with localcontext(self.context) as context:
+                if symbol in ('//', '%'):
+                    # Python semantics (floor division, the remainder takes the divisor's sign),
+                    # unlike Decimal's truncating operators
+                    quotient, remainder = divmod(left, right)
+                    if remainder and (remainder < 0) != (right < 0):
+                        quotient, remainder = quotient - 1, remainder + right
+                    result = quotient if symbol == '//' else remainder
+                else:
+                    result = SAFE_OPERATORS[symbol](left, right)
+            self.inexact = self.inexact or bool(context.flags[Inexact])
+            return result
+        if self.mode == "exact":
+            if symbol == '/':
+                left = Fraction(left)
+            return self.exact(SAFE_OPERATORS[symbol](left, right))
+        return _check_size(SAFE_OPERATORS[symbol](left, right))
+
+    @staticmethod
+    def exact(value: Any) -> Any:
+        """Check an exact result's size, keeping integers as ints (the fast path for big-integer arithmetic)."""
+        if isinstance(value, Fraction) and value.denominator == 1:
+            value = value.numerator
+        return _check_size(value)
+
+    def power(self, base: Any, exponent: Any) -> Any:
+        if self.mode == "decimal":
+            # Bounded precision keeps any exponent cheap; overflow is trapped
+            with localcontext(self.context) as context:
+                result = base ** exponent
+            self.inexact = self.inexact or bool(context.flags[Inexact])
+            return result
+        if isinstance(exponent, Fraction) and exponent.denominator == 1:
+            exponent = exponent.numerator
+        if isinstance(exponent, int) and not isinstance(base, float):
+            if self.mode == "float" and exponent < 0:
+                # A float result: tiny values underflow to 0.0 instead of being rejected
+                return float(base) ** exponent
+            if base not in (0, 1, -1):
+                # Reject results that are certainly too large before computing them
+                fraction = Fraction(base)
+                bits = max(abs(fraction.numerator).bit_length(), fraction.denominator.bit_length())
+                if (bits - 1) * abs(exponent) > MAX_RESULT_BITS:
+                    raise CalculationError("Result is too large")
+            if self.mode == "exact" and exponent < 0:
+                return self.exact(Fraction(base) ** exponent)
+            return _check_size(base ** exponent)
+        if self.mode == "float":
+            result = float(base) ** float(exponent)
+            if isinstance(result, complex):
+                raise CalculationError("Result is not a real number")
+            return result
+        # Irrational powers are computed in decimal and marked inexact
+        with localcontext(self.context):
+            return self.approximate(self.to_decimal(base) ** self.to_decimal(exponent))
+
+    # Functions
+
+    def call(self, name: str, args: List[Any]) -> Any:
+        if name not in SAFE_FUNCTIONS:
+            raise CalculationError(f"Unknown function: {name}")
+        if name in ("abs", "round", "min", "max", "sum"):
+            if name == "round" and len(args) == 2:
+                args = [args[0], int(args[1])]
+                if abs(args[1]) > MAX_PRECISION:
+                    raise CalculationError(f"round() digits must be between -{MAX_PRECISION} and {MAX_PRECISION}")
+            result = SAFE_FUNCTIONS[name](*args)
+            return self.exact(result) if self.mode == "exact" else _check_size(result)
+        if len(args) != 1 and name != "log":
+            raise CalculationError(f"{name}() takes one argument")
+        if self.mode == "float":
+            return SAFE_FUNCTIONS[name](*args)
+        if name == "sqrt":
+            return self.sqrt(args[0])
+        if name in ("exp", "log", "log10") and len(args) == 1:
+            x = self.to_decimal(args[0])
+            with localcontext(self.context):
+                value = {"exp": x.exp, "log": x.ln, "log10": x.log10}[name]()
+            return self.approximate(value)
+        # No decimal implementation: fall back to floating point
+        return self.approximate(SAFE_FUNCTIONS[name](*(float(arg) for arg in args)))
+
+    def sqrt(self, value: Any) -> Any:
+        if value < 0:
+            raise CalculationError("Square root of a negative number")
+        if self.mode == "exact":
+            fraction = Fraction(value)
+            numerator, denominator = math.isqrt(fraction.numerator), math.isqrt(fraction.denominator)
+            if numerator * numerator == fraction.numerator and denominator * denominator == fraction.denominator:
+                root = Fraction(numerator, denominator)
+                return root.numerator if root.denominator == 1 else root
+        return self.approximate(self.to_decimal(value).sqrt(self.context))
+
+
+def _rounded(value: Any, evaluator: _Evaluator) -> Union[int, float, str]:
+    """The result as a JSON number, rounded to ROUNDED_DIGITS significant digits."""
+    if isinstance(value, int):
+        return value
+    decimal = Context(prec=ROUNDED_DIGITS).plus(evaluator.to_decimal(value))
+    if decimal == decimal.to_integral_value() and abs(decimal) < 10 ** ROUNDED_DIGITS:
+        return int(decimal)
+    rounded = float(decimal)
+    # Beyond the float range the rounded form stays a string
+    return rounded if math.isfinite(rounded) else str(decimal)
+
+
+def _exact_text(value: Any, evaluator: _Evaluator) -> str:
+    """The result in full: a terminating decimal if it has one, else a fraction."""
+    if isinstance(value, Decimal):
+        value = value.normalize(evaluator.context)
+        return format(value, "f") if abs(value.adjusted()) <= 100 else str(value)
+    if isinstance(value, int):
+        return str(value)
+    numerator, denominator = value.numerator, value.denominator
+    twos = fives = 0
+    while denominator % 2 == 0:
+        denominator //= 2
+        twos += 1
+    while denominator % 5 == 0:
+        denominator //= 5
+        fives += 1
+    if denominator != 1:
+        return f"{numerator}/{value.denominator}"
+    if value.denominator == 1:
+        return str(numerator)
+    # Terminating decimal: scale to an integer and place the point
+    places = max(twos, fives)
+    scaled = abs(numerator) * 10 ** places // value.denominator
+    if scaled.bit_length() > MAX_RESULT_BITS:
+        # Too many digits to print in full; the fraction's parts are within the limit
+        return f"{numerator}/{value.denominator}"
+    digits = str(scaled).rjust(places + 1, "0")
+    return f"{'-' if numerator < 0 else ''}{digits[:-places]}.{digits[-places:]}"
+
+
+def evaluate(expression: str, mode: str = "float", precision: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Evaluate an expression in the given mode.
+
+    Args:
+        expression: The mathematical expression
+        mode: "float", "exact" or "decimal"
+        precision: Significant digits for decimal arithmetic and approximations
+
+    Returns:
+        {"result": number} in float mode; in exact and decimal modes also
+        "exact" (the full result as a string), "mode" and "inexact"
+        (whether any step had to be approximated)
+
+    Raises:
+        CalculationError: If the expression is invalid, unsupported or too large
+    """
+    if mode not in MODES:
+        raise CalculationError(f"Unknown mode {mode!r} (expected one of {', '.join(MODES)})")
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise CalculationError("Expression is too long")
+    precision = min(max(1, precision or DEFAULT_PRECISION), MAX_PRECISION)
+
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise CalculationError(f"Invalid expression: {e.msg}")
+
+    evaluator = _Evaluator(mode, precision)
+    try:
+        value = evaluator.evaluate(tree)
+    except CalculationError:
+        raise
+    except ZeroDivisionError:
+        raise CalculationError("Division by zero")
+    except DecimalException as e:
+        raise CalculationError(f"Invalid operation ({type(e).__name__})")
+    except (OverflowError, TypeError, ValueError) as e:
+        raise CalculationError(str(e))
+    if isinstance(value, list):
+        raise CalculationError("Expression must evaluate to a number")
+
+    if mode == "float":
+        if isinstance(value, float) and not math.isfinite(value):
+            raise CalculationError("Result is too large")
+        return {"result": value}
+    if isinstance(value, Decimal) and not value.is_finite():
+        raise CalculationError("Result is too large")
+    return {
+        "result": _rounded(value, evaluator),
+        "exact": _exact_text(value, evaluator),
+        "mode": mode,
+        "inexact": evaluator.inexact,
+    }
+
+
+def calculate(expression: str, mode: Optional[str] = None, precision: Optional[int] = None) -> Dict[str, Any]:
     """
     Safely evaluate a mathematical expression.
-    
+
+    Unless TOOL_SANDBOX is "off" the expression is evaluated in a sandboxed
+    worker process (see src.tools.sandbox).
+
     Args:
         expression: The mathematical expression to evaluate
-        
+        mode: "float", "exact" or "decimal" (defaults to CALCULATOR_MODE)
+        precision: Significant digits for decimal arithmetic
+
     Returns:
         Dictionary with the result or error message
     """
+    sandbox = get_sandbox()
+    if sandbox is None:
+        return _calculate(expression, mode, precision)
     try:
-        logger.debug(f"Calculating expression: {expression}")
-        
+        return sandbox.run(_calculate, expression, mode, precision)
+    except ToolError as e:
+        logger.error("Calculation error: %s", e)
+        return {"error": f"Calculation error: {str(e)}"}
+
+
+def _calculate(expression: str, mode: Optional[str], precision: Optional[int]) -> Dict[str, Any]:
+    try:
+        logger.debug("Calculating expression: %s", expression)
+
         # Sanitize the expression
         sanitized = sanitize_expression(expression)
         if not sanitized:
             return {"error": "Invalid or unsafe expression"}
-        
-        # Create a safe environment for evaluation
-        safe_globals = {
-            "__builtins__": {},
-            **SAFE_FUNCTIONS,
-            "pi": math.pi,
-            "e": math.e,
-        }
-        
-        safe_locals = {}
-        
-        # Evaluate the expression
-        result = eval(sanitized, safe_globals, safe_locals)
-        logger.debug(f"Calculation result: {result}")
-        
-        return {"result": result}
-    
+
+        result = evaluate(sanitized, mode or CALCULATOR_MODE, precision)
+        logger.debug("Calculation result: %s", result)
+
+        return result
+
     except Exception as e:
-        logger.error(f"Calculation error: {str(e)}")
+        logger.error("Calculation error: %s", e)
         return {"error": f"Calculation error: {str(e)}"}
 
 def sanitize_expression(expression: str) -> Union[str, None]:
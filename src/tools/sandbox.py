@@ -0,0 +1,319 @@
+"""
+Sandboxed tool execution.
+
+Tools run in a pool of worker processes started ahead of time, so a
+runaway expression cannot pin the server's CPU or exhaust its memory. Each
+worker has an address-space limit, and a CPU time limit for every call;
+a call that overruns its wall-clock timeout has its worker killed and
+replaced. Workers are started from a fork server that has already imported
+the tool modules, so starting a replacement is cheap, and idle workers are
+reused, so a call only costs a round trip over a pipe.
+
+Resource limits use the ``resource`` module and are skipped on platforms
+without it.
+"""
+
+import atexit
+import math
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from typing import Any, Callable, Optional, Sequence
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from src.config import TOOL_SANDBOX
+from src.settings import Settings, get_settings, on_reload
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Modules imported once by the fork server instead of by every worker
+PRELOAD_MODULES = ["src.tools.calculator"]
+
+# Set in worker processes, which run tools directly
+_in_worker = False
+
+
+class ToolError(RuntimeError):
+    """A sandboxed tool call failed."""
+
+
+class ToolTimeout(ToolError):
+    """A sandboxed tool call ran past its timeout and its worker was killed."""
+
+
+def _set_limit(limit: int, soft: int) -> None:
+    _, hard = resource.getrlimit(limit)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(limit, (soft, hard))
+
+
+def _serve(connection: Any, cpu_seconds: float, memory_bytes: int) -> None:
+    """Worker loop: run calls received on the connection until told to stop."""
+    global _in_worker
+    _in_worker = True
+    # Interrupts are for the parent; it decides when workers stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if resource is not None and memory_bytes:
+        _set_limit(resource.RLIMIT_AS, memory_bytes)
+
+    while True:
+        try:
+            request = connection.recv()
+        except (EOFError, OSError):
+            return
+        if request is None:
+            return
+        func, args, kwargs = request
+
+        if resource is not None and cpu_seconds:
+            # RLIMIT_CPU counts the process's lifetime, so each call gets its
+            # allowance on top of what has been used so far
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            _set_limit(resource.RLIMIT_CPU, math.ceil(usage.ru_utime + usage.ru_stime + cpu_seconds))
+
+        try:
+            reply = ("ok", func(*args, **kwargs))
+        except MemoryError:
+            reply = ("error", "Memory limit exceeded")
+        except Exception as e:
+            reply = ("error", f"{type(e).__name__}: {e}")
+        try:
+            connection.send(reply)
+        except Exception as e:
+            connection.send(("error", f"Could not return result: {e}"))
+
+
+class _Worker:
+    """A worker process and the parent's end of its pipe."""
+
+    def __init__(self, context: Any, cpu_seconds: float, memory_bytes: int):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(
+            target=_serve, args=(child, cpu_seconds, memory_bytes), name="tool-worker", daemon=True
+        )
+        self.process.start()
+        child.close()
+        self.calls = 0
+
+    def stop(self) -> None:
+        try:
+            self.connection.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(0.5)
+        self.kill()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.connection.close()
+
+
+class ToolSandbox:
+    """Pool of worker processes that tool calls are run in."""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        timeout: float = 2.0,
+        cpu_seconds: float = 1.0,
+        memory_mb: int = 512,
+        max_calls_per_worker: int = 1000,
+        preload: Optional[Sequence[str]] = None
+    ):
+        """
+        Initialize the sandbox; workers are started by ``start`` or on first use.
+
+        Args:
+            workers: Number of worker processes (and so of concurrent calls)
+            timeout: Wall-clock seconds a call may take before its worker is killed
+            cpu_seconds: CPU seconds a call may use (0 for no limit)
+            memory_mb: Address space limit of each worker in MB (0 for no limit)
+            max_calls_per_worker: Calls after which a worker is replaced
+            preload: Modules the fork server imports (defaults to PRELOAD_MODULES)
+        """
+        self.size = workers
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_mb * 1024 * 1024
+        self.max_calls_per_worker = max_calls_per_worker
+        self.preload = list(PRELOAD_MODULES if preload is None else preload)
+        self.recycled = 0
+        self._context: Any = None
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers: set = set()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _start_worker(self) -> _Worker:
+        worker = _Worker(self._context, self.cpu_seconds, self.memory_bytes)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def start(self) -> None:
+        """Start the workers, so the first calls do not wait for them."""
+        with self._lock:
+            if self._context is not None:
+                return
+            methods = multiprocessing.get_all_start_methods()
+            # A fork server keeps workers from inheriting the server's threads and locks
+            self._context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            if "forkserver" in methods:
+                self._context.set_forkserver_preload(self.preload)
+            self._closed = False
+        for _ in range(self.size):
+            self._idle.put(self._start_worker())
+        logger.info("Started %d tool workers", self.size)
+
+    def _retire(self, worker: _Worker, kill: bool = False) -> None:
+        with self._lock:
+            self._workers.discard(worker)
+        if kill:
+            worker.kill()
+        else:
+            worker.stop()
+        self.recycled += 1
+        if not self._closed:
+            self._idle.put(self._start_worker())
+
+    def run(self, func: Callable[..., Any], *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """
+        Call a function in a worker.
+
+        The function and its arguments are pickled, so the function must be
+        defined at module level.
+
+        Args:
+            func: Function to call
+            *args: Its positional arguments
+            timeout: Wall-clock seconds, including any wait for a free worker
+                (defaults to the sandbox's timeout)
+            **kwargs: Its keyword arguments
+
+        Returns:
+            What the function returned
+
+        Raises:
+            ToolTimeout: If no worker became free or the call ran past its timeout
+            ToolError: If the call raised, its worker died (e.g. on hitting the
+                CPU limit) or the sandbox is closed
+        """
+        if self._closed:
+            raise ToolError("Tool sandbox is closed")
+        if self._context is None:
+            self.start()
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        try:
+            worker = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            if self._closed:
+                raise ToolError("Tool sandbox is closed")
+            raise ToolTimeout(f"No tool worker became free within {timeout:g} seconds")
+        try:
+            worker.connection.send((func, args, kwargs))
+        except Exception:
+            # Nothing reached the worker (e.g. the arguments cannot be pickled)
+            self._idle.put(worker)
+            raise
+
+        if not worker.connection.poll(max(0.0, deadline - time.monotonic())):
+            logger.warning("Tool call %s timed out after %.2fs, killing worker", getattr(func, "__name__", func), timeout)
+            self._retire(worker, kill=True)
+            raise ToolTimeout(f"Timed out after {timeout:g} seconds")
+        try:
+            status, value = worker.connection.recv()
+        except (EOFError, OSError):
+            worker.process.join(0.5)
+            exit_code = worker.process.exitcode
+            self._retire(worker, kill=True)
+            if exit_code == -getattr(signal, "SIGXCPU", 0):
+                raise ToolError("CPU time limit exceeded")
+            raise ToolError(f"Tool worker died (exit code {exit_code})")
+
+        worker.calls += 1
+        if self._closed:
+            # The sandbox was closed while the call ran
+            with self._lock:
+                self._workers.discard(worker)
+            worker.stop()
+        elif worker.calls >= self.max_calls_per_worker:
+            self._retire(worker)
+        else:
+            self._idle.put(worker)
+        if status == "error":
+            raise ToolError(value)
+        return value
+
+    def configure(self, timeout: float, cpu_seconds: float, memory_mb: int, max_calls_per_worker: int) -> None:
+        """
+        Change the limits; calls already running keep theirs.
+
+        The timeout applies from the next call; CPU and memory limits are
+        set when a worker starts, so they apply as workers are replaced.
+        """
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_mb * 1024 * 1024
+        self.max_calls_per_worker = max_calls_per_worker
+
+    def close(self) -> None:
+        """Stop the workers; later calls fail until ``start`` is called again."""
+        self._closed = True
+        with self._lock:
+            workers, self._workers = list(self._workers), set()
+            self._context = None
+        for worker in workers:
+            worker.stop()
+        while not self._idle.empty():
+            self._idle.get_nowait()
+
+
+_sandbox: Optional[ToolSandbox] = None
+_sandbox_lock = threading.Lock()
+
+
+def get_sandbox() -> Optional[ToolSandbox]:
+    """
+    Return the shared sandbox, or None if TOOL_SANDBOX is "off".
+
+    Workers are started on first use; call ``start()`` on the result to
+    start them ahead of time.
+    """
+    global _sandbox
+    if TOOL_SANDBOX == "off" or _in_worker:
+        return None
+    with _sandbox_lock:
+        if _sandbox is None:
+            settings = get_settings()
+            _sandbox = ToolSandbox(
+                workers=settings.tool_sandbox_workers or os.cpu_count() or 1,
+                timeout=settings.tool_timeout,
+                cpu_seconds=settings.tool_cpu_seconds,
+                memory_mb=settings.tool_memory_mb,
+                max_calls_per_worker=settings.tool_max_calls_per_worker
+            )
+            atexit.register(_sandbox.close)
+        return _sandbox
+
+
+def _apply_settings(settings: Settings) -> None:
+    if _sandbox is not None:
+        _sandbox.configure(
+            settings.tool_timeout, settings.tool_cpu_seconds, settings.tool_memory_mb, settings.tool_max_calls_per_worker
+        )
+
+
+on_reload(_apply_settings)
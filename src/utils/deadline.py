@@ -0,0 +1,78 @@
+"""
+Request deadlines and cooperative cancellation.
+"""
+
+import threading
+import time
+from typing import Optional
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request runs past its deadline or is cancelled."""
+
+
+class Deadline:
+    """
+    A point in time after which a request should stop doing upstream work.
+
+    Deadlines are shared between the web layer (which may cancel them when the
+    client disconnects) and the worker thread running the reasoner (which
+    checks them before every upstream call and bounds each call's timeout by
+    the remaining budget).
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        """
+        Initialize the deadline.
+
+        Args:
+            timeout: Seconds from now until expiry, or None for no limit
+        """
+        self.expires_at = time.monotonic() + timeout if timeout else None
+        self._cancelled = threading.Event()
+        self._parent: Optional["Deadline"] = None
+
+    def child(self) -> "Deadline":
+        """
+        Create a deadline for part of the request's work.
+
+        The child expires with this deadline and is cancelled with it, but
+        can also be cancelled on its own, e.g. to stop a speculative attempt.
+        """
+        child = Deadline()
+        child.expires_at = self.expires_at
+        child._parent = self
+        return child
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before expiry (never negative), or None if unbounded."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        """Whether the deadline has passed or the request was cancelled."""
+        if self.cancelled:
+            return True
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def cancel(self) -> None:
+        """Cancel the request, e.g. because the client went away."""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set() or (self._parent is not None and self._parent.cancelled)
+
+    def check(self) -> None:
+        """
+        Raise DeadlineExceeded if no more work should be started.
+
+        Raises:
+            DeadlineExceeded: If the deadline expired or was cancelled
+        """
+        if self.cancelled:
+            raise DeadlineExceeded("Request was cancelled")
+        if self.expired:
+            raise DeadlineExceeded("Request deadline exceeded")
@@ -43,5 +43,5 @@ def patch_groq_client():
             return False
     
     except Exception as e:
-        logger.error(f"Failed to patch Groq client: {e}")
+        logger.error("Failed to patch Groq client: %s", e)
         return False
@@ -1,37 +1,212 @@
 """
 This module provides logging functionality for the application.
+
+Loggers enqueue records on an in-memory queue; a single background listener
+thread formats them and writes them out, so logging never blocks the event
+loop on stdout. Records carry the current request id and can be emitted as
+plain text or as JSON lines (LOG_FORMAT=json). High-volume DEBUG records can
+be sampled with LOG_DEBUG_SAMPLE_RATE.
 """
 
+import atexit
+import contextvars
+import json
 import logging
+import logging.handlers
+import queue
+import random
 import sys
-from typing import Optional
+import threading
+import uuid
+from typing import IO, Optional
+
+from src.config import LOG_LEVEL, LOG_FORMAT, LOG_DEBUG_SAMPLE_RATE
+
+# Id of the request being handled in the current context (task or thread)
+request_id_var: contextvars.ContextVar = contextvars.ContextVar("request_id", default=None)
+
+_TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s'
+
+_log_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_lock = threading.Lock()
+
+
+def new_request_id() -> str:
+    """Generate a new random request id."""
+    return uuid.uuid4().hex[:16]
+
+
+def get_request_id() -> Optional[str]:
+    """Return the request id of the current context, if any."""
+    return request_id_var.get()
+
+
+def set_request_id(request_id: Optional[str]) -> contextvars.Token:
+    """
+    Set the request id for the current context.
+
+    Args:
+        request_id: The request id to attach to subsequent log records
+
+    Returns:
+        Token that can be passed to reset_request_id
+    """
+    return request_id_var.set(request_id)
+
+
+def reset_request_id(token: contextvars.Token) -> None:
+    """Restore the request id that was active before set_request_id."""
+    request_id_var.reset(token)
+
+
+class RequestContextFilter(logging.Filter):
+    """Attach the current request id to every record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get() or "-"
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of DEBUG records; other levels always pass."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that does the minimum of work in the calling thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args into the message in the calling thread (only reached when
+        # the level is enabled) so the listener never touches caller objects,
+        # but leave all other formatting to the listener thread.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure_logging(
+    stream: Optional[IO[str]] = None,
+    fmt: Optional[str] = None,
+    debug_sample_rate: Optional[float] = None
+) -> logging.Handler:
+    """
+    (Re)configure the shared logging pipeline.
+
+    Args:
+        stream: Output stream (defaults to stdout)
+        fmt: "text" or "json" (defaults to LOG_FORMAT from config)
+        debug_sample_rate: Fraction of DEBUG records to keep (defaults to config)
+
+    Returns:
+        The queue handler that loggers should attach
+    """
+    global _queue_handler, _listener
+
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+
+        handler = logging.StreamHandler(stream or sys.stdout)
+        if (fmt or LOG_FORMAT).lower() == "json":
+            handler.setFormatter(JsonFormatter())
+        else:
+            handler.setFormatter(logging.Formatter(_TEXT_FORMAT))
+
+        if _queue_handler is None:
+            _queue_handler = _QueueHandler(_log_queue)
+            _queue_handler.addFilter(RequestContextFilter())
+        _queue_handler.filters = [f for f in _queue_handler.filters if not isinstance(f, SamplingFilter)]
+        rate = LOG_DEBUG_SAMPLE_RATE if debug_sample_rate is None else debug_sample_rate
+        if rate < 1.0:
+            _queue_handler.addFilter(SamplingFilter(rate))
+
+        _listener = logging.handlers.QueueListener(_log_queue, handler)
+        _listener.start()
+
+    return _queue_handler
+
+
+def flush_logging() -> None:
+    """Stop the listener after draining queued records; it restarts on next configure."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+atexit.register(flush_logging)
+
+
+def set_log_level(level: str, debug_sample_rate: Optional[float] = None) -> None:
+    """
+    Change the level of every logger created with get_logger, e.g. on a settings reload.
+
+    Args:
+        level: The new logging level
+        debug_sample_rate: Fraction of DEBUG records to keep (None leaves it unchanged)
+    """
+    for logger in list(logging.Logger.manager.loggerDict.values()):
+        if isinstance(logger, logging.Logger) and _queue_handler in logger.handlers:
+            logger.setLevel(getattr(logging, level.upper()))
+    if debug_sample_rate is not None and _queue_handler is not None:
+        with _lock:
+            _queue_handler.filters = [f for f in _queue_handler.filters if not isinstance(f, SamplingFilter)]
+            if debug_sample_rate < 1.0:
+                _queue_handler.addFilter(SamplingFilter(debug_sample_rate))
 
-from src.config import LOG_LEVEL
 
 def get_logger(name: str, level: Optional[str] = None) -> logging.Logger:
     """
     Get a logger with the specified name and level.
-    
+
     Args:
         name: The name of the logger
         level: The logging level (defaults to LOG_LEVEL from config)
-        
+
     Returns:
         Configured logger instance
     """
     logger = logging.getLogger(name)
-    
+
     # Set level from parameter or config
     log_level = level or LOG_LEVEL
     logger.setLevel(getattr(logging, log_level))
-    
-    # Create handler if not already configured
+
+    # Attach the shared queue handler if not already configured
     if not logger.handlers:
-        handler = logging.StreamHandler(sys.stdout)
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        handler.setFormatter(formatter)
+        handler = _queue_handler if _listener is not None else configure_logging()
         logger.addHandler(handler)
-    
+
     return logger
@@ -0,0 +1,141 @@
+"""
+Analysis of exported trace files (OTLP/JSON lines written by src.utils.tracing).
+"""
+
+import json
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+
+def _attributes(span: Dict[str, Any]) -> Dict[str, Any]:
+    values = {}
+    for attribute in span.get("attributes", []):
+        value = attribute["value"]
+        values[attribute["key"]] = next(iter(value.values())) if value else None
+    return values
+
+
+def load_traces(path: str) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Read a trace file.
+
+    Args:
+        path: JSONL file of OTLP/JSON ExportTraceServiceRequests
+
+    Returns:
+        Mapping of trace id to spans, each span a dict with name, span_id,
+        parent_id, start_ns, end_ns, duration_ns, attributes and error
+    """
+    traces: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            for resource_spans in json.loads(line).get("resourceSpans", []):
+                for scope_spans in resource_spans.get("scopeSpans", []):
+                    for span in scope_spans.get("spans", []):
+                        start, end = int(span["startTimeUnixNano"]), int(span["endTimeUnixNano"])
+                        traces[span["traceId"]].append({
+                            "name": span["name"],
+                            "span_id": span["spanId"],
+                            "parent_id": span.get("parentSpanId"),
+                            "start_ns": start,
+                            "end_ns": end,
+                            "duration_ns": end - start,
+                            "attributes": _attributes(span),
+                            "error": span.get("status", {}).get("message"),
+                        })
+    return dict(traces)
+
+
+def root_span(spans: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Return the root span of a trace."""
+    return next((span for span in spans if not span["parent_id"]), None)
+
+
+def self_times(spans: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Compute the time each span spent outside its children.
+
+    Children that overlap (concurrent work) are merged, so self time is never negative.
+
+    Returns:
+        Mapping of span id to self time in nanoseconds
+    """
+    children = defaultdict(list)
+    for span in spans:
+        if span["parent_id"]:
+            children[span["parent_id"]].append(span)
+
+    result = {}
+    for span in spans:
+        covered = 0
+        cursor = span["start_ns"]
+        for child in sorted(children[span["span_id"]], key=lambda c: c["start_ns"]):
+            start = max(child["start_ns"], cursor, span["start_ns"])
+            end = min(child["end_ns"], span["end_ns"])
+            if end > start:
+                covered += end - start
+                cursor = end
+        result[span["span_id"]] = max(0, span["duration_ns"] - covered)
+    return result
+
+
+def collapsed_stacks(traces: Iterable[List[Dict[str, Any]]]) -> Dict[str, int]:
+    """
+    Aggregate traces into collapsed stacks for flame graph tools.
+
+    Args:
+        traces: Span lists of the traces to include
+
+    Returns:
+        Mapping of "root;child;grandchild" to total self time in microseconds
+        (the format read by flamegraph.pl and speedscope)
+    """
+    stacks: Dict[str, int] = defaultdict(int)
+    for spans in traces:
+        by_id = {span["span_id"]: span for span in spans}
+        own = self_times(spans)
+        for span in spans:
+            path = [span["name"]]
+            parent = by_id.get(span["parent_id"])
+            while parent is not None:
+                path.append(parent["name"])
+                parent = by_id.get(parent["parent_id"])
+            stacks[";".join(reversed(path))] += own[span["span_id"]] // 1000
+    return dict(stacks)
+
+
+def span_statistics(traces: Iterable[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Summarize spans by name.
+
+    Returns:
+        One row per span name with count, total/self time and p50/p95
+        duration in milliseconds, sorted by total self time
+    """
+    durations: Dict[str, List[float]] = defaultdict(list)
+    self_ms: Dict[str, float] = defaultdict(float)
+    errors: Dict[str, int] = defaultdict(int)
+    for spans in traces:
+        own = self_times(spans)
+        for span in spans:
+            durations[span["name"]].append(span["duration_ns"] / 1e6)
+            self_ms[span["name"]] += own[span["span_id"]] / 1e6
+            if span["error"]:
+                errors[span["name"]] += 1
+
+    rows = []
+    for name, values in durations.items():
+        values.sort()
+        rows.append({
+            "name": name,
+            "count": len(values),
+            "total_ms": sum(values),
+            "self_ms": self_ms[name],
+            "p50_ms": values[len(values) // 2],
+            "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))],
+            "errors": errors[name],
+        })
+    rows.sort(key=lambda row: row["self_ms"], reverse=True)
+    return rows
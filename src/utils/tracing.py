@@ -0,0 +1,318 @@
+"""
+Request-scoped tracing.
+
+Spans are recorded only inside a trace started with ``start_trace`` (the web
+app starts one per request) and only when tracing is enabled, so ``span()``
+costs a context variable lookup otherwise. The current span is held in a
+context variable, so spans opened in ``asyncio.to_thread`` workers nest
+under the request's span.
+
+Finished traces are exported in the OTLP/JSON format (one
+ExportTraceServiceRequest per line) to ``TRACE_FILE`` and/or posted to an
+OTLP/HTTP collector at ``TRACE_OTLP_ENDPOINT``, from a background thread.
+"""
+
+import contextvars
+import functools
+import json
+import os
+import queue
+import re
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from src.config import TRACE_FILE, TRACE_OTLP_ENDPOINT, TRACE_SERVICE_NAME
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = ("name", "trace", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace: "Trace", parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach an attribute to the span."""
+        self.attributes[key] = value
+
+    def end(self) -> None:
+        """Finish the span; finishing the root span exports the trace."""
+        self.end_ns = time.time_ns()
+        if self.parent_id is None:
+            self.trace.finish()
+
+
+class _NoopSpan:
+    """Returned when no trace is active."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """The spans of one request."""
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def finish(self) -> None:
+        with self._lock:
+            spans = [span for span in self.spans if span.end_ns is not None]
+        _exporter.export(self.trace_id, spans)
+
+
+def trace_id_for(request_id: Optional[str]) -> str:
+    """
+    Derive the trace id from a request id.
+
+    Hexadecimal request ids (such as the ones the app generates) are
+    zero-padded to 32 digits, so a trace can be found from the X-Request-ID
+    header; anything else gets a random trace id.
+    """
+    if request_id and re.fullmatch(r"[0-9a-f]{1,32}", request_id):
+        return request_id.zfill(32)
+    return os.urandom(16).hex()
+
+
+def _attribute_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # OTLP/JSON encodes 64-bit integers as strings
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(trace_id: str, spans: List[Span]) -> Dict[str, Any]:
+    """
+    Encode spans as an OTLP/JSON ExportTraceServiceRequest.
+
+    Args:
+        trace_id: Id of the trace
+        spans: Finished spans
+
+    Returns:
+        The request body
+    """
+    encoded = []
+    for span in spans:
+        item = {
+            "traceId": trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": [{"key": key, "value": _attribute_value(value)} for key, value in span.attributes.items()],
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+        }
+        if span.parent_id:
+            item["parentSpanId"] = span.parent_id
+        encoded.append(item)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": TRACE_SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "src.utils.tracing"}, "spans": encoded}],
+        }]
+    }
+
+
+class _Exporter:
+    """Writes finished traces from a background thread."""
+
+    def __init__(self):
+        self.file = TRACE_FILE
+        self.endpoint = TRACE_OTLP_ENDPOINT
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.file or self.endpoint)
+
+    def configure(self, file: Optional[str] = None, endpoint: Optional[str] = None) -> None:
+        self.flush()
+        self.file = file
+        self.endpoint = endpoint
+
+    def export(self, trace_id: str, spans: List[Span]) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+        self._queue.put((trace_id, spans))
+
+    def flush(self, timeout: float = 5.0) -> None:
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            body = json.dumps(to_otlp(*item))
+            try:
+                if self.file:
+                    with open(self.file, "a", encoding="utf-8") as f:
+                        f.write(body + "\n")
+                if self.endpoint:
+                    request = urllib.request.Request(
+                        self.endpoint, data=body.encode("utf-8"), headers={"Content-Type": "application/json"}
+                    )
+                    urllib.request.urlopen(request, timeout=5).close()
+            except OSError as e:
+                logger.warning("Could not export trace %s: %s", item[0], e)
+
+
+_exporter = _Exporter()
+
+
+def configure_tracing(file: Optional[str] = None, endpoint: Optional[str] = None) -> None:
+    """
+    Set where traces are exported; tracing is disabled when neither is set.
+
+    Args:
+        file: JSONL file to append traces to
+        endpoint: OTLP/HTTP traces endpoint, e.g. http://localhost:4318/v1/traces
+    """
+    _exporter.configure(file, endpoint)
+
+
+def flush_tracing(timeout: float = 5.0) -> None:
+    """Wait until traces finished so far have been exported."""
+    _exporter.flush(timeout)
+
+
+def tracing_enabled() -> bool:
+    """Return whether traces are being exported."""
+    return _exporter.enabled
+
+
+@contextmanager
+def start_trace(name: str, request_id: Optional[str] = None, **attributes: Any) -> Iterator[Any]:
+    """
+    Start a trace with a root span; the trace is exported when the span ends.
+
+    Does nothing when tracing is disabled.
+
+    Args:
+        name: Name of the root span
+        request_id: Request id the trace id is derived from
+        **attributes: Attributes of the root span
+
+    Yields:
+        The root span
+    """
+    if not _exporter.enabled:
+        yield _NOOP_SPAN
+        return
+    trace = Trace(trace_id_for(request_id))
+    if request_id:
+        attributes["request.id"] = request_id
+    with _open_span(name, trace, None, attributes) as root:
+        yield root
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """
+    Record a span as a child of the current span.
+
+    Does nothing outside a trace.
+
+    Args:
+        name: Name of the span, e.g. "llm.completion"
+        **attributes: Attributes of the span
+
+    Yields:
+        The span (call set_attribute to add attributes)
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield _NOOP_SPAN
+        return
+    with _open_span(name, parent.trace, parent.span_id, attributes) as child:
+        yield child
+
+
+@contextmanager
+def _open_span(name: str, trace: Trace, parent_id: Optional[str], attributes: Dict[str, Any]) -> Iterator[Span]:
+    current = Span(name, trace, parent_id, attributes)
+    trace.add(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end()
+
+
+def traced(name: str) -> Callable:
+    """Decorator recording each call of a function as a span."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def add_span(name: str, start_ns: int, end_ns: Optional[int] = None, **attributes: Any) -> None:
+    """
+    Record an already finished span as a child of the current span.
+
+    For timing code that cannot be wrapped in ``span()``, such as the body
+    of a generator, which may be resumed in a different context.
+
+    Args:
+        name: Name of the span
+        start_ns: Start time from time.time_ns()
+        end_ns: End time (defaults to now)
+        **attributes: Attributes of the span
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return
+    finished = Span(name, parent.trace, parent.span_id, attributes)
+    finished.start_ns = start_ns
+    finished.end_ns = end_ns or time.time_ns()
+    parent.trace.add(finished)
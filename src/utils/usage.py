@@ -0,0 +1,300 @@
+"""
+Token and cost accounting.
+
+Every completion is recorded with the feature that made it ("structured",
+"unstructured", "tool_round", "json_reask", "fallback", "stream", "hedge")
+and the caller it was made for. Usage is added to the current request's
+UsageMeter, if one is active, and to the process-wide ledger, which keeps
+cumulative totals (served by /metrics) and periodically flushes the usage
+of each interval to USAGE_LEDGER_PATH: an SQLite database, or a CSV file
+if the path ends in ".csv".
+"""
+
+import atexit
+import contextvars
+import csv
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.config import USAGE_LEDGER_PATH, USAGE_PRICES
+from src.settings import get_settings, on_reload
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# USD per million (input, output) tokens; override or extend with USAGE_PRICES
+DEFAULT_PRICES: Dict[str, Tuple[float, float]] = {
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "llama-3.1-8b-instant": (0.05, 0.08),
+}
+
+COLUMNS = ("period_start", "period_end", "caller", "feature", "model",
+           "calls", "prompt_tokens", "completion_tokens", "cost_usd")
+
+_current_meter: contextvars.ContextVar = contextvars.ContextVar("usage_meter", default=None)
+
+
+def _load_prices() -> Dict[str, Tuple[float, float]]:
+    prices = dict(DEFAULT_PRICES)
+    if USAGE_PRICES:
+        try:
+            prices.update({model: tuple(price) for model, price in json.loads(USAGE_PRICES).items()})
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.warning("Ignoring invalid USAGE_PRICES: %s", e)
+    return prices
+
+
+PRICES = _load_prices()
+
+
+def cost_of(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Return the cost in USD of a completion (0 for models without a price)."""
+    input_price, output_price = PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token), for completions without reported usage."""
+    return math.ceil(len(text) / 4)
+
+
+def _empty() -> Dict[str, Any]:
+    return {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0}
+
+
+def _add(counters: Dict[str, Any], prompt_tokens: int, completion_tokens: int, cost: float) -> None:
+    counters["calls"] += 1
+    counters["prompt_tokens"] += prompt_tokens
+    counters["completion_tokens"] += completion_tokens
+    counters["cost_usd"] += cost
+
+
+class UsageMeter:
+    """Usage of a single request, broken down by feature."""
+
+    def __init__(self, caller: str = "local"):
+        """
+        Initialize the meter.
+
+        Args:
+            caller: Ledger name of the caller the usage is attributed to
+        """
+        self.caller = caller
+        self.by_feature: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, feature: str, prompt_tokens: int, completion_tokens: int, cost: float) -> None:
+        """Add one completion."""
+        with self._lock:
+            _add(self.by_feature.setdefault(feature, _empty()), prompt_tokens, completion_tokens, cost)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Return the request's usage.
+
+        Returns:
+            Totals (calls, prompt_tokens, completion_tokens, total_tokens,
+            cost_usd) and the same counters per feature under "by_feature"
+        """
+        with self._lock:
+            by_feature = {feature: dict(counters) for feature, counters in self.by_feature.items()}
+        totals = _empty()
+        for counters in by_feature.values():
+            for key in totals:
+                totals[key] += counters[key]
+        totals["total_tokens"] = totals["prompt_tokens"] + totals["completion_tokens"]
+        totals["by_feature"] = by_feature
+        return totals
+
+
+class UsageLedger:
+    """Process-wide usage per (caller, feature, model), flushed periodically."""
+
+    def __init__(self, path: Optional[str] = None, flush_interval: float = 30.0):
+        """
+        Initialize the ledger.
+
+        Args:
+            path: SQLite database or CSV file the usage is flushed to (None keeps it in memory)
+            flush_interval: Seconds between flushes
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self._totals: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self._pending: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self._period_start = time.time()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._listeners: List[Callable[[str, str, str, int, int, float], None]] = []
+
+    def add_listener(self, listener: Callable[[str, str, str, int, int, float], None]) -> None:
+        """Call a function with the caller, feature, model, tokens and cost of every completion recorded."""
+        self._listeners.append(listener)
+
+    def record(self, caller: str, feature: str, model: str, prompt_tokens: int, completion_tokens: int, cost: float) -> None:
+        """Add one completion."""
+        key = (caller, feature, model)
+        with self._lock:
+            _add(self._totals.setdefault(key, _empty()), prompt_tokens, completion_tokens, cost)
+            if self.path:
+                _add(self._pending.setdefault(key, _empty()), prompt_tokens, completion_tokens, cost)
+                if self._thread is None:
+                    self._start()
+        for listener in self._listeners:
+            listener(caller, feature, model, prompt_tokens, completion_tokens, cost)
+
+    def totals(self) -> Dict[Tuple[str, str, str], Dict[str, Any]]:
+        """Return cumulative usage keyed by (caller, feature, model)."""
+        with self._lock:
+            return {key: dict(counters) for key, counters in self._totals.items()}
+
+    def _start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="usage-ledger", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Write the usage recorded since the last flush.
+
+        Returns:
+            Number of rows written
+        """
+        with self._write_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                start, end = self._period_start, time.time()
+                self._period_start = end
+            if not pending or not self.path:
+                return 0
+
+            rows = [
+                (_timestamp(start), _timestamp(end), caller, feature, model, counters["calls"],
+                 counters["prompt_tokens"], counters["completion_tokens"], round(counters["cost_usd"], 8))
+                for (caller, feature, model), counters in sorted(pending.items())
+            ]
+            try:
+                if self.path.endswith(".csv"):
+                    self._write_csv(rows)
+                else:
+                    self._write_sqlite(rows)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning("Could not write usage ledger %s: %s", self.path, e)
+                return 0
+            return len(rows)
+
+    def _write_csv(self, rows: List[Tuple]) -> None:
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(COLUMNS)
+            writer.writerows(rows)
+
+    def _write_sqlite(self, rows: List[Tuple]) -> None:
+        connection = sqlite3.connect(self.path)
+        try:
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS usage (period_start TEXT, period_end TEXT, caller TEXT, "
+                    "feature TEXT, model TEXT, calls INTEGER, prompt_tokens INTEGER, "
+                    "completion_tokens INTEGER, cost_usd REAL)"
+                )
+                connection.executemany(f"INSERT INTO usage VALUES ({', '.join('?' * len(COLUMNS))})", rows)
+        finally:
+            connection.close()
+
+    def close(self) -> None:
+        """Stop the flush thread and write what is left."""
+        self._stop.set()
+        self.flush()
+
+
+def _timestamp(seconds: float) -> str:
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat(timespec="seconds")
+
+
+ledger = UsageLedger(USAGE_LEDGER_PATH, get_settings().usage_flush_interval)
+# The flush thread picks up a new interval after its current wait
+on_reload(lambda settings: setattr(ledger, "flush_interval", settings.usage_flush_interval))
+
+
+def record_usage(feature: str, model: str, usage: Optional[Dict[str, int]]) -> None:
+    """
+    Record a completion in the current meter and the ledger.
+
+    Args:
+        feature: What the completion was for, e.g. "tool_round"
+        model: Model that served it
+        usage: Usage reported by the backend (None counts the call without tokens)
+    """
+    prompt_tokens = (usage or {}).get("prompt_tokens", 0)
+    completion_tokens = (usage or {}).get("completion_tokens", 0)
+    cost = cost_of(model, prompt_tokens, completion_tokens)
+    meter = _current_meter.get()
+    if meter is not None:
+        meter.add(feature, prompt_tokens, completion_tokens, cost)
+    ledger.record(meter.caller if meter is not None else "local", feature, model, prompt_tokens, completion_tokens, cost)
+
+
+@contextmanager
+def metering(caller: str = "local") -> Iterator[UsageMeter]:
+    """
+    Meter the completions made inside the block (including in threads started with asyncio.to_thread).
+
+    Args:
+        caller: Ledger name of the caller
+
+    Yields:
+        The meter
+    """
+    meter = UsageMeter(caller)
+    token = _current_meter.set(meter)
+    try:
+        yield meter
+    finally:
+        _current_meter.reset(token)
+
+
+def metered(events: Iterator[Any], meter: UsageMeter) -> Iterator[Any]:
+    """
+    Meter a generator's completions.
+
+    The meter is made current around each step, so it applies even when
+    the generator is advanced from different threads.
+
+    Args:
+        events: The generator
+        meter: Meter to record into
+
+    Yields:
+        The generator's items
+    """
+    try:
+        while True:
+            token = _current_meter.set(meter)
+            try:
+                event = next(events)
+            except StopIteration:
+                return
+            finally:
+                _current_meter.reset(token)
+            yield event
+    finally:
+        # Closing early closes the generator, and with it any upstream stream
+        close = getattr(events, "close", None)
+        if close is not None:
+            close()
@@ -0,0 +1,362 @@
+"""
+Admission control for the web API: bounded priority queueing, fair sharing
+between tenants, deadlines and load shedding.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from src.utils.deadline import Deadline, DeadlineExceeded
+from src.utils.logger import get_logger
+from src.utils.tracing import span
+from src.web.profiling import cpu_timed
+from src.web.tenants import Tenant
+
+logger = get_logger(__name__)
+
+# Slots taken without naming a tenant
+LOCAL_TENANT = Tenant("local")
+
+# Recent request latencies kept per tenant for /metrics
+LATENCY_SAMPLES = 1000
+
+# Tenants whose statistics are kept before idle ones are forgotten
+MAX_TRACKED_TENANTS = 10000
+
+
+class Priority(IntEnum):
+    """Request priority classes; lower values are served first."""
+
+    INTERACTIVE = 0
+    BATCH = 1
+
+    @classmethod
+    def parse(cls, value: Optional[str]) -> "Priority":
+        """
+        Parse a priority name as sent by API clients.
+
+        Args:
+            value: "interactive", "batch" or None (interactive)
+
+        Returns:
+            The matching Priority
+        """
+        if not value:
+            return cls.INTERACTIVE
+        try:
+            return cls[value.strip().upper()]
+        except KeyError:
+            raise ValueError(f"Unknown priority '{value}', expected one of: interactive, batch")
+
+
+class QueueFullError(Exception):
+    """Raised when a request is shed because the admission queue is full."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Admission queue is full")
+        self.retry_after = retry_after
+
+
+class _TenantState:
+    """Scheduling state and statistics of one tenant."""
+
+    def __init__(self):
+        self.active = 0
+        self.queued = 0
+        # Start-time fair queueing: virtual time at which the tenant's last request finishes
+        self.finish_tag = 0.0
+        self.admitted = 0
+        self.throttled = 0
+        self.shed = 0
+        self.wait_seconds = 0.0
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+
+class AdmissionController:
+    """
+    Limits how many requests run concurrently and queues the rest by priority.
+
+    Requests beyond ``max_concurrency`` wait in a bounded queue ordered by
+    priority class and arrival. When the queue is full new requests are
+    rejected immediately with a Retry-After estimate instead of piling up
+    behind work that will not finish in time. Batch traffic may only occupy
+    ``batch_queue_share`` of the queue so that interactive requests are not
+    shed because of a batch flood.
+
+    Within a priority class, waiting requests are served by weighted fair
+    queueing across tenants (start-time fair queueing, one unit of work per
+    request): a tenant with many queued requests does not delay a tenant
+    that sends few, and a tenant of weight 2 gets twice the slots of one of
+    weight 1 while both are waiting. A tenant's ``max_concurrency`` caps
+    the slots it holds; its further requests wait even when slots are free.
+
+    All methods must be called from the event loop thread.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int,
+        batch_queue_share: float = 0.5,
+        initial_service_time: float = 5.0
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            max_concurrency: Maximum number of requests running at once
+            max_queue: Maximum number of requests waiting for a slot
+            batch_queue_share: Fraction of the queue batch requests may use
+            initial_service_time: Seed for the service time estimate, in seconds
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.batch_queue_share = batch_queue_share
+        self._active = 0
+        self._queued = 0
+        self._waiters: List[Tuple[int, float, int, asyncio.Future, Tenant]] = []
+        self._seq = itertools.count()
+        self._virtual_time = 0.0
+        self._tenants: Dict[str, _TenantState] = {}
+        self._service_time = initial_service_time
+        self.shed_count = 0
+
+    def configure(self, max_concurrency: int, max_queue: int) -> None:
+        """
+        Change the limits, e.g. on a settings reload.
+
+        Requests holding a slot keep it; when the limit shrinks, queued
+        requests wait until enough of them have finished.
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._dispatch()
+
+    @property
+    def active(self) -> int:
+        """Number of requests currently holding a slot."""
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        """Number of requests waiting for a slot."""
+        return self._queued
+
+    def retry_after(self) -> int:
+        """
+        Estimate how many seconds a shed client should wait before retrying.
+
+        Returns:
+            Whole seconds until the current queue is expected to drain (at least 1)
+        """
+        backlog = self._queued + 1
+        return max(1, math.ceil(self._service_time * backlog / max(1, self.max_concurrency)))
+
+    def _queue_limit(self, priority: Priority) -> int:
+        if priority == Priority.BATCH:
+            return int(self.max_queue * self.batch_queue_share)
+        return self.max_queue
+
+    def _state(self, tenant: Tenant) -> _TenantState:
+        state = self._tenants.get(tenant.name)
+        if state is None:
+            if len(self._tenants) >= MAX_TRACKED_TENANTS:
+                # Forget idle tenants rather than growing without bound
+                for name in [name for name, idle in self._tenants.items() if not idle.active and not idle.queued]:
+                    del self._tenants[name]
+            state = self._tenants[tenant.name] = _TenantState()
+        return state
+
+    def _has_room(self, tenant: Tenant, state: _TenantState) -> bool:
+        return tenant.max_concurrency is None or state.active < tenant.max_concurrency
+
+    def _start_tag(self, tenant: Tenant, state: _TenantState) -> float:
+        start = max(self._virtual_time, state.finish_tag)
+        state.finish_tag = start + 1.0 / max(tenant.weight, 1e-6)
+        return start
+
+    def _grant(self, state: _TenantState) -> None:
+        self._active += 1
+        state.active += 1
+        state.admitted += 1
+
+    def _dispatch(self) -> None:
+        """Hand free slots to the first waiters whose tenants may take them."""
+        skipped = []
+        while self._waiters and self._active < self.max_concurrency:
+            entry = heapq.heappop(self._waiters)
+            _, start, _, future, tenant = entry
+            if future.done():
+                continue
+            state = self._state(tenant)
+            if not self._has_room(tenant, state):
+                skipped.append(entry)
+                continue
+            self._virtual_time = max(self._virtual_time, start)
+            self._grant(state)
+            future.set_result(None)
+        for entry in skipped:
+            heapq.heappush(self._waiters, entry)
+
+    async def acquire(self, priority: Priority, deadline: Optional[Deadline] = None, tenant: Optional[Tenant] = None) -> None:
+        """
+        Wait for a slot.
+
+        Args:
+            priority: Priority class of the request
+            deadline: Deadline after which the request gives up waiting
+            tenant: Caller the slot is for (defaults to a shared "local" tenant)
+
+        Raises:
+            QueueFullError: If the queue is full and the request was shed
+            DeadlineExceeded: If the deadline expired while waiting
+        """
+        tenant = tenant or LOCAL_TENANT
+        state = self._state(tenant)
+        has_room = self._has_room(tenant, state)
+        # Slots are handed out as soon as they free up, so waiters left in
+        # the queue while a slot is free all belong to tenants at their limit
+        if self._active < self.max_concurrency and has_room:
+            self._virtual_time = max(self._virtual_time, self._start_tag(tenant, state))
+            self._grant(state)
+            return
+
+        if self._queued >= self._queue_limit(priority):
+            self.shed_count += 1
+            state.shed += 1
+            raise QueueFullError(self.retry_after())
+        if not has_room:
+            state.throttled += 1
+
+        arrived = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), self._start_tag(tenant, state), next(self._seq), future, tenant))
+        self._queued += 1
+        state.queued += 1
+        with span("admission.queue", priority=priority.name.lower(), tenant=tenant.name, queued=self._queued):
+            try:
+                timeout = deadline.remaining() if deadline is not None else None
+                await asyncio.wait_for(future, timeout=timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                if future.done() and not future.cancelled():
+                    # The slot was handed to us just as we gave up; pass it on
+                    self.release(tenant)
+                else:
+                    future.cancel()
+                if isinstance(e, asyncio.TimeoutError):
+                    raise DeadlineExceeded("Request deadline exceeded while queued")
+                raise
+            finally:
+                self._queued -= 1
+                state.queued -= 1
+                state.wait_seconds += time.monotonic() - arrived
+
+    def release(self, tenant: Optional[Tenant] = None, since: Optional[float] = None) -> None:
+        """
+        Release a slot, handing it to the next waiter if there is one.
+
+        Args:
+            tenant: Caller the slot was acquired for
+            since: time.monotonic() when the request arrived, to record its latency
+        """
+        state = self._state(tenant or LOCAL_TENANT)
+        self._active -= 1
+        state.active -= 1
+        if since is not None:
+            state.latencies.append(time.monotonic() - since)
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority, deadline: Optional[Deadline] = None, tenant: Optional[Tenant] = None):
+        """
+        Hold a slot for the duration of the block.
+
+        Args:
+            priority: Priority class of the request
+            deadline: Deadline after which the request gives up waiting
+            tenant: Caller the slot is for
+        """
+        arrived = time.monotonic()
+        await self.acquire(priority, deadline, tenant)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            # Exponentially weighted average keeps Retry-After responsive to load
+            self._service_time = 0.8 * self._service_time + 0.2 * elapsed
+            self.release(tenant, since=arrived)
+
+    def tenant_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return per-tenant scheduling statistics.
+
+        Returns:
+            Tenant name -> active and queued requests, requests admitted,
+            throttled by the tenant's concurrency limit and shed, total
+            seconds spent queued and the latencies of recent requests
+        """
+        return {
+            name: {
+                "active": state.active,
+                "queued": state.queued,
+                "admitted": state.admitted,
+                "throttled": state.throttled,
+                "shed": state.shed,
+                "wait_seconds": state.wait_seconds,
+                "latencies": list(state.latencies),
+            }
+            for name, state in sorted(self._tenants.items())
+        }
+
+
+async def _cancel_on_disconnect(request: Any, deadline: Deadline, interval: float = 0.5) -> None:
+    while not deadline.expired:
+        if await request.is_disconnected():
+            logger.info("Client disconnected, cancelling request")
+            deadline.cancel()
+            return
+        await asyncio.sleep(interval)
+
+
+async def run_with_deadline(request: Any, deadline: Deadline, func: Callable, /, *args, **kwargs) -> Any:
+    """
+    Run a blocking function in a worker thread, bounded by a deadline.
+
+    The deadline is cancelled when the client disconnects or the time runs
+    out, which stops the function from starting further upstream calls
+    (functions receiving the deadline call ``deadline.check()`` and bound
+    their upstream timeouts by ``deadline.remaining()``).
+
+    Args:
+        request: The incoming Starlette request, used to detect disconnects
+        deadline: The request deadline
+        func: Blocking function to run
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        The function's return value
+
+    Raises:
+        DeadlineExceeded: If the deadline expired or the client disconnected
+    """
+    work = asyncio.ensure_future(asyncio.to_thread(cpu_timed(func), *args, **kwargs))
+    watcher = asyncio.ensure_future(_cancel_on_disconnect(request, deadline))
+    try:
+        done, _ = await asyncio.wait({work, watcher}, timeout=deadline.remaining(), return_when=asyncio.FIRST_COMPLETED)
+        if work in done:
+            return work.result()
+        deadline.cancel()
+        # The worker thread notices the cancellation at its next check
+        work.add_done_callback(lambda task: task.exception())
+        raise DeadlineExceeded("Request cancelled" if deadline.cancelled and watcher in done else "Request deadline exceeded")
+    finally:
+        watcher.cancel()
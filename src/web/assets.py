@@ -0,0 +1,453 @@
+"""
+Build pipeline for the web UI's static assets.
+
+Produces ``static/dist`` containing minified, content-fingerprinted copies of
+``app.js`` and ``style.css``, self-hosted subsets of the Font Awesome and
+Google Fonts assets the page uses, a rewritten ``index.html`` and
+precompressed ``.gz``/``.br`` siblings for every text asset.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import urllib.request
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.utils.logger import get_logger
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; only .gz siblings are produced without it
+    brotli = None
+
+logger = get_logger(__name__)
+
+FONT_AWESOME_CSS_URL = "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css"
+FONT_AWESOME_SOLID_URL = "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/webfonts/fa-solid-900.woff2"
+
+# Google Fonts serves woff2 with per-script unicode ranges only to modern browsers
+_BROWSER_USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+)
+
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".json", ".svg", ".txt")
+
+FINGERPRINT_PATTERN = re.compile(r"\.[0-9a-f]{10}\.[A-Za-z0-9]+$")
+
+
+def fingerprint(content: bytes) -> str:
+    """Return the short content hash used in asset file names."""
+    return hashlib.sha256(content).hexdigest()[:10]
+
+
+def fingerprinted_name(name: str, content: bytes) -> str:
+    """
+    Insert the content hash before the file extension.
+
+    Args:
+        name: Original file name, e.g. "app.js"
+        content: File content
+
+    Returns:
+        Fingerprinted name, e.g. "app.3f2a9c01bd.js"
+    """
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{fingerprint(content)}{ext}"
+
+
+# String literals, which the minifiers copy unchanged, and CSS comments
+_CSS_TOKEN = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|/\*.*?(?:\*/|$)""", re.DOTALL)
+
+# Code after which a "/" starts a regular expression literal rather than a division
+_REGEX_PRECEDER = re.compile(r"(?:^|[(,=:\[!&|?{};+\-*%<>~^]|\b(?:return|typeof|case|do|else|in|of|new|delete|void|throw|yield|await))$")
+
+
+def _minify_css_code(css: str) -> str:
+    css = re.sub(r"\s+", " ", css)
+    # Whitespace before ":" is kept, as it separates a descendant pseudo-class ("a :hover")
+    css = re.sub(r"\s*([{};,])\s*", r"\1", css)
+    return re.sub(r":\s+", ":", css).replace(";}", "}")
+
+
+def minify_css(css: str) -> str:
+    """
+    Minify CSS by removing comments and redundant whitespace.
+
+    Strings are copied unchanged, and whitespace is only removed where it
+    cannot change a selector or value.
+
+    Args:
+        css: Stylesheet source
+
+    Returns:
+        Minified stylesheet
+    """
+    # Comments go first (each still separates what surrounds it), then whitespace outside strings
+    css = _CSS_TOKEN.sub(lambda match: match.group(1) or " ", css)
+    parts = []
+    position = 0
+    for match in _CSS_TOKEN.finditer(css):
+        parts.extend([_minify_css_code(css[position:match.start()]), match.group(1)])
+        position = match.end()
+    parts.append(_minify_css_code(css[position:]))
+    return "".join(parts).strip()
+
+
+def _string_end(js: str, start: int) -> int:
+    """Return the index after the string literal starting at start."""
+    quote = js[start]
+    i = start + 1
+    while i < len(js) and js[i] != quote and js[i] != "\n":
+        i += 2 if js[i] == "\\" else 1
+    return min(i + 1, len(js))
+
+
+def _template_end(js: str, start: int) -> int:
+    """Return the index after the template literal starting at start, including its ${} expressions."""
+    i = start + 1
+    while i < len(js):
+        if js[i] == "\\":
+            i += 2
+        elif js[i] == "`":
+            return i + 1
+        elif js.startswith("${", i):
+            depth = 1
+            i += 2
+            while i < len(js) and depth:
+                if js[i] in "'\"":
+                    i = _string_end(js, i)
+                    continue
+                if js[i] == "`":
+                    i = _template_end(js, i)
+                    continue
+                depth += {"{": 1, "}": -1}.get(js[i], 0)
+                i += 1
+        else:
+            i += 1
+    return len(js)
+
+
+def _regex_end(js: str, start: int) -> Optional[int]:
+    """Return the index after the regular expression literal starting at start, or None if there is none."""
+    i = start + 1
+    in_class = False
+    while i < len(js) and js[i] != "\n":
+        if js[i] == "\\":
+            i += 2
+            continue
+        if js[i] == "[":
+            in_class = True
+        elif js[i] == "]":
+            in_class = False
+        elif js[i] == "/" and not in_class:
+            i += 1
+            while i < len(js) and js[i].isalpha():
+                i += 1
+            return i
+        i += 1
+    return None
+
+
+def minify_js(js: str) -> str:
+    """
+    Conservatively minify JavaScript.
+
+    Removes comments, indentation, trailing whitespace and blank lines;
+    string, template and regular expression literals are copied unchanged.
+    Line breaks are kept, so automatic semicolon insertion is unaffected.
+
+    Args:
+        js: Script source
+
+    Returns:
+        Minified script
+    """
+    lines: List[str] = []
+    line: List[str] = []
+
+    def end_line() -> None:
+        text = "".join(line).rstrip()
+        if text:
+            lines.append(text)
+        line.clear()
+
+    i = 0
+    while i < len(js):
+        char = js[i]
+        if char == "\n":
+            end_line()
+            i += 1
+        elif char in " \t\r" and not "".join(line).strip():
+            i += 1  # Indentation
+        elif js.startswith("//", i):
+            end = js.find("\n", i)
+            i = len(js) if end < 0 else end
+        elif js.startswith("/*", i):
+            end = js.find("*/", i + 2)
+            end = len(js) if end < 0 else end + 2
+            if "\n" in js[i:end]:
+                end_line()
+            else:
+                line.append(" ")
+            i = end
+        elif char in "'\"`":
+            end = _template_end(js, i) if char == "`" else _string_end(js, i)
+            line.append(js[i:end])
+            i = end
+        elif char == "/" and _REGEX_PRECEDER.search("".join(line).rstrip()):
+            end = _regex_end(js, i)
+            line.append(js[i:end] if end else char)
+            i = end or i + 1
+        else:
+            line.append(char)
+            i += 1
+    end_line()
+    return "\n".join(lines) + "\n"
+
+
+def precompress(path: str) -> List[str]:
+    """
+    Write precompressed siblings of a file.
+
+    Args:
+        path: File to compress
+
+    Returns:
+        Paths of the files written
+    """
+    with open(path, "rb") as f:
+        content = f.read()
+
+    written = []
+    gz_path = path + ".gz"
+    with open(gz_path, "wb") as f:
+        # mtime=0 keeps the output reproducible between builds
+        f.write(gzip.compress(content, compresslevel=9, mtime=0))
+    written.append(gz_path)
+
+    if brotli is not None:
+        br_path = path + ".br"
+        with open(br_path, "wb") as f:
+            f.write(brotli.compress(content, quality=11))
+        written.append(br_path)
+
+    return written
+
+
+def used_icon_names(sources: Iterable[str]) -> List[str]:
+    """
+    Find the Font Awesome icon names referenced by the given sources.
+
+    Args:
+        sources: HTML/JS source texts
+
+    Returns:
+        Sorted icon names without the "fa-" prefix (style classes excluded)
+    """
+    style_classes = {"solid", "regular", "brands", "light", "thin", "duotone"}
+    names = set()
+    for source in sources:
+        for name in re.findall(r"\bfa-([a-z0-9-]+)", source):
+            if name not in style_classes:
+                names.add(name)
+    return sorted(names)
+
+
+def subset_font_awesome_css(full_css: str, icons: Iterable[str], font_url: str) -> str:
+    """
+    Build a minimal Font Awesome stylesheet for the given solid icons.
+
+    Args:
+        full_css: The upstream all.min.css
+        icons: Icon names to keep
+        font_url: URL of the self-hosted solid webfont
+
+    Returns:
+        Stylesheet with the base rules, the solid font face and one rule per icon
+    """
+    rules = [
+        "@font-face{font-family:\"Font Awesome 6 Free\";font-style:normal;font-weight:900;"
+        f"font-display:block;src:url({font_url}) format(\"woff2\")}}",
+        ".fa-solid{-moz-osx-font-smoothing:grayscale;-webkit-font-smoothing:antialiased;"
+        "display:var(--fa-display,inline-block);font-style:normal;font-variant:normal;"
+        "line-height:1;text-rendering:auto;font-family:\"Font Awesome 6 Free\";font-weight:900}",
+    ]
+    for icon in icons:
+        match = re.search(r"\.fa-" + re.escape(icon) + r":before(?:,[^{]*)?\{content:\"([^\"]+)\"\}", full_css)
+        if match:
+            rules.append(f".fa-{icon}:before{{content:\"{match.group(1)}\"}}")
+        else:
+            logger.warning("Icon fa-%s not found in Font Awesome stylesheet", icon)
+    return "".join(rules)
+
+
+def icon_codepoints(subset_css: str) -> List[int]:
+    """Return the code points of the icons in a subset stylesheet."""
+    return [int(code, 16) for code in re.findall(r"content:\"\\([0-9a-fA-F]+)\"", subset_css)]
+
+
+def subset_font(path: str, codepoints: List[int]) -> bool:
+    """
+    Subset a font to the given code points in place, if fontTools is installed.
+
+    Returns:
+        True if the font was subset
+    """
+    try:
+        from fontTools import subset
+    except ImportError:
+        logger.info("fontTools not installed, keeping the full font %s", os.path.basename(path))
+        return False
+
+    options = subset.Options()
+    options.flavor = "woff2"
+    font = subset.load_font(path, options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+    subset.save_font(font, path, options)
+    return True
+
+
+def latin_font_faces(css: str) -> List[Tuple[str, str]]:
+    """
+    Extract the latin @font-face blocks from a Google Fonts stylesheet.
+
+    Args:
+        css: Stylesheet returned by fonts.googleapis.com
+
+    Returns:
+        List of (block, font URL) pairs
+    """
+    faces = []
+    for comment, block in re.findall(r"/\*\s*([\w-]+)\s*\*/\s*(@font-face\s*\{[^}]*\})", css):
+        if comment != "latin":
+            continue
+        url = re.search(r"url\(([^)]+)\)", block)
+        if url:
+            faces.append((block, url.group(1)))
+    return faces
+
+
+def _download(url: str) -> bytes:
+    request = urllib.request.Request(url, headers={"User-Agent": _BROWSER_USER_AGENT})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return response.read()
+
+
+class AssetBuilder:
+    """Builds the ``dist`` directory for a static directory."""
+
+    def __init__(self, static_dir: str, offline: bool = False):
+        """
+        Initialize the builder.
+
+        Args:
+            static_dir: Directory containing index.html, css/ and js/
+            offline: Skip vendoring third-party assets (CDN links are kept)
+        """
+        self.static_dir = static_dir
+        self.dist_dir = os.path.join(static_dir, "dist")
+        self.offline = offline
+        self.manifest: Dict[str, str] = {}
+
+    def _write(self, relative_path: str, content: bytes) -> str:
+        path = os.path.join(self.dist_dir, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def _emit(self, source_name: str, relative_dir: str, content: bytes) -> str:
+        name = fingerprinted_name(os.path.basename(source_name), content)
+        relative_path = f"{relative_dir}/{name}"
+        self._write(relative_path, content)
+        self.manifest[source_name] = relative_path
+        return f"/static/dist/{relative_path}"
+
+    def _vendor_font_awesome(self, html: str, script: str) -> str:
+        full_css = _download(FONT_AWESOME_CSS_URL).decode("utf-8")
+        icons = used_icon_names([html, script])
+
+        # Subset the solid webfont to the glyphs of the icons actually used
+        font_path = self._write("vendor/fa-solid-900.woff2", _download(FONT_AWESOME_SOLID_URL))
+        subset_font(font_path, icon_codepoints(subset_font_awesome_css(full_css, icons, "")))
+        with open(font_path, "rb") as f:
+            font = f.read()
+        os.remove(font_path)
+
+        font_url = self._emit("vendor/fa-solid-900.woff2", "vendor", font)
+        css = subset_font_awesome_css(full_css, icons, font_url)
+        return self._emit("vendor/font-awesome.css", "vendor", css.encode("utf-8"))
+
+    def _vendor_google_fonts(self, url: str) -> Optional[str]:
+        css = _download(url.replace("&amp;", "&")).decode("utf-8")
+        blocks = []
+        for index, (block, font_url) in enumerate(latin_font_faces(css)):
+            local_url = self._emit(f"vendor/font-{index}.woff2", "vendor", _download(font_url))
+            blocks.append(block.replace(font_url, local_url))
+        if not blocks:
+            return None
+        return self._emit("vendor/fonts.css", "vendor", minify_css("".join(blocks)).encode("utf-8"))
+
+    def _vendor(self, html: str, script: str) -> str:
+        """Self-host third-party assets; on network errors the CDN links are kept."""
+        try:
+            fa_url = self._vendor_font_awesome(html, script)
+            html = html.replace(FONT_AWESOME_CSS_URL, fa_url)
+        except OSError as e:
+            logger.warning("Could not vendor Font Awesome, keeping the CDN link: %s", e)
+
+        fonts_match = re.search(r'href="(https://fonts\.googleapis\.com/css2[^"]+)"', html)
+        if fonts_match:
+            try:
+                fonts_url = self._vendor_google_fonts(fonts_match.group(1))
+            except OSError as e:
+                logger.warning("Could not vendor Google Fonts, keeping the CDN link: %s", e)
+                fonts_url = None
+            if fonts_url:
+                html = html.replace(fonts_match.group(1), fonts_url)
+
+        if "https://fonts.googleapis.com/css2" not in html:
+            # Preconnects to the font CDNs are no longer needed
+            html = re.sub(r'\s*<link rel="preconnect"[^>]*>', "", html)
+        return html
+
+    def build(self) -> Dict[str, str]:
+        """
+        Build the dist directory.
+
+        Returns:
+            Manifest mapping source names to fingerprinted paths under dist/
+        """
+        if os.path.isdir(self.dist_dir):
+            shutil.rmtree(self.dist_dir)
+        os.makedirs(self.dist_dir)
+
+        with open(os.path.join(self.static_dir, "index.html"), encoding="utf-8") as f:
+            html = f.read()
+        with open(os.path.join(self.static_dir, "css", "style.css"), encoding="utf-8") as f:
+            style = f.read()
+        with open(os.path.join(self.static_dir, "js", "app.js"), encoding="utf-8") as f:
+            script = f.read()
+
+        css_url = self._emit("css/style.css", "css", minify_css(style).encode("utf-8"))
+        js_url = self._emit("js/app.js", "js", minify_js(script).encode("utf-8"))
+        html = html.replace("/static/css/style.css", css_url).replace("/static/js/app.js", js_url)
+
+        if not self.offline:
+            html = self._vendor(html, script)
+
+        self._write("index.html", html.encode("utf-8"))
+        self._write("manifest.json", json.dumps(self.manifest, indent=2, sort_keys=True).encode("utf-8"))
+
+        for root, _, files in os.walk(self.dist_dir):
+            for name in files:
+                if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                    precompress(os.path.join(root, name))
+
+        logger.info("Built %d assets into %s", len(self.manifest), self.dist_dir)
+        return self.manifest
@@ -0,0 +1,421 @@
+"""
+Asynchronous jobs for long-running reasoning requests.
+
+A job is submitted, gets an id straight away and runs on a pool of
+background workers, so no HTTP connection has to stay open while the
+model and tools work. Clients poll the job (optionally long-polling until
+it finishes) or pass a callback URL that the finished job is POSTed to.
+Finished jobs are kept in the result store for ``result_ttl`` seconds.
+Callbacks are only sent to public addresses unless the host is explicitly
+allowed, so a callback URL cannot be used to reach internal services.
+
+All methods must be called from the event loop thread.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import http.client
+import ipaddress
+import json
+import os
+import socket
+import time
+import urllib.parse
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence
+
+from src.utils.deadline import Deadline, DeadlineExceeded
+from src.utils.logger import get_logger, reset_request_id, set_request_id
+
+logger = get_logger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobQueueFullError(Exception):
+    """Raised when a job is submitted while too many jobs are pending."""
+
+
+class Job:
+    """A submitted request and, once finished, its outcome."""
+
+    def __init__(self, payload: Dict[str, Any], timeout: Optional[float], callback_url: Optional[str], caller: str):
+        self.id = os.urandom(12).hex()
+        self.payload = payload
+        self.timeout = timeout
+        self.callback_url = callback_url
+        self.caller = caller
+        self.status = QUEUED
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.callback_status: Optional[str] = None
+        self.deadline: Optional[Deadline] = None
+        self.done = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the job as reported to clients."""
+        data = {
+            "id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+        if self.callback_url:
+            data["callback_status"] = self.callback_status
+        return {key: value for key, value in data.items() if value is not None}
+
+
+def _is_public(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if getattr(ip, "ipv4_mapped", None) is not None:
+        ip = ip.ipv4_mapped
+    # Excludes private, loopback, link-local (cloud metadata), reserved and unspecified addresses
+    return ip.is_global and not ip.is_multicast
+
+
+def validate_callback_url(url: str, allowed_hosts: Sequence[str] = ()) -> str:
+    """
+    Check that a callback URL can be delivered to.
+
+    Names are not resolved here (see resolve_callback_host); IP addresses and
+    localhost names are checked straight away.
+
+    Args:
+        url: Callback URL
+        allowed_hosts: Hosts allowed even if they are not public
+
+    Raises:
+        ValueError: If the URL is not an absolute http(s) URL, or its host
+            is a non-public address or localhost and not allowed
+    """
+    parsed = urllib.parse.urlsplit(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise ValueError("callback_url must be an absolute http or https URL")
+    host = parsed.hostname.lower()
+    if host in allowed_hosts:
+        return url
+    if host == "localhost" or host.endswith(".localhost"):
+        raise ValueError("callback_url must not point at a private or local address")
+    try:
+        public = _is_public(host)
+    except ValueError:
+        return url  # A name, checked when the callback is delivered
+    if not public:
+        raise ValueError("callback_url must not point at a private or local address")
+    return url
+
+
+def resolve_callback_host(url: str, allowed_hosts: Sequence[str] = ()) -> str:
+    """
+    Resolve a callback URL's host and check every address it resolves to is public.
+
+    The callback must then be sent to the returned address rather than
+    resolving the name again, which could give a different (internal) answer.
+
+    Returns:
+        The address to connect to
+
+    Raises:
+        ValueError: If the host does not resolve or resolves to a non-public address
+    """
+    parsed = urllib.parse.urlsplit(url)
+    host = (parsed.hostname or "").lower()
+    try:
+        infos = socket.getaddrinfo(host, parsed.port or None, proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError) as e:
+        raise ValueError(f"Cannot resolve {host}: {e}")
+    addresses = [info[4][0] for info in infos]
+    if not addresses:
+        raise ValueError(f"Cannot resolve {host}")
+    if host not in allowed_hosts and not all(_is_public(address) for address in addresses):
+        raise ValueError(f"{host} resolves to a private or local address")
+    return addresses[0]
+
+
+def _pinned_connection(url: str, address: str, timeout: float) -> http.client.HTTPConnection:
+    """
+    Return a connection to a URL's host that connects to an already checked address.
+
+    The Host header, TLS server name and certificate check still use the
+    URL's host name. http.client does not follow redirects, which could
+    lead a callback to an address that was not checked.
+    """
+    parsed = urllib.parse.urlsplit(url)
+    if parsed.scheme == "https":
+        connection: http.client.HTTPConnection = http.client.HTTPSConnection(parsed.hostname, parsed.port, timeout=timeout)
+    else:
+        connection = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=timeout)
+    # http.client opens its socket through this attribute; connect to the address instead of the name
+    connection._create_connection = lambda target, *args: socket.create_connection((address, target[1]), *args)
+    return connection
+
+
+def sign_callback(body: bytes, secret: str) -> str:
+    """Return the X-Signature header value of a callback body."""
+    return "sha256=" + hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+
+
+def deliver_callback(
+    url: str,
+    body: bytes,
+    secret: Optional[str] = None,
+    attempts: int = 3,
+    timeout: float = 10.0,
+    allowed_hosts: Sequence[str] = ()
+) -> bool:
+    """
+    POST a finished job to its callback URL, retrying with backoff.
+
+    Args:
+        url: Callback URL
+        body: JSON body
+        secret: Key the body is signed with (X-Signature header), if set
+        attempts: Delivery attempts before giving up
+        timeout: Seconds per attempt
+        allowed_hosts: Hosts that may be delivered to even if they are not public
+
+    Returns:
+        Whether the receiver acknowledged the callback with a 2xx status
+    """
+    headers = {"Content-Type": "application/json"}
+    if secret:
+        headers["X-Signature"] = sign_callback(body, secret)
+    for attempt in range(attempts):
+        if attempt:
+            time.sleep(2 ** (attempt - 1))
+        try:
+            # Checked on every attempt, as the name may resolve differently
+            address = resolve_callback_host(url, allowed_hosts)
+        except ValueError as e:
+            logger.warning("Not delivering callback to %s: %s", url, e)
+            return False
+        parsed = urllib.parse.urlsplit(url)
+        connection = _pinned_connection(url, address, timeout)
+        try:
+            connection.request("POST", urllib.parse.urlunsplit(("", "", parsed.path or "/", parsed.query, "")), body, headers)
+            response = connection.getresponse()
+            if 200 <= response.status < 300:
+                return True
+        except (http.client.HTTPException, OSError) as e:
+            logger.warning("Callback to %s failed (attempt %d of %d): %s", url, attempt + 1, attempts, e)
+        finally:
+            connection.close()
+    return False
+
+
+class JobManager:
+    """Runs jobs on background workers and keeps their results for a while."""
+
+    def __init__(
+        self,
+        run: Callable[[Job], Awaitable[Dict[str, Any]]],
+        workers: int = 4,
+        max_pending: int = 100,
+        result_ttl: float = 3600.0,
+        callback_secret: Optional[str] = None,
+        callback_allowed_hosts: Sequence[str] = ()
+    ):
+        """
+        Initialize the manager; workers are started with the first job.
+
+        Args:
+            run: Coroutine function running a job and returning its result;
+                it should stop early once ``job.deadline`` is cancelled
+            workers: Jobs run at once
+            max_pending: Jobs that may be queued or running before submissions are rejected
+            result_ttl: Seconds finished jobs are kept
+            callback_secret: Key callbacks are signed with
+            callback_allowed_hosts: Callback hosts allowed even if they are
+                private, loopback or link-local
+        """
+        self._run = run
+        self.workers = workers
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self.callback_secret = callback_secret
+        self.callback_allowed_hosts = list(callback_allowed_hosts)
+        self._jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list = []
+        self._callbacks: set = set()
+
+    @property
+    def pending(self) -> int:
+        """Jobs queued or running."""
+        return sum(1 for job in self._jobs.values() if not job.finished)
+
+    def _start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def close(self) -> None:
+        """Stop the workers, cancelling running jobs."""
+        for job in self._jobs.values():
+            if not job.finished and job.deadline is not None:
+                job.deadline.cancel()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._callbacks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def purge(self) -> int:
+        """
+        Drop finished jobs older than the TTL.
+
+        Returns:
+            Number of jobs dropped
+        """
+        cutoff = time.time() - self.result_ttl
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+        return len(expired)
+
+    def submit(
+        self,
+        payload: Dict[str, Any],
+        timeout: Optional[float] = None,
+        callback_url: Optional[str] = None,
+        caller: str = "local"
+    ) -> Job:
+        """
+        Queue a job.
+
+        Args:
+            payload: What to run, passed to the run function as ``job.payload``
+            timeout: Seconds the job may run once started
+            callback_url: URL the finished job is POSTed to
+            caller: Ledger name of the caller
+
+        Returns:
+            The queued job
+
+        Raises:
+            JobQueueFullError: If max_pending jobs are already queued or running
+            ValueError: If the callback URL is invalid
+        """
+        if callback_url:
+            validate_callback_url(callback_url, self.callback_allowed_hosts)
+        self.purge()
+        if self.pending >= self.max_pending:
+            raise JobQueueFullError(f"{self.pending} jobs are pending")
+        if self._queue is None:
+            self._start()
+        job = Job(payload, timeout, callback_url, caller)
+        self._jobs[job.id] = job
+        self._queue.put_nowait(job)
+        logger.info("Queued job %s", job.id)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return a job, or None if it is unknown or has expired."""
+        self.purge()
+        return self._jobs.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        """
+        Return a job once it has finished or the timeout has passed (long polling).
+
+        Args:
+            job_id: Id of the job
+            timeout: Longest time to wait in seconds
+
+        Returns:
+            The job, or None if it is unknown or has expired
+        """
+        job = self.get(job_id)
+        if job is not None and not job.finished and timeout > 0:
+            try:
+                await asyncio.wait_for(job.done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a queued or running job.
+
+        Returns:
+            The job, or None if it is unknown or has expired
+        """
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+        if job.status == QUEUED:
+            self._finish(job, CANCELLED, error="Job was cancelled")
+        else:
+            job.deadline.cancel()
+            job._task.cancel()
+        return job
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            if job.finished:
+                continue
+            job.status = RUNNING
+            job.started_at = time.time()
+            job.deadline = Deadline(job.timeout)
+            # The job's log records and trace are tagged with its id
+            token = set_request_id(job.id)
+            job._task = asyncio.create_task(self._run(job))
+            try:
+                result = await asyncio.wait_for(asyncio.shield(job._task), job.deadline.remaining())
+            except asyncio.TimeoutError:
+                job.deadline.cancel()
+                job._task.cancel()
+                self._finish(job, FAILED, error="Job deadline exceeded")
+            except asyncio.CancelledError:
+                if not job._task.cancelled():
+                    # The worker itself is being stopped
+                    job._task.cancel()
+                    raise
+                self._finish(job, CANCELLED, error="Job was cancelled")
+            except DeadlineExceeded as e:
+                self._finish(job, CANCELLED if job.deadline.cancelled else FAILED, error=str(e))
+            except Exception as e:
+                logger.error("Job %s failed: %s", job.id, e)
+                self._finish(job, FAILED, error=str(e))
+            else:
+                self._finish(job, SUCCEEDED, result=result)
+            finally:
+                reset_request_id(token)
+
+    def _finish(self, job: Job, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        job.done.set()
+        logger.info("Job %s %s", job.id, status)
+        if job.callback_url:
+            job.callback_status = "pending"
+            task = asyncio.create_task(self._callback(job))
+            self._callbacks.add(task)
+            task.add_done_callback(self._callbacks.discard)
+
+    async def _callback(self, job: Job) -> None:
+        data = {key: value for key, value in job.to_dict().items() if key != "callback_status"}
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        delivered = await asyncio.to_thread(
+            deliver_callback, job.callback_url, body, self.callback_secret, allowed_hosts=self.callback_allowed_hosts
+        )
+        job.callback_status = "delivered" if delivered else "failed"
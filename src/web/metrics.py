@@ -0,0 +1,158 @@
+"""
+Metrics in the Prometheus text exposition format.
+"""
+
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MetricFamily(NamedTuple):
+    """A metric with its samples, each a (labels, value) pair."""
+
+    name: str
+    type: str
+    help: str
+    samples: List[Tuple[Dict[str, str], float]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def format_metrics(families: List[MetricFamily]) -> str:
+    """
+    Render metric families as Prometheus text.
+
+    Args:
+        families: Metrics to render
+
+    Returns:
+        The exposition text
+    """
+    lines = []
+    for family in families:
+        lines.append(f"# HELP {family.name} {family.help}")
+        lines.append(f"# TYPE {family.name} {family.type}")
+        for labels, value in family.samples:
+            label_text = ",".join(f'{key}="{_escape(str(label))}"' for key, label in labels.items())
+            name = f"{family.name}{{{label_text}}}" if label_text else family.name
+            lines.append(f"{name} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def usage_metrics(totals: Dict[Tuple[str, str, str], Dict[str, float]]) -> List[MetricFamily]:
+    """
+    Build counters from the usage ledger's totals.
+
+    Args:
+        totals: Result of UsageLedger.totals()
+
+    Returns:
+        Completion, token and cost counters labelled by caller, feature and model
+    """
+    counters = (
+        ("cot_llm_calls_total", "calls", "Completion calls made upstream"),
+        ("cot_llm_prompt_tokens_total", "prompt_tokens", "Prompt tokens sent upstream"),
+        ("cot_llm_completion_tokens_total", "completion_tokens", "Completion tokens received"),
+        ("cot_llm_cost_usd_total", "cost_usd", "Estimated cost of completions in USD"),
+    )
+    families = []
+    for name, field, help_text in counters:
+        samples = [
+            ({"caller": caller, "feature": feature, "model": model}, values[field])
+            for (caller, feature, model), values in sorted(totals.items())
+        ]
+        families.append(MetricFamily(name, "counter", help_text, samples))
+    return families
+
+
+def _quantile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else 0.0
+
+
+def tenant_metrics(
+    stats: Dict[str, Dict[str, Any]],
+    quota_rejections: Dict[str, int],
+    quota_usage: Dict[str, Dict[str, int]]
+) -> List[MetricFamily]:
+    """
+    Build per-tenant scheduling metrics.
+
+    Args:
+        stats: Result of AdmissionController.tenant_stats()
+        quota_rejections: Requests rejected per tenant for exceeding its token quota
+        quota_usage: Result of TenantRegistry.quota_usage()
+
+    Returns:
+        Request, throttling, queue wait, latency and quota metrics labelled by tenant
+    """
+    families = [
+        MetricFamily("cot_tenant_requests_active", "gauge", "Requests of the tenant holding an admission slot",
+                     [({"tenant": name}, values["active"]) for name, values in stats.items()]),
+        MetricFamily("cot_tenant_requests_queued", "gauge", "Requests of the tenant waiting for an admission slot",
+                     [({"tenant": name}, values["queued"]) for name, values in stats.items()]),
+        MetricFamily("cot_tenant_requests_admitted_total", "counter", "Requests of the tenant given an admission slot",
+                     [({"tenant": name}, values["admitted"]) for name, values in stats.items()]),
+        MetricFamily("cot_tenant_queue_wait_seconds_total", "counter", "Seconds requests of the tenant spent queued",
+                     [({"tenant": name}, values["wait_seconds"]) for name, values in stats.items()]),
+    ]
+
+    throttled = []
+    for name in sorted(set(stats) | set(quota_rejections)):
+        values = stats.get(name, {})
+        throttled.append(({"tenant": name, "reason": "concurrency"}, values.get("throttled", 0)))
+        throttled.append(({"tenant": name, "reason": "queue_full"}, values.get("shed", 0)))
+        throttled.append(({"tenant": name, "reason": "quota"}, quota_rejections.get(name, 0)))
+    families.append(MetricFamily(
+        "cot_tenant_requests_throttled_total", "counter",
+        "Requests of the tenant delayed by its concurrency limit or rejected for a full queue or quota", throttled
+    ))
+
+    latency = [
+        ({"tenant": name, "quantile": str(q)}, _quantile(values["latencies"], q))
+        for name, values in stats.items() if values["latencies"]
+        for q in (0.5, 0.95, 0.99)
+    ]
+    families.append(MetricFamily(
+        "cot_tenant_request_seconds", "summary", "Latency of recent requests of the tenant, queueing included", latency
+    ))
+    families.append(MetricFamily(
+        "cot_tenant_quota_used_tokens", "gauge", "Tokens the tenant has used of its quota in the current window",
+        [({"tenant": name}, values["used"]) for name, values in quota_usage.items()]
+    ))
+    return families
+
+
+def profiling_metrics(route_stats: Dict[str, Dict[str, float]], loop_stats: Dict[str, Any]) -> List[MetricFamily]:
+    """
+    Build per-route CPU and event-loop lag metrics.
+
+    Args:
+        route_stats: Result of RouteCPU.stats()
+        loop_stats: Result of LoopLagMonitor.stats()
+
+    Returns:
+        Request, CPU and wall time metrics labelled by route, and loop lag metrics
+    """
+    return [
+        MetricFamily("cot_route_requests_total", "counter", "Requests finished per route",
+                     [({"route": route}, values["requests"]) for route, values in route_stats.items()]),
+        MetricFamily("cot_route_cpu_seconds_total", "counter", "Thread CPU seconds spent on the route's blocking work and serialization",
+                     [({"route": route}, values["cpu_seconds"]) for route, values in route_stats.items()]),
+        MetricFamily("cot_route_wall_seconds_total", "counter", "Seconds from request to the end of the response per route",
+                     [({"route": route}, values["wall_seconds"]) for route, values in route_stats.items()]),
+        MetricFamily("cot_event_loop_lag_seconds", "gauge", "How late the event loop last woke up a sleeping task",
+                     [({}, loop_stats["lag_seconds"])]),
+        MetricFamily("cot_event_loop_lag_max_seconds", "gauge", "Largest event loop lag seen",
+                     [({}, loop_stats["max_lag_seconds"])]),
+        MetricFamily("cot_event_loop_stalls_total", "counter", "Times the event loop lagged by more than LOOP_LAG_THRESHOLD",
+                     [({}, loop_stats["stalls"])]),
+    ]
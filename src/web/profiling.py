@@ -0,0 +1,350 @@
+"""
+Where the server spends CPU: an on-demand sampling profiler, CPU time per
+route and an event-loop lag monitor.
+
+``SamplingProfiler`` records the Python stack of every thread at a fixed
+interval for a number of seconds and returns the stacks in the collapsed
+format ("thread;outer (file:line);inner (file:line) count") read by
+flamegraph.pl, speedscope and inferno. Threads waiting for work (idle
+workers, the event loop in ``select``) are left out.
+
+``RouteCPU`` adds up the thread CPU time of the blocking work done for each
+route: the worker-thread function of ``run_with_deadline``, the producer of
+a streamed response and response serialization all run inside
+``cpu_timer()``, which charges the request that is current in the context.
+Work in the tool sandbox processes is not included.
+
+``LoopLagMonitor`` wakes up every LOOP_LAG_INTERVAL seconds and measures
+how late it wakes. A watchdog thread notices when the loop has not woken
+for longer than LOOP_LAG_THRESHOLD and logs the stack of the code that is
+blocking it.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from src.settings import get_settings
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Longest profile that can be requested
+MAX_PROFILE_SECONDS = 60.0
+MIN_PROFILE_INTERVAL = 0.001
+
+# Leaf frames of threads that are waiting rather than running: (file name, function)
+IDLE_FRAMES = frozenset({
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("handlers.py", "dequeue"),
+    ("socket.py", "accept"),
+    ("connection.py", "_poll"),
+})
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class ProfilerBusyError(Exception):
+    """Raised when a profile is requested while another one is running."""
+
+
+def _frame_label(code: Any) -> str:
+    path = code.co_filename
+    if path.startswith(_ROOT):
+        path = os.path.relpath(path, _ROOT)
+    else:
+        path = os.path.join(os.path.basename(os.path.dirname(path)), os.path.basename(path))
+    return f"{code.co_name} ({path}:{code.co_firstlineno})".replace(";", ":")
+
+
+class SamplingProfiler:
+    """Samples the stacks of all threads of the process; one profile runs at a time."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._labels: Dict[Any, str] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def _stack(self, frame: Any) -> Tuple[str, ...]:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = _frame_label(code)
+            stack.append(label)
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    def profile(self, seconds: float, interval: float = 0.005, include_idle: bool = False) -> Dict[str, Any]:
+        """
+        Sample the stacks of all other threads, blocking the calling thread.
+
+        Args:
+            seconds: How long to sample for (at most MAX_PROFILE_SECONDS)
+            interval: Seconds between samples
+            include_idle: Whether to keep the stacks of threads waiting for work
+
+        Returns:
+            The collapsed stacks as {"thread;frame;...": samples}, and the
+            number of samples taken and the duration in seconds
+
+        Raises:
+            ProfilerBusyError: If another profile is running
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+        try:
+            seconds = min(max(seconds, 0.0), MAX_PROFILE_SECONDS)
+            interval = max(interval, MIN_PROFILE_INTERVAL)
+            own = threading.get_ident()
+            counts: Dict[Tuple[str, Tuple[str, ...]], int] = {}
+            samples = 0
+            start = time.perf_counter()
+            next_sample = start
+            while True:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own:
+                        continue
+                    code = frame.f_code
+                    if not include_idle and (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                        continue
+                    key = (names.get(thread_id, str(thread_id)), self._stack(frame))
+                    counts[key] = counts.get(key, 0) + 1
+                samples += 1
+                next_sample += interval
+                now = time.perf_counter()
+                if next_sample - start > seconds:
+                    break
+                if next_sample > now:
+                    time.sleep(next_sample - now)
+            elapsed = time.perf_counter() - start
+        finally:
+            self._lock.release()
+
+        stacks = {
+            ";".join((thread.replace(";", ":"),) + stack): count
+            for (thread, stack), count in sorted(counts.items(), key=lambda item: -item[1])
+        }
+        return {"stacks": stacks, "samples": samples, "seconds": round(elapsed, 3)}
+
+
+def collapsed(stacks: Dict[str, int]) -> str:
+    """Format stacks as collapsed-stack text, one "frame;frame;... count" line per stack."""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.items())
+
+
+class _RouteUsage:
+    __slots__ = ("cpu",)
+
+    def __init__(self):
+        self.cpu = 0.0
+
+
+_current_usage: contextvars.ContextVar = contextvars.ContextVar("route_usage", default=None)
+
+
+@contextmanager
+def cpu_timer() -> Iterator[None]:
+    """Charge the thread CPU time spent in the block to the current request, if any."""
+    usage = _current_usage.get()
+    if usage is None:
+        yield
+        return
+    start = time.thread_time()
+    try:
+        yield
+    finally:
+        usage.cpu += time.thread_time() - start
+
+
+def cpu_timed(func: Callable) -> Callable:
+    """Wrap a function to be run in a worker thread so its CPU time is charged to the current request."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with cpu_timer():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def cpu_timed_iter(iterator: Iterator[Any]) -> Iterator[Any]:
+    """Wrap a blocking generator so the CPU time of advancing it is charged to the current request."""
+    try:
+        while True:
+            with cpu_timer():
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+
+
+class RouteCPU:
+    """Requests, wall time and CPU time per route."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[str, List[float]] = {}
+
+    def start(self) -> Tuple[_RouteUsage, contextvars.Token]:
+        """Start charging CPU time to a new request; pass the result to ``finish``."""
+        usage = _RouteUsage()
+        return usage, _current_usage.set(usage)
+
+    @staticmethod
+    def detach(token: contextvars.Token) -> None:
+        """Stop charging work in this context to the request (its usage object is still updated by work it started)."""
+        _current_usage.reset(token)
+
+    def record(self, route: str, usage: _RouteUsage, wall: float) -> None:
+        """Add a finished request's CPU and wall time to its route."""
+        with self._lock:
+            totals = self._routes.get(route)
+            if totals is None:
+                totals = self._routes[route] = [0, 0.0, 0.0]
+            totals[0] += 1
+            totals[1] += usage.cpu
+            totals[2] += wall
+
+    @contextmanager
+    def track(self, route: str) -> Iterator[None]:
+        """Charge the work done in the block to a route, e.g. for background jobs."""
+        usage, token = self.start()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.detach(token)
+            self.record(route, usage, time.perf_counter() - start)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Return requests, CPU seconds and wall seconds per route, busiest first."""
+        with self._lock:
+            routes = {route: list(totals) for route, totals in self._routes.items()}
+        return {
+            route: {
+                "requests": requests,
+                "cpu_seconds": round(cpu, 6),
+                "wall_seconds": round(wall, 6),
+                "cpu_per_request": round(cpu / requests, 6) if requests else 0.0,
+            }
+            for route, (requests, cpu, wall) in sorted(routes.items(), key=lambda item: -item[1][1])
+        }
+
+
+class LoopLagMonitor:
+    """Measures event-loop lag and logs what blocks the loop."""
+
+    def __init__(self, interval: Optional[float] = None, threshold: Optional[float] = None, history: int = 20):
+        """
+        Initialize the monitor.
+
+        Args:
+            interval: Seconds between wake-ups (defaults to the loop_lag_interval setting)
+            threshold: Lag in seconds reported as a stall (defaults to the loop_lag_threshold setting)
+            history: Number of recent stalls kept
+        """
+        self._interval = interval
+        self._threshold = threshold
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.stalls = 0
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self._beat = 0.0
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @property
+    def interval(self) -> float:
+        return self._interval if self._interval is not None else get_settings().loop_lag_interval
+
+    @property
+    def threshold(self) -> float:
+        return self._threshold if self._threshold is not None else get_settings().loop_lag_threshold
+
+    def start(self) -> None:
+        """Start monitoring the running event loop."""
+        self._loop_thread = threading.get_ident()
+        self._beat = time.perf_counter()
+        self._stopped.clear()
+        self._task = asyncio.ensure_future(self._run())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Stop monitoring."""
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    async def _run(self) -> None:
+        while True:
+            interval = self.interval
+            start = time.perf_counter()
+            self._beat = start
+            await asyncio.sleep(interval)
+            now = time.perf_counter()
+            self._beat = now
+            self.lag = max(0.0, now - start - interval)
+            self.max_lag = max(self.max_lag, self.lag)
+            if self.lag >= self.threshold:
+                self.stalls += 1
+                logger.warning("Event loop was blocked for %.0f ms", self.lag * 1000)
+
+    def _watch(self) -> None:
+        """Capture the loop thread's stack while it is blocked, once per stall."""
+        reported = 0.0
+        while not self._stopped.wait(self.threshold / 2):
+            beat = self._beat
+            blocked = time.perf_counter() - beat - self.interval
+            if blocked < self.threshold or beat == reported:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            stack = [line.rstrip() for line in traceback.format_stack(frame, limit=12)]
+            reported = beat
+            self.recent.append({"time": time.time(), "blocked_ms": round(blocked * 1000), "stack": stack})
+            logger.warning("Event loop blocked for over %.0f ms in:\n%s", blocked * 1000, "\n".join(stack))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the last and largest lag, the number of stalls and the recent blocking stacks."""
+        return {
+            "lag_seconds": round(self.lag, 6),
+            "max_lag_seconds": round(self.max_lag, 6),
+            "stalls": self.stalls,
+            "interval": self.interval,
+            "threshold": self.threshold,
+            "recent": list(self.recent),
+        }
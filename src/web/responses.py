@@ -0,0 +1,159 @@
+"""
+Fast JSON responses with optional compression.
+"""
+
+import gzip
+import json
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
+from pydantic import BaseModel
+from starlette.concurrency import iterate_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response
+
+from src.settings import get_settings
+from src.utils.deadline import Deadline, DeadlineExceeded
+from src.utils.logger import get_logger
+from src.web.profiling import cpu_timed_iter, cpu_timer
+
+try:
+    import brotli
+except ImportError:  # brotli is optional
+    brotli = None
+
+logger = get_logger(__name__)
+
+
+def accepted_encodings(header: str) -> Dict[str, float]:
+    """
+    Parse an Accept-Encoding header.
+
+    Args:
+        header: The header value
+
+    Returns:
+        Mapping of encoding name to quality value
+    """
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    return accepted
+
+
+def choose_encoding(accept_encoding: str, size: int, min_size: Optional[int] = None) -> Optional[str]:
+    """
+    Pick a content encoding for a response body.
+
+    Args:
+        accept_encoding: The request's Accept-Encoding header
+        size: Size of the uncompressed body in bytes
+        min_size: Bodies smaller than this are sent uncompressed
+
+    Returns:
+        "br", "gzip" or None
+    """
+    if size < (get_settings().compression_min_size if min_size is None else min_size):
+        return None
+    accepted = accepted_encodings(accept_encoding)
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """
+    Compress a body with a fast setting suitable for per-response use.
+
+    Args:
+        body: Uncompressed bytes
+        encoding: "br" or "gzip"
+
+    Returns:
+        Compressed bytes
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=4)
+    return gzip.compress(body, compresslevel=5)
+
+
+def json_response(
+    request: Request,
+    model: BaseModel,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """
+    Serialize a model straight to JSON bytes and compress large bodies.
+
+    The model is serialized by pydantic-core without an intermediate dict or
+    a second validation pass, and None fields are omitted.
+
+    Args:
+        request: The incoming request (for Accept-Encoding)
+        model: Model to serialize
+        status_code: HTTP status code
+        headers: Extra response headers
+
+    Returns:
+        The response
+    """
+    headers = dict(headers or {})
+    with cpu_timer():
+        body = model.model_dump_json(exclude_none=True).encode("utf-8")
+        encoding = choose_encoding(request.headers.get("accept-encoding", ""), len(body))
+        if encoding:
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Vary"] = "Accept-Encoding"
+
+    return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
+
+
+async def ndjson_stream(
+    events: Iterator[Dict[str, Any]],
+    deadline: Deadline,
+    on_close: Optional[Callable[[], None]] = None
+) -> AsyncIterator[bytes]:
+    """
+    Encode events from a blocking generator as newline-delimited JSON.
+
+    The generator is advanced in the thread pool so it never blocks the event
+    loop. Errors become a final {"type": "error"} event. When the stream ends
+    for any reason, including a client disconnect, the deadline is cancelled
+    so the producer stops making upstream calls, and on_close is called.
+
+    Args:
+        events: Blocking generator of JSON-serializable events
+        deadline: Deadline shared with the producer
+        on_close: Callback run once the stream is finished
+
+    Yields:
+        One encoded JSON line per event
+    """
+    try:
+        async for event in iterate_in_threadpool(cpu_timed_iter(events)):
+            with cpu_timer():
+                line = (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
+            yield line
+    except DeadlineExceeded as e:
+        logger.warning("Stream did not complete: %s", e)
+        yield (json.dumps({"type": "error", "detail": str(e)}) + "\n").encode("utf-8")
+    except Exception as e:
+        logger.error("Error while streaming: %s", e)
+        yield (json.dumps({"type": "error", "detail": f"Error processing query: {e}"}) + "\n").encode("utf-8")
+    finally:
+        deadline.cancel()
+        if on_close is not None:
+            on_close()
@@ -0,0 +1,83 @@
+"""
+Static file serving with precompressed variants and long-lived caching.
+"""
+
+import mimetypes
+import os
+import stat
+from typing import Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from src.web.assets import FINGERPRINT_PATTERN
+from src.web.responses import accepted_encodings
+
+# Fingerprinted assets never change under the same name
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Everything else is cached but revalidated with its ETag on every use
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that serves ``.br``/``.gz`` siblings built ahead of time.
+
+    When a compressed sibling exists and the client accepts its encoding, it
+    is sent as-is (no per-request compression). Fingerprinted files get
+    immutable caching; other files are revalidated with ETags.
+    """
+
+    def _variant(self, full_path: str, accept_encoding: str) -> Tuple[Optional[str], Optional[str], Optional[os.stat_result], bool]:
+        accepted = {name for name, quality in accepted_encodings(accept_encoding).items() if quality > 0}
+        has_variants = False
+        for encoding, suffix in _ENCODINGS:
+            try:
+                stat_result = os.stat(full_path + suffix)
+            except OSError:
+                continue
+            if not stat.S_ISREG(stat_result.st_mode):
+                continue
+            has_variants = True
+            if encoding in accepted:
+                return encoding, full_path + suffix, stat_result, True
+        return None, None, None, has_variants
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+
+        headers = {
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL if FINGERPRINT_PATTERN.search(full_path) else REVALIDATE_CACHE_CONTROL
+        }
+        media_type = mimetypes.guess_type(full_path)[0] or "text/plain"
+
+        encoding, variant_path, variant_stat, has_variants = self._variant(
+            full_path, request_headers.get("accept-encoding", "")
+        )
+        if has_variants:
+            headers["Vary"] = "Accept-Encoding"
+        if encoding:
+            headers["Content-Encoding"] = encoding
+            full_path, stat_result = variant_path, variant_stat
+
+        response = FileResponse(
+            full_path,
+            status_code=status_code,
+            stat_result=stat_result,
+            headers=headers,
+            media_type=media_type
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,173 @@
+"""
+API callers (tenants): identification, scheduling weights and token quotas.
+
+Callers identify themselves with the X-API-Key header. Keys listed in the
+TENANTS setting belong to named tenants; all other callers share the
+"default" tenant and its settings, so a caller cannot get a fresh quota or
+scheduling share by sending a new key. A tenant's weight sets its share of the
+admission slots when callers compete for them, ``max_concurrency`` caps
+the slots it may hold at once and ``token_quota`` caps the tokens it may
+use per TENANT_QUOTA_WINDOW. Quotas are checked when a request is
+admitted, so a request that is already running may take a tenant over
+its quota.
+
+    {"acme": {"api_keys": ["sha256:9f86d0..."], "weight": 3, "max_concurrency": 4},
+     "batch-etl": {"api_keys": ["..."], "weight": 1, "token_quota": 2000000},
+     "default": {"max_concurrency": 2, "token_quota": 100000}}
+"""
+
+import hashlib
+import json
+import math
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Tenant shared by every caller whose key is not listed
+DEFAULT_TENANT = "default"
+
+
+class Tenant(NamedTuple):
+    """An API caller and its limits."""
+
+    name: str
+    weight: float = 1.0
+    max_concurrency: Optional[int] = None
+    token_quota: Optional[int] = None
+
+
+class UnknownAPIKeyError(Exception):
+    """Raised when API keys are required and a caller's key is not listed."""
+
+
+class QuotaExceededError(Exception):
+    """Raised when a tenant has used up its token quota for the current window."""
+
+    def __init__(self, tenant: str, retry_after: int):
+        super().__init__(f"Token quota of tenant '{tenant}' is exhausted")
+        self.retry_after = retry_after
+
+
+def key_digest(api_key: str) -> str:
+    """Return the form API keys can be listed in instead of the key itself."""
+    return "sha256:" + hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+class TenantRegistry:
+    """Maps API keys to tenants and keeps track of their token use."""
+
+    def __init__(
+        self,
+        tenants: Optional[Dict[str, Dict[str, Any]]] = None,
+        require_key: bool = False,
+        quota_window: float = 3600.0
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            tenants: Tenant name -> settings, as in the TENANTS setting
+            require_key: Whether callers without a listed key are rejected
+            quota_window: Seconds token quotas are counted over
+        """
+        self.require_key = require_key
+        self.quota_window = quota_window
+        self._tenants: Dict[str, Tenant] = {}
+        self._keys: Dict[str, str] = {}
+        self._default = Tenant(name=DEFAULT_TENANT)
+        for name, settings in (tenants or {}).items():
+            settings = dict(settings)
+            keys = settings.pop("api_keys", [])
+            if name == DEFAULT_TENANT:
+                self._default = Tenant(name=name, **settings)
+                continue
+            self._tenants[name] = Tenant(name=name, **settings)
+            for key in keys:
+                self._keys[key if key.startswith("sha256:") else key_digest(key)] = name
+        # Tokens used per tenant in the current quota window (only listed tenants and the default)
+        self._window = 0
+        self._used: Dict[str, int] = {}
+        self.quota_rejections: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, text: Optional[str], require_key: bool = False, quota_window: float = 3600.0) -> "TenantRegistry":
+        """Create a registry from the TENANTS setting, ignoring it if it is invalid."""
+        if text:
+            try:
+                return cls(json.loads(text), require_key=require_key, quota_window=quota_window)
+            except (ValueError, TypeError, AttributeError) as e:
+                logger.warning("Ignoring invalid TENANTS: %s", e)
+        return cls(require_key=require_key, quota_window=quota_window)
+
+    def get(self, name: str) -> Tenant:
+        """Return a tenant by name; unlisted names get the shared default tenant."""
+        return self._tenants.get(name, self._default)
+
+    def identify(self, api_key: Optional[str]) -> Tenant:
+        """
+        Return the tenant an API key belongs to.
+
+        Raises:
+            UnknownAPIKeyError: If keys are required and this one is not listed
+        """
+        name = self._keys.get(key_digest(api_key)) if api_key else None
+        if name is not None:
+            return self._tenants[name]
+        if self.require_key:
+            raise UnknownAPIKeyError("A valid X-API-Key header is required")
+        return self._default
+
+    def _roll_window(self) -> float:
+        """Start a new quota window if the current one is over; return when it ends."""
+        window = int(time.time() // self.quota_window)
+        if window != self._window:
+            self._window = window
+            self._used.clear()
+        return (window + 1) * self.quota_window
+
+    def charge(self, name: str, tokens: int) -> None:
+        """Add tokens used by a tenant (callers that are not listed are charged to the default tenant)."""
+        tenant = self.get(name)
+        if tenant.token_quota is None:
+            return
+        with self._lock:
+            self._roll_window()
+            self._used[tenant.name] = self._used.get(tenant.name, 0) + tokens
+
+    def used(self, name: str) -> int:
+        """Return the tokens a tenant has used in the current quota window."""
+        with self._lock:
+            self._roll_window()
+            return self._used.get(self.get(name).name, 0)
+
+    def check_quota(self, tenant: Tenant) -> None:
+        """
+        Check that a tenant has tokens left in the current quota window.
+
+        Raises:
+            QuotaExceededError: If the quota is used up, with the seconds until the window ends
+        """
+        if tenant.token_quota is None:
+            return
+        with self._lock:
+            window_end = self._roll_window()
+            if self._used.get(tenant.name, 0) < tenant.token_quota:
+                return
+            self.quota_rejections[tenant.name] = self.quota_rejections.get(tenant.name, 0) + 1
+        raise QuotaExceededError(tenant.name, max(1, math.ceil(window_end - time.time())))
+
+    def on_usage(self, caller: str, feature: str, model: str, prompt_tokens: int, completion_tokens: int, cost: float) -> None:
+        """Usage ledger listener charging completions to the caller's tenant."""
+        self.charge(caller, prompt_tokens + completion_tokens)
+
+    def quota_usage(self) -> Dict[str, Dict[str, int]]:
+        """Return tokens used and quota of every tenant that has used part of a quota."""
+        with self._lock:
+            self._roll_window()
+            used = dict(self._used)
+        return {name: {"used": tokens, "quota": self.get(name).token_quota} for name, tokens in sorted(used.items())}
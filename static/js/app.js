@@ -54,11 +54,23 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     });
     
+    // Request currently streaming, aborted when the user submits again
+    let activeRequest = null;
+    
     // Submit button
     submitButton.addEventListener('click', async function() {
         const query = queryInput.value.trim();
+        
+        // Cancel the previous request, if any; submitting with no query only stops it
+        if (activeRequest) {
+            activeRequest.abort();
+            finishRequest();
+        }
         if (!query) return;
         
+        const controller = new AbortController();
+        activeRequest = controller;
+        
         // Add user message to chat
         addMessage(query, 'user');
         
@@ -66,8 +78,7 @@ document.addEventListener('DOMContentLoaded', function() {
         queryInput.value = '';
         queryInput.style.height = '50px';
         
-        // Disable input during processing
-        submitButton.disabled = true;
+        // Disable input during processing; the submit button stays enabled to cancel
         queryInput.disabled = true;
         loadingIndicator.style.display = 'flex';
         
@@ -77,8 +88,8 @@ document.addEventListener('DOMContentLoaded', function() {
             const structured_output = structuredToggle.checked;
             const use_tools = toolsToggle.checked;
             
-            // Send request to API
-            const response = await fetch('/api/reason', {
+            // Send request to the streaming API
+            const response = await fetch('/api/reason/stream', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -88,32 +99,179 @@ document.addEventListener('DOMContentLoaded', function() {
                     temperature,
                     structured_output,
                     use_tools
-                })
+                }),
+                signal: controller.signal
             });
             
             if (!response.ok) {
                 throw new Error(`Server responded with status: ${response.status}`);
             }
             
-            const data = await response.json();
-            
-            // Process and display response
-            processResponse(data.result);
+            // Render events as they arrive
+            const view = createStreamView();
+            await readEvents(response.body, event => view.handle(event));
+            view.finish();
             
         } catch (error) {
+            if (error.name === 'AbortError') return;
             console.error('Error:', error);
             addErrorMessage(error.message);
         } finally {
-            // Re-enable input
-            submitButton.disabled = false;
-            queryInput.disabled = false;
-            loadingIndicator.style.display = 'none';
-            
-            // Scroll to bottom
-            chatMessages.scrollTop = chatMessages.scrollHeight;
+            if (activeRequest === controller) {
+                finishRequest();
+            }
         }
     });
     
+    // Re-enable input once the active request is over
+    function finishRequest() {
+        activeRequest = null;
+        queryInput.disabled = false;
+        loadingIndicator.style.display = 'none';
+    }
+    
+    // Read a newline-delimited JSON stream, calling onEvent for each line
+    async function readEvents(body, onEvent) {
+        const reader = body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            
+            let newline;
+            while ((newline = buffer.indexOf('\n')) !== -1) {
+                const line = buffer.slice(0, newline).trim();
+                buffer = buffer.slice(newline + 1);
+                if (line) onEvent(JSON.parse(line));
+            }
+        }
+        
+        buffer += decoder.decode();
+        if (buffer.trim()) onEvent(JSON.parse(buffer));
+    }
+    
+    // Assistant message that is built up one node per event
+    function createStreamView() {
+        const messageDiv = addMessage('', 'assistant');
+        let stepCount = 0;
+        let unstructuredDiv = null;
+        let finished = false;
+        
+        function appendNode(node) {
+            // Only follow the stream if the user has not scrolled up
+            const atBottom = chatMessages.scrollHeight - chatMessages.scrollTop - chatMessages.clientHeight < 40;
+            messageDiv.appendChild(node);
+            if (atBottom) {
+                chatMessages.scrollTop = chatMessages.scrollHeight;
+            }
+        }
+        
+        function appendStep(step) {
+            stepCount += 1;
+            appendNode(createStepNode(step, stepCount));
+        }
+        
+        function appendText(text) {
+            // Deltas are appended as plain text; the final result is formatted once
+            if (!unstructuredDiv) {
+                unstructuredDiv = document.createElement('div');
+                unstructuredDiv.className = 'unstructured-content';
+                unstructuredDiv.style.whiteSpace = 'pre-wrap';
+                appendNode(unstructuredDiv);
+            }
+            const last = unstructuredDiv.lastChild;
+            if (last && last.nodeType === Node.TEXT_NODE) {
+                last.appendData(text);
+            } else {
+                unstructuredDiv.appendChild(document.createTextNode(text));
+            }
+        }
+        
+        function showResult(result) {
+            finished = true;
+            
+            if (result.error) {
+                messageDiv.remove();
+                addErrorMessage(result.error);
+                return;
+            }
+            
+            // Replace whatever was streamed with the final, validated result:
+            // repair may have dropped or normalized steps seen while streaming
+            messageDiv.textContent = '';
+            unstructuredDiv = null;
+            stepCount = 0;
+            
+            if (result.structured === false || !Array.isArray(result.reasoning_steps)) {
+                if (result.content) {
+                    const content = document.createElement('div');
+                    content.className = 'unstructured-content';
+                    content.innerHTML = formatContent(result.content);
+                    appendNode(content);
+                } else {
+                    messageDiv.textContent = 'Received an unexpected response format.';
+                }
+                return;
+            }
+            
+            result.reasoning_steps.forEach(appendStep);
+            
+            if (result.final_answer) {
+                const finalAnswer = document.createElement('div');
+                finalAnswer.className = 'final-answer';
+                finalAnswer.innerHTML = formatContent(result.final_answer);
+                appendNode(finalAnswer);
+            }
+        }
+        
+        return {
+            handle(event) {
+                switch (event.type) {
+                    case 'step':
+                        appendStep(event.step);
+                        break;
+                    case 'delta':
+                        appendText(event.content);
+                        break;
+                    case 'result':
+                        showResult(event.result);
+                        break;
+                    case 'error':
+                        finished = true;
+                        if (!messageDiv.hasChildNodes()) messageDiv.remove();
+                        addErrorMessage(event.detail);
+                        break;
+                }
+            },
+            finish() {
+                if (!finished) {
+                    throw new Error('The response ended unexpectedly');
+                }
+            }
+        };
+    }
+    
+    // Build the node for one reasoning step
+    function createStepNode(step, number) {
+        const stepDiv = document.createElement('div');
+        stepDiv.className = 'step';
+        
+        const title = document.createElement('div');
+        title.className = 'step-title';
+        title.textContent = `Step ${number}: ${step.title || ''}`;
+        
+        const content = document.createElement('div');
+        content.className = 'step-content';
+        content.innerHTML = formatContent(step.content);
+        
+        stepDiv.appendChild(title);
+        stepDiv.appendChild(content);
+        return stepDiv;
+    }
+    
     // Add message to chat
     function addMessage(content, role) {
         const messageDiv = document.createElement('div');
@@ -143,40 +301,6 @@ document.addEventListener('DOMContentLoaded', function() {
         chatMessages.appendChild(errorDiv);
     }
     
-    // Process and display response
-    function processResponse(result) {
-        const messageDiv = addMessage('', 'assistant');
-        
-        if (result.structured === false) {
-            // Unstructured response
-            messageDiv.innerHTML = `<div class="unstructured-content">${formatContent(result.content)}</div>`;
-            return;
-        }
-        
-        if (result.reasoning_steps && Array.isArray(result.reasoning_steps)) {
-            // Structured response with reasoning steps
-            const stepsHtml = result.reasoning_steps.map((step, index) => `
-                <div class="step">
-                    <div class="step-title">Step ${index + 1}: ${escapeHtml(step.title)}</div>
-                    <div class="step-content">${formatContent(step.content)}</div>
-                </div>
-            `).join('');
-            
-            let finalAnswer = '';
-            if (result.final_answer) {
-                finalAnswer = `<div class="final-answer">${formatContent(result.final_answer)}</div>`;
-            }
-            
-            messageDiv.innerHTML = stepsHtml + finalAnswer;
-        } else if (result.content) {
-            // Fallback to content field
-            messageDiv.innerHTML = `<div class="unstructured-content">${formatContent(result.content)}</div>`;
-        } else {
-            // Unknown format
-            messageDiv.textContent = 'Received an unexpected response format.';
-        }
-    }
-    
     // Format content with basic markdown
     function formatContent(content) {
         if (!content) return '';
@@ -0,0 +1,169 @@
+"""
+Tests for admission control and request deadlines.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.deadline import Deadline, DeadlineExceeded
+from src.web.admission import AdmissionController, Priority, QueueFullError, run_with_deadline
+
+
+class FakeRequest:
+    """Stand-in for a Starlette request that can simulate a disconnect."""
+
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+class TestDeadline:
+
+    def test_unbounded(self):
+        """A deadline without timeout never expires on its own."""
+        deadline = Deadline()
+        assert deadline.remaining() is None
+        assert not deadline.expired
+        deadline.check()
+
+    def test_cancel(self):
+        """Cancelling a deadline makes check() raise."""
+        deadline = Deadline(60)
+        deadline.cancel()
+        assert deadline.expired
+        with pytest.raises(DeadlineExceeded):
+            deadline.check()
+
+
+class TestAdmissionController:
+
+    def test_priority_parse(self):
+        """Priority names are parsed case-insensitively."""
+        assert Priority.parse(None) == Priority.INTERACTIVE
+        assert Priority.parse("Batch") == Priority.BATCH
+        with pytest.raises(ValueError):
+            Priority.parse("urgent")
+
+    def test_sheds_when_queue_full(self):
+        """Requests beyond concurrency plus queue are rejected with a Retry-After."""
+        async def scenario():
+            # Arrange
+            controller = AdmissionController(max_concurrency=1, max_queue=1)
+            await controller.acquire(Priority.INTERACTIVE)
+            waiter = asyncio.ensure_future(controller.acquire(Priority.INTERACTIVE))
+            await asyncio.sleep(0)
+
+            # Act / Assert
+            with pytest.raises(QueueFullError) as excinfo:
+                await controller.acquire(Priority.INTERACTIVE)
+            assert excinfo.value.retry_after >= 1
+            assert controller.shed_count == 1
+
+            controller.release()
+            await waiter
+            assert controller.active == 1
+
+        asyncio.run(scenario())
+
+    def test_batch_limited_to_queue_share(self):
+        """Batch requests cannot fill the queue reserved for interactive traffic."""
+        async def scenario():
+            controller = AdmissionController(max_concurrency=1, max_queue=2, batch_queue_share=0.5)
+            await controller.acquire(Priority.INTERACTIVE)
+            batch = asyncio.ensure_future(controller.acquire(Priority.BATCH))
+            await asyncio.sleep(0)
+
+            with pytest.raises(QueueFullError):
+                await controller.acquire(Priority.BATCH)
+
+            interactive = asyncio.ensure_future(controller.acquire(Priority.INTERACTIVE))
+            await asyncio.sleep(0)
+            assert controller.queued == 2
+
+            batch.cancel()
+            interactive.cancel()
+            await asyncio.gather(batch, interactive, return_exceptions=True)
+
+        asyncio.run(scenario())
+
+    def test_interactive_served_before_batch(self):
+        """Waiting interactive requests get the next free slot ahead of batch ones."""
+        async def scenario():
+            controller = AdmissionController(max_concurrency=1, max_queue=4)
+            order = []
+
+            async def request(name, priority):
+                async with controller.slot(priority):
+                    order.append(name)
+
+            await controller.acquire(Priority.INTERACTIVE)
+            tasks = [
+                asyncio.ensure_future(request("batch", Priority.BATCH)),
+                asyncio.ensure_future(request("interactive", Priority.INTERACTIVE)),
+            ]
+            await asyncio.sleep(0)
+            controller.release()
+            await asyncio.gather(*tasks)
+
+            assert order == ["interactive", "batch"]
+            assert controller.active == 0
+
+        asyncio.run(scenario())
+
+    def test_deadline_while_queued(self):
+        """A queued request gives up when its deadline expires."""
+        async def scenario():
+            controller = AdmissionController(max_concurrency=1, max_queue=4)
+            await controller.acquire(Priority.INTERACTIVE)
+
+            with pytest.raises(DeadlineExceeded):
+                await controller.acquire(Priority.INTERACTIVE, Deadline(0.05))
+            assert controller.queued == 0
+
+        asyncio.run(scenario())
+
+
+class TestRunWithDeadline:
+
+    def test_returns_result(self):
+        """The function's result is returned when it completes in time."""
+        result = asyncio.run(run_with_deadline(FakeRequest(), Deadline(5), lambda x: x * 2, 21))
+        assert result == 42
+
+    def test_forwards_deadline_keyword(self):
+        """The deadline can be passed on to the function as a keyword argument."""
+        deadline = Deadline(5)
+
+        result = asyncio.run(run_with_deadline(FakeRequest(), deadline, lambda deadline: deadline, deadline=deadline))
+
+        assert result is deadline
+
+    def test_cancels_on_disconnect(self):
+        """A client disconnect cancels the deadline seen by the worker."""
+        async def scenario():
+            request = FakeRequest()
+            deadline = Deadline(5)
+
+            def work():
+                while not deadline.expired:
+                    time.sleep(0.01)
+                deadline.check()
+
+            task = asyncio.ensure_future(run_with_deadline(request, deadline, work))
+            await asyncio.sleep(0.05)
+            request.disconnected = True
+
+            with pytest.raises(DeadlineExceeded):
+                await task
+            assert deadline.cancelled
+
+        asyncio.run(scenario())
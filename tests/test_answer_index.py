@@ -0,0 +1,104 @@
+"""
+Tests for the precomputed answer index.
+"""
+
+import json
+import os
+import sys
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'examples')))
+
+from src.api.backends import configured_model
+from src.api.fake import FakeBackend
+from src.cot.answer_index import AnswerIndex, normalize_query
+
+RESULT = {
+    "reasoning_steps": [{"title": "Count", "content": "s-t-r-a-w-b-e-r-r-y has three Rs.", "next_action": "final_answer"}],
+    "final_answer": "3",
+}
+
+
+def test_normalize_query():
+    """Case, whitespace, curly quotes and trailing punctuation do not matter."""
+    assert normalize_query("How many Rs are in the word 'strawberry'?") == \
+        normalize_query("  how many  RS are in the word ‘strawberry’ ")
+    assert normalize_query("What is 2+2?") != normalize_query("What is 2+3?")
+
+
+def test_lookup_matches_model_and_settings():
+    """Answers are only served for the model and settings they were built with."""
+    index = AnswerIndex(model="m")
+    index.add("How many Rs are in the word 'strawberry'?", RESULT)
+
+    assert index.lookup("how many rs are in the word 'strawberry'", "m") == RESULT
+    assert index.lookup("How many Rs are in the word 'strawberry'?", "other-model") is None
+    assert index.lookup("How many Rs are in the word 'strawberry'?", "m", use_tools=False) is None
+    assert index.lookup("How many Rs are in the word 'strawberry'?", "m", structured_output=False) is None
+    assert (index.hits, index.misses) == (1, 3)
+
+    # Callers get a copy they may modify
+    index.lookup("How many Rs are in the word 'strawberry'?", "m")["final_answer"] = "4"
+    assert index.lookup("How many Rs are in the word 'strawberry'?", "m")["final_answer"] == "3"
+
+
+def test_save_and_load(tmp_path):
+    """An index round-trips through its file, and a stale one is not served."""
+    path = str(tmp_path / "index.json")
+    index = AnswerIndex(model="m")
+    index.add("What is 2+2?", RESULT)
+    index.save(path)
+
+    assert AnswerIndex.load(path).lookup("what is 2+2", "m") == RESULT
+    assert len(AnswerIndex.load(str(tmp_path / "missing.json"))) == 0
+
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    data["fingerprint"] = "built-with-other-prompts"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    assert len(AnswerIndex.load(path)) == 0
+
+
+@patch('src.cot.reasoning.GroqClient')
+def test_reason_endpoint_serves_precomputed_answers(mock_groq_client):
+    """Indexed queries are answered without calling the model."""
+    import web_app
+
+    backend = FakeBackend()
+    mock_groq_client.return_value = backend
+    backend.model = configured_model()
+    index = AnswerIndex(model=backend.model)
+    index.add("How many Rs are in the word 'strawberry'?", RESULT)
+    web_app.get_reasoner.cache_clear()
+    try:
+        with patch.object(web_app, "get_answer_index", return_value=index), \
+                patch.object(backend, "generate_completion", wraps=backend.generate_completion) as completion:
+            with TestClient(web_app.app) as client:
+                cached = client.post("/api/reason", json={"query": "how many Rs are in the word 'strawberry'?"})
+                streamed = client.post("/api/reason/stream", json={"query": "How many Rs are in the word 'strawberry'"})
+                with client.websocket_connect("/ws/reason") as websocket:
+                    websocket.send_json({"query": "how many rs are in the word 'strawberry'?"})
+                    session_events = [websocket.receive_json() for _ in range(3)]
+                # Index hits create no reasoner or client
+                assert web_app.get_reasoner.cache_info().currsize == 0
+                assert mock_groq_client.call_count == 0
+                client.post("/api/reason", json={"query": "What is 6 * 7?"})
+                assert completion.call_count > 0
+                metrics = client.get("/metrics")
+    finally:
+        web_app.get_reasoner.cache_clear()
+
+    assert cached.headers["X-Answer-Source"] == "index"
+    assert cached.json()["result"]["final_answer"] == "3"
+    assert cached.json()["usage"]["calls"] == 0
+    events = [json.loads(line) for line in streamed.text.splitlines()]
+    assert streamed.headers["X-Answer-Source"] == "index"
+    assert [event["type"] for event in events] == ["step", "result", "usage"]
+    assert events[1]["result"]["final_answer"] == "3"
+    assert [event["type"] for event in session_events] == ["step", "result", "usage"]
+    assert "cot_answer_index_hits_total 3" in metrics.text
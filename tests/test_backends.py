@@ -0,0 +1,142 @@
+"""
+Tests for the completion backends.
+"""
+
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.api.backends import create_backend
+from src.api.fake import FakeBackend, find_expression
+from src.api.openai_compat import OpenAICompatibleBackend
+from src.cot.reasoning import ChainOfThoughtReasoner
+
+
+class TestFakeBackend:
+
+    def test_find_expression(self):
+        """Arithmetic is found in a question; plain numbers are not expressions."""
+        assert find_expression("What is 12 * (3 + 4) in total?") == "12 * (3 + 4)"
+        assert find_expression("Born in 1990, what is my age?") is None
+
+    def test_reasoner_with_tools(self):
+        """The fake requests the calculator and answers with its result."""
+        backend = FakeBackend()
+        reasoner = ChainOfThoughtReasoner(use_tools=True, client=backend)
+
+        result = reasoner.process_query("What is 6 * 7?")
+
+        assert result["final_answer"] == "6 * 7 = 42"
+        assert len(result["reasoning_steps"]) == 3
+        assert backend.calls == 2
+
+    def test_deterministic(self):
+        """The same request always produces the same response."""
+        reasoner = ChainOfThoughtReasoner(use_tools=False, client=FakeBackend())
+        assert reasoner.process_query("Why is the sky blue?") == reasoner.process_query("Why is the sky blue?")
+
+    def test_streaming_matches_blocking(self):
+        """Streaming yields the same result as a blocking call."""
+        reasoner = ChainOfThoughtReasoner(use_tools=True, client=FakeBackend(chunk_size=5))
+        events = list(reasoner.stream_query("What is 6 * 7?"))
+
+        assert events[-1]["result"] == reasoner.process_query("What is 6 * 7?")
+        assert [e["type"] for e in events].count("step") == 3
+
+    def test_create_backend(self):
+        """Backends are selected by name."""
+        assert isinstance(create_backend("fake"), FakeBackend)
+        with pytest.raises(ValueError):
+            create_backend("nonexistent")
+
+
+class _CompletionHandler(BaseHTTPRequestHandler):
+    """Minimal OpenAI-compatible server returning canned responses."""
+
+    requests = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        _CompletionHandler.requests.append((self.path, self.headers.get("Authorization"), payload))
+
+        if payload.get("stream"):
+            chunks = [
+                {"choices": [{"delta": {"content": "Hel"}}]},
+                {"choices": [{"delta": {"content": "lo"}}]},
+                {"choices": [{"delta": {"tool_calls": [{"index": 0, "id": "c1", "function": {"name": "calculate", "arguments": "{\"expr"}}]}}]},
+                {"choices": [{"delta": {"tool_calls": [{"index": 0, "function": {"arguments": "ession\": \"1+1\"}"}}]}}]},
+                {"choices": [], "usage": {"prompt_tokens": 5, "completion_tokens": 9, "total_tokens": 14}},
+            ]
+            body = "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in chunks) + "data: [DONE]\n\n"
+            content_type = "text/event-stream"
+        else:
+            body = json.dumps({
+                "choices": [{"message": {"role": "assistant", "content": "Hello"}}],
+                "usage": {"prompt_tokens": 5, "completion_tokens": 1, "total_tokens": 6},
+            })
+            content_type = "application/json"
+
+        encoded = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+
+@pytest.fixture
+def completion_server():
+    _CompletionHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _CompletionHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+class TestOpenAICompatibleBackend:
+
+    def test_generate_completion(self, completion_server):
+        """Requests go to /chat/completions with the configured model and key."""
+        backend = OpenAICompatibleBackend(completion_server, api_key="secret", model="local")
+        response = backend.generate_completion(
+            [{"role": "user", "content": "Hi"}],
+            response_format={"type": "json_schema", "schema": {}}
+        )
+        backend.close()
+
+        assert response == {
+            "content": "Hello",
+            "tool_calls": None,
+            "usage": {"prompt_tokens": 5, "completion_tokens": 1, "total_tokens": 6},
+        }
+        path, authorization, payload = _CompletionHandler.requests[0]
+        assert path == "/v1/chat/completions"
+        assert authorization == "Bearer secret"
+        assert payload["model"] == "local"
+        assert payload["response_format"] == {"type": "json_object"}
+
+    def test_stream_completion(self, completion_server):
+        """Streamed content and tool call fragments are reassembled, followed by usage."""
+        backend = OpenAICompatibleBackend(completion_server)
+        chunks = list(backend.stream_completion([{"role": "user", "content": "Hi"}]))
+        backend.close()
+
+        assert [chunk["content"] for chunk in chunks[:2]] == ["Hel", "lo"]
+        assert chunks[-1] == {"usage": {"prompt_tokens": 5, "completion_tokens": 9, "total_tokens": 14}}
+        assert _CompletionHandler.requests[0][2]["stream_options"] == {"include_usage": True}
+        tool_call = chunks[2]["tool_calls"][0]
+        assert tool_call.id == "c1"
+        assert tool_call.function.name == "calculate"
+        assert json.loads(tool_call.function.arguments) == {"expression": "1+1"}
@@ -0,0 +1,95 @@
+"""
+Tests for the calculator tool.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tools.calculator import calculate, evaluate
+
+
+def test_float_mode_is_the_default():
+    """Without a mode the calculator keeps Python's float semantics."""
+    assert calculate("2+2") == {"result": 4}
+    assert calculate("0.1 + 0.2") == {"result": 0.1 + 0.2}
+    assert calculate("sqrt(16) + max(1, 2)") == {"result": 6.0}
+
+
+def test_exact_mode_avoids_float_rounding():
+    """Exact mode computes with rationals and reports terminating decimals in full."""
+    result = calculate("0.1 + 0.2", mode="exact")
+    assert result == {"result": 0.3, "exact": "0.3", "mode": "exact", "inexact": False}
+
+    assert calculate("1/3", mode="exact")["exact"] == "1/3"
+    assert calculate("sqrt(16/9)", mode="exact")["exact"] == "4/3"
+
+
+@pytest.mark.parametrize("expression, exact", [
+    ("2.0", "2"), ("-3.0", "-3"), ("exp(0)", "1"), ("log(8, 2)", "3"), ("-(1.5 + 1.5)", "-3"),
+])
+def test_exact_mode_whole_numbers(expression, exact):
+    """Whole-number results print as integers, whether written as floats or approximated."""
+    assert calculate(expression, mode="exact")["exact"] == exact
+
+
+def test_exact_mode_compound_interest():
+    """Money calculations keep every cent until the final rounding."""
+    result = calculate("round(1000 * (1 + 0.05/12)**120, 2)", mode="exact")
+    assert result["exact"] == "1647.01"
+    assert result["inexact"] is False
+
+
+def test_exact_mode_keeps_large_integers():
+    """Integers beyond float precision are not rounded."""
+    result = calculate("2**100 + 1", mode="exact")
+    assert result["exact"] == str(2**100 + 1)
+
+
+def test_decimal_mode_precision_and_floor_semantics():
+    """Decimal mode honours the precision and Python's // and % semantics."""
+    assert calculate("1/3", mode="decimal", precision=5)["exact"] == "0.33333"
+    assert calculate("-7 % 3", mode="decimal")["exact"] == "2"
+    assert calculate("-7 // 2", mode="decimal")["exact"] == "-4"
+
+    irrational = calculate("sqrt(2)", mode="decimal", precision=40)
+    assert irrational["exact"] == "1.41421356237309504880168872420969807857"
+    assert irrational["inexact"] is True
+
+
+@pytest.mark.parametrize("expression", ["9**9**9", "10**10**10", "[1] * 10**9", "1e400 * 2"])
+def test_oversized_results_are_rejected(expression):
+    """Expressions that would exhaust memory or overflow return an error instead."""
+    assert "error" in calculate(expression, mode="exact")
+
+
+@pytest.mark.parametrize("mode", ["float", "exact"])
+def test_results_are_printable(mode):
+    """Results within the size limit serialize; larger ones are rejected, never unprintable."""
+    json.dumps(calculate("2**14000", mode=mode))
+    json.dumps(calculate("1/2**14000", mode=mode))
+    assert calculate("2**20000", mode=mode) == {"error": "Calculation error: Result is too large"}
+
+
+def test_round_digits_are_bounded():
+    """round() with a huge number of digits fails fast instead of computing 10**ndigits."""
+    assert "error" in calculate("round(1/3, 10**7)", mode="exact")
+    assert calculate("round(1/3, 3)", mode="exact")["exact"] == "0.333"
+
+
+def test_float_underflow_is_zero():
+    """Tiny float results underflow to zero like Python floats."""
+    assert calculate("10**-400000") == {"result": 0.0}
+
+
+def test_unsafe_expressions_are_rejected():
+    """Anything but arithmetic on numbers and the allowed functions is refused."""
+    assert "error" in calculate("__import__('os').system('true')")
+    assert "error" in calculate("1 +", mode="exact")
+    with pytest.raises(ValueError):
+        evaluate("1 + 1", mode="symbolic")
@@ -0,0 +1,90 @@
+"""
+Tests for the record/replay cassette backend.
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.api.cassette import CassetteBackend, CassetteMiss
+from src.api.fake import FakeBackend
+from src.cot.reasoning import ChainOfThoughtReasoner
+
+
+@pytest.fixture
+def cassette_path(tmp_path):
+    return str(tmp_path / "cassette.jsonl")
+
+
+def test_replay_matches_recording(cassette_path):
+    """A replayed run reproduces the recorded run, including tool calls."""
+    recorder = CassetteBackend(cassette_path, inner=FakeBackend(), mode="record")
+    recorded = ChainOfThoughtReasoner(use_tools=True, client=recorder).process_query("What is 6 * 7?")
+
+    def no_backend():
+        raise AssertionError("replay must not create a backend")
+
+    player = CassetteBackend(cassette_path, inner=no_backend, mode="replay")
+    replayed = ChainOfThoughtReasoner(use_tools=True, client=player).process_query("What is 6 * 7?")
+
+    assert replayed == recorded
+    assert replayed["final_answer"] == "6 * 7 = 42"
+    assert player.hits == 2
+
+
+def test_streams_are_recorded_with_timing(cassette_path):
+    """Streamed chunks are replayed in order, with timing scaled by speed."""
+    recorder = CassetteBackend(cassette_path, inner=FakeBackend(chunk_size=10, chunk_delay=0.01), mode="record")
+    reasoner = ChainOfThoughtReasoner(use_tools=False, client=recorder)
+    recorded = list(reasoner.stream_query("Why is the sky blue?"))
+    recorded_events = [event["type"] for event in recorded]
+
+    player = CassetteBackend(cassette_path, mode="replay", speed=1.0)
+    start = time.monotonic()
+    replayed = list(ChainOfThoughtReasoner(use_tools=False, client=player).stream_query("Why is the sky blue?"))
+    original_speed = time.monotonic() - start
+
+    fast = CassetteBackend(cassette_path, mode="replay", speed=0)
+    start = time.monotonic()
+    list(ChainOfThoughtReasoner(use_tools=False, client=fast).stream_query("Why is the sky blue?"))
+    instant = time.monotonic() - start
+
+    assert [event["type"] for event in replayed] == recorded_events
+    assert replayed[-1] == recorded[-1]
+    assert original_speed > 0.1
+    assert instant < original_speed / 5
+
+
+def test_stream_recording_answers_blocking_request(cassette_path):
+    """A streamed recording can answer the same request made without streaming."""
+    recorder = CassetteBackend(cassette_path, inner=FakeBackend(), mode="record")
+    messages = [{"role": "user", "content": "Hello"}]
+    chunks = list(recorder.stream_completion(messages))
+
+    player = CassetteBackend(cassette_path, mode="replay")
+    response = player.generate_completion(messages)
+
+    assert response["content"] == "".join(chunk.get("content", "") for chunk in chunks)
+    assert response["usage"] == chunks[-1]["usage"]
+
+
+def test_replay_miss_raises(cassette_path):
+    """Unrecorded requests fail in replay mode and are recorded in auto mode."""
+    messages = [{"role": "user", "content": "Hello"}]
+    with pytest.raises(CassetteMiss):
+        CassetteBackend(cassette_path, mode="replay").generate_completion(messages)
+
+    backend = FakeBackend()
+    auto = CassetteBackend(cassette_path, inner=backend, mode="auto")
+    auto.generate_completion(messages)
+    auto.generate_completion(messages)
+    assert backend.calls == 1
+
+    # Timeouts do not change the request key
+    replay = CassetteBackend(cassette_path, mode="replay")
+    assert replay.generate_completion(messages, timeout=3.0)["content"]
@@ -0,0 +1,79 @@
+"""
+Tests for the evaluation harness.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.api.fake import FakeBackend
+from src.cot.reasoning import ChainOfThoughtReasoner
+from src.eval.datasets import EvalItem, load_dataset, parse_item
+from src.eval.runner import EvalRunner, diff_runs, format_report, rescore
+from src.eval.scoring import extract_number, is_correct
+
+
+class TestScoring:
+
+    @pytest.mark.parametrize("text, number", [
+        ("6 * 7 = 42", 42.0),
+        ("The total is $1,500.", 1500.0),
+        ("It dropped to -4 degrees", -4.0),
+        ("about 485.95 dollars", 485.95),
+        ("no numbers here", None),
+    ])
+    def test_extract_number(self, text, number):
+        """The last number in the text is extracted."""
+        assert extract_number(text) == number
+
+    def test_numeric_tolerance(self):
+        """Numeric items allow the item's tolerance."""
+        item = EvalItem(id="1", question="q", answer="485.95", kind="numeric", tolerance=0.01)
+        assert is_correct("The interest is about $485.946", item)
+        assert not is_correct("The interest is $486.10", item)
+
+    def test_exact_match_is_normalized(self):
+        """Exact matches ignore case, punctuation and articles."""
+        item = EvalItem(id="1", question="q", answer="The Eiffel Tower")
+        assert is_correct("eiffel tower.", item)
+        assert not is_correct("Eiffel Tower in Paris", item)
+
+
+def test_gsm8k_style_answers():
+    """Worked solutions ending in '#### N' are reduced to the number."""
+    item = parse_item({"question": "q", "answer": "250 * 6 = 1,500 grams.\n#### 1,500"}, default_id="7")
+    assert item == EvalItem(id="7", question="q", answer="1500", kind="numeric")
+
+
+def test_bundled_datasets_load():
+    """The bundled datasets can be loaded by name."""
+    assert len(load_dataset("examples")) == 4
+    assert all(item.kind == "numeric" for item in load_dataset("math_sample"))
+
+
+def test_run_rescore_and_diff():
+    """A run against the fake backend can be rescored and diffed offline."""
+    items = [
+        EvalItem(id="mul", question="What is 6 * 7?", answer="42", kind="numeric"),
+        EvalItem(id="add", question="What is 2 + 2?", answer="5", kind="numeric"),
+    ]
+    reasoner = ChainOfThoughtReasoner(use_tools=True, client=FakeBackend())
+    run = EvalRunner(reasoner, concurrency=2).run(items, name="base")
+
+    assert [item["correct"] for item in run["items"]] == [True, False]
+    assert run["summary"]["accuracy"] == 0.5
+    assert run["summary"]["tokens"] > 0
+    json.dumps(run)
+
+    fixed_items = [items[0], items[1]._replace(answer="4")]
+    new = dict(rescore(run, fixed_items), name="new")
+    diff = diff_runs(run, new)
+
+    assert diff["fixed"] == ["add"]
+    assert diff["regressed"] == []
+    assert "+50.0 pts" in format_report(diff)
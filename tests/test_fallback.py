@@ -0,0 +1,94 @@
+"""
+Tests for speculative fallback to unstructured reasoning.
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.api.fake import FakeBackend
+from src.cot.reasoning import ChainOfThoughtReasoner
+from src.utils.deadline import Deadline
+
+
+class FlakyBackend(FakeBackend):
+    """FakeBackend whose structured attempts fail after a delay."""
+
+    def __init__(self, structured_latency: float, unstructured_latency: float, fail: bool):
+        super().__init__()
+        self.structured_latency = structured_latency
+        self.unstructured_latency = unstructured_latency
+        self.fail = fail
+        self.unstructured_calls = 0
+
+    def generate_completion(self, messages, **kwargs):
+        if "Show your work" in messages[-1]["content"]:
+            self.unstructured_calls += 1
+            time.sleep(self.unstructured_latency)
+        else:
+            time.sleep(self.structured_latency)
+            if self.fail:
+                raise RuntimeError("upstream error")
+        return super().generate_completion(messages, **kwargs)
+
+
+def test_parallel_fallback_overlaps_attempts():
+    """With parallel speculation a failed structured attempt costs max, not sum, of the latencies."""
+    backend = FlakyBackend(structured_latency=0.3, unstructured_latency=0.3, fail=True)
+    reasoner = ChainOfThoughtReasoner(use_tools=False, client=backend)
+
+    start = time.monotonic()
+    result = reasoner.process_query_with_fallback("Why is the sky blue?", speculation="parallel")
+    elapsed = time.monotonic() - start
+
+    assert result["structured"] is False
+    assert "step by step" in result["content"]
+    assert elapsed < 0.5
+    stats = reasoner.speculation_stats()
+    assert stats["paid_off"] == 1 and stats["payoff_rate"] == 1.0
+
+
+def test_structured_result_is_preferred():
+    """A successful structured attempt wins and the speculative fallback is counted as wasted."""
+    backend = FlakyBackend(structured_latency=0.1, unstructured_latency=0.0, fail=False)
+    reasoner = ChainOfThoughtReasoner(use_tools=False, client=backend)
+
+    result = reasoner.process_query_with_fallback("Why is the sky blue?", speculation="parallel")
+
+    assert result["structured"] is True
+    assert result["reasoning_steps"]
+    assert reasoner.speculation_stats()["wasted"] == 1
+
+
+def test_delayed_fallback_only_starts_for_slow_attempts():
+    """In delayed mode a fast structured attempt never starts the fallback."""
+    backend = FlakyBackend(structured_latency=0.0, unstructured_latency=0.0, fail=False)
+    reasoner = ChainOfThoughtReasoner(use_tools=False, client=backend)
+
+    result = reasoner.process_query_with_fallback("Why is the sky blue?", speculation="delayed", speculation_delay=1.0)
+
+    assert result["structured"] is True
+    assert backend.unstructured_calls == 0
+    assert reasoner.speculation_stats()["speculated"] == 0
+
+
+def test_child_deadline_follows_parent():
+    """Cancelling a child leaves the parent alone; cancelling the parent cancels the child."""
+    parent = Deadline(10)
+    first, second = parent.child(), parent.child()
+    first.cancel()
+    assert first.cancelled and not parent.cancelled and not second.cancelled
+    parent.cancel()
+    assert second.cancelled
+    assert second.expires_at == parent.expires_at
+
+
+def test_unknown_mode_rejected():
+    reasoner = ChainOfThoughtReasoner(use_tools=False, client=FakeBackend())
+    with pytest.raises(ValueError):
+        reasoner.process_query_with_fallback("Hi", speculation="eager")
@@ -0,0 +1,132 @@
+"""
+Tests for hedged requests.
+"""
+
+import os
+import queue
+import sys
+import threading
+import time
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.api.backends import CompletionBackend
+from src.api.hedging import HedgedBackend, _Attempt
+from src.utils.usage import estimate_tokens, metering
+
+MESSAGES = [{"role": "user", "content": "Hi"}]
+
+
+class SlowBackend(CompletionBackend):
+    """Streams a fixed reply after a delay and records when streams are closed."""
+
+    def __init__(self, reply, delay=0.0, error=None):
+        self.model = "slow"
+        self.reply = reply
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.closed = threading.Event()
+
+    def generate_completion(self, messages, **kwargs):
+        raise NotImplementedError
+
+    def stream_completion(self, messages, **kwargs):
+        self.calls += 1
+        try:
+            time.sleep(self.delay)
+            if self.error:
+                raise self.error
+            for part in self.reply.split(" "):
+                yield {"content": part + " "}
+        finally:
+            self.closed.set()
+
+
+def test_fast_primary_is_not_hedged():
+    """No hedge request is sent when the first token arrives in time."""
+    primary = SlowBackend("fast reply")
+    alternate = SlowBackend("hedge reply")
+    backend = HedgedBackend(primary, alternate, initial_delay=0.5, max_hedge_rate=1.0)
+
+    response = backend.generate_completion(MESSAGES)
+
+    assert response["content"] == "fast reply "
+    assert alternate.calls == 0
+    assert backend.stats()["hedges"] == 0
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    """A slow primary is hedged; the hedge wins and the primary is closed."""
+    primary = SlowBackend("slow reply", delay=0.5)
+    alternate = SlowBackend("hedge reply")
+    backend = HedgedBackend(primary, alternate, initial_delay=0.05, max_hedge_rate=1.0)
+
+    start = time.monotonic()
+    response = backend.generate_completion(MESSAGES)
+
+    assert time.monotonic() - start < 0.4
+    assert response["content"] == "hedge reply "
+    assert backend.stats() == {"requests": 1, "hedges": 1, "hedge_wins": 1, "hedge_rate": 1.0}
+    assert primary.closed.wait(2.0)
+
+
+def test_losing_attempt_usage_is_recorded():
+    """The cancelled primary's tokens are recorded in the request's meter."""
+    primary = SlowBackend("slow reply", delay=0.3)
+    alternate = SlowBackend("hedge reply")
+    backend = HedgedBackend(primary, alternate, initial_delay=0.05, max_hedge_rate=1.0)
+
+    with metering("test") as meter:
+        assert backend.generate_completion(MESSAGES)["content"] == "hedge reply "
+
+    deadline = time.monotonic() + 2.0
+    while "hedge" not in meter.summary()["by_feature"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    hedge = meter.summary()["by_feature"]["hedge"]
+    assert hedge["calls"] == 1
+    assert hedge["prompt_tokens"] > 0
+
+
+def test_usage_of_an_attempt_that_finished_before_losing_is_recorded_once():
+    """An attempt that is done before the winner cancels it still has its usage recorded, once."""
+    with metering("test") as meter:
+        attempt = _Attempt(1, SlowBackend("finished reply"), {"messages": MESSAGES}, queue.Queue())
+        attempt._thread.join()
+        attempt.lose()
+        attempt.lose()
+    hedge = meter.summary()["by_feature"]["hedge"]
+    assert hedge["calls"] == 1
+    assert hedge["completion_tokens"] == estimate_tokens("finished reply ")
+
+
+def test_hedge_rate_is_capped():
+    """Requests beyond the hedge rate are not hedged."""
+    primary = SlowBackend("slow reply", delay=0.1)
+    alternate = SlowBackend("hedge reply")
+    backend = HedgedBackend(primary, alternate, initial_delay=0.01, max_hedge_rate=0.0)
+
+    assert backend.generate_completion(MESSAGES)["content"] == "slow reply "
+    assert alternate.calls == 0
+
+
+def test_delay_follows_latency_percentile():
+    """Once enough latencies are known the delay is their percentile."""
+    backend = HedgedBackend(SlowBackend("x"), percentile=90, min_samples=10, initial_delay=5.0)
+    for latency in range(1, 11):
+        backend._record(latency / 10, False, False)
+    assert backend.hedge_delay() == pytest.approx(1.0)
+
+
+def test_error_without_hedge_is_raised():
+    """Errors are not retried as hedges."""
+    primary = SlowBackend("", error=RuntimeError("upstream failed"))
+    alternate = SlowBackend("hedge reply")
+    backend = HedgedBackend(primary, alternate, initial_delay=0.5, max_hedge_rate=1.0)
+
+    with pytest.raises(RuntimeError):
+        backend.generate_completion(MESSAGES)
+    assert alternate.calls == 0
@@ -0,0 +1,68 @@
+"""
+Import-time budget tests.
+
+Importing the library must not construct network clients, validate
+credentials or pull in the groq SDK. The cumulative import time reported by
+``python -X importtime`` is checked against a budget (override with
+IMPORT_TIME_BUDGET_MS on slow machines).
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "150"))
+
+
+def _profile_import(module, setup=""):
+    """
+    Import a module in a fresh interpreter without credentials.
+
+    Returns:
+        Tuple of (cumulative import time in ms, whether groq was imported)
+    """
+    env = {k: v for k, v in os.environ.items() if k != "GROQ_API_KEY"}
+    code = f"{setup}import {module}, sys; print('groq' in sys.modules)"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    cumulative_us = None
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = [field.strip() for field in line.split(":", 1)[1].split("|")]
+        if fields[2] == module:
+            cumulative_us = int(fields[1])
+
+    assert cumulative_us is not None, f"{module} not found in -X importtime output"
+    return cumulative_us / 1000, proc.stdout.strip() == "True"
+
+
+@pytest.mark.parametrize("module", [
+    "src.api.groq_client",
+    "src.cot.reasoning",
+    "src.tools.calculator",
+])
+def test_import_within_budget(module):
+    """Core modules import quickly, without credentials and without the groq SDK."""
+    elapsed_ms, groq_imported = _profile_import(module)
+
+    assert not groq_imported
+    assert elapsed_ms < IMPORT_TIME_BUDGET_MS, f"importing {module} took {elapsed_ms:.1f} ms"
+
+
+def test_web_app_import_is_lazy():
+    """Importing the web app constructs no reasoners or API clients."""
+    _, groq_imported = _profile_import("web_app", setup="import sys; sys.path.insert(0, 'examples'); ")
+
+    assert not groq_imported
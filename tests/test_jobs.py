@@ -0,0 +1,180 @@
+"""
+Tests for asynchronous jobs.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'examples')))
+
+from src.api.fake import FakeBackend
+from src.web.jobs import (
+    CANCELLED, FAILED, QUEUED, SUCCEEDED, JobManager, JobQueueFullError, deliver_callback, resolve_callback_host,
+    sign_callback, validate_callback_url
+)
+
+
+async def echo(job):
+    await asyncio.sleep(job.payload.get("sleep", 0))
+    if job.payload.get("fail"):
+        raise RuntimeError("boom")
+    return {"echo": job.payload["value"]}
+
+
+class TestJobManager:
+
+    def test_job_lifecycle(self):
+        """Jobs run in the background and can be long-polled until they finish."""
+        async def scenario():
+            manager = JobManager(echo, workers=2)
+            job = manager.submit({"value": 1, "sleep": 0.05})
+            assert job.status == QUEUED
+            assert (await manager.wait(job.id, 5)).status == SUCCEEDED
+            assert job.result == {"echo": 1}
+
+            failing = manager.submit({"value": 2, "fail": True})
+            await manager.wait(failing.id, 5)
+            assert (failing.status, failing.error) == (FAILED, "boom")
+            await manager.close()
+
+        asyncio.run(scenario())
+
+    def test_timeout_and_cancel(self):
+        """Jobs past their timeout fail; queued and running jobs can be cancelled."""
+        async def scenario():
+            manager = JobManager(echo, workers=1)
+            slow = manager.submit({"value": 1, "sleep": 10}, timeout=0.05)
+            queued = manager.submit({"value": 2})
+            manager.cancel(queued.id)
+            await manager.wait(slow.id, 5)
+            assert (slow.status, slow.error) == (FAILED, "Job deadline exceeded")
+            assert slow.deadline.cancelled
+            assert queued.status == CANCELLED
+
+            running = manager.submit({"value": 3, "sleep": 10})
+            await asyncio.sleep(0.05)
+            manager.cancel(running.id)
+            await manager.wait(running.id, 5)
+            assert running.status == CANCELLED
+            await manager.close()
+
+        asyncio.run(scenario())
+
+    def test_limits_and_expiry(self):
+        """Submissions beyond max_pending are rejected and results expire after the TTL."""
+        async def scenario():
+            manager = JobManager(echo, workers=1, max_pending=1, result_ttl=0.05)
+            job = manager.submit({"value": 1, "sleep": 0.05})
+            with pytest.raises(JobQueueFullError):
+                manager.submit({"value": 2})
+            with pytest.raises(ValueError):
+                manager.submit({"value": 3}, callback_url="file:///etc/passwd")
+            await manager.wait(job.id, 5)
+            assert manager.get(job.id) is job
+            await asyncio.sleep(0.1)
+            assert manager.get(job.id) is None
+            await manager.close()
+
+        asyncio.run(scenario())
+
+
+def test_callback_urls_must_be_public():
+    """Callbacks cannot target private, loopback, link-local or metadata addresses unless allowed."""
+    for url in ("http://127.0.0.1/done", "http://10.0.0.5/done", "http://169.254.169.254/latest/meta-data",
+                "http://[::1]/done", "http://[::ffff:192.168.0.1]/done", "http://0.0.0.0/done", "http://localhost:8000/done"):
+        with pytest.raises(ValueError):
+            validate_callback_url(url)
+    assert validate_callback_url("https://93.184.216.34/hook") == "https://93.184.216.34/hook"
+    assert validate_callback_url("http://127.0.0.1:9000/done", ["127.0.0.1"])
+
+    # Names are checked by resolving them when the callback is delivered
+    assert validate_callback_url("http://internal.localdomain/done")
+    with pytest.raises(ValueError):
+        resolve_callback_host("http://localhost./done")
+    assert resolve_callback_host("http://localhost/done", ["localhost"]) in ("127.0.0.1", "::1")
+
+
+def test_callback_connects_to_the_checked_address():
+    """A host re-resolving to an internal address after the check is still reached at the checked one."""
+    def address(ip):
+        return [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", (ip, 80))]
+
+    # A DNS-rebinding host: public when checked, loopback when resolved again
+    answers = [address("93.184.216.34"), address("127.0.0.1")]
+    with patch("src.web.jobs.socket.getaddrinfo", side_effect=lambda *args, **kwargs: answers.pop(0)) as resolve, \
+            patch("src.web.jobs.socket.create_connection", side_effect=ConnectionRefusedError) as connect:
+        assert deliver_callback("http://rebind.example/done", b"{}", attempts=1) is False
+    assert resolve.call_count == 1
+    assert connect.call_args.args[0] == ("93.184.216.34", 80)
+
+    # The next attempt resolves again and refuses the loopback answer without connecting
+    answers = [address("93.184.216.34"), address("127.0.0.1")]
+    with patch("src.web.jobs.socket.getaddrinfo", side_effect=lambda *args, **kwargs: answers.pop(0)), \
+            patch("src.web.jobs.socket.create_connection", side_effect=ConnectionRefusedError) as connect, \
+            patch("src.web.jobs.time.sleep"):
+        assert deliver_callback("http://rebind.example/done", b"{}", attempts=2) is False
+    assert [call.args[0] for call in connect.call_args_list] == [("93.184.216.34", 80)]
+
+
+class CallbackReceiver(BaseHTTPRequestHandler):
+    received = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.received.append((body, self.headers.get("X-Signature")))
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@patch('src.cot.reasoning.GroqClient')
+def test_jobs_endpoints_with_callback(mock_groq_client):
+    """A submitted job can be polled and is POSTed to its callback URL when done."""
+    import web_app
+
+    mock_groq_client.return_value = FakeBackend()
+    web_app.get_reasoner.cache_clear()
+    receiver = HTTPServer(("127.0.0.1", 0), CallbackReceiver)
+    threading.Thread(target=receiver.serve_forever, daemon=True).start()
+    callback_url = f"http://127.0.0.1:{receiver.server_port}/done"
+    try:
+        with patch.object(web_app.jobs, "callback_secret", "secret"), \
+                patch.object(web_app.jobs, "callback_allowed_hosts", ["127.0.0.1"]), TestClient(web_app.app) as client:
+            submitted = client.post("/api/jobs", json={"query": "What is 6 * 7?", "callback_url": callback_url})
+            assert submitted.status_code == 202
+            job_id = submitted.json()["id"]
+            assert submitted.headers["Location"] == f"/api/jobs/{job_id}"
+
+            job = client.get(f"/api/jobs/{job_id}", params={"wait": 10}).json()
+            deadline = time.monotonic() + 10
+            while client.get(f"/api/jobs/{job_id}").json().get("callback_status") == "pending" and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            assert client.get("/api/jobs/unknown").status_code == 404
+            assert client.post("/api/jobs", json={"query": "x", "callback_url": "ftp://example.com"}).status_code == 422
+            assert client.post("/api/jobs", json={"query": "x", "callback_url": "http://169.254.169.254/"}).status_code == 422
+    finally:
+        receiver.shutdown()
+        web_app.get_reasoner.cache_clear()
+
+    assert job["status"] == SUCCEEDED
+    assert job["result"]["result"]["final_answer"]
+    assert job["result"]["usage"]["calls"] == 2
+
+    body, signature = CallbackReceiver.received[-1]
+    assert json.loads(body)["id"] == job_id
+    assert signature == sign_callback(body, "secret")
@@ -0,0 +1,86 @@
+"""
+Tests for the open-loop load generator and SLO checks.
+"""
+
+import asyncio
+import os
+import random
+import sys
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'examples')))
+
+from src.api.fake import FakeBackend, find_expression
+from src.eval.load import Scenario, arrival_times, check_slos, load_scenarios, plan_requests, run_scenario, summarize
+
+SCENARIO = Scenario(
+    name="test",
+    rate=40,
+    duration=0.5,
+    mix={"structured": 0.4, "unstructured": 0.2, "tools": 0.2, "stream": 0.2},
+    query_chars={"median": 150, "sigma": 0.5, "max": 600},
+    slo={"p99_ms": 5000, "max_error_rate": 0.0},
+)
+
+
+def test_poisson_arrivals():
+    """Arrivals average the requested rate over the duration."""
+    times = arrival_times(100, 50, random.Random(1))
+    assert times == sorted(times) and times[-1] < 50
+    assert 4700 < len(times) < 5300
+
+
+def test_plan_mix_and_lengths():
+    """Traffic kinds follow the mix and queries stay within the length limit."""
+    plan = plan_requests(SCENARIO._replace(rate=2000, duration=1), seed=3)
+    kinds = [kind for _, kind, _ in plan]
+    assert 0.35 < kinds.count("structured") / len(kinds) < 0.45
+    assert all(find_expression(query) for _, kind, query in plan if kind == "tools")
+    assert max(len(query) for _, _, query in plan) < 600 + 150
+    assert plan == plan_requests(SCENARIO._replace(rate=2000, duration=1), seed=3)
+    assert "steady" in load_scenarios()
+
+
+def test_summary_and_slos():
+    """Failed requests count as errors and each SLO passes or fails on its own."""
+    records = [{"kind": "structured", "status": 200, "latency": i / 1000, "ttfb": None} for i in range(1, 100)]
+    records.append({"kind": "structured", "status": 503, "latency": 0.001, "ttfb": None})
+    summary = summarize(records, elapsed=1.0)
+    summary.update(offered_rate=100, sent_rate=100)
+    assert summary["error_rate"] == 0.01
+    assert summary["latency_ms"]["p50"] == 50
+    assert summary["statuses"] == {"200": 99, "503": 1}
+
+    checks = {check["name"]: check["passed"] for check in check_slos(summary, {"p50_ms": 60, "p99_ms": 90, "max_error_rate": 0.05})}
+    assert checks == {"p50_ms": True, "p99_ms": False, "max_error_rate": True}
+    with pytest.raises(ValueError, match="Unknown SLO"):
+        check_slos(summary, {"p42_ms": 1})
+
+
+@patch('src.cot.reasoning.GroqClient')
+def test_scenario_against_app(mock_groq_client):
+    """A short scenario runs against the app in-process and meets loose SLOs."""
+    import web_app
+
+    mock_groq_client.return_value = FakeBackend()
+    web_app.get_reasoner.cache_clear()
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=web_app.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await run_scenario(client, SCENARIO, seed=1)
+
+    try:
+        summary = asyncio.run(scenario())
+    finally:
+        web_app.get_reasoner.cache_clear()
+
+    assert summary["requests"] > 5
+    assert summary["statuses"] == {"200": summary["requests"]}
+    assert summary["passed"]
+    assert sum(count for _, count in summary["histogram_ms"]) == summary["succeeded"]
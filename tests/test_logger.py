@@ -0,0 +1,64 @@
+"""
+Tests for the logging pipeline.
+"""
+
+import io
+import json
+import logging
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.logger import (
+    SamplingFilter,
+    configure_logging,
+    flush_logging,
+    get_logger,
+    reset_request_id,
+    set_request_id,
+)
+
+
+class TestLogger:
+
+    def teardown_method(self):
+        configure_logging()
+
+    def test_json_records_carry_request_id(self):
+        """JSON log lines include the request id of the current context."""
+        # Arrange
+        stream = io.StringIO()
+        configure_logging(stream=stream, fmt="json")
+        logger = get_logger("tests.logger.json")
+        token = set_request_id("req-123")
+
+        # Act
+        logger.info("Processed %d steps", 3)
+        reset_request_id(token)
+        flush_logging()
+
+        # Assert
+        record = json.loads(stream.getvalue().strip().splitlines()[-1])
+        assert record["message"] == "Processed 3 steps"
+        assert record["request_id"] == "req-123"
+        assert record["level"] == "INFO"
+
+    def test_disabled_level_is_not_formatted(self):
+        """Arguments are not formatted when the level is disabled."""
+        class Exploding:
+            def __str__(self):
+                raise AssertionError("formatted a disabled record")
+
+        logger = get_logger("tests.logger.lazy", level="INFO")
+        logger.debug("value: %s", Exploding())
+
+    def test_sampling_filter_keeps_other_levels(self):
+        """Sampling only drops DEBUG records."""
+        sampler = SamplingFilter(0.0)
+        debug = logging.LogRecord("x", logging.DEBUG, __file__, 1, "msg", None, None)
+        warning = logging.LogRecord("x", logging.WARNING, __file__, 1, "msg", None, None)
+
+        assert not sampler.filter(debug)
+        assert sampler.filter(warning)
@@ -0,0 +1,132 @@
+"""
+Tests for generation budget profiles.
+"""
+
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'examples')))
+
+from src.api.fake import FakeBackend
+from src.cot import profiles
+from src.cot.profiles import get_profile, profile_names
+from src.cot.reasoning import ChainOfThoughtReasoner
+
+
+def completion_calls(profile, query="What is 6 * 7?", **kwargs):
+    """Run a query and return the keyword arguments of every completion call."""
+    backend = FakeBackend()
+    reasoner = ChainOfThoughtReasoner(client=backend, profile=profile)
+    with patch.object(backend, "generate_completion", wraps=backend.generate_completion) as completion:
+        reasoner.process_query(query, **kwargs)
+    return [call.kwargs for call in completion.call_args_list]
+
+
+def test_builtin_profiles():
+    """The three built-in profiles exist and get cheaper from thorough to fast."""
+    assert {"fast", "balanced", "thorough"} <= set(profile_names())
+    fast, balanced, thorough = get_profile("fast"), get_profile("balanced"), get_profile("thorough")
+    assert fast.max_tokens < balanced.max_tokens < thorough.max_tokens
+    # Like the reasoner before profiles: one tool round, then a final call without tools
+    assert fast.max_tool_rounds == balanced.max_tool_rounds == thorough.max_tool_rounds == 1
+    assert get_profile(" Fast ") == fast
+    with pytest.raises(ValueError, match="Unknown profile 'turbo'"):
+        get_profile("turbo")
+
+
+def test_profile_sets_completion_parameters():
+    """A profile's prompt, temperature and max_tokens reach the backend."""
+    fast = get_profile("fast")
+    first = completion_calls("fast", query="How many Rs are in the word 'strawberry'?")[0]
+    assert first["max_tokens"] == fast.max_tokens
+    assert first["temperature"] == fast.temperature
+    assert first["messages"][0]["content"].startswith(fast.system_prompt())
+
+    # Explicit arguments override the profile
+    first = completion_calls("fast", temperature=0.0, max_tokens=99)[0]
+    assert (first["temperature"], first["max_tokens"]) == (0.0, 99)
+
+
+def test_tool_rounds_are_limited():
+    """The call after the last allowed tool round is not offered tools."""
+    fast = completion_calls("fast")
+    assert "tools" in fast[0] and fast[1].get("tools") is None
+
+    thorough = completion_calls("thorough")
+    assert "tools" in thorough[0] and thorough[1].get("tools") is None
+
+    deep = get_profile("thorough")._replace(name="deep", max_tool_rounds=2)
+    with patch.dict(profiles.PROFILES, {"deep": deep}):
+        calls = completion_calls("deep")
+    assert "tools" in calls[0] and calls[1].get("tools")
+
+
+def test_blocking_and_streaming_run_the_same_tool_rounds():
+    """Both paths run the tool calls of every allowed round and reach the same answer."""
+    ran = []
+    for stream in (False, True):
+        reasoner = ChainOfThoughtReasoner(client=FakeBackend(), profile="fast")
+        with patch.object(reasoner, "_run_tool_calls", wraps=reasoner._run_tool_calls) as run_tools:
+            if stream:
+                events = list(reasoner.stream_query("What is 6 * 7?"))
+                result = events[-1]["result"]
+            else:
+                result = reasoner.process_query("What is 6 * 7?")
+        ran.append((run_tools.call_count, result["final_answer"]))
+    assert ran[0] == ran[1]
+    assert ran[0][0] == get_profile("fast").max_tool_rounds
+
+
+def test_tool_rounds_must_be_positive():
+    """Overrides that would skip the tool calls the model asked for are ignored."""
+    with patch.object(profiles, "BUDGET_PROFILE_OVERRIDES", '{"fast": {"max_tool_rounds": 0}, "none": {"max_tool_rounds": -1}}'):
+        loaded = profiles._load_profiles()
+    assert "fast" not in loaded and "none" not in loaded
+
+
+def test_thorough_prompt_uses_min_steps():
+    """The thorough profile's min_steps reaches the model."""
+    thorough = get_profile("thorough")
+    assert f"At least {thorough.min_steps}." in thorough.system_prompt()
+    assert "At least 5." in thorough._replace(min_steps=5).system_prompt()
+
+
+def test_step_limits_must_fit_the_prompt():
+    """Overrides leaving a prompt's max_steps unset or below min_steps are ignored."""
+    overrides = '{"balanced": {"max_steps": null}, "short": {"prompt": "concise", "min_steps": 4, "max_steps": 2}, ' \
+                '"open": {"prompt": "thorough", "max_steps": null}}'
+    with patch.object(profiles, "BUDGET_PROFILE_OVERRIDES", overrides):
+        loaded = profiles._load_profiles()
+    assert "balanced" not in loaded and "short" not in loaded
+    assert loaded["open"].max_steps is None
+    assert "None" not in loaded["fast"].system_prompt()
+
+
+@patch('src.cot.reasoning.GroqClient')
+def test_reason_endpoint_profile(mock_groq_client):
+    """The API selects profiles per request and rejects unknown ones."""
+    import web_app
+
+    backend = FakeBackend()
+    mock_groq_client.return_value = backend
+    web_app.get_reasoner.cache_clear()
+    try:
+        with patch.object(backend, "generate_completion", wraps=backend.generate_completion) as completion:
+            with TestClient(web_app.app) as client:
+                response = client.post("/api/reason", json={"query": "What is 6 * 7?", "profile": "fast"})
+                unknown = client.post("/api/reason", json={"query": "What is 6 * 7?", "profile": "turbo"})
+                too_small = client.post("/api/reason", json={"query": "What is 6 * 7?", "max_tokens": 0})
+    finally:
+        web_app.get_reasoner.cache_clear()
+
+    assert response.status_code == 200
+    assert completion.call_args_list[0].kwargs["max_tokens"] == get_profile("fast").max_tokens
+    assert unknown.status_code == 422
+    assert "turbo" in unknown.json()["detail"]
+    assert too_small.status_code == 422
@@ -0,0 +1,117 @@
+"""
+Tests for the sampling profiler, CPU time per route and event loop lag monitoring.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'examples')))
+
+from src.api.fake import FakeBackend
+from src.web.profiling import LoopLagMonitor, ProfilerBusyError, RouteCPU, SamplingProfiler, collapsed, cpu_timed
+
+
+def spin_until(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_profiler_samples_busy_threads():
+    """Stacks of a busy thread are sampled, idle threads are left out."""
+    stop, idle = threading.Event(), threading.Event()
+    busy = threading.Thread(target=spin_until, args=(stop,), name="busy")
+    waiting = threading.Thread(target=idle.wait, name="waiting")
+    busy.start()
+    waiting.start()
+    profiler = SamplingProfiler()
+    try:
+        profile = profiler.profile(0.2, interval=0.005)
+    finally:
+        stop.set()
+        idle.set()
+        busy.join()
+        waiting.join()
+
+    assert profile["samples"] > 10
+    busy_stacks = [stack for stack in profile["stacks"] if stack.startswith("busy;")]
+    assert busy_stacks and all("spin_until (tests/test_profiling.py:" in stack for stack in busy_stacks)
+    assert not any(stack.startswith("waiting;") for stack in profile["stacks"])
+    line = collapsed(profile["stacks"]).splitlines()[0]
+    assert int(line.rsplit(" ", 1)[1]) > 0
+
+    with profiler._lock, pytest.raises(ProfilerBusyError):
+        profiler.profile(0.1)
+
+
+def test_cpu_time_is_charged_to_the_route():
+    """CPU spent in worker threads counts for the request that started the work."""
+    async def scenario():
+        routes = RouteCPU()
+        with routes.track("POST /busy"):
+            await asyncio.to_thread(cpu_timed(lambda: sum(range(2 * 10 ** 6))))
+            await asyncio.to_thread(time.sleep, 0.05)
+        # Work outside of a request is not charged
+        await asyncio.to_thread(cpu_timed(lambda: sum(range(10 ** 6))))
+        return routes.stats()
+
+    stats = asyncio.run(scenario())["POST /busy"]
+    assert stats["requests"] == 1
+    assert 0 < stats["cpu_seconds"] < stats["wall_seconds"]
+
+
+def test_loop_lag_monitor_reports_blocking_code():
+    """Blocking the event loop is measured and the blocking stack captured."""
+    async def scenario():
+        monitor = LoopLagMonitor(interval=0.02, threshold=0.05)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        time.sleep(0.3)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        return monitor.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["max_lag_seconds"] >= 0.2
+    assert stats["stalls"] >= 1
+    assert any("time.sleep(0.3)" in line for line in stats["recent"][0]["stack"])
+
+
+@patch('src.cot.reasoning.GroqClient')
+def test_admin_profiling_endpoints(mock_groq_client):
+    """The profiling endpoints need the admin key; CPU per route is exported as metrics."""
+    import web_app
+
+    mock_groq_client.return_value = FakeBackend()
+    web_app.get_reasoner.cache_clear()
+    try:
+        with TestClient(web_app.app) as client:
+            assert client.get("/admin/profile").status_code == 404
+            client.post("/api/reason", json={"query": "What is 6 * 7?", "profile": "fast"})
+            with patch.object(web_app, "ADMIN_API_KEY", "admin-secret"):
+                headers = {"X-Admin-Key": "admin-secret"}
+                assert client.get("/admin/cpu").status_code == 403
+                profile = client.get("/admin/profile", params={"seconds": 0.2}, headers=headers)
+                as_json = client.get("/admin/profile", params={"seconds": 0.1, "format": "json"}, headers=headers)
+                too_long = client.get("/admin/profile", params={"seconds": 600}, headers=headers)
+                cpu = client.get("/admin/cpu", headers=headers).json()
+            metrics = client.get("/metrics").text
+    finally:
+        web_app.get_reasoner.cache_clear()
+
+    assert profile.status_code == 200
+    assert int(profile.headers["X-Profile-Samples"]) > 0
+    assert as_json.json()["samples"] > 0
+    assert too_long.status_code == 422
+    assert cpu["routes"]["POST /api/reason"]["requests"] >= 1
+    assert "lag_seconds" in cpu["event_loop"]
+    assert 'cot_route_cpu_seconds_total{route="POST /api/reason"}' in metrics
+    assert "cot_event_loop_lag_seconds" in metrics
@@ -136,3 +136,55 @@ class TestChainOfThoughtReasoner:
         assert result["final_answer"] == "The answer is 4"
         assert mock_client_instance.generate_completion.call_count == 2
         mock_calculate.assert_called_once_with("2+2")
+
+    @patch('src.cot.reasoning.GroqClient')
+    def test_process_query_repairs_locally(self, mock_groq_client):
+        """Test that fixable schema violations are repaired without another call."""
+        # Arrange
+        mock_client_instance = MagicMock()
+        mock_client_instance.generate_completion.return_value = {
+            "content": "Here is my answer:\n```json\n" + json.dumps({
+                "reasoning_steps": [
+                    {"title": "Step 1", "content": "Content 1", "next_action": "Final Answer"}
+                ]
+            }) + "\n```"
+        }
+        mock_groq_client.return_value = mock_client_instance
+        
+        reasoner = ChainOfThoughtReasoner(use_tools=False)
+        
+        # Act
+        result = reasoner.process_query("Test query", structured_output=True)
+        
+        # Assert
+        assert result["reasoning_steps"][0]["next_action"] == "final_answer"
+        assert result["final_answer"] == "Content 1"
+        mock_client_instance.generate_completion.assert_called_once()
+    
+    @patch('src.cot.reasoning.GroqClient')
+    def test_process_query_reasks_for_broken_json(self, mock_groq_client):
+        """Test that unparseable JSON triggers a short fix-your-JSON request."""
+        # Arrange
+        mock_client_instance = MagicMock()
+        mock_client_instance.generate_completion.side_effect = [
+            {"content": '{"reasoning_steps": [{"title": "Step 1", "content": "Content 1"'},
+            {"content": json.dumps({
+                "reasoning_steps": [
+                    {"title": "Step 1", "content": "Content 1", "next_action": "final_answer"}
+                ],
+                "final_answer": "Final answer"
+            })}
+        ]
+        mock_groq_client.return_value = mock_client_instance
+        
+        reasoner = ChainOfThoughtReasoner(use_tools=False)
+        
+        # Act
+        result = reasoner.process_query("Test query", structured_output=True)
+        
+        # Assert
+        assert result["final_answer"] == "Final answer"
+        assert mock_client_instance.generate_completion.call_count == 2
+        reask_kwargs = mock_client_instance.generate_completion.call_args.kwargs
+        assert reask_kwargs["temperature"] == 0.0
+        assert reask_kwargs["max_tokens"] < 4000
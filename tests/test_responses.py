@@ -0,0 +1,71 @@
+"""
+Tests for the typed response models and JSON response helper.
+"""
+
+import gzip
+import json
+import os
+import sys
+from unittest.mock import MagicMock
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.cot.models import QueryResponse, ReasoningResult
+from src.web.responses import choose_encoding, json_response
+
+
+def _request(accept_encoding=""):
+    request = MagicMock()
+    request.headers = {"accept-encoding": accept_encoding}
+    return request
+
+
+class TestReasoningResult:
+
+    def test_structured_result(self):
+        """Structured results validate into typed steps."""
+        result = ReasoningResult.from_result({
+            "reasoning_steps": [{"title": "T", "content": "C", "next_action": "final_answer"}],
+            "final_answer": "42",
+            "structured": True
+        })
+
+        assert result.reasoning_steps[0].next_action == "final_answer"
+        assert result.final_answer == "42"
+
+    def test_invalid_result_becomes_unstructured(self):
+        """Results that do not match the schema are passed on as content."""
+        raw = {"reasoning_steps": [{"title": "T"}]}
+
+        result = ReasoningResult.from_result(raw)
+
+        assert result.structured is False
+        assert json.loads(result.content) == raw
+
+
+class TestJsonResponse:
+
+    def test_small_body_not_compressed(self):
+        """Bodies below the threshold are sent as-is without None fields."""
+        model = QueryResponse(result=ReasoningResult(content="short", structured=False))
+
+        response = json_response(_request("gzip"), model)
+
+        assert "content-encoding" not in response.headers
+        assert json.loads(response.body) == {"result": {"content": "short", "structured": False}}
+
+    def test_large_body_gzipped(self):
+        """Large bodies are gzip-compressed when the client accepts it."""
+        model = QueryResponse(result=ReasoningResult(content="x" * 5000, structured=False))
+
+        response = json_response(_request("gzip, deflate"), model)
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert json.loads(gzip.decompress(response.body))["result"]["content"] == "x" * 5000
+
+    def test_choose_encoding_respects_quality(self):
+        """Encodings with q=0 are not used."""
+        assert choose_encoding("gzip;q=0", 10000) is None
+        assert choose_encoding("identity", 10000) is None
+        assert choose_encoding("gzip", 10, min_size=100) is None
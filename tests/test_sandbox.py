@@ -0,0 +1,83 @@
+"""
+Tests for sandboxed tool execution.
+"""
+
+import math
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tools.calculator import _calculate, calculate
+from src.tools.sandbox import ToolError, ToolSandbox, ToolTimeout
+
+
+@pytest.fixture
+def sandbox():
+    sandbox = ToolSandbox(workers=1, timeout=5, cpu_seconds=1, memory_mb=256)
+    yield sandbox
+    sandbox.close()
+
+
+def test_calls_run_in_a_worker(sandbox):
+    """Results come back from the worker, which is reused between calls."""
+    assert sandbox.run(_calculate, "1/3 + 1/6", "exact", None)["exact"] == "0.5"
+    assert sandbox.run(os.getpid) == sandbox.run(os.getpid) != os.getpid()
+
+
+def test_timeout_kills_and_replaces_the_worker(sandbox):
+    """A call past its timeout fails fast and the pool keeps serving."""
+    pid = sandbox.run(os.getpid)
+    start = time.monotonic()
+    with pytest.raises(ToolTimeout):
+        sandbox.run(time.sleep, 10, timeout=0.2)
+    assert time.monotonic() - start < 5
+    assert sandbox.recycled == 1
+    assert sandbox.run(os.getpid) != pid
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="resource limits need the resource module")
+def test_resource_limits(sandbox):
+    """Running out of CPU time or memory fails the call, not the server."""
+    with pytest.raises(ToolError, match="Memory limit exceeded"):
+        sandbox.run(bytearray, 1024 ** 3)
+    with pytest.raises(ToolError, match="CPU time limit exceeded"):
+        sandbox.run(math.factorial, 10 ** 7)
+    assert sandbox.run(pow, 2, 10) == 1024
+
+
+def test_errors_are_reported(sandbox):
+    """Exceptions raised by the tool, or unpicklable calls, leave the worker usable."""
+    with pytest.raises(ToolError, match="ZeroDivisionError"):
+        sandbox.run(divmod, 1, 0)
+    with pytest.raises(Exception):
+        sandbox.run(lambda: 1)
+    assert sandbox.run(abs, -1) == 1
+    assert sandbox.recycled == 0
+
+
+def test_waiting_for_a_worker_is_bounded(sandbox):
+    """Calls fail within their timeout when every worker is busy, and after close()."""
+    busy = threading.Thread(target=sandbox.run, args=(time.sleep, 1))
+    busy.start()
+    time.sleep(0.2)
+    start = time.monotonic()
+    with pytest.raises(ToolTimeout):
+        sandbox.run(abs, -1, timeout=0.2)
+    assert time.monotonic() - start < 0.8
+    busy.join()
+
+    sandbox.close()
+    with pytest.raises(ToolError, match="closed"):
+        sandbox.run(abs, -1)
+
+
+def test_calculate_uses_the_sandbox():
+    """The calculator tool goes through the shared sandbox by default."""
+    assert calculate("6 * 7") == {"result": 42}
+    assert calculate("0.1 + 0.2", mode="exact")["exact"] == "0.3"
@@ -0,0 +1,112 @@
+"""
+Tests for multi-turn reasoning sessions.
+"""
+
+import json
+import os
+import sys
+from unittest.mock import patch, MagicMock
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'examples')))
+
+from fastapi.testclient import TestClient
+
+from src.cot.reasoning import ChainOfThoughtReasoner
+from src.cot.session import ReasoningSession
+
+
+def answer(final_answer):
+    return json.dumps({
+        "reasoning_steps": [{"title": "Think", "content": "Thinking.", "next_action": "final_answer"}],
+        "final_answer": final_answer
+    })
+
+
+def stream_of(*contents):
+    return [iter([{"content": content}]) for content in contents]
+
+
+class TestReasoningSession:
+
+    def test_history_is_question_and_final_answer(self):
+        """Only the question and final answer of earlier turns are sent back."""
+        session = ReasoningSession(MagicMock())
+        session.record("What is 2 + 2?", {"reasoning_steps": [{"title": "x"}], "final_answer": "4"})
+
+        assert session.history() == [
+            {"role": "user", "content": "What is 2 + 2?"},
+            {"role": "assistant", "content": "4"},
+        ]
+
+    def test_old_turns_are_summarized(self):
+        """Turns beyond max_turns are folded into a bounded summary."""
+        session = ReasoningSession(MagicMock(), max_turns=2, max_summary_chars=200)
+        for i in range(10):
+            session.record(f"Question {i}. With more detail.", {"final_answer": f"Answer {i}. Explanation."})
+
+        history = session.history()
+        assert history[0]["role"] == "system"
+        summary = history[0]["content"]
+        assert "Q: Question 7. A: Answer 7." in summary
+        assert "With more detail" not in summary
+        assert len(summary) < 250
+        assert [m["content"] for m in history[1:]] == [
+            "Question 8. With more detail.", "Answer 8. Explanation.",
+            "Question 9. With more detail.", "Answer 9. Explanation.",
+        ]
+
+    @patch('src.cot.reasoning.GroqClient')
+    def test_follow_up_includes_history(self, mock_groq_client):
+        """A follow-up question is sent with the earlier turn."""
+        mock_client_instance = MagicMock()
+        mock_client_instance.stream_completion.side_effect = stream_of(answer("4"), answer("8"))
+        mock_groq_client.return_value = mock_client_instance
+
+        session = ReasoningSession(ChainOfThoughtReasoner(use_tools=False))
+        list(session.stream("What is 2 + 2?"))
+        events = list(session.stream("And doubled?"))
+
+        assert events[-1]["result"]["final_answer"] == "8"
+        messages = mock_client_instance.stream_completion.call_args_list[1].kwargs["messages"]
+        assert [m["role"] for m in messages] == ["system", "user", "assistant", "user"]
+        assert messages[2]["content"] == "4"
+        assert session.turn_count == 2
+
+
+@patch('src.cot.reasoning.GroqClient')
+def test_websocket_session(mock_groq_client):
+    """Messages on one connection share a conversation and stream events back."""
+    import web_app
+
+    mock_client_instance = MagicMock()
+    mock_client_instance.stream_completion.side_effect = stream_of(answer("4"), answer("8"))
+    mock_groq_client.return_value = mock_client_instance
+    web_app.get_reasoner.cache_clear()
+
+    try:
+        with TestClient(web_app.app) as client:
+            with client.websocket_connect("/ws/reason?use_tools=false") as websocket:
+                results = []
+                for query in ("What is 2 + 2?", "And doubled?"):
+                    websocket.send_json({"query": query})
+                    while True:
+                        event = websocket.receive_json()
+                        if event["type"] == "result":
+                            results.append(event["result"]["final_answer"])
+                        elif event["type"] == "usage":
+                            # Each answer ends with its usage
+                            break
+                        else:
+                            assert event["type"] == "step"
+
+                websocket.send_text("not json")
+                assert websocket.receive_json()["type"] == "error"
+    finally:
+        web_app.get_reasoner.cache_clear()
+
+    assert results == ["4", "8"]
+    assert mock_groq_client.call_count == 1
+    second_request = mock_client_instance.stream_completion.call_args_list[1].kwargs["messages"]
+    assert second_request[1] == {"role": "user", "content": "What is 2 + 2?"}
@@ -0,0 +1,152 @@
+"""
+Tests for runtime settings and their hot reload.
+"""
+
+import asyncio
+import json
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'examples')))
+
+from src import settings as settings_module
+from src.api.fake import FakeBackend
+from src.api.hedging import HedgedBackend
+from src.cot.reasoning import ChainOfThoughtReasoner
+from src.settings import Settings, SettingsError, get_settings, load_settings, on_reload, reload_settings, validate_settings
+from src.web.admission import AdmissionController, Priority
+
+
+@pytest.fixture
+def restore_settings(monkeypatch):
+    """Undo reloads made by a test."""
+    monkeypatch.setattr(settings_module, "_settings", settings_module._settings)
+    monkeypatch.setattr(settings_module, "_path", settings_module._path)
+
+
+def write_settings(path, values):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(values, f)
+    return str(path)
+
+
+def test_validate_settings():
+    """Values override the defaults and are checked for name, type and range."""
+    settings = validate_settings({"max_concurrent_requests": 3, "request_timeout": 30, "log_level": "debug"})
+    assert settings.max_concurrent_requests == 3
+    assert settings.request_timeout == 30.0 and isinstance(settings.request_timeout, float)
+    assert settings.log_level == "DEBUG"
+    assert settings.tool_timeout == Settings().tool_timeout
+
+    with pytest.raises(SettingsError, match="Unknown settings: max_concurency"):
+        validate_settings({"max_concurency": 3})
+    with pytest.raises(SettingsError, match="expected int"):
+        validate_settings({"max_concurrent_requests": "3"})
+    with pytest.raises(SettingsError, match="max_concurrent_requests: must be positive"):
+        validate_settings({"max_concurrent_requests": 0})
+    with pytest.raises(SettingsError, match="fallback_speculation"):
+        validate_settings({"fallback_speculation": "sometimes"})
+
+
+def test_toml_file(tmp_path):
+    """Settings files may be TOML."""
+    path = tmp_path / "settings.toml"
+    path.write_text("tool_timeout = 0.5\njob_workers = 2\n", encoding="utf-8")
+    settings = load_settings(str(path))
+    assert (settings.tool_timeout, settings.job_workers) == (0.5, 2)
+
+
+def test_reload(tmp_path, monkeypatch, restore_settings):
+    """A reload swaps in valid settings, notifies listeners and keeps the old ones if invalid."""
+    monkeypatch.setattr(settings_module, "_listeners", [])
+    seen = []
+    on_reload(seen.append)
+    path = write_settings(tmp_path / "settings.json", {"request_timeout": 12, "port": 9000})
+
+    result = reload_settings(path)
+    assert result["changed"]["request_timeout"][1] == 12.0
+    assert result["restart_required"] == ["port"]
+    assert get_settings().request_timeout == 12.0
+    assert seen == [get_settings()]
+
+    write_settings(path, {"request_timeout": -1})
+    with pytest.raises(SettingsError):
+        reload_settings()
+    assert get_settings().request_timeout == 12.0
+    assert len(seen) == 1
+
+
+@patch('src.cot.reasoning.GroqClient')
+def test_hedging_follows_reload(mock_groq_client, tmp_path, restore_settings):
+    """Hedging is switched on, retuned and off again by reloads, without a new reasoner."""
+    mock_groq_client.return_value = FakeBackend()
+    reasoner = ChainOfThoughtReasoner(use_tools=False)
+    path = tmp_path / "settings.json"
+    assert reasoner._backend() is reasoner.client
+
+    reload_settings(write_settings(path, {"hedge_enabled": True, "hedge_initial_delay": 0.5}))
+    hedged = reasoner._backend()
+    assert isinstance(hedged, HedgedBackend) and hedged.primary is reasoner.client
+    assert hedged.hedge_delay() == 0.5
+
+    reload_settings(write_settings(path, {"hedge_enabled": True, "hedge_initial_delay": 0.1, "hedge_max_rate": 0.5}))
+    assert reasoner._backend() is hedged
+    assert (hedged.hedge_delay(), hedged.max_hedge_rate) == (0.1, 0.5)
+
+    reload_settings(write_settings(path, {}))
+    assert reasoner._backend() is reasoner.client
+
+
+def test_admission_resize():
+    """Raising the concurrency limit admits queued requests; lowering it spares running ones."""
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, max_queue=4)
+        await controller.acquire(Priority.INTERACTIVE)
+        waiter = asyncio.ensure_future(controller.acquire(Priority.INTERACTIVE))
+        await asyncio.sleep(0)
+
+        controller.configure(max_concurrency=2, max_queue=4)
+        await waiter
+        assert controller.active == 2
+
+        controller.configure(max_concurrency=1, max_queue=4)
+        assert controller.active == 2
+        controller.release()
+        controller.release()
+        assert controller.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_admin_reload_endpoint(tmp_path, restore_settings):
+    """The admin endpoints need the admin key; a reload retunes admission without a restart."""
+    import web_app
+
+    path = write_settings(tmp_path / "settings.json", {"max_concurrent_requests": 3, "max_queued_requests": 7})
+    original = (web_app.admission.max_concurrency, web_app.admission.max_queue)
+    try:
+        with TestClient(web_app.app) as client:
+            assert client.get("/admin/settings").status_code == 404
+            with patch.object(web_app, "ADMIN_API_KEY", "admin-secret"), patch.object(settings_module, "_path", path):
+                assert client.post("/admin/settings/reload", headers={"X-Admin-Key": "wrong"}).status_code == 403
+                reloaded = client.post("/admin/settings/reload", headers={"X-Admin-Key": "admin-secret"})
+                assert (web_app.admission.max_concurrency, web_app.admission.max_queue) == (3, 7)
+                current = client.get("/admin/settings", headers={"X-Admin-Key": "admin-secret"}).json()
+
+                write_settings(path, {"max_concurrent_requests": "many"})
+                rejected = client.post("/admin/settings/reload", headers={"X-Admin-Key": "admin-secret"})
+    finally:
+        web_app.admission.configure(*original)
+
+    assert reloaded.status_code == 200
+    assert reloaded.json()["changed"]["max_concurrent_requests"][1] == 3
+    assert current["settings"]["max_queued_requests"] == 7
+    assert current["file"] == path
+    assert rejected.status_code == 422
+    assert "max_concurrent_requests" in rejected.json()["detail"]
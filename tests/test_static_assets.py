@@ -0,0 +1,150 @@
+"""
+Tests for the static asset pipeline and precompressed static file serving.
+"""
+
+import gzip
+import json
+import os
+import shutil
+import sys
+from unittest.mock import patch
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from src.web import assets
+from src.web.assets import (
+    AssetBuilder,
+    latin_font_faces,
+    minify_css,
+    minify_js,
+    subset_font_awesome_css,
+    used_icon_names,
+)
+from src.web.static_files import IMMUTABLE_CACHE_CONTROL, PrecompressedStaticFiles
+
+STATIC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'static'))
+
+FONT_AWESOME_CSS = (
+    '.fa-brain:before{content:"\\f5dc"}.fa-house:before,.fa-home:before{content:"\\f015"}'
+    '.fa-sun:before{content:"\\f185"}.fa-sun-bright:before{content:"\\e28f"}'
+)
+
+GOOGLE_FONTS_CSS = """/* cyrillic */
+@font-face { font-family: 'Inter'; src: url(https://fonts.gstatic.com/inter-cyrillic.woff2) format('woff2'); }
+/* latin */
+@font-face { font-family: 'Inter'; src: url(https://fonts.gstatic.com/inter-latin.woff2) format('woff2'); }
+"""
+
+
+def fake_download(url):
+    if url.endswith("all.min.css"):
+        return FONT_AWESOME_CSS.encode("utf-8")
+    if "fonts.googleapis.com" in url:
+        return GOOGLE_FONTS_CSS.encode("utf-8")
+    return b"wOF2 font bytes"
+
+
+class TestAssetTransforms:
+
+    def test_minify_css(self):
+        """Comments and redundant whitespace are removed."""
+        css = "/* theme */\nbody {\n    color: red;\n    margin: 0 auto;\n}\n"
+        assert minify_css(css) == "body{color:red;margin:0 auto}"
+
+    def test_minify_css_keeps_selectors_and_strings(self):
+        """Whitespace that changes a selector and the contents of strings are kept."""
+        css = 'nav a :hover {\n    content: "a ;  /* b */";\n}\n'
+        assert minify_css(css) == 'nav a :hover{content:"a ;  /* b */"}'
+
+    def test_minify_js_keeps_code(self):
+        """Comments, indentation and blank lines are removed."""
+        js = "// setup\nconst url = 'http://x'; // note\n\n    if (a) {\n        b(); /* call */\n    }\n"
+        assert minify_js(js) == "const url = 'http://x';\nif (a) {\nb();\n}\n"
+
+    def test_minify_js_keeps_literals(self):
+        """Template literals, strings and regular expressions are copied unchanged."""
+        js = "const text = `first\n    // not a comment\n  ${ {a: 1}.a } last`;\nconst re = /\\/\\/[/*]/g, half = x / 2;\n"
+        assert minify_js(js) == js
+
+    def test_font_awesome_subset(self):
+        """Only the icons in use are kept, including aliased selectors."""
+        css = subset_font_awesome_css(FONT_AWESOME_CSS, ["home", "sun"], "/font.woff2")
+
+        assert '.fa-home:before{content:"\\f015"}' in css
+        assert '.fa-sun:before{content:"\\f185"}' in css
+        assert "f5dc" not in css and "e28f" not in css
+        assert "url(/font.woff2)" in css
+
+    def test_used_icon_names(self):
+        """Style classes are not treated as icons."""
+        assert used_icon_names(['<i class="fa-solid fa-brain"></i>']) == ["brain"]
+
+    def test_latin_font_faces(self):
+        """Only the latin subset of Google Fonts is kept."""
+        faces = latin_font_faces(GOOGLE_FONTS_CSS)
+        assert [url for _, url in faces] == ["https://fonts.gstatic.com/inter-latin.woff2"]
+
+
+class TestAssetBuilder:
+
+    def test_build(self, tmp_path):
+        """The build fingerprints, vendors and precompresses assets."""
+        # Arrange
+        static_dir = tmp_path / "static"
+        shutil.copytree(STATIC_DIR, static_dir, ignore=shutil.ignore_patterns("dist"))
+
+        # Act
+        with patch.object(assets, "_download", side_effect=fake_download):
+            manifest = AssetBuilder(str(static_dir)).build()
+
+        # Assert
+        dist = static_dir / "dist"
+        html = (dist / "index.html").read_text()
+        assert f"/static/dist/{manifest['js/app.js']}" in html
+        assert f"/static/dist/{manifest['css/style.css']}" in html
+        assert "cdnjs.cloudflare.com" not in html
+        assert "fonts.googleapis.com" not in html
+        assert "font-awesome" in manifest["vendor/font-awesome.css"]
+        assert json.loads((dist / "manifest.json").read_text()) == manifest
+
+        js_path = dist / manifest["js/app.js"]
+        assert gzip.decompress((dist / (manifest["js/app.js"] + ".gz")).read_bytes()) == js_path.read_bytes()
+        assert not (dist / (manifest["vendor/fa-solid-900.woff2"] + ".gz")).exists()
+
+
+class TestPrecompressedStaticFiles:
+
+    def test_serves_gzip_variant_with_immutable_caching(self, tmp_path):
+        """Fingerprinted files are served from their .gz sibling and cached forever."""
+        # Arrange
+        (tmp_path / "app.0123456789.js").write_text("console.log('hi');")
+        (tmp_path / "app.0123456789.js.gz").write_bytes(gzip.compress(b"console.log('hi');"))
+        client = TestClient(Starlette(routes=[Mount("/static", PrecompressedStaticFiles(directory=str(tmp_path)))]))
+
+        # Act
+        response = client.get("/static/app.0123456789.js", headers={"Accept-Encoding": "gzip"})
+        plain = client.get("/static/app.0123456789.js", headers={"Accept-Encoding": "identity"})
+
+        # Assert
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+        assert response.headers["content-type"].startswith("text/javascript")
+        assert response.text == "console.log('hi');"
+        assert "content-encoding" not in plain.headers
+        assert plain.headers["vary"] == "Accept-Encoding"
+
+    def test_revalidates_unfingerprinted_files(self, tmp_path):
+        """Other files are revalidated with their ETag."""
+        (tmp_path / "index.html").write_text("<html></html>")
+        client = TestClient(Starlette(routes=[Mount("/static", PrecompressedStaticFiles(directory=str(tmp_path)))]))
+
+        first = client.get("/static/index.html")
+        second = client.get("/static/index.html", headers={"If-None-Match": first.headers["etag"]})
+
+        assert first.headers["cache-control"] == "no-cache"
+        assert second.status_code == 304
@@ -0,0 +1,151 @@
+"""
+Tests for streaming reasoning steps.
+"""
+
+import asyncio
+import json
+import os
+import sys
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.api.types import FunctionCall, ToolCall
+from src.cot.reasoning import ChainOfThoughtReasoner
+from src.cot.streaming import StepStreamParser
+from src.utils.deadline import Deadline, DeadlineExceeded
+from src.web.responses import ndjson_stream
+
+RESPONSE = json.dumps({
+    "reasoning_steps": [
+        {"title": "Read", "content": "Braces {like [these]} and \"quotes\"", "next_action": "continue"},
+        {"title": "Solve", "content": "2 + 2 = 4", "next_action": "final_answer"}
+    ],
+    "final_answer": "4"
+})
+
+
+def chunks(text, size=7):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class TestStepStreamParser:
+
+    def test_steps_complete_before_document(self):
+        """Each step is returned by the chunk that closes it."""
+        parser = StepStreamParser()
+        seen = []
+        for index, chunk in enumerate(chunks(RESPONSE)):
+            for step in parser.feed(chunk):
+                seen.append((index, step["title"]))
+
+        assert [title for _, title in seen] == ["Read", "Solve"]
+        assert seen[0][0] < seen[1][0] < len(chunks(RESPONSE)) - 1
+        assert parser.steps[0]["content"] == "Braces {like [these]} and \"quotes\""
+
+    def test_single_character_chunks(self):
+        """Parsing does not depend on where chunk boundaries fall."""
+        parser = StepStreamParser()
+        for char in RESPONSE:
+            parser.feed(char)
+        assert [step["title"] for step in parser.steps] == ["Read", "Solve"]
+
+    def test_no_steps_array(self):
+        """Unrelated JSON yields no steps."""
+        parser = StepStreamParser()
+        assert parser.feed('{"answer": "[{}]"}') == []
+        assert parser.steps == []
+
+
+class TestStreamQuery:
+
+    @patch('src.cot.reasoning.GroqClient')
+    def test_stream_structured(self, mock_groq_client):
+        """Steps are streamed individually and followed by the result."""
+        mock_client_instance = MagicMock()
+        mock_client_instance.stream_completion.return_value = iter(
+            [{"content": chunk} for chunk in chunks(RESPONSE)]
+        )
+        mock_groq_client.return_value = mock_client_instance
+
+        reasoner = ChainOfThoughtReasoner(use_tools=False)
+        events = list(reasoner.stream_query("Test query"))
+
+        assert [event["type"] for event in events] == ["step", "step", "result"]
+        assert events[1]["index"] == 1
+        assert events[-1]["result"]["final_answer"] == "4"
+
+    @patch('src.cot.reasoning.GroqClient')
+    def test_stream_unstructured(self, mock_groq_client):
+        """Unstructured text is streamed as deltas."""
+        mock_client_instance = MagicMock()
+        mock_client_instance.stream_completion.return_value = iter([{"content": "Hello "}, {"content": "world"}])
+        mock_groq_client.return_value = mock_client_instance
+
+        reasoner = ChainOfThoughtReasoner(use_tools=False)
+        events = list(reasoner.stream_query("Test query", structured_output=False))
+
+        assert [event["type"] for event in events] == ["delta", "delta", "result"]
+        assert events[-1]["result"]["content"] == "Hello world"
+
+    @patch('src.cot.reasoning.GroqClient')
+    @patch('src.cot.reasoning.calculate')
+    def test_stream_with_tool_calls(self, mock_calculate, mock_groq_client):
+        """Tool rounds are reported before the follow-up stream."""
+        mock_calculate.return_value = {"result": 4}
+        tool_call = ToolCall(id="call_1", function=FunctionCall(name="calculate", arguments='{"expression": "2 + 2"}'))
+        mock_client_instance = MagicMock()
+        mock_client_instance.stream_completion.side_effect = [
+            iter([{"tool_calls": [tool_call]}]),
+            iter([{"content": chunk} for chunk in chunks(RESPONSE)]),
+        ]
+        mock_groq_client.return_value = mock_client_instance
+
+        reasoner = ChainOfThoughtReasoner(use_tools=True)
+        events = list(reasoner.stream_query("What is 2 + 2?"))
+
+        assert [event["type"] for event in events] == ["tool_call", "tool_result", "step", "step", "result"]
+        assert events[1]["result"] == {"result": 4}
+        follow_up = mock_client_instance.stream_completion.call_args_list[1].kwargs["messages"]
+        assert [message["role"] for message in follow_up[-3:]] == ["assistant", "tool", "user"]
+
+    @patch('src.cot.reasoning.GroqClient')
+    def test_stream_stops_when_cancelled(self, mock_groq_client):
+        """A cancelled deadline stops reading the upstream stream."""
+        mock_client_instance = MagicMock()
+        mock_client_instance.stream_completion.return_value = iter(
+            [{"content": chunk} for chunk in chunks(RESPONSE)]
+        )
+        mock_groq_client.return_value = mock_client_instance
+
+        deadline = Deadline()
+        reasoner = ChainOfThoughtReasoner(use_tools=False)
+        events = reasoner.stream_query("Test query", deadline=deadline)
+        next(events)
+        deadline.cancel()
+
+        with pytest.raises(DeadlineExceeded):
+            list(events)
+
+
+def test_ndjson_stream_reports_errors_and_closes():
+    """Events are encoded one per line; failures end with an error event."""
+    def events():
+        yield {"type": "step", "index": 0, "step": {"title": "A"}}
+        raise RuntimeError("boom")
+
+    closed = []
+    deadline = Deadline()
+
+    async def collect():
+        return [line async for line in ndjson_stream(events(), deadline, on_close=lambda: closed.append(True))]
+
+    lines = [json.loads(line) for line in asyncio.run(collect())]
+
+    assert lines[0]["type"] == "step"
+    assert lines[1]["type"] == "error"
+    assert closed == [True]
+    assert deadline.cancelled
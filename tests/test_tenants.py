@@ -0,0 +1,179 @@
+"""
+Tests for tenants: identification, token quotas and fair scheduling.
+"""
+
+import asyncio
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'examples')))
+
+from src.api.fake import FakeBackend
+from src.utils.usage import UsageLedger
+from src.web.admission import AdmissionController, Priority
+from src.web.tenants import QuotaExceededError, Tenant, TenantRegistry, UnknownAPIKeyError, key_digest
+
+TENANTS = {
+    "acme": {"api_keys": ["acme-key"], "weight": 2, "max_concurrency": 4},
+    "etl": {"api_keys": [key_digest("etl-key")], "token_quota": 1000},
+    "default": {"max_concurrency": 1},
+}
+
+
+class TestTenantRegistry:
+
+    def test_identify(self):
+        """Listed keys (plain or hashed) map to their tenant, all others to the shared default tenant."""
+        registry = TenantRegistry(TENANTS)
+        assert registry.identify("acme-key") == Tenant("acme", weight=2, max_concurrency=4)
+        assert registry.identify("etl-key").name == "etl"
+
+        stranger = registry.identify("some-key")
+        assert stranger == Tenant("default", max_concurrency=1)
+        assert registry.identify("another-key") == registry.identify(None) == registry.get("unlisted") == stranger
+
+        with pytest.raises(UnknownAPIKeyError):
+            TenantRegistry(TENANTS, require_key=True).identify("some-key")
+
+    def test_invalid_config_is_ignored(self):
+        """An unparsable TENANTS setting leaves every caller on the defaults."""
+        assert TenantRegistry.from_config('{"acme": {"colour": "red"}}').identify("acme-key").name == "default"
+
+    def test_token_quota(self):
+        """Completions recorded in the ledger count against the caller's quota until the window ends."""
+        registry = TenantRegistry(TENANTS, quota_window=60)
+        ledger = UsageLedger()
+        ledger.add_listener(registry.on_usage)
+        etl = registry.get("etl")
+
+        with patch("src.web.tenants.time.time", return_value=600.0):
+            ledger.record("etl", "structured", "m", 600, 300, 0.0)
+            registry.check_quota(etl)
+            ledger.record("etl", "structured", "m", 100, 0, 0.0)
+            with pytest.raises(QuotaExceededError) as excinfo:
+                registry.check_quota(etl)
+            assert excinfo.value.retry_after == 60
+            assert registry.quota_usage() == {"etl": {"used": 1000, "quota": 1000}}
+            # Tenants without a quota are not tracked
+            ledger.record("acme", "structured", "m", 10 ** 6, 0, 0.0)
+            registry.check_quota(registry.get("acme"))
+
+        with patch("src.web.tenants.time.time", return_value=660.0):
+            registry.check_quota(etl)
+        assert registry.quota_rejections == {"etl": 1}
+
+    def test_unlisted_callers_share_the_default_quota(self):
+        """Rotating keys does not reset the quota, and usage of unlisted callers is tracked under one name."""
+        registry = TenantRegistry({"default": {"token_quota": 100}}, quota_window=60)
+        with patch("src.web.tenants.time.time", return_value=600.0):
+            for i in range(50):
+                registry.charge(f"key-{i}", 2)
+            with pytest.raises(QuotaExceededError):
+                registry.check_quota(registry.identify("brand-new-key"))
+            assert registry.quota_usage() == {"default": {"used": 100, "quota": 100}}
+
+
+class TestFairScheduling:
+
+    def test_light_tenant_not_starved(self):
+        """A tenant with one queued request is served before another tenant's backlog."""
+        async def scenario():
+            controller = AdmissionController(max_concurrency=1, max_queue=10)
+            heavy, light = Tenant("heavy"), Tenant("light")
+            order = []
+
+            async def request(tenant):
+                async with controller.slot(Priority.INTERACTIVE, tenant=tenant):
+                    order.append(tenant.name)
+                    await asyncio.sleep(0)
+
+            await controller.acquire(Priority.INTERACTIVE, tenant=heavy)
+            tasks = [asyncio.ensure_future(request(heavy)) for _ in range(4)]
+            await asyncio.sleep(0)
+            tasks.append(asyncio.ensure_future(request(light)))
+            await asyncio.sleep(0)
+            controller.release(heavy)
+            await asyncio.gather(*tasks)
+
+            assert order.index("light") <= 1
+            assert controller.active == 0
+
+        asyncio.run(scenario())
+
+    def test_weights(self):
+        """While both wait, a tenant of weight 2 gets twice the slots of one of weight 1."""
+        async def scenario():
+            controller = AdmissionController(max_concurrency=1, max_queue=20)
+            gold, basic = Tenant("gold", weight=2), Tenant("basic")
+            order = []
+
+            async def request(tenant):
+                async with controller.slot(Priority.INTERACTIVE, tenant=tenant):
+                    order.append(tenant.name)
+                    await asyncio.sleep(0)
+
+            await controller.acquire(Priority.INTERACTIVE)
+            tasks = [asyncio.ensure_future(request(tenant)) for _ in range(6) for tenant in (basic, gold)]
+            await asyncio.sleep(0)
+            controller.release()
+            await asyncio.gather(*tasks)
+
+            assert order[:6].count("gold") == 4
+
+        asyncio.run(scenario())
+
+    def test_tenant_concurrency_limit(self):
+        """A tenant at its limit waits while other tenants use the free slots."""
+        async def scenario():
+            controller = AdmissionController(max_concurrency=4, max_queue=10)
+            limited = Tenant("limited", max_concurrency=1)
+
+            await controller.acquire(Priority.INTERACTIVE, tenant=limited)
+            waiter = asyncio.ensure_future(controller.acquire(Priority.INTERACTIVE, tenant=limited))
+            await asyncio.sleep(0)
+            assert not waiter.done()
+
+            await controller.acquire(Priority.INTERACTIVE, tenant=Tenant("other"))
+            assert controller.active == 2
+
+            controller.release(limited)
+            await waiter
+            stats = controller.tenant_stats()
+            assert stats["limited"]["active"] == 1
+            assert stats["limited"]["throttled"] == 1
+
+        asyncio.run(scenario())
+
+
+@patch('src.cot.reasoning.GroqClient')
+def test_api_keys_and_quotas(mock_groq_client):
+    """The API rejects unlisted keys when keys are required and callers over their quota."""
+    import web_app
+
+    mock_groq_client.return_value = FakeBackend()
+    registry = TenantRegistry(TENANTS, require_key=True)
+    registry.charge("etl", 5000)
+    web_app.get_reasoner.cache_clear()
+    try:
+        with patch.object(web_app, "tenants", registry), TestClient(web_app.app) as client:
+            body = {"query": "What is 6 * 7?", "profile": "fast"}
+            accepted = client.post("/api/reason", json=body, headers={"X-API-Key": "acme-key"})
+            unknown = client.post("/api/reason", json=body, headers={"X-API-Key": "stolen-key"})
+            over_quota = client.post("/api/reason", json=body, headers={"X-API-Key": "etl-key"})
+            metrics = client.get("/metrics").text
+    finally:
+        web_app.get_reasoner.cache_clear()
+
+    assert accepted.status_code == 200
+    assert unknown.status_code == 401
+    assert over_quota.status_code == 429
+    assert int(over_quota.headers["Retry-After"]) >= 1
+    assert 'cot_tenant_requests_admitted_total{tenant="acme"} 1' in metrics
+    assert 'cot_tenant_requests_throttled_total{tenant="etl",reason="quota"} 1' in metrics
+    assert 'cot_llm_calls_total{caller="acme"' in metrics
@@ -0,0 +1,90 @@
+"""
+Tests for compressed storage of reasoning results.
+"""
+
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.cot.trace_store import RAW, ZLIB, ZSTD, TraceCodec, TraceCodecError, TraceLog, read_records, read_results, zstandard
+
+TITLES = ["Understand the problem", "Set up the calculation", "Verify the answer"]
+
+
+def make_results(count):
+    return [
+        {
+            "query": f"What is {i} * 7?",
+            "result": {
+                "reasoning_steps": [
+                    {"title": title, "content": f"We multiply {i} by 7, which gives {i * 7}. Let's double-check each step.",
+                     "next_action": "final_answer" if title == TITLES[-1] else "continue"}
+                    for title in TITLES
+                ] + [{"title": f"Note on {i}", "content": "A one-off step.", "next_action": "continue"}],
+                "final_answer": f"The answer is {i * 7}.",
+            },
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize("method", [RAW, ZLIB, pytest.param(ZSTD, marks=pytest.mark.skipif(zstandard is None, reason="zstandard is not installed"))])
+def test_round_trip(method):
+    """Results decode to what was encoded, with both interned and unknown titles."""
+    samples = make_results(40)
+    codec = TraceCodec.train(samples[:30], method=method)
+    assert codec.titles == TITLES
+    for sample in samples[30:] + [{"content": "Unstructured answer", "structured": False}]:
+        assert codec.decode(codec.encode(sample)) == sample
+
+
+def test_trained_codec_is_smaller():
+    """Interning titles and a trained dictionary beat compressing plain JSON."""
+    samples = make_results(60)
+    trained = TraceCodec.train(samples[:50], method=ZLIB)
+    plain = TraceCodec(method=RAW)
+    untrained = TraceCodec(method=ZLIB)
+    sizes = [sum(len(codec.encode(sample)) for sample in samples[50:]) for codec in (plain, untrained, trained)]
+    assert sizes[2] < sizes[1] < sizes[0]
+
+
+def test_codec_file_and_dictionary_check(tmp_path):
+    """A saved codec reads the records it wrote; another dictionary is refused."""
+    samples = make_results(20)
+    codec = TraceCodec.train(samples, method=ZLIB)
+    path = str(tmp_path / "codec.json")
+    codec.save(path)
+    loaded = TraceCodec.load(path, method=ZLIB)
+    assert loaded.dictionary_id == codec.dictionary_id
+    assert loaded.decode(codec.encode(samples[0])) == samples[0]
+
+    with pytest.raises(TraceCodecError, match="dictionary"):
+        TraceCodec(method=ZLIB).decode(codec.encode(samples[0]))
+    with pytest.raises(TraceCodecError):
+        codec.decode(b"not a record")
+
+
+def test_trace_log(tmp_path):
+    """Records appended to the log are written in the background and read back in order."""
+    path = str(tmp_path / "traces.bin")
+    codec = TraceCodec(method=ZLIB)
+    log = TraceLog(path, codec)
+    samples = make_results(5)
+    for sample in samples:
+        log.append(sample)
+    log.flush()
+    assert list(read_records(path, codec)) == samples
+    assert read_results(path, codec) == samples
+
+    # A record that fails to encode is dropped without stopping the writer
+    encode = codec.encode
+    with patch.object(codec, "encode", side_effect=lambda record: encode(record) if "query" in record else 1 / 0):
+        log.append({"broken": True})
+        log.append(samples[0])
+        log.flush()
+    assert read_results(path, codec) == samples + samples[:1]
@@ -0,0 +1,129 @@
+"""
+Tests for request-scoped tracing and trace file analysis.
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.api.fake import FakeBackend
+from src.cot.reasoning import ChainOfThoughtReasoner
+from src.utils.trace_analysis import collapsed_stacks, load_traces, self_times, span_statistics
+from src.utils.tracing import configure_tracing, flush_tracing, span, start_trace, trace_id_for
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    path = str(tmp_path / "traces.jsonl")
+    configure_tracing(file=path)
+    yield path
+    configure_tracing(None, None)
+
+
+def test_disabled_tracing_is_a_noop(tmp_path):
+    """Without an export target spans are not recorded."""
+    configure_tracing(None, None)
+    with start_trace("request") as root:
+        root.set_attribute("ignored", True)
+        with span("child") as child:
+            child.set_attribute("ignored", True)
+    assert not list(tmp_path.iterdir())
+
+
+def test_reasoning_pipeline_is_traced(trace_file):
+    """A traced request records nested reasoner, completion and tool spans."""
+    reasoner = ChainOfThoughtReasoner(use_tools=True, client=FakeBackend())
+    with start_trace("POST /api/reason", request_id="3fa4c2"):
+        result = reasoner.process_query("What is 6 * 7?")
+    flush_tracing()
+
+    assert result["final_answer"] == "6 * 7 = 42"
+    traces = load_traces(trace_file)
+    assert list(traces) == [trace_id_for("3fa4c2")]
+    assert trace_id_for("3fa4c2").endswith("3fa4c2")
+
+    spans = traces[trace_id_for("3fa4c2")]
+    by_id = {s["span_id"]: s for s in spans}
+    parents = {s["name"]: by_id[s["parent_id"]]["name"] if s["parent_id"] else None for s in spans}
+    assert parents["reasoner.process_query"] == "POST /api/reason"
+    assert parents["reasoner.tool_round"] == "reasoner.process_query"
+    assert parents["tool.calculate"] == "reasoner.tool_round"
+    assert [s["name"] for s in spans].count("llm.completion") == 2
+
+    root = next(s for s in spans if not s["parent_id"])
+    assert root["attributes"]["request.id"] == "3fa4c2"
+    completion = next(s for s in spans if s["name"] == "llm.completion")
+    assert completion["attributes"]["backend"] == "FakeBackend"
+
+
+def test_spans_follow_work_into_threads(trace_file):
+    """Spans opened in asyncio.to_thread workers nest under the caller's span."""
+    def work():
+        with span("worker"):
+            pass
+
+    async def handler():
+        with start_trace("request"):
+            await asyncio.to_thread(work)
+
+    asyncio.run(handler())
+    flush_tracing()
+
+    (spans,) = load_traces(trace_file).values()
+    worker = next(s for s in spans if s["name"] == "worker")
+    assert worker["parent_id"] == next(s for s in spans if s["name"] == "request")["span_id"]
+
+
+def test_errors_are_recorded(trace_file):
+    """A span left by an exception carries the error."""
+    with pytest.raises(ValueError):
+        with start_trace("request"):
+            with span("failing"):
+                raise ValueError("boom")
+    flush_tracing()
+
+    (spans,) = load_traces(trace_file).values()
+    assert {s["name"]: s["error"] for s in spans} == {"failing": "ValueError: boom", "request": "ValueError: boom"}
+
+
+def test_trace_file_is_otlp_json(trace_file):
+    """Each line is an OTLP/JSON ExportTraceServiceRequest."""
+    with start_trace("request", tokens=12):
+        pass
+    flush_tracing()
+
+    with open(trace_file, encoding="utf-8") as f:
+        body = json.loads(f.readline())
+    (otlp_span,) = body["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert len(otlp_span["traceId"]) == 32 and len(otlp_span["spanId"]) == 16
+    assert {"key": "tokens", "value": {"intValue": "12"}} in otlp_span["attributes"]
+
+
+def _span(name, span_id, parent_id, start_ms, end_ms):
+    return {
+        "name": name, "span_id": span_id, "parent_id": parent_id,
+        "start_ns": start_ms * 1_000_000, "end_ns": end_ms * 1_000_000,
+        "duration_ns": (end_ms - start_ms) * 1_000_000, "attributes": {}, "error": None,
+    }
+
+
+def test_self_time_and_collapsed_stacks():
+    """Self time excludes children (overlapping children counted once)."""
+    spans = [
+        _span("request", "a", None, 0, 100),
+        _span("llm", "b", "a", 10, 50),
+        _span("llm", "c", "a", 30, 70),
+        _span("tool", "d", "b", 20, 30),
+    ]
+    assert self_times(spans) == {"a": 40_000_000, "b": 30_000_000, "c": 40_000_000, "d": 10_000_000}
+    assert collapsed_stacks([spans]) == {"request": 40_000, "request;llm": 70_000, "request;llm;tool": 10_000}
+
+    rows = {row["name"]: row for row in span_statistics([spans])}
+    assert rows["llm"]["count"] == 2
+    assert rows["llm"]["total_ms"] == pytest.approx(80.0)
@@ -0,0 +1,101 @@
+"""
+Tests for token usage capture, the usage ledger and /metrics.
+"""
+
+import csv
+import os
+import sqlite3
+import sys
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'examples')))
+
+from src.api.fake import FakeBackend
+from src.cot.reasoning import ChainOfThoughtReasoner
+from src.utils.usage import UsageLedger, UsageMeter, cost_of, ledger, metered, metering
+from src.web.metrics import MetricFamily, format_metrics
+from src.web.tenants import TenantRegistry
+
+
+def test_usage_is_attributed_to_features():
+    """Each completion of a request is metered under the feature that made it."""
+    reasoner = ChainOfThoughtReasoner(use_tools=True, client=FakeBackend())
+    with metering("tests") as meter:
+        reasoner.process_query("What is 6 * 7?")
+
+    usage = meter.summary()
+    assert set(usage["by_feature"]) == {"structured", "tool_round"}
+    assert usage["calls"] == 2
+    assert usage["total_tokens"] == usage["prompt_tokens"] + usage["completion_tokens"] > 0
+    assert ledger.totals()[("tests", "tool_round", "fake")]["calls"] >= 1
+
+
+def test_streams_are_metered():
+    """Usage reported at the end of a stream is recorded, even across threads."""
+    reasoner = ChainOfThoughtReasoner(use_tools=False, client=FakeBackend())
+    meter = UsageMeter("tests")
+    events = list(metered(reasoner.stream_query("Why is the sky blue?"), meter))
+
+    assert events[-1]["type"] == "result"
+    assert meter.summary()["by_feature"]["stream"]["calls"] == 1
+    assert meter.summary()["completion_tokens"] > 0
+
+
+def test_cost():
+    """Known models are priced per million tokens."""
+    assert cost_of("llama-3.3-70b-versatile", 1_000_000, 1_000_000) == 0.59 + 0.79
+    assert cost_of("unknown-model", 1000, 1000) == 0.0
+
+
+def test_ledger_flushes_to_sqlite_and_csv(tmp_path):
+    """Flushes write the usage since the previous flush."""
+    for path in (str(tmp_path / "usage.db"), str(tmp_path / "usage.csv")):
+        usage_ledger = UsageLedger(path, flush_interval=3600)
+        usage_ledger.record("alice", "structured", "m", 10, 5, 0.01)
+        usage_ledger.record("alice", "structured", "m", 20, 5, 0.02)
+        usage_ledger.record("bob", "fallback", "m", 7, 3, 0.0)
+        assert usage_ledger.flush() == 2
+        usage_ledger.record("alice", "structured", "m", 1, 1, 0.0)
+        usage_ledger.close()
+
+        if path.endswith(".csv"):
+            with open(path, newline="", encoding="utf-8") as f:
+                rows = [(r["caller"], r["feature"], int(r["calls"]), int(r["prompt_tokens"])) for r in csv.DictReader(f)]
+        else:
+            connection = sqlite3.connect(path)
+            rows = connection.execute("SELECT caller, feature, calls, prompt_tokens FROM usage").fetchall()
+            connection.close()
+        assert rows == [("alice", "structured", 2, 30), ("bob", "fallback", 1, 7), ("alice", "structured", 1, 1)]
+        assert usage_ledger.totals()[("alice", "structured", "m")]["calls"] == 3
+
+
+def test_format_metrics():
+    """Metrics render in the Prometheus text format with escaped labels."""
+    text = format_metrics([MetricFamily("x_total", "counter", "Things", [({"who": 'a"b'}, 3), ({}, 0.5)])])
+    assert text == '# HELP x_total Things\n# TYPE x_total counter\nx_total{who="a\\"b"} 3\nx_total 0.5\n'
+
+
+@patch('src.cot.reasoning.GroqClient')
+def test_reason_endpoint_reports_usage(mock_groq_client):
+    """/api/reason returns the request's usage and /metrics exposes the totals."""
+    import web_app
+
+    mock_groq_client.return_value = FakeBackend()
+    web_app.get_reasoner.cache_clear()
+    try:
+        with patch.object(web_app, "tenants", TenantRegistry({"team-k1": {"api_keys": ["k1"]}})), \
+                TestClient(web_app.app) as client:
+            response = client.post("/api/reason", json={"query": "What is 6 * 7?"}, headers={"X-API-Key": "k1"})
+            metrics = client.get("/metrics")
+    finally:
+        web_app.get_reasoner.cache_clear()
+
+    usage = response.json()["usage"]
+    assert usage["calls"] == 2
+    assert set(usage["by_feature"]) == {"structured", "tool_round"}
+    assert metrics.headers["content-type"].startswith("text/plain")
+    assert f'cot_llm_calls_total{{caller="team-k1",feature="tool_round",model="fake"}} 1' in metrics.text
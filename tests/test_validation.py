@@ -0,0 +1,93 @@
+"""
+Tests for reasoning schema validation and local repair.
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.cot.validation import ReasoningValidationError, repair_reasoning, validate_reasoning
+
+VALID_RESULT = {
+    "reasoning_steps": [
+        {"title": "Step 1", "content": "Content 1", "next_action": "continue"},
+        {"title": "Step 2", "content": "Content 2", "next_action": "final_answer"}
+    ],
+    "final_answer": "Final answer"
+}
+
+
+class TestValidateReasoning:
+
+    def test_valid_result(self):
+        """A result matching the schema has no errors."""
+        assert validate_reasoning(VALID_RESULT) == []
+
+    def test_reports_errors(self):
+        """Missing fields and bad enum values are reported."""
+        errors = validate_reasoning({
+            "reasoning_steps": [{"title": "T", "content": "C", "next_action": "keep going"}]
+        })
+
+        assert "missing 'final_answer'" in errors
+        assert any("invalid next_action" in error for error in errors)
+
+    def test_is_fast(self):
+        """Validating a typical result takes microseconds."""
+        start = time.perf_counter()
+        for _ in range(1000):
+            validate_reasoning(VALID_RESULT)
+        assert (time.perf_counter() - start) / 1000 < 1e-4
+
+
+class TestRepairReasoning:
+
+    def test_valid_result_untouched(self):
+        """Valid results are returned as-is with no repairs."""
+        result, repairs = repair_reasoning(VALID_RESULT)
+
+        assert result is VALID_RESULT
+        assert repairs == []
+
+    def test_coerces_enums_and_synthesizes_final_answer(self):
+        """Enum values are coerced and a missing final answer comes from the last step."""
+        # Arrange
+        data = {
+            "steps": [
+                {"title": "Count", "content": "There are 3 Rs", "next_action": "Continue"},
+                {"title": "Answer", "content": "3", "next_action": "done"}
+            ]
+        }
+
+        # Act
+        result, repairs = repair_reasoning(data)
+
+        # Assert
+        assert validate_reasoning(result) == []
+        assert [step["next_action"] for step in result["reasoning_steps"]] == ["continue", "final_answer"]
+        assert result["final_answer"] == "3"
+        assert repairs
+
+    def test_drops_malformed_steps(self):
+        """Steps that are not objects or have no content are dropped."""
+        data = {
+            "reasoning_steps": ["just text", {"title": "Empty"}, {"content": 42}],
+            "final_answer": 42
+        }
+
+        result, _ = repair_reasoning(data)
+
+        assert result["reasoning_steps"] == [{"title": "Step 1", "content": "42", "next_action": "final_answer"}]
+        assert result["final_answer"] == "42"
+
+    def test_unrepairable(self):
+        """Results with nothing usable raise ReasoningValidationError."""
+        with pytest.raises(ReasoningValidationError):
+            repair_reasoning({"reasoning_steps": []})
+        with pytest.raises(ReasoningValidationError):
+            repair_reasoning("not json")